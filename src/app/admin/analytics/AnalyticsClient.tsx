@@ -17,7 +17,7 @@ import {
 import React, { useState, useRef } from 'react'
 import { toast } from 'sonner'
 import { Tooltip } from '@/components/admin/Tooltip'
-import { exportAnalyticsData } from '@/lib/admin/export-utils'
+import { downloadExport } from '@/lib/admin/export-utils'
 
 interface StatsData {
     totalUsers: number
@@ -285,8 +285,6 @@ function SimplePieChart({ data, size = 120 }: { data: PieDataPoint[], size?: num
 
 export function AnalyticsClient({
     stats,
-    userGrowthData,
-    bookingTrendsData,
     revenueData,
     servicePopularityData,
     locationData,
@@ -299,12 +297,8 @@ export function AnalyticsClient({
     const revenueChartRef = useRef<SVGSVGElement>(null)
 
     const handleExport = () => {
-        exportAnalyticsData(
-            stats as unknown as Record<string, number>,
-            userGrowthData as unknown as Record<string, unknown>[],
-            bookingTrendsData as unknown as Record<string, unknown>[],
-            revenueData as unknown as Record<string, unknown>[]
-        )
+        // Daily rollups for every metric, oldest first
+        downloadExport('analytics')
         toast.success('Export Started', {
             description: 'Analytics data is being downloaded as CSV.'
         })
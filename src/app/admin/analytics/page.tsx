@@ -1,7 +1,7 @@
+import { cache, CACHE_KEYS } from '@/lib/admin/cache'
 import { generateOpenGraphMetadata } from '@/lib/og-metadata'
 import { createApiClient } from '@/lib/supabase/api'
 import { AnalyticsClient } from './AnalyticsClient'
-import type { Booking, Dispute, Profile, Transaction, Verification, Wallet } from '@/types/database'
 
 const APP_URL = process.env.NEXT_PUBLIC_APP_URL || 'https://negoempire.live'
 
@@ -13,7 +13,49 @@ export const metadata = generateOpenGraphMetadata({
     pageType: 'admin',
 })
 
+// analytics_window() row: a day of a series, or (day null) one of the window's leaders
+interface DailyRollup {
+    day: string | null
+    metric: string
+    dimension: string
+    count: number
+    amount: number
+}
+
+interface RollupTotal {
+    metric: string
+    dimension: string
+    count: number
+    amount: number
+}
+
+interface AnalyticsSnapshot {
+    escrow_total: number
+    avg_verification_hours: number
+    disputes_by_type: Record<string, number>
+    peak_hour: number
+    booking_clients: number
+    repeat_booking_clients: number
+}
+
+// Locations and talents listed on the page
+const TOP_N = 5
+
+// Analytics are recomputed at most once a minute per instance; concurrent renders
+// share one load, and a stale copy is served for a while during the refresh
+const ANALYTICS_TTL_MS = 60 * 1000
+const ANALYTICS_STALE_MS = 5 * 60 * 1000
+
 export default async function AnalyticsPage() {
+    const analytics = await cache.getOrLoad(CACHE_KEYS.ANALYTICS_STATS, loadAnalytics, {
+        ttlMs: ANALYTICS_TTL_MS,
+        staleMs: ANALYTICS_STALE_MS,
+    })
+
+    return <AnalyticsClient {...analytics} />
+}
+
+async function loadAnalytics() {
     // Use API client (service role) to bypass RLS for admin operations
     const supabase = createApiClient()
 
@@ -21,187 +63,137 @@ export default async function AnalyticsPage() {
     const now = new Date()
     const thirtyDaysAgo = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000)
     const sevenDaysAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
+    const windowStart = toDayKey(thirtyDaysAgo)
+    const weekStart = toDayKey(sevenDaysAgo)
+
+    // pg_cron compacts the rollup deltas every ten minutes; folding them in here as
+    // well keeps the reads bounded where it is not available. Overlapping calls skip.
+    const { error: compactError } = await supabase.rpc('compact_analytics_rollups')
+    if (compactError) {
+        console.warn('[Analytics] Rollup compaction failed:', compactError)
+    }
 
-    // Fetch all required data in parallel
+    // Everything derived from bookings and transactions comes from the trigger-maintained
+    // rollups (202610170006_analytics_rollups.sql), aggregated in the database by
+    // analytics_window(), so this page reads a bounded number of rows however large
+    // those tables get.
     const [
         { count: totalUsers },
         { count: totalClients },
         { count: totalTalents },
-        { count: totalBookings },
-        { count: pendingBookings },
-        { count: completedBookings },
-        { data: recentUsers },
-        { data: allBookingsData }, // Rename to avoid confusion if needed, but and type below
-        { data: transactionsData },
-        { data: walletsData },
         { count: pendingModeration },
-        { data: verificationsData },
-        { data: disputes },
         profileViewsRes,
+        { data: windowRowsData },
+        { data: lifetimeRowsData },
+        { data: snapshotData },
     ] = await Promise.all([
         supabase.from('profiles').select('*', { count: 'exact', head: true }),
         supabase.from('profiles').select('*', { count: 'exact', head: true }).eq('role', 'client'),
         supabase.from('profiles').select('*', { count: 'exact', head: true }).eq('role', 'talent'),
-        supabase.from('bookings').select('*', { count: 'exact', head: true }),
-        supabase.from('bookings').select('*', { count: 'exact', head: true }).eq('status', 'pending'),
-        supabase.from('bookings').select('*', { count: 'exact', head: true }).eq('status', 'completed'),
-        supabase.from('profiles').select('id, role, location, created_at').gte('created_at', thirtyDaysAgo.toISOString()).order('created_at', { ascending: true }),
-        supabase.from('bookings').select('id, client_id, status, total_price, services_snapshot, created_at'),
-        supabase.from('transactions').select('id, type, amount, coins, status, created_at').gte('created_at', thirtyDaysAgo.toISOString()).order('created_at', { ascending: true }),
-        supabase.from('wallets').select('escrow_balance'),
         supabase.from('media').select('*', { count: 'exact', head: true }).eq('moderation_status', 'pending'),
-        supabase.from('verifications').select('created_at, updated_at, status'),
-        supabase.from('disputes').select('status, dispute_type'),
-        supabase.from('profile_views').select('*', { count: 'exact', head: true }),
+        supabase.from('profile_views').select('*', { count: 'estimated', head: true }),
+        supabase.rpc('analytics_window', { p_since: windowStart, p_top: TOP_N }),
+        supabase.rpc('analytics_rollup_totals', { p_metrics: ['bookings', 'booking_services'] }),
+        supabase.rpc('admin_analytics_snapshot'),
     ])
 
-    const allBookings = allBookingsData as Booking[] | null
-    const transactions = transactionsData as Transaction[] | null
-    const wallets = walletsData as Wallet[] | null
-    const verifications = verificationsData as Verification[] | null
-    const recentUsersList = recentUsers as Partial<Profile>[] | null
-    const allDisputes = disputes as Dispute[] | null
+    const windowRows = (windowRowsData ?? []) as DailyRollup[]
+    const lifetimeRows = (lifetimeRowsData ?? []) as RollupTotal[]
+    const snapshot = (snapshotData ?? null) as AnalyticsSnapshot | null
+
+    const rowsFor = (metric: string, since = windowStart) =>
+        windowRows.filter((r) => r.metric === metric && (r.day === null || r.day >= since))
 
     const totalProfileViews = profileViewsRes.count || 0
-    const recentBookings = allBookings?.filter((b) => new Date(b.created_at) >= thirtyDaysAgo) || []
+
+    // Lifetime booking counts by status
+    const bookingsByStatus: Record<string, number> = {}
+    lifetimeRows.filter((r) => r.metric === 'bookings').forEach((r) => {
+        bookingsByStatus[r.dimension] = (bookingsByStatus[r.dimension] || 0) + Number(r.count)
+    })
+    const totalBookings = Object.values(bookingsByStatus).reduce((sum, n) => sum + n, 0)
 
     // 1. Financial Metrics
-    const totalEscrow = wallets?.reduce((sum: number, w) => sum + (w.escrow_balance || 0), 0) || 0
-    const totalRevenue = transactions?.filter((t) => t.type === 'purchase' && t.status === 'completed')
-        .reduce((sum: number, t) => sum + (t.amount || 0), 0) || 0
+    const totalEscrow = Number(snapshot?.escrow_total || 0)
+    const totalRevenue = sumOf(rowsFor('revenue'), 'amount')
 
     // 2. Service Category Popularity
-    const serviceCounts: Record<string, number> = {}
-    allBookings?.forEach((b) => {
-        if (b.services_snapshot && Array.isArray(b.services_snapshot)) {
-            b.services_snapshot.forEach((s) => {
-                const name = s.service_type?.name || 'Unknown'
-                serviceCounts[name] = (serviceCounts[name] || 0) + 1
-            })
-        }
-    })
-    const servicePopularityData = Object.entries(serviceCounts)
-        .map(([name, value]) => ({ name, value }))
+    const servicePopularityData = lifetimeRows
+        .filter((r) => r.metric === 'booking_services')
+        .map((r) => ({ name: r.dimension, value: Number(r.count) }))
         .sort((a, b) => b.value - a.value)
         .slice(0, 5)
 
     // 3. Location Data
-    const locationCounts: Record<string, number> = {}
-    recentUsersList?.forEach((u) => {
-        if (u.location) {
-            locationCounts[u.location] = (locationCounts[u.location] || 0) + 1
-        }
-    })
-    const locationData = Object.entries(locationCounts)
+    const locationData = groupByDimension(rowsFor('signups_location'), 'count')
         .map(([name, value]) => ({ name, value }))
         .sort((a, b) => b.value - a.value)
-        .slice(0, 5)
+        .slice(0, TOP_N)
 
     // 4. Operational Metrics (Velocity)
-    const approvedVerifications = verifications?.filter((v) => v.status === 'approved' && v.updated_at) || []
-    const avgVerificationTime = approvedVerifications.length > 0
-        ? approvedVerifications.reduce((sum: number, v) => {
-            const start = new Date(v.created_at).getTime()
-            const end = new Date(v.updated_at!).getTime() // updated_at is checked in filter
-            return sum + (end - start)
-        }, 0) / approvedVerifications.length / (1000 * 60 * 60) // in hours
-        : 0
+    const avgVerificationTime = Number(snapshot?.avg_verification_hours || 0)
 
     // 5. Dispute Breakdown
-    const disputeCounts: Record<string, number> = {}
-    allDisputes?.forEach((d) => {
-        const type = d.dispute_type || 'other'
-        disputeCounts[type] = (disputeCounts[type] || 0) + 1
-    })
-    const disputeDistribution = Object.entries(disputeCounts).map(([name, value], i) => ({
+    const disputeDistribution = Object.entries(snapshot?.disputes_by_type || {}).map(([name, value], i) => ({
         name,
-        value,
+        value: Number(value),
         color: ['#ef4444', '#f59e0b', '#3b82f6', '#8b5cf6'][i % 4]
     }))
 
     // Existing Weekly Stats
-    const weeklyUsers = recentUsers?.filter((u) => new Date(u.created_at) >= sevenDaysAgo).length || 0
-    const weeklyBookings = recentBookings?.filter((b) => new Date(b.created_at) >= sevenDaysAgo).length || 0
-    const weeklyRevenue = transactions?.filter((t) =>
-        t.type === 'purchase' &&
-        t.status === 'completed' &&
-        new Date(t.created_at) >= sevenDaysAgo
-    ).reduce((sum: number, t) => sum + (t.amount || 0), 0) || 0
-
-    const completedBookingsWithPrice = recentBookings?.filter((b) => b.status === 'completed' && b.total_price) || []
-    const averageBookingValue = completedBookingsWithPrice.length > 0
-        ? completedBookingsWithPrice.reduce((sum: number, b) => sum + (b.total_price || 0), 0) / completedBookingsWithPrice.length
+    const weeklyUsers = sumOf(rowsFor('signups', weekStart), 'count')
+    const weeklyBookings = sumOf(rowsFor('bookings', weekStart), 'count')
+    const weeklyRevenue = sumOf(rowsFor('revenue', weekStart), 'amount')
+
+    const recentBookings = rowsFor('bookings')
+    const recentBookingCount = sumOf(recentBookings, 'count')
+    const completedRecent = recentBookings.filter((r) => r.dimension === 'completed')
+    const completedRecentCount = sumOf(completedRecent, 'count')
+    const averageBookingValue = completedRecentCount > 0
+        ? sumOf(completedRecent, 'amount') / completedRecentCount
         : 0
 
-    const cancelledBookings = recentBookings?.filter((b) => b.status === 'cancelled').length || 0
-    const cancellationRate = recentBookings.length > 0
-        ? (cancelledBookings / recentBookings.length) * 100
+    const cancelledBookings = sumOf(recentBookings.filter((r) => r.dimension === 'cancelled'), 'count')
+    const cancellationRate = recentBookingCount > 0
+        ? (cancelledBookings / recentBookingCount) * 100
         : 0
-    
-    // 7. Peak Booking Hour
-    const hourCounts: Record<number, number> = {}
-    allBookings?.forEach((b) => {
-        const hour = new Date(b.created_at).getHours()
-        hourCounts[hour] = (hourCounts[hour] || 0) + 1
-    })
-    
-    let peakHour = 0
-    const hours = Object.entries(hourCounts)
-    if (hours.length > 0) {
-        const sortedHours = hours.sort((a, b) => b[1] - a[1])
-        const topHour = sortedHours[0]
-        if (topHour) {
-            peakHour = parseInt(topHour[0])
-        }
-    }
+
+    // 7. Peak Booking Hour (UTC)
+    const peakHour = Number(snapshot?.peak_hour || 0)
 
     // 8. Retention Rate (Clients with >1 booking)
-    const clientBookingCounts: Record<string, number> = {}
-    allBookings?.forEach((b) => {
-        if (b.client_id) {
-            clientBookingCounts[b.client_id] = (clientBookingCounts[b.client_id] || 0) + 1
-        }
-    })
-    const totalClientsWithBookings = Object.keys(clientBookingCounts).length
-    const repeatClients = Object.values(clientBookingCounts).filter(count => count > 1).length
+    const totalClientsWithBookings = Number(snapshot?.booking_clients || 0)
+    const repeatClients = Number(snapshot?.repeat_booking_clients || 0)
     const retentionRate = totalClientsWithBookings > 0
         ? (repeatClients / totalClientsWithBookings) * 100
         : 0
 
     // Charts processing
-    const userGrowthData = processTimeSeriesData((recentUsersList || []) as { created_at: string }[], 'created_at', 30)
-    const bookingTrendsData = processTimeSeriesData((recentBookings || []) as { created_at: string }[], 'created_at', 30)
-    const revenueData = processRevenueData((transactions || []) as { created_at: string; type: string; status: string; amount: number | null }[], 30)
-
-    // 6. Top Talents (Revenue + Views)
-    // For revenue, we ideally need to aggregate booking totals per talent.
-    const talentRevenue: Record<string, number> = {}
-    if (allBookings) {
-        completedBookingsWithPrice.forEach((b) => {
-            if (b.talent_id) {
-                talentRevenue[b.talent_id] = (talentRevenue[b.talent_id] || 0) + (b.total_price || 0)
-            }
-        })
-    }
-
-    // Get the actual talent names for the top 5
-    const topTalentIds = Object.entries(talentRevenue)
+    const userGrowthData = processTimeSeriesData(rowsFor('signups'), 'count', 30)
+        .map(({ date, value }) => ({ date, count: value }))
+    const bookingTrendsData = processTimeSeriesData(recentBookings, 'count', 30)
+        .map(({ date, value }) => ({ date, count: value }))
+    const revenueData = processTimeSeriesData(rowsFor('revenue'), 'amount', 30)
+        .map(({ date, value }) => ({ date, amount: value }))
+
+    // 6. Top Talents (revenue from completed bookings in the window)
+    const topTalentRevenue = groupByDimension(rowsFor('talent_revenue'), 'amount')
         .sort((a, b) => b[1] - a[1])
-        .slice(0, 5)
-        .map(t => t[0])
+        .slice(0, TOP_N)
+    const topTalentIds = topTalentRevenue.map(([id]) => id)
 
     const { data: topTalents } = await supabase
         .from('profiles')
         .select('id, display_name, avatar_url')
         .in('id', topTalentIds)
 
-    const topTalentsData = topTalentIds.map(id => {
+    const topTalentsData = topTalentRevenue.map(([id, revenue]) => {
         const talent = topTalents?.find(t => t.id === id)
         return {
             id,
             name: talent?.display_name || 'Unknown',
             avatar: talent?.avatar_url,
-            revenue: talentRevenue[id] || 0
+            revenue
         }
     })
 
@@ -209,9 +201,9 @@ export default async function AnalyticsPage() {
         totalUsers: totalUsers || 0,
         totalClients: totalClients || 0,
         totalTalents: totalTalents || 0,
-        totalBookings: totalBookings || 0,
-        pendingBookings: pendingBookings || 0,
-        completedBookings: completedBookings || 0,
+        totalBookings,
+        pendingBookings: bookingsByStatus.pending || 0,
+        completedBookings: bookingsByStatus.completed || 0,
         totalRevenue,
         totalEscrow,
         pendingModeration: pendingModeration || 0,
@@ -226,67 +218,51 @@ export default async function AnalyticsPage() {
         totalProfileViews,
     }
 
-    return (
-        <AnalyticsClient
-            stats={statsData}
-            userGrowthData={userGrowthData}
-            bookingTrendsData={bookingTrendsData}
-            revenueData={revenueData}
-            servicePopularityData={servicePopularityData}
-            locationData={locationData}
-            disputeDistribution={disputeDistribution}
-            topTalents={topTalentsData}
-        />
-    )
+    return {
+        stats: statsData,
+        userGrowthData,
+        bookingTrendsData,
+        revenueData,
+        servicePopularityData,
+        locationData,
+        disputeDistribution,
+        topTalents: topTalentsData,
+    }
 }
 
-// Helper function to process time series data
-function processTimeSeriesData(data: Array<{ created_at?: string | null }>, dateField: string, days: number) {
-    const result: { date: string; count: number }[] = []
-    const now = new Date()
-
-    for (let i = days - 1; i >= 0; i--) {
-        const date = new Date(now.getTime() - i * 24 * 60 * 60 * 1000)
-        const dateStr = date.toISOString().split('T')[0]
-        const count = data.filter(item => {
-            const dateValue = (item as Record<string, unknown>)[dateField]
-            if (typeof dateValue !== 'string' && !(dateValue instanceof Date)) {
-                return false
-            }
-            const itemDate = new Date(dateValue as string).toISOString().split('T')[0]
-            return itemDate === dateStr
-        }).length
+function toDayKey(date: Date): string {
+    return date.toISOString().split('T')[0]!
+}
 
-        result.push({
-            date: date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-            count,
-        })
-    }
+function sumOf(rows: DailyRollup[], field: 'count' | 'amount'): number {
+    return rows.reduce((sum, r) => sum + Number(r[field] || 0), 0)
+}
 
-    return result
+function groupByDimension(rows: DailyRollup[], field: 'count' | 'amount'): [string, number][] {
+    const totals: Record<string, number> = {}
+    rows.forEach((r) => {
+        totals[r.dimension] = (totals[r.dimension] || 0) + Number(r[field] || 0)
+    })
+    return Object.entries(totals)
 }
 
-// Helper function to process revenue data
-// Helper function to process revenue data
-function processRevenueData(transactions: Array<{ created_at?: string | null; type?: string | null; status?: string | null; amount?: number | null }>, days: number) {
-    const result: { date: string; amount: number }[] = []
+// Helper function to turn daily rollup rows into a zero-filled series for the last `days` days
+function processTimeSeriesData(rows: DailyRollup[], field: 'count' | 'amount', days: number) {
+    const byDay = new Map<string, number>()
+    rows.forEach((r) => {
+        if (r.day) {
+            byDay.set(r.day, (byDay.get(r.day) || 0) + Number(r[field] || 0))
+        }
+    })
+
+    const result: { date: string; value: number }[] = []
     const now = new Date()
 
     for (let i = days - 1; i >= 0; i--) {
         const date = new Date(now.getTime() - i * 24 * 60 * 60 * 1000)
-        const dateStr = date.toISOString().split('T')[0]
-
-        const amount = transactions
-            .filter(t => {
-                if (!t.created_at) return false
-                const itemDate = new Date(t.created_at).toISOString().split('T')[0]
-                return itemDate === dateStr && t.type === 'purchase' && t.status === 'completed'
-            })
-            .reduce((sum, t) => sum + (t.amount || 0), 0)
-
         result.push({
             date: date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-            amount,
+            value: byDay.get(toDayKey(date)) || 0,
         })
     }
 
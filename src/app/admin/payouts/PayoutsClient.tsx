@@ -22,7 +22,7 @@ import { StatusBadge } from '@/components/admin/StatusBadge'
 import { Tooltip } from '@/components/admin/Tooltip'
 import { Button } from '@/components/ui/button'
 import { usePagination } from '@/hooks/admin/usePagination'
-import { exportWithdrawalRequests, exportPayoutHistory } from '@/lib/admin/export-utils'
+import { downloadExport } from '@/lib/admin/export-utils'
 import { createClient } from '@/lib/supabase/client'
 import type { WithdrawalRequestWithTalent, PayoutTransaction } from '@/types/admin'
 import type { Profile, Wallet as WalletType } from '@/types/database'
@@ -218,14 +218,14 @@ export function PayoutsClient({
     })
 
     const handleExportRequests = () => {
-        exportWithdrawalRequests(withdrawalRequests)
+        downloadExport('withdrawal_requests')
         toast.success('Export Started', {
             description: 'Withdrawal requests data is being downloaded as CSV.'
         })
     }
 
     const handleExportHistory = () => {
-        exportPayoutHistory(payouts)
+        downloadExport('payouts')
         toast.success('Export Started', {
             description: 'Payout history data is being downloaded as CSV.'
         })
@@ -23,7 +23,7 @@ import { StatusBadge } from '@/components/admin/StatusBadge'
 import { Tooltip } from '@/components/admin/Tooltip'
 import { Button } from '@/components/ui/button'
 import { usePagination } from '@/hooks/admin/usePagination'
-import { exportVerifications } from '@/lib/admin/export-utils'
+import { downloadExport } from '@/lib/admin/export-utils'
 import { createClient } from '@/lib/supabase/client'
 import type { VerificationWithBooking } from '@/types/admin'
 
@@ -270,7 +270,7 @@ export function VerificationsClient({ verifications: initialVerifications }: Ver
     })
 
     const handleExport = () => {
-        exportVerifications(verifications)
+        downloadExport('verifications')
         toast.success('Export Started', {
             description: 'Verifications data is being downloaded as CSV.'
         })
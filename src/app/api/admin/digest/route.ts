@@ -1,7 +1,14 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { sendEmail, emailTemplates } from '@/lib/email'
+import { sendBatchEmails, sendEmail, emailTemplates } from '@/lib/email'
 import { createApiClient } from '@/lib/supabase/api'
 
+interface RollupTotal {
+    metric: string
+    dimension: string
+    count: number
+    amount: number
+}
+
 interface AdminDigestRecipient {
     id: string
     email: string | null
@@ -24,47 +31,56 @@ export async function POST(request: NextRequest) {
         const now = new Date()
         const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
 
-        // Fetch all stats in parallel
+        const weekStart = oneWeekAgo.toISOString().split('T')[0]
+
+        // Fold pending rollup deltas before reading (pg_cron also does this every ten minutes)
+        const { error: compactError } = await supabase.rpc('compact_analytics_rollups')
+        if (compactError) {
+            console.warn('[Admin Digest] Rollup compaction failed:', compactError)
+        }
+
+        // Fetch all stats in parallel. Booking and revenue figures are summed in the
+        // database from analytics_daily_rollups rather than pulled row by row.
         const [
             { count: totalUsers },
             { count: newUsersThisWeek },
-            { count: totalBookings },
-            { count: newBookingsThisWeek },
             { count: pendingVerifications },
             { count: pendingWithdrawals },
-            { data: transactions },
-            { data: weeklyTransactions },
+            { data: lifetimeTotals },
+            { data: weeklyTotals },
             { data: adminProfiles },
         ] = await Promise.all([
             // Total users
             supabase.from('profiles').select('*', { count: 'exact', head: true }),
             // New users this week
             supabase.from('profiles').select('*', { count: 'exact', head: true }).gte('created_at', oneWeekAgo.toISOString()),
-            // Total bookings
-            supabase.from('bookings').select('*', { count: 'exact', head: true }),
-            // New bookings this week
-            supabase.from('bookings').select('*', { count: 'exact', head: true }).gte('created_at', oneWeekAgo.toISOString()),
             // Pending verifications
             supabase.from('verifications').select('*', { count: 'exact', head: true }).eq('status', 'pending'),
             // Pending withdrawals
             supabase.from('withdrawal_requests').select('*', { count: 'exact', head: true }).eq('status', 'pending'),
-            // All purchase transactions for total revenue
-            supabase.from('transactions').select('amount').eq('type', 'purchase').eq('status', 'completed'),
-            // Weekly purchase transactions
-            supabase.from('transactions').select('amount').eq('type', 'purchase').eq('status', 'completed').gte('created_at', oneWeekAgo.toISOString()),
+            // Lifetime bookings and completed purchase revenue
+            supabase.rpc('analytics_rollup_totals', { p_metrics: ['bookings', 'revenue'] }),
+            // The same, for the past week
+            supabase.rpc('analytics_rollup_totals', { p_metrics: ['bookings', 'revenue'], p_since: weekStart }),
             // Admin recipients from profiles to avoid per-admin auth lookups
             supabase.from('profiles').select('id, email').eq('role', 'admin'),
         ])
 
+        const sumMetric = (rows: RollupTotal[] | null, metric: string, field: 'count' | 'amount') =>
+            (rows || []).filter((r) => r.metric === metric).reduce((sum, r) => sum + Number(r[field] || 0), 0)
+
+        const totalBookings = sumMetric(lifetimeTotals, 'bookings', 'count')
+        const newBookingsThisWeek = sumMetric(weeklyTotals, 'bookings', 'count')
+
         // Calculate revenue
-        const totalRevenue = transactions?.reduce((sum, t) => sum + (t.amount || 0), 0) || 0
-        const revenueThisWeek = weeklyTransactions?.reduce((sum, t) => sum + (t.amount || 0), 0) || 0
+        const totalRevenue = sumMetric(lifetimeTotals, 'revenue', 'amount')
+        const revenueThisWeek = sumMetric(weeklyTotals, 'revenue', 'amount')
 
         const digestData = {
             totalUsers: totalUsers || 0,
             newUsersThisWeek: newUsersThisWeek || 0,
-            totalBookings: totalBookings || 0,
-            newBookingsThisWeek: newBookingsThisWeek || 0,
+            totalBookings,
+            newBookingsThisWeek,
             pendingVerifications: pendingVerifications || 0,
             pendingWithdrawals: pendingWithdrawals || 0,
             totalRevenue,
@@ -94,26 +110,16 @@ export async function POST(request: NextRequest) {
                 }
             }
 
-            const settledResults = await Promise.allSettled(
-                Array.from(uniqueRecipients.values()).map(async (admin) => {
-                    const result = await sendEmail(admin.email!, template)
-
-                    if (!result.success) {
-                        throw new Error(`Failed to send to ${admin.email}`)
-                    }
-
-                    return admin.email
-                })
-            )
+            // One template for every admin, sent in provider-sized batches
+            const recipients = Array.from(uniqueRecipients.keys())
+            const batchResult = await sendBatchEmails(recipients.map((to) => ({ to, template })))
 
-            settledResults.forEach((result) => {
-                if (result.status === 'fulfilled') {
-                    results.sent++
-                    return
+            results.sent += batchResult.sent
+            results.failed += batchResult.failed
+            batchResult.delivered.forEach((delivered, index) => {
+                if (!delivered) {
+                    results.errors.push(`Failed to send to ${recipients[index]}`)
                 }
-
-                results.failed++
-                results.errors.push(result.reason instanceof Error ? result.reason.message : String(result.reason))
             })
         }
 
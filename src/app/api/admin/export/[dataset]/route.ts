@@ -0,0 +1,81 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getClientIP, logAdminAction } from '@/lib/admin/audit-log'
+import {
+    exportContentType,
+    exportFilename,
+    isExportDataset,
+    streamExport,
+    type ExportDateRange,
+    type ExportFormat,
+} from '@/lib/admin/export-stream'
+import { validateAdmin } from '@/lib/admin/validation'
+
+const DATE_ONLY = /^\d{4}-\d{2}-\d{2}$/
+
+// A bare date in `to` covers that whole (UTC) day
+function parseBound(raw: string | null, endOfDay: boolean): string | null | undefined {
+    if (!raw) return undefined
+    const value = DATE_ONLY.test(raw) && endOfDay ? `${raw}T23:59:59.999Z` : raw
+    const time = Date.parse(value)
+    return Number.isNaN(time) ? null : new Date(time).toISOString()
+}
+
+/**
+ * GET /api/admin/export/[dataset]?format=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD
+ * Streams verifications, withdrawal_requests, payouts or analytics as a download
+ */
+export async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ dataset: string }> }
+) {
+    try {
+        const { dataset } = await params
+        if (!isExportDataset(dataset)) {
+            return NextResponse.json({ error: 'Unknown export dataset' }, { status: 404 })
+        }
+
+        const { isValid, userId: adminId, error: authError } = await validateAdmin()
+        if (!isValid || !adminId) {
+            return NextResponse.json({ error: authError || 'Unauthorized' }, { status: 401 })
+        }
+
+        const { searchParams } = new URL(request.url)
+        const formatParam = searchParams.get('format') || 'csv'
+        if (formatParam !== 'csv' && formatParam !== 'ndjson') {
+            return NextResponse.json({ error: 'format must be csv or ndjson' }, { status: 400 })
+        }
+        const format: ExportFormat = formatParam
+
+        const from = parseBound(searchParams.get('from'), false)
+        const to = parseBound(searchParams.get('to'), true)
+        if (from === null || to === null) {
+            return NextResponse.json({ error: 'from and to must be ISO dates' }, { status: 400 })
+        }
+        if (from && to && from > to) {
+            return NextResponse.json({ error: 'from must not be after to' }, { status: 400 })
+        }
+
+        const range: ExportDateRange = { from, to }
+
+        await logAdminAction({
+            admin_id: adminId,
+            action: 'EXPORT_DATA',
+            resource_type: 'export',
+            resource_id: dataset,
+            details: { format, from: from ?? null, to: to ?? null },
+            ip_address: getClientIP(request.headers),
+            user_agent: request.headers.get('user-agent') || undefined,
+        })
+
+        return new Response(streamExport(dataset, format, range), {
+            headers: {
+                'Content-Type': exportContentType(format),
+                'Content-Disposition': `attachment; filename="${exportFilename(dataset, format)}"`,
+                'Cache-Control': 'no-store',
+            },
+        })
+    } catch (error) {
+        console.error('[Admin Export] Error:', error)
+        return NextResponse.json({ error: 'Export failed' }, { status: 500 })
+    }
+}
@@ -3,6 +3,7 @@ import { logAdminAction } from "@/lib/admin/audit-log";
 import { validateAdmin } from "@/lib/admin/validation";
 import { notifyUser } from "@/lib/notifications";
 import { createApiClient } from "@/lib/supabase/api";
+import { invalidateTalentProfile } from "@/lib/talent-profile";
 
 export async function DELETE(
   _request: Request,
@@ -62,6 +63,8 @@ export async function DELETE(
 
     // 5. Notify the talent their media was removed
     if (media.talent_id) {
+      invalidateTalentProfile(media.talent_id);
+
       notifyUser({
         userId: media.talent_id,
         type: 'media_deleted' as import('@/types/database').NotificationType,
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { createApiClient } from '@/lib/supabase/api'
+import { getSessionUserId } from '@/lib/supabase/jwt'
 import { createClient } from '@/lib/supabase/server'
+import { settleBooking } from '@/services/bookingSettlement'
 
 /**
  * Utility endpoint to release escrow for a completed booking
@@ -14,9 +15,9 @@ export async function POST(
     const { id } = await params
     const supabase = await createClient()
 
-    const { data: { user }, error: authError } = await supabase.auth.getUser()
+    const userId = await getSessionUserId(supabase)
 
-    if (authError || !user) {
+    if (!userId) {
       return NextResponse.json(
         { error: 'Unauthorized' },
         { status: 401 }
@@ -27,177 +28,53 @@ export async function POST(
     const { data: profile } = await supabase
       .from('profiles')
       .select('role')
-      .eq('id', user.id)
+      .eq('id', userId)
       .single()
 
     const isAdmin = profile?.role === 'admin'
 
-    // Fetch the booking
-    const { data: booking, error: fetchError } = await supabase
-      .from('bookings')
-      .select('id, talent_id, client_id, total_price, status, net_amount, platform_fee')
-      .eq('id', id)
-      .single()
-
-    if (fetchError || !booking) {
-      return NextResponse.json(
-        { error: 'Booking not found' },
-        { status: 404 }
-      )
-    }
-
-    // Verify user is admin or the talent
-    if (!isAdmin && booking.talent_id !== user.id) {
-      return NextResponse.json(
-        { error: 'You are not authorized to release escrow for this booking' },
-        { status: 403 }
-      )
-    }
-
-    // Only process completed bookings
-    if (booking.status !== 'completed') {
-      return NextResponse.json(
-        { error: `Booking is not completed. Current status: ${booking.status}` },
-        { status: 400 }
-      )
-    }
-
-    const apiClient = createApiClient()
-
-    // Check if escrow has already been released by checking if transaction exists
-    const { data: existingTransaction } = await apiClient
-      .from('transactions')
-      .select('id')
-      .eq('reference_id', booking.id)
-      .eq('type', 'booking')
-      .eq('user_id', booking.talent_id)
-      .maybeSingle()
-
-    if (existingTransaction) {
-      return NextResponse.json({
-        success: true,
-        message: 'Escrow has already been released for this booking',
-        alreadyReleased: true
-      })
-    }
-
-    console.log('[API] Releasing escrow for completed booking:', {
-      bookingId: id,
-      clientId: booking.client_id,
-      talentId: booking.talent_id,
-      totalPrice: booking.total_price
+    // Escrow debit, talent credit and ledger row commit together; a booking that
+    // has already been settled is reported rather than paid twice
+    const settlement = await settleBooking(id, {
+      complete: false,
+      talentId: isAdmin ? null : userId,
     })
 
-    // Get client's wallet to release escrow
-    const { data: clientWallet, error: clientWalletError } = await apiClient
-      .from('wallets')
-      .select('escrow_balance, balance')
-      .eq('user_id', booking.client_id)
-      .single()
-
-    if (clientWalletError || !clientWallet) {
-      return NextResponse.json(
-        { error: 'Client wallet not found' },
-        { status: 404 }
-      )
-    }
-
-    // Check if escrow has enough balance
-    if ((clientWallet.escrow_balance || 0) < booking.total_price) {
-      return NextResponse.json(
-        { error: `Insufficient escrow balance. Expected: ${booking.total_price}, Available: ${clientWallet.escrow_balance || 0}` },
-        { status: 400 }
-      )
-    }
-
-    // Release escrow from client's wallet
-    const newClientEscrow = (clientWallet.escrow_balance || 0) - booking.total_price
-    const { error: releaseEscrowError } = await apiClient
-      .from('wallets')
-      .update({ escrow_balance: newClientEscrow })
-      .eq('user_id', booking.client_id)
-
-    if (releaseEscrowError) {
-      console.error('[API] Error releasing escrow:', releaseEscrowError)
-      return NextResponse.json(
-        { error: `Failed to release escrow: ${releaseEscrowError.message}` },
-        { status: 500 }
-      )
-    }
-
-    // Get talent's wallet to add balance
-    const { data: talentWallet, error: talentWalletError } = await apiClient
-      .from('wallets')
-      .select('balance')
-      .eq('user_id', booking.talent_id)
-      .single()
-
-    if (talentWalletError || !talentWallet) {
-      // Create wallet if it doesn't exist
-      const { error: createWalletError } = await apiClient
-        .from('wallets')
-        .insert({
-          user_id: booking.talent_id,
-          balance: booking.total_price,
-          escrow_balance: 0
-        })
-
-      if (createWalletError) {
-        // Rollback escrow release
-        await apiClient
-          .from('wallets')
-          .update({ escrow_balance: clientWallet.escrow_balance })
-          .eq('user_id', booking.client_id)
-
+    switch (settlement.status) {
+      case 'not_found':
         return NextResponse.json(
-          { error: `Failed to create talent wallet: ${createWalletError.message}` },
-          { status: 500 }
+          { error: 'Booking not found' },
+          { status: 404 }
         )
-      }
-    } else {
-      // Add to talent's balance
-      // Use net_amount if available, otherwise fallback to total_price (for old bookings)
-      const amountToTransfer = booking.net_amount || booking.total_price
-      const { error: addBalanceError } = await apiClient
-        .from('wallets')
-        .update({ balance: (talentWallet.balance || 0) + amountToTransfer })
-        .eq('user_id', booking.talent_id)
-
-      if (addBalanceError) {
-        // Rollback escrow release
-        await apiClient
-          .from('wallets')
-          .update({ escrow_balance: clientWallet.escrow_balance })
-          .eq('user_id', booking.client_id)
-
+      case 'forbidden':
         return NextResponse.json(
-          { error: `Failed to add to talent balance: ${addBalanceError.message}` },
-          { status: 500 }
+          { error: 'You are not authorized to release escrow for this booking' },
+          { status: 403 }
         )
-      }
-    }
-
-    // Create transaction record for talent
-    const { error: transactionError } = await apiClient.from('transactions').insert({
-      user_id: booking.talent_id,
-      amount: booking.net_amount || booking.total_price,
-      coins: booking.net_amount || booking.total_price,
-      type: 'booking',
-      status: 'completed',
-      description: `Earnings from completed booking #${booking.id.slice(0, 8)}`,
-      reference_id: booking.id
-    })
-
-    if (transactionError) {
-      console.error('[API] Error creating transaction record:', transactionError)
-      // Don't fail the whole operation if transaction record fails
+      case 'invalid_status':
+        return NextResponse.json(
+          { error: `Booking is not completed. Current status: ${settlement.booking_status}` },
+          { status: 400 }
+        )
+      case 'insufficient_escrow':
+        return NextResponse.json(
+          { error: 'Insufficient escrow balance to release this booking' },
+          { status: 400 }
+        )
+      case 'already_settled':
+        return NextResponse.json({
+          success: true,
+          message: 'Escrow has already been released for this booking',
+          alreadyReleased: true
+        })
+      case 'settled':
+        break
     }
 
     return NextResponse.json({
       success: true,
       message: 'Escrow released successfully',
-      releasedAmount: booking.net_amount || booking.total_price,
-      platformFee: booking.platform_fee || 0
+      releasedAmount: settlement.amount,
     })
   } catch (error) {
     console.error('Error releasing escrow:', error)
@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { notifyUser } from '@/lib/notifications'
+import { notifyBatch } from '@/lib/notifications'
 import { createApiClient } from '@/lib/supabase/api'
 
 // This endpoint should be called by a cron job (e.g., Vercel Cron, external service)
@@ -11,6 +11,12 @@ import { createApiClient } from '@/lib/supabase/api'
 //
 // Alternative: Consider client-side expiration checks or webhook-based expiration for
 // payment_pending bookings that need to expire after exactly 1 hour.
+//
+// Expiry is set-based: each expire_stale_bookings call marks, refunds and writes ledger
+// rows for one chunk in a single statement. Chunks commit independently, so if the time
+// budget runs out the next run picks up where this one stopped.
+
+export const maxDuration = 60
 
 const EXPIRATION_RULES = {
     // Bookings in 'payment_pending' status expire after 1 hour
@@ -20,12 +26,32 @@ const EXPIRATION_RULES = {
     pending: 24 * 60 * 60 * 1000, // 24 hours in milliseconds
 }
 
-type ExpirationResult = {
-    expired?: boolean
-    refunded?: boolean
-    notified?: boolean
-    skipped?: boolean
-    error?: string
+// Bookings per expire_stale_bookings call
+const CHUNK_SIZE = 500
+
+// Stop starting new chunks once this much of maxDuration has been used
+const TIME_BUDGET_MS = 45 * 1000
+
+interface ExpiredBooking {
+    id: string
+    client_id: string | null
+    talent_name: string | null
+    refunded: boolean
+}
+
+interface ChunkResult {
+    expired: number
+    refunded: number
+    bookings: ExpiredBooking[]
+}
+
+interface ChunkReport {
+    status: string
+    expired: number
+    refunded: number
+    notified: number
+    durationMs: number
+    bookingsPerSecond: number
 }
 
 export async function POST(request: NextRequest) {
@@ -42,153 +68,84 @@ export async function POST(request: NextRequest) {
         const supabase = createApiClient()
 
         const now = new Date()
+        const startedAt = Date.now()
         const results = {
             expired: 0,
             refunded: 0,
             notified: 0,
             errors: [] as string[],
         }
+        const chunks: ChunkReport[] = []
+        let complete = true
 
-        // Process each status type in parallel
-        await Promise.all(Object.entries(EXPIRATION_RULES).map(async ([status, maxAge]) => {
+        for (const [status, maxAge] of Object.entries(EXPIRATION_RULES)) {
             const cutoffTime = new Date(now.getTime() - maxAge).toISOString()
 
-            // Find stale bookings
-            const { data: staleBookings, error: fetchError } = await supabase
-                .from('bookings')
-                .select(`
-                    id,
-                    client_id,
-                    talent_id,
-                    total_price,
-                    status,
-                    created_at,
-                    client:profiles!bookings_client_id_fkey(display_name, id),
-                    talent:profiles!bookings_talent_id_fkey(display_name, id)
-                `)
-                .eq('status', status)
-                .lt('created_at', cutoffTime)
-
-            if (fetchError) {
-                results.errors.push(`Error fetching ${status} bookings: ${fetchError.message}`)
-                return
-            }
+            while (true) {
+                if (Date.now() - startedAt > TIME_BUDGET_MS) {
+                    complete = false
+                    break
+                }
 
-            if (!staleBookings || staleBookings.length === 0) return
-
-            // Process stale bookings in parallel to reduce Fluid CPU wall-clock time
-            const processingResults = await Promise.allSettled(
-                staleBookings.map(async (booking) => {
-                    try {
-                        // Update booking status to expired
-                        const { data: updatedRows, error: updateError } = await supabase
-                            .from('bookings')
-                            .update({
-                                status: 'expired',
-                                updated_at: now.toISOString()
-                            })
-                            .eq('id', booking.id)
-                            .eq('status', status)
-                            .select('id')
-
-                        if (updateError) {
-                            throw new Error(`Failed to expire booking ${booking.id}: ${updateError.message}`)
-                        }
-
-                        if (!updatedRows || updatedRows.length === 0) {
-                            return { skipped: true } satisfies ExpirationResult
-                        }
-
-                        // If booking was payment_pending and coins were held in escrow, refund them
-                        if (status === 'payment_pending' && booking.total_price > 0) {
-                            const { data: existingRefund } = await supabase
-                                .from('transactions')
-                                .select('id')
-                                .eq('reference_id', booking.id)
-                                .eq('type', 'refund')
-                                .maybeSingle()
-
-                            if (existingRefund) {
-                                return { expired: true, refunded: true, notified: false } satisfies ExpirationResult
-                            }
-
-                            const { data: walletData, error: walletError } = await supabase
-                                .from('wallets')
-                                .select('balance, escrow_balance')
-                                .eq('user_id', booking.client_id)
-                                .single()
-
-                            if (!walletError && walletData && walletData.escrow_balance >= booking.total_price) {
-                                const { error: refundError } = await supabase
-                                    .from('wallets')
-                                    .update({
-                                        escrow_balance: walletData.escrow_balance - booking.total_price,
-                                        balance: walletData.balance + booking.total_price
-                                    })
-                                    .eq('user_id', booking.client_id)
-
-                                if (!refundError) {
-                                    // Create refund transaction (fire and forget)
-                                    await supabase.from('transactions').insert({
-                                        user_id: booking.client_id,
-                                        amount: 0,
-                                        coins: booking.total_price,
-                                        type: 'refund',
-                                        status: 'completed',
-                                        description: `Refund for expired booking #${booking.id.slice(0, 8)}`,
-                                        reference_id: booking.id
-                                    })
-                                    
-                                    return { expired: true, refunded: true, notified: false } satisfies ExpirationResult
-                                }
-                            }
-                        }
-
-                        // Create notification for client
-                        const talentData = booking.talent as unknown as { display_name: string; id: string } | null
-                        await notifyUser({
-                            userId: booking.client_id,
-                            type: 'booking_expired',
-                            title: 'Booking Expired',
-                            message: `Your booking with ${talentData?.display_name || 'the talent'} has expired due to inactivity.`,
-                            data: { booking_id: booking.id },
-                            url: `/dashboard/bookings/${booking.id}`,
-                        })
-
-                        return { expired: true, refunded: false, notified: true } satisfies ExpirationResult
-                    } catch (err) {
-                        return { error: err instanceof Error ? err.message : String(err) } satisfies ExpirationResult
-                    }
+                const chunkStart = Date.now()
+                const { data, error: rpcError } = await supabase.rpc('expire_stale_bookings', {
+                    p_status: status,
+                    p_cutoff: cutoffTime,
+                    p_limit: CHUNK_SIZE,
                 })
-            )
-
-            // Collect results
-            processingResults.forEach((res) => {
-                if (res.status === 'fulfilled') {
-                    const val = res.value
-                    if ('error' in val) {
-                        const errorMessage = val.error
-                        if (errorMessage) {
-                            results.errors.push(errorMessage)
-                        }
-                    } else if ('skipped' in val) {
-                        return
-                    } else {
-                        if (val.expired) results.expired++
-                        if (val.refunded) results.refunded++
-                        if (val.notified) results.notified++
-                    }
-                } else {
-                    results.errors.push(String(res.reason))
+
+                if (rpcError || !data) {
+                    results.errors.push(`Error expiring ${status} bookings: ${rpcError?.message || 'no result'}`)
+                    break
                 }
-            })
 
-        }))
+                const chunk = data as ChunkResult
+
+                // Clients who got their escrow back are not notified separately (as before);
+                // everyone else hears about the expiry.
+                const toNotify = chunk.bookings.filter((booking) => !booking.refunded && booking.client_id)
+                const notifications = await notifyBatch(toNotify.map((booking) => ({
+                    userIds: [booking.client_id as string],
+                    type: 'booking_expired' as const,
+                    title: 'Booking Expired',
+                    message: `Your booking with ${booking.talent_name || 'the talent'} has expired due to inactivity.`,
+                    data: { booking_id: booking.id },
+                    url: `/dashboard/bookings/${booking.id}`,
+                })))
+
+                const notified = notifications.filter((result) => result.success).length
+                notifications.forEach((result, index) => {
+                    if (!result.success) {
+                        results.errors.push(`Failed to notify for booking ${toNotify[index]!.id}: ${String(result.error)}`)
+                    }
+                })
+
+                const durationMs = Date.now() - chunkStart
+                chunks.push({
+                    status,
+                    expired: chunk.expired,
+                    refunded: chunk.refunded,
+                    notified,
+                    durationMs,
+                    bookingsPerSecond: durationMs > 0 ? Math.round((chunk.expired / durationMs) * 1000) : chunk.expired,
+                })
+
+                results.expired += chunk.expired
+                results.refunded += chunk.refunded
+                results.notified += notified
+
+                if (chunk.expired < CHUNK_SIZE) {
+                    break
+                }
+            }
+        }
 
         return NextResponse.json({
             success: true,
-            message: `Processed expired bookings`,
+            message: complete ? 'Processed expired bookings' : 'Time budget reached; remaining bookings will be processed on the next run',
+            complete,
             results,
+            chunks,
             timestamp: now.toISOString()
         })
 
@@ -0,0 +1,68 @@
+/**
+ * Gift Leaderboard API Route
+ *
+ * GET /api/gifts/leaderboard?talentId=<uuid>&range=week|month|all
+ * Returns the top gift senders for a talent (at most LEADERBOARD_SIZE rows).
+ *
+ * Requires a session. As with RLS on gifts, the talent sees every sender and any
+ * other viewer sees only their own entry.
+ */
+
+import { NextRequest, NextResponse } from 'next/server'
+import { isValidUUID } from '@/lib/gift-validation'
+import {
+    getGiftLeaderboard,
+    getOwnGiftLeaderboardEntry,
+    isLeaderboardRange,
+    LEADERBOARD_TTL_MS,
+} from '@/lib/gift-leaderboard'
+import { getSessionUserId } from '@/lib/supabase/jwt'
+import { createClient } from '@/lib/supabase/server'
+
+export const runtime = 'nodejs'
+
+export async function GET(request: NextRequest) {
+    const supabase = await createClient()
+    const userId = await getSessionUserId(supabase)
+    if (!userId) {
+        return NextResponse.json(
+            { success: false, error: 'Unauthorized. Please sign in to continue.' },
+            { status: 401 }
+        )
+    }
+
+    const talentId = request.nextUrl.searchParams.get('talentId')
+    const range = request.nextUrl.searchParams.get('range') || 'all'
+
+    if (!isValidUUID(talentId)) {
+        return NextResponse.json(
+            { success: false, error: 'talentId must be a valid UUID' },
+            { status: 400 }
+        )
+    }
+
+    if (!isLeaderboardRange(range)) {
+        return NextResponse.json(
+            { success: false, error: 'range must be one of week, month, all' },
+            { status: 400 }
+        )
+    }
+
+    try {
+        const topGifters = userId === talentId
+            ? await getGiftLeaderboard(talentId, range)
+            : await getOwnGiftLeaderboardEntry(supabase, talentId, range)
+        const maxAge = Math.floor(LEADERBOARD_TTL_MS / 1000)
+
+        return NextResponse.json(
+            { success: true, topGifters },
+            { headers: { 'Cache-Control': `private, max-age=${maxAge}` } }
+        )
+    } catch (error) {
+        console.error('[Gift Leaderboard] Error:', error)
+        return NextResponse.json(
+            { success: false, error: 'Failed to load leaderboard' },
+            { status: 500 }
+        )
+    }
+}
@@ -7,9 +7,12 @@
 
 import { createClient } from '@supabase/supabase-js'
 import { NextRequest, NextResponse } from 'next/server'
+import { invalidateGiftLeaderboard } from '@/lib/gift-leaderboard'
 import { validateGiftRequest, sanitizeGiftRequest } from '@/lib/gift-validation'
-import { notifyUser } from '@/lib/notifications'
+import { queueNotifyUser } from '@/lib/notifications'
+import { getSessionUserId } from '@/lib/supabase/jwt'
 import { createClient as createServerClient } from '@/lib/supabase/server'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
 
 // Use Node.js runtime for better Supabase compatibility
 export const runtime = 'nodejs'
@@ -19,6 +22,10 @@ function errorResponse(error: string, status = 400, field?: string) {
 }
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/gifts', request, (trace) => sendGift(request, trace))
+}
+
+async function sendGift(request: NextRequest, trace: RequestTrace) {
     try {
         // Get environment variables
         const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
@@ -32,16 +39,15 @@ export async function POST(request: NextRequest) {
         // Authenticate the caller. The sender is always the signed-in user —
         // never a value taken from the request body, otherwise anyone could
         // move coins out of any wallet by supplying another user's id.
-        const sessionSupabase = await createServerClient()
-        const { data: { user }, error: authError } = await sessionSupabase.auth.getUser()
-        if (authError || !user) {
+        const userId = await trace.span('auth', async () => getSessionUserId(await createServerClient()))
+        if (!userId) {
             return errorResponse('Unauthorized. Please sign in to continue.', 401)
         }
 
         // Parse request body
         let body: Record<string, unknown>
         try {
-            body = await request.json()
+            body = await trace.span('parse', () => request.json())
         } catch (parseError) {
             console.error('[Gift API] JSON parse error:', parseError)
             return errorResponse('Invalid request format', 400)
@@ -49,7 +55,7 @@ export async function POST(request: NextRequest) {
 
         // Force the sender to the authenticated user before validation/sanitization,
         // so any client-supplied senderId is ignored.
-        body.senderId = user.id
+        body.senderId = userId
 
         // Validate request using centralized validation
         const validation = validateGiftRequest(body)
@@ -66,12 +72,12 @@ export async function POST(request: NextRequest) {
         })
 
         // Call database function for atomic transaction
-        const { data: result, error: rpcError } = await supabase.rpc('handle_gift', {
+        const { data: result, error: rpcError } = await trace.span('db.handle_gift', () => supabase.rpc('handle_gift', {
             p_sender_id: sanitized.senderId,
             p_recipient_id: sanitized.recipientId,
             p_amount: sanitized.amount,
             p_message: sanitized.message || null
-        })
+        }))
 
         if (rpcError) {
             console.error('[Gift API] RPC error:', rpcError)
@@ -107,22 +113,18 @@ export async function POST(request: NextRequest) {
 
             // Provide user-friendly error messages
             if (errorMsg.includes('balance') || errorMsg.includes('insufficient')) {
-                // Create low balance notification
-                try {
-                    await notifyUser({
-                        userId: sanitized.senderId,
-                        type: 'low_balance',
-                        title: 'Insufficient Balance ⚠️',
-                        message: `You don't have enough coins to send this gift. Please top up your wallet.`,
-                        data: {
-                            required_amount: sanitized.amount,
-                            error: errorMsg,
-                        },
-                        url: '/dashboard/wallet',
-                    })
-                } catch (notifError) {
-                    console.error('[Gift API] Failed to create low balance notification:', notifError)
-                }
+                // Queued: delivered after the response is sent
+                queueNotifyUser({
+                    userId: sanitized.senderId,
+                    type: 'low_balance',
+                    title: 'Insufficient Balance ⚠️',
+                    message: `You don't have enough coins to send this gift. Please top up your wallet.`,
+                    data: {
+                        required_amount: sanitized.amount,
+                        error: errorMsg,
+                    },
+                    url: '/dashboard/wallet',
+                })
 
                 return errorResponse('Insufficient balance. Please top up your wallet.', 400, 'balance')
             }
@@ -133,65 +135,62 @@ export async function POST(request: NextRequest) {
             return errorResponse(errorMsg, 400)
         }
 
+        // The sender's new total shows up on this instance's leaderboard immediately
+        invalidateGiftLeaderboard(sanitized.recipientId)
+
         // Get recipient name for notifications
-        const { data: recipientProfile } = await supabase
+        const { data: recipientProfile } = await trace.span('db.recipient_profile', () => supabase
             .from('profiles')
             .select('display_name')
             .eq('id', sanitized.recipientId)
-            .single()
+            .single())
 
         const recipientName = recipientProfile?.display_name || 'the talent'
 
-        // Create notifications for both sender and recipient
-        try {
-            // Notification for sender
-            await notifyUser({
-                userId: sanitized.senderId,
-                type: 'gift_sent',
-                title: 'Gift Sent! 🎁',
-                message: `You sent ${sanitized.amount.toLocaleString()} coins to ${recipientName}. Your new balance is ${resultObj.new_balance?.toLocaleString() || 0} coins.`,
-                data: {
-                    gift_id: resultObj.gift_id,
-                    recipient_id: sanitized.recipientId,
-                    recipient_name: recipientName,
-                    amount: sanitized.amount,
-                    new_balance: resultObj.new_balance,
-                },
-                url: '/dashboard/gifts',
-            })
+        // Notifications are queued and fanned out after the response is sent,
+        // so gift latency does not depend on push or email delivery.
+        queueNotifyUser({
+            userId: sanitized.senderId,
+            type: 'gift_sent',
+            title: 'Gift Sent! 🎁',
+            message: `You sent ${sanitized.amount.toLocaleString()} coins to ${recipientName}. Your new balance is ${resultObj.new_balance?.toLocaleString() || 0} coins.`,
+            data: {
+                gift_id: resultObj.gift_id,
+                recipient_id: sanitized.recipientId,
+                recipient_name: recipientName,
+                amount: sanitized.amount,
+                new_balance: resultObj.new_balance,
+            },
+            url: '/dashboard/gifts',
+        })
+
+        queueNotifyUser({
+            userId: sanitized.recipientId,
+            type: 'gift_received',
+            title: 'You received a gift! 🎁',
+            message: `You received ${sanitized.amount.toLocaleString()} coins as a gift.`,
+            data: {
+                gift_id: resultObj.gift_id,
+                sender_id: sanitized.senderId,
+                amount: sanitized.amount,
+                message: sanitized.message || null,
+            },
+            url: '/dashboard/gifts',
+        })
 
-            // Notification for recipient
-            await notifyUser({
-                userId: sanitized.recipientId,
-                type: 'gift_received',
-                title: 'You received a gift! 🎁',
-                message: `You received ${sanitized.amount.toLocaleString()} coins as a gift.`,
+        // Check for low balance warning for sender
+        if (resultObj.new_balance && resultObj.new_balance < 100) {
+            queueNotifyUser({
+                userId: sanitized.senderId,
+                type: 'low_balance',
+                title: 'Low Balance Warning ⚠️',
+                message: `Your balance is low (${resultObj.new_balance.toLocaleString()} coins). Consider topping up to continue enjoying our services.`,
                 data: {
-                    gift_id: resultObj.gift_id,
-                    sender_id: sanitized.senderId,
-                    amount: sanitized.amount,
-                    message: sanitized.message || null,
+                    current_balance: resultObj.new_balance,
+                    threshold: 100,
                 },
-                url: '/dashboard/gifts',
+                url: '/dashboard/wallet',
             })
-
-            // Check for low balance warning for sender
-            if (resultObj.new_balance && resultObj.new_balance < 100) {
-                await notifyUser({
-                    userId: sanitized.senderId,
-                    type: 'low_balance',
-                    title: 'Low Balance Warning ⚠️',
-                    message: `Your balance is low (${resultObj.new_balance.toLocaleString()} coins). Consider topping up to continue enjoying our services.`,
-                    data: {
-                        current_balance: resultObj.new_balance,
-                        threshold: 100,
-                    },
-                    url: '/dashboard/wallet',
-                })
-            }
-        } catch (notifError) {
-            console.error('[Gift API] Failed to create notifications:', notifError)
-            // Don't fail the gift if notification fails
         }
 
         // Success!
@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { createApiClient } from '@/lib/supabase/api'
+import { VISIBLE_MEDIA_FILTER } from '@/lib/talent-profile'
 
 export async function GET(request: NextRequest) {
   try {
@@ -21,7 +22,7 @@ export async function GET(request: NextRequest) {
       .from('media')
       .select('id, talent_id, url, type, is_premium, unlock_price, created_at')
       .eq('talent_id', talentId)
-      .or('moderation_status.is.null,moderation_status.eq.approved,moderation_status.eq.pending')
+      .or(VISIBLE_MEDIA_FILTER)
       .order('created_at', { ascending: false })
 
     if (error) {
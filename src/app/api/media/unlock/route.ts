@@ -1,26 +1,47 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { notifyUser } from '@/lib/notifications'
-import { createApiClient } from '@/lib/supabase/api'
+import { queueNotifyUser } from '@/lib/notifications'
+import { getSessionUserId } from '@/lib/supabase/jwt'
 import { createClient } from '@/lib/supabase/server'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+
+interface UnlockResult {
+    success: boolean
+    code?: string
+    error?: string
+    message?: string
+    new_balance?: number
+    unlock_price?: number
+    current_balance?: number
+    talent_id?: string
+}
+
+// unlock_media failure codes that are not plain 400s
+const STATUS_BY_CODE: Record<string, number> = {
+    forbidden: 403,
+    not_found: 404,
+    wallet_not_found: 404,
+    failed: 500,
+}
 
 export async function POST(request: NextRequest) {
-    try {
+    return traceRequest('POST /api/media/unlock', request, (trace) => unlockMedia(request, trace))
+}
 
-        const supabase = await createClient() // For user session/auth if needed
-        const apiClient = createApiClient() // For wallet operations to bypass RLS
+async function unlockMedia(request: NextRequest, trace: RequestTrace) {
+    try {
+        const supabase = await createClient()
 
-        const { data: { user }, error: authError } = await supabase.auth.getUser()
+        const userId = await trace.span('auth', () => getSessionUserId(supabase))
 
-        if (authError || !user) {
+        if (!userId) {
             return NextResponse.json(
                 { success: false, error: 'Unauthorized' },
                 { status: 401 }
             )
         }
 
-        const body = await request.json()
+        const body = await trace.span('parse', () => request.json())
         const { mediaId } = body
-        const userId = user.id
 
         // Validate input
         if (!mediaId) {
@@ -39,256 +60,60 @@ export async function POST(request: NextRequest) {
             )
         }
 
-        // Look up the media server-side. The price and the owner (who gets paid) are
-        // authoritative from the database — never taken from the client. Trusting a
-        // client-supplied price/talentId would let a user unlock premium content for
-        // any amount (e.g. 1 coin) or redirect the payment to a wallet they control.
-        const { data: media, error: mediaError } = await apiClient
-            .from('media')
-            .select('id, talent_id, unlock_price, is_premium')
-            .eq('id', mediaId)
-            .maybeSingle()
-
-        if (mediaError || !media) {
-            return NextResponse.json(
-                { success: false, error: 'Content not found' },
-                { status: 404 }
-            )
-        }
-
-        if (!media.is_premium || !media.unlock_price || media.unlock_price <= 0) {
-            return NextResponse.json(
-                { success: false, error: 'This content is not available for unlock' },
-                { status: 400 }
-            )
-        }
-
-        const talentId = media.talent_id as string
-        const unlockPrice = media.unlock_price as number
+        // One round trip: unlock_media reads the authoritative price and owner from the
+        // media row, claims the unlock, debits/credits both wallets and writes the ledger
+        // rows in a single transaction. It is called via the user session client so the
+        // function can enforce p_user_id = auth.uid(). Client-supplied talentId/unlockPrice
+        // are deliberately ignored.
+        const { data, error: rpcError } = await trace.span('db.unlock_media', () => supabase.rpc('unlock_media', {
+            p_user_id: userId,
+            p_media_id: mediaId
+        }))
 
-        // A user cannot unlock their own content — it would be a free self-transfer.
-        if (talentId === userId) {
+        if (rpcError || !data) {
+            console.error('[Media Unlock] RPC error:', rpcError)
             return NextResponse.json(
-                { success: false, error: "You can't unlock your own content" },
-                { status: 400 }
+                { success: false, error: 'Failed to process unlock. Please try again or contact support.' },
+                { status: 500 }
             )
         }
 
-        // Try database function first (most reliable).
-        // Call via the user session client so the function can enforce p_user_id = auth.uid();
-        // the function is SECURITY DEFINER and still bypasses RLS for the wallet updates.
-        const { data: rpcData, error: rpcError } = await supabase.rpc('unlock_media', {
-            p_user_id: userId,
-            p_media_id: mediaId
-        })
-
-        // If RPC works, use its result
-        if (!rpcError && rpcData) {
-            if (!rpcData.success) {
-                console.error('[Media Unlock] RPC error:', rpcData.error)
-
-                // Create failure notification if insufficient balance
-                if (rpcData.error?.includes('balance') || rpcData.error?.includes('insufficient')) {
-                    try {
-                        await notifyUser({
-                            userId,
-                            type: 'low_balance',
-                            title: 'Insufficient Balance ⚠️',
-                            message: `You don't have enough coins to unlock this content. ${rpcData.error}`,
-                            data: {
-                                media_id: mediaId,
-                                unlock_price: unlockPrice,
-                                error: rpcData.error,
-                            },
-                            url: '/dashboard/wallet',
-                        })
-                    } catch (notifError) {
-                        console.error('[Media Unlock] Failed to create notification:', notifError)
-                    }
-                }
-
-                return NextResponse.json(
-                    { success: false, error: rpcData.error || 'Failed to unlock content' },
-                    { status: 400 }
-                )
-            }
+        const result = data as UnlockResult
 
-            // Create success notification
-            try {
-                await notifyUser({
+        if (!result.success) {
+            if (result.code === 'insufficient_balance') {
+                queueNotifyUser({
                     userId,
-                    type: 'media_unlocked',
-                    title: 'Content Unlocked! 🔓',
-                    message: `You successfully unlocked premium content. Your new balance is ${rpcData.new_balance?.toLocaleString() || 0} coins.`,
+                    type: 'low_balance',
+                    title: 'Insufficient Balance ⚠️',
+                    message: `You don't have enough coins to unlock this content. ${result.error}`,
                     data: {
                         media_id: mediaId,
-                        unlock_price: unlockPrice,
-                        new_balance: rpcData.new_balance,
+                        unlock_price: result.unlock_price,
+                        current_balance: result.current_balance,
+                        error: result.error,
                     },
-                    url: '/dashboard/notifications',
+                    url: '/dashboard/wallet',
                 })
-
-                // Check for low balance warning (below 100 coins)
-                if (rpcData.new_balance && rpcData.new_balance < 100) {
-                    await notifyUser({
-                        userId,
-                        type: 'low_balance',
-                        title: 'Low Balance Warning ⚠️',
-                        message: `Your balance is low (${rpcData.new_balance.toLocaleString()} coins). Consider topping up to continue enjoying our services.`,
-                        data: {
-                            current_balance: rpcData.new_balance,
-                            threshold: 100,
-                        },
-                        url: '/dashboard/wallet',
-                    })
-                }
-            } catch (notifError) {
-                console.error('[Media Unlock] Failed to create notifications:', notifError)
-                // Don't fail the unlock if notification fails
             }
 
-            return NextResponse.json({
-                success: true,
-                message: rpcData.message || 'Content unlocked successfully',
-                newUserBalance: rpcData.new_balance
-            })
-        }
-
-        // Log RPC error for debugging
-        console.warn('[Media Unlock] RPC unlock_media not available, using fallback:', rpcError?.message)
-
-        // Fallback: Direct operations using API client to bypass RLS
-        const { data: userWallet, error: userError } = await apiClient
-            .from('wallets')
-            .select('balance')
-            .eq('user_id', userId)
-            .single()
-
-        if (userError || !userWallet) {
-            console.error('[Media Unlock] User wallet error:', userError)
             return NextResponse.json(
-                { success: false, error: 'User wallet not found. Please contact support if this persists.' },
-                { status: 404 }
+                { success: false, error: result.error || 'Failed to unlock content' },
+                { status: STATUS_BY_CODE[result.code || ''] ?? 400 }
             )
         }
 
-        if (userWallet.balance < unlockPrice) {
-            // Create low balance notification
-            await notifyUser({
-                userId,
-                type: 'low_balance',
-                title: 'Insufficient Balance ⚠️',
-                message: `You don't have enough coins to unlock this content. You have ${userWallet.balance.toLocaleString()} coins but need ${unlockPrice.toLocaleString()} coins. Please top up your wallet.`,
-                data: {
-                    current_balance: userWallet.balance,
-                    required_amount: unlockPrice,
-                    shortfall: unlockPrice - userWallet.balance,
-                },
-                url: '/dashboard/wallet',
-            })
-
-            return NextResponse.json(
-                { success: false, error: `Insufficient balance. You need ${unlockPrice} coins but only have ${userWallet.balance} coins.` },
-                { status: 400 }
-            )
-        }
-
-        // Get talent wallet
-        const { data: talentWallet, error: talentError } = await apiClient
-            .from('wallets')
-            .select('balance')
-            .eq('user_id', talentId)
-            .single()
-
-        if (talentError || !talentWallet) {
-            console.error('[Media Unlock] Talent wallet error:', talentError)
-            return NextResponse.json(
-                { success: false, error: 'Talent wallet not found. Please contact support.' },
-                { status: 404 }
-            )
-        }
-
-        // Deduct from user using API client
-        const { error: deductError } = await apiClient
-            .from('wallets')
-            .update({ balance: userWallet.balance - unlockPrice })
-            .eq('user_id', userId)
-
-        if (deductError) {
-            console.error('[Media Unlock] Deduct error:', deductError)
-            return NextResponse.json(
-                { success: false, error: 'Failed to process unlock. Please try again or contact support.' },
-                { status: 500 }
-            )
-        }
-
-        // Add to talent using API client
-        const { error: addError } = await apiClient
-            .from('wallets')
-            .update({ balance: talentWallet.balance + unlockPrice })
-            .eq('user_id', talentId)
-
-        if (addError) {
-            // Rollback using API client
-            await apiClient
-                .from('wallets')
-                .update({ balance: userWallet.balance })
-                .eq('user_id', userId)
-
-            console.error('[Media Unlock] Add to talent error:', addError)
-            return NextResponse.json(
-                { success: false, error: 'Failed to complete unlock. Your balance has been restored. Please try again.' },
-                { status: 500 }
-            )
-        }
-
-        // Create media unlock record in user_unlocks table
-        try {
-            await supabase.from('user_unlocks').insert({
-                user_id: userId,
-                media_id: mediaId
-            })
-        } catch (err) {
-            console.warn('[Media Unlock] Failed to create unlock record (may already exist):', err)
-            // Ignore duplicate key errors - content may already be unlocked
-        }
-
-        // Create transaction records using API client
-        try {
-            await apiClient.from('transactions').insert([
-                {
-                    user_id: userId,
-                    amount: -unlockPrice,
-                    coins: -unlockPrice,
-                    type: 'premium_unlock',
-                    status: 'completed',
-                    reference_id: mediaId,
-                    description: 'Unlocked premium content'
-                },
-                {
-                    user_id: talentId,
-                    amount: unlockPrice,
-                    coins: unlockPrice,
-                    type: 'premium_unlock',
-                    status: 'completed',
-                    reference_id: mediaId,
-                    description: 'Content unlock payment'
-                }
-            ])
-        } catch {
-            // Ignore transaction record errors
-        }
-
-        const newBalance = userWallet.balance - unlockPrice
+        const newBalance = result.new_balance ?? 0
 
-        await notifyUser({
+        // Queued: push and email fan-out happens after the response is sent.
+        queueNotifyUser({
             userId,
             type: 'media_unlocked',
             title: 'Content Unlocked! 🔓',
-            message: `You successfully unlocked premium content for ${unlockPrice} coins. Your new balance is ${newBalance.toLocaleString()} coins.`,
+            message: `You successfully unlocked premium content for ${result.unlock_price} coins. Your new balance is ${newBalance.toLocaleString()} coins.`,
             data: {
                 media_id: mediaId,
-                unlock_price: unlockPrice,
+                unlock_price: result.unlock_price,
                 new_balance: newBalance,
             },
             url: '/dashboard/notifications',
@@ -296,7 +121,7 @@ export async function POST(request: NextRequest) {
 
         // Check for low balance warning (below 100 coins)
         if (newBalance < 100) {
-            await notifyUser({
+            queueNotifyUser({
                 userId,
                 type: 'low_balance',
                 title: 'Low Balance Warning ⚠️',
@@ -311,7 +136,7 @@ export async function POST(request: NextRequest) {
 
         return NextResponse.json({
             success: true,
-            message: 'Content unlocked successfully',
+            message: result.message || 'Content unlocked successfully',
             newUserBalance: newBalance
         })
 
@@ -1,17 +1,126 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { isValidUUID } from '@/lib/gift-validation'
 import { notifyUser } from '@/lib/notifications'
 import { createClient } from '@/lib/supabase/server'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+import { keysetFilter } from '@/lib/utils/keyset'
+
+// Sender profiles are not joined; the client hydrates them from its own cache
+const MESSAGE_COLUMNS = 'id, conversation_id, sender_id, content, is_read, created_at'
+
+const DEFAULT_WINDOW = 50
+const MAX_WINDOW = 200
+
+/**
+ * GET /api/messages?conversationId=<uuid>[&before=<messageId>|&after=<messageId>][&limit=n]
+ *
+ * Windowed history, always returned oldest first:
+ * - no cursor: the latest `limit` messages; hasMore means older ones exist
+ * - before:    the `limit` messages preceding that message; hasMore as above
+ * - after:     up to `limit` messages following it (delta sync); hasMore means
+ *              the client is still behind and should ask again
+ */
+export async function GET(request: NextRequest) {
+    return traceRequest('GET /api/messages', request, (trace) => loadMessages(request, trace))
+}
+
+async function loadMessages(request: NextRequest, trace: RequestTrace) {
+    try {
+        const supabase = await createClient()
+        const { data: { user }, error: authError } = await trace.span('auth', () => supabase.auth.getUser())
+
+        if (authError || !user) {
+            return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+        }
+
+        const params = request.nextUrl.searchParams
+        const conversationId = params.get('conversationId')
+        const before = params.get('before')
+        const after = params.get('after')
+        const limit = Math.min(Math.max(parseInt(params.get('limit') || '', 10) || DEFAULT_WINDOW, 1), MAX_WINDOW)
+
+        if (!isValidUUID(conversationId) || (before && after)) {
+            return NextResponse.json({ error: 'A valid conversationId and at most one of before/after are required' }, { status: 400 })
+        }
+
+        const { data: conversation } = await trace.span('db.conversation', () => supabase
+            .from('conversations')
+            .select('id, participant_1, participant_2')
+            .eq('id', conversationId)
+            .maybeSingle())
+
+        if (!conversation || (conversation.participant_1 !== user.id && conversation.participant_2 !== user.id)) {
+            return NextResponse.json({ error: 'Conversation not found' }, { status: 404 })
+        }
+
+        const anchorId = before || after
+        let query = supabase
+            .from('messages')
+            .select(MESSAGE_COLUMNS)
+            .eq('conversation_id', conversationId)
+
+        if (anchorId) {
+            if (!isValidUUID(anchorId)) {
+                return NextResponse.json({ error: 'Invalid message cursor' }, { status: 400 })
+            }
+
+            const { data: anchor } = await trace.span('db.cursor', () => supabase
+                .from('messages')
+                .select('id, created_at')
+                .eq('id', anchorId)
+                .eq('conversation_id', conversationId)
+                .maybeSingle())
+
+            if (!anchor) {
+                // The client's anchor is gone; it should reload the latest window
+                return NextResponse.json({ error: 'Message cursor not found' }, { status: 410 })
+            }
+
+            query = query.or(keysetFilter(
+                { column: 'created_at', ascending: !!after },
+                { value: anchor.created_at, id: anchor.id }
+            ))
+        }
+
+        const ascending = !!after
+        const { data, error } = await trace.span('db.messages', () => query
+            .order('created_at', { ascending })
+            .order('id', { ascending })
+            .limit(limit + 1))
+
+        if (error) {
+            console.error('[Messages] Error loading history:', error)
+            return NextResponse.json({ error: 'Failed to load messages' }, { status: 500 })
+        }
+
+        const rows = data || []
+        const hasMore = rows.length > limit
+        const page = rows.slice(0, limit)
+
+        return NextResponse.json({
+            messages: ascending ? page : page.reverse(),
+            hasMore,
+        })
+    } catch (error) {
+        console.error('[Messages] Error:', error)
+        return NextResponse.json({ error: 'Internal server error' }, { status: 500 })
+    }
+}
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/messages', request, (trace) => sendMessage(request, trace))
+}
+
+async function sendMessage(request: NextRequest, trace: RequestTrace) {
     try {
         const supabase = await createClient()
-        const { data: { user }, error: authError } = await supabase.auth.getUser()
+        const { data: { user }, error: authError } = await trace.span('auth', () => supabase.auth.getUser())
 
         if (authError || !user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
         }
 
-        const body = await request.json()
+        const body = await trace.span('parse', () => request.json())
         const { conversationId, content } = body
 
         if (!conversationId || !content?.trim()) {
@@ -22,11 +131,11 @@ export async function POST(request: NextRequest) {
         }
 
         // Verify user is a participant in this conversation
-        const { data: conversation, error: convError } = await supabase
+        const { data: conversation, error: convError } = await trace.span('db.conversation', () => supabase
             .from('conversations')
             .select('id, participant_1, participant_2')
             .eq('id', conversationId)
-            .single()
+            .single())
 
         if (convError || !conversation) {
             return NextResponse.json({ error: 'Conversation not found' }, { status: 404 })
@@ -42,7 +151,7 @@ export async function POST(request: NextRequest) {
             : conversation.participant_1
 
         // Insert the message
-        const { data: message, error: messageError } = await supabase
+        const { data: message, error: messageError } = await trace.span('db.insert_message', () => supabase
             .from('messages')
             .insert({
                 conversation_id: conversationId,
@@ -53,7 +162,7 @@ export async function POST(request: NextRequest) {
                 *,
                 sender:profiles!messages_sender_id_fkey(id, display_name, avatar_url, is_verified)
             `)
-            .single()
+            .single())
 
         if (messageError) {
             console.error('[Message Send] Error inserting message:', messageError)
@@ -61,11 +170,11 @@ export async function POST(request: NextRequest) {
         }
 
         // Send push notification to the other participant
-        const { data: senderProfile } = await supabase
+        const { data: senderProfile } = await trace.span('db.sender_profile', () => supabase
             .from('profiles')
             .select('display_name')
             .eq('id', user.id)
-            .single()
+            .single())
 
         const senderName = senderProfile?.display_name || 'Someone'
         const truncatedContent = content.length > 100
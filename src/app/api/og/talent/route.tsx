@@ -1,273 +1,331 @@
 import { ImageResponse } from 'next/og'
 import { NextRequest } from 'next/server'
+import { BoundedCache } from '@/lib/cache'
+import { talentCardHash, type TalentCardFields } from '@/lib/og-card'
 import { createApiClient } from '@/lib/supabase/api'
 
 export const runtime = 'edge'
 
-export async function GET(request: NextRequest) {
+// Talent share cards are cached at three levels, keyed on talent id + a hash of the
+// drawn fields (see src/lib/og-card.ts):
+//   - Versioned URLs (?id=...&v=<hash>) are immutable, so CDNs and crawlers keep them
+//   - A matching If-None-Match, or a warm in-memory render, is answered without
+//     touching the database or the renderer
+//   - Unversioned URLs look the talent up once, then reuse the render for that hash
+
+const IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+// Unversioned or outdated URLs: revalidate hourly at the CDN, re-rendering in the background
+const REVALIDATING_CACHE_CONTROL = 'public, max-age=300, s-maxage=3600, stale-while-revalidate=86400'
+
+const CARD_SELECT = 'id, display_name, username, avatar_url, bio'
+
+// Rendered PNGs for this isolate; sized by byte length
+const renderedCards = new BoundedCache({
+    maxEntries: 200,
+    maxBytes: 32 * 1024 * 1024,
+    defaultTtlMs: 24 * 60 * 60 * 1000,
+    sizeOf: (value) => (value as ArrayBuffer).byteLength,
+})
+
+function cardHeaders(etag: string, cacheControl: string): HeadersInit {
+    return {
+        'Content-Type': 'image/png',
+        'Cache-Control': cacheControl,
+        ETag: etag,
+    }
+}
+
+function matchesETag(request: NextRequest, etag: string): boolean {
+    const ifNoneMatch = request.headers.get('if-none-match')
+    return !!ifNoneMatch && ifNoneMatch.split(',').some((tag) => tag.trim().replace(/^W\//, '') === etag)
+}
+
+// For OG images, the avatar has to be embedded as a base64 data URI
+async function fetchAvatarDataUri(avatarUrl: string): Promise<string | null> {
     try {
-        const { searchParams } = new URL(request.url)
-        const username = searchParams.get('username')
-        const talentId = searchParams.get('id')
+        const avatarResponse = await fetch(avatarUrl, {
+            headers: {
+                'User-Agent': 'Mozilla/5.0',
+            },
+        })
 
-        if (!username && !talentId) {
-            return new Response('Missing username or id parameter', { status: 400 })
+        if (!avatarResponse.ok) {
+            return null
         }
 
-        // Fetch talent data using API client (service role, works in edge runtime)
-        const supabase = createApiClient()
-        let talent
-
-        if (username) {
-            const { data } = await supabase
-                .from('profiles')
-                .select('display_name, username, avatar_url, bio')
-                .eq('role', 'talent')
-                .eq('username', username)
-                .single()
-            talent = data
-        } else if (talentId) {
-            const { data } = await supabase
-                .from('profiles')
-                .select('display_name, username, avatar_url, bio')
-                .eq('role', 'talent')
-                .eq('id', talentId)
-                .single()
-            talent = data
-        }
+        const arrayBuffer = await avatarResponse.arrayBuffer()
 
-        if (!talent) {
-            return new Response('Talent not found', { status: 404 })
+        // Limit image size to prevent issues (max 500KB for OG images)
+        if (arrayBuffer.byteLength > 500 * 1024) {
+            console.warn(`Avatar image too large (${arrayBuffer.byteLength} bytes), skipping embed`)
+            return null
         }
 
-        const talentName = talent.display_name || 'Talent Profile'
-        const avatarUrl = talent.avatar_url
-        const bio = talent.bio || 'Premium Managed Talent Marketplace'
-
-        // Brand colors
-        const bgColor = '#000000'
-        const primaryColor = '#df2531'
-        const textColor = '#ffffff'
-        const textSecondary = '#a0a0a0'
-
-        // Fetch avatar image if available and convert to data URI
-        // Note: For OG images, we need to embed the image as base64 data URI
-        let avatarDataUri: string | null = null
-        if (avatarUrl) {
-            try {
-                // Fetch the avatar image
-                const avatarResponse = await fetch(avatarUrl, {
-                    headers: {
-                        'User-Agent': 'Mozilla/5.0',
-                    },
-                })
-
-                if (avatarResponse.ok) {
-                    const arrayBuffer = await avatarResponse.arrayBuffer()
-
-                    // Limit image size to prevent issues (max 500KB for OG images)
-                    if (arrayBuffer.byteLength > 500 * 1024) {
-                        console.warn(`Avatar image too large (${arrayBuffer.byteLength} bytes), skipping embed`)
-                    } else {
-                        const uint8Array = new Uint8Array(arrayBuffer)
-
-                        // Convert ArrayBuffer to base64 (edge runtime compatible)
-                        // Build binary string character by character (works reliably in edge runtime)
-                        let binaryString = ''
-                        for (let i = 0; i < uint8Array.length; i++) {
-                            binaryString += String.fromCharCode(uint8Array[i]!)
-                        }
-
-                        const base64 = btoa(binaryString)
-                        const mimeType = avatarResponse.headers.get('content-type') || 'image/png'
-                        avatarDataUri = `data:${mimeType};base64,${base64}`
-                    }
-                }
-            } catch (error) {
-                console.error('Error fetching avatar for OG image:', error)
-                // Continue without avatar - will show fallback star icon
-            }
+        const uint8Array = new Uint8Array(arrayBuffer)
+
+        // Convert ArrayBuffer to base64 (edge runtime compatible)
+        // Build binary string character by character (works reliably in edge runtime)
+        let binaryString = ''
+        for (let i = 0; i < uint8Array.length; i++) {
+            binaryString += String.fromCharCode(uint8Array[i]!)
         }
 
-        return new ImageResponse(
-            (
+        const base64 = btoa(binaryString)
+        const mimeType = avatarResponse.headers.get('content-type') || 'image/png'
+        return `data:${mimeType};base64,${base64}`
+    } catch (error) {
+        console.error('Error fetching avatar for OG image:', error)
+        // Continue without avatar - will show fallback star icon
+        return null
+    }
+}
+
+async function renderTalentCard(talent: TalentCardFields): Promise<ArrayBuffer> {
+    const talentName = talent.display_name || 'Talent Profile'
+    const bio = talent.bio || 'Premium Managed Talent Marketplace'
+
+    // Brand colors
+    const bgColor = '#000000'
+    const primaryColor = '#df2531'
+    const textColor = '#ffffff'
+    const textSecondary = '#a0a0a0'
+
+    const avatarDataUri = talent.avatar_url ? await fetchAvatarDataUri(talent.avatar_url) : null
+
+    const image = new ImageResponse(
+        (
+            <div
+                style={{
+                    height: '100%',
+                    width: '100%',
+                    display: 'flex',
+                    flexDirection: 'row',
+                    alignItems: 'center',
+                    justifyContent: 'center',
+                    backgroundColor: bgColor,
+                    backgroundImage: 'linear-gradient(135deg, #000000 0%, #1a0a0a 50%, #000000 100%)',
+                    fontFamily: 'system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif',
+                    position: 'relative',
+                    padding: '80px',
+                }}
+            >
+                {/* Decorative gradient overlay */}
+                <div
+                    style={{
+                        position: 'absolute',
+                        top: 0,
+                        left: 0,
+                        right: 0,
+                        bottom: 0,
+                        background: `radial-gradient(circle at 70% 50%, ${primaryColor}20 0%, transparent 60%)`,
+                    }}
+                />
+
+                {/* Left side - Avatar */}
                 <div
                     style={{
-                        height: '100%',
-                        width: '100%',
                         display: 'flex',
-                        flexDirection: 'row',
+                        flexDirection: 'column',
                         alignItems: 'center',
-                        justifyContent: 'center',
-                        backgroundColor: bgColor,
-                        backgroundImage: 'linear-gradient(135deg, #000000 0%, #1a0a0a 50%, #000000 100%)',
-                        fontFamily: 'system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif',
-                        position: 'relative',
-                        padding: '80px',
+                        marginRight: 60,
                     }}
                 >
-                    {/* Decorative gradient overlay */}
-                    <div
-                        style={{
-                            position: 'absolute',
-                            top: 0,
-                            left: 0,
-                            right: 0,
-                            bottom: 0,
-                            background: `radial-gradient(circle at 70% 50%, ${primaryColor}20 0%, transparent 60%)`,
-                        }}
-                    />
-
-                    {/* Left side - Avatar */}
-                    <div
-                        style={{
-                            display: 'flex',
-                            flexDirection: 'column',
-                            alignItems: 'center',
-                            marginRight: 60,
-                        }}
-                    >
-                        {avatarDataUri ? (
-                            <div
-                                style={{
-                                    width: 280,
-                                    height: 280,
-                                    borderRadius: 140,
-                                    border: `4px solid ${primaryColor}`,
-                                    backgroundImage: `url(${avatarDataUri})`,
-                                    backgroundSize: 'cover',
-                                    backgroundPosition: 'center',
-                                    backgroundRepeat: 'no-repeat',
-                                }}
-                            />
-                        ) : (
-                            <div
-                                style={{
-                                    width: 280,
-                                    height: 280,
-                                    borderRadius: 140,
-                                    border: `4px solid ${primaryColor}`,
-                                    backgroundColor: '#1a1a1a',
-                                    display: 'flex',
-                                    alignItems: 'center',
-                                    justifyContent: 'center',
-                                    fontSize: 120,
-                                    color: primaryColor,
-                                }}
-                            >
-                                ⭐
-                            </div>
-                        )}
-                    </div>
-
-                    {/* Right side - Content */}
-                    <div
-                        style={{
-                            display: 'flex',
-                            flexDirection: 'column',
-                            flex: 1,
-                            maxWidth: 700,
-                        }}
-                    >
-                        {/* Brand */}
+                    {avatarDataUri ? (
                         <div
                             style={{
+                                width: 280,
+                                height: 280,
+                                borderRadius: 140,
+                                border: `4px solid ${primaryColor}`,
+                                backgroundImage: `url(${avatarDataUri})`,
+                                backgroundSize: 'cover',
+                                backgroundPosition: 'center',
+                                backgroundRepeat: 'no-repeat',
+                            }}
+                        />
+                    ) : (
+                        <div
+                            style={{
+                                width: 280,
+                                height: 280,
+                                borderRadius: 140,
+                                border: `4px solid ${primaryColor}`,
+                                backgroundColor: '#1a1a1a',
                                 display: 'flex',
                                 alignItems: 'center',
-                                marginBottom: 30,
+                                justifyContent: 'center',
+                                fontSize: 120,
+                                color: primaryColor,
                             }}
                         >
-                            <div
-                                style={{
-                                    fontSize: 36,
-                                    fontWeight: 700,
-                                    color: textColor,
-                                    letterSpacing: '-1px',
-                                }}
-                            >
-                                NEGO
-                            </div>
-                            <div
-                                style={{
-                                    fontSize: 36,
-                                    fontWeight: 700,
-                                    color: primaryColor,
-                                    marginLeft: 4,
-                                }}
-                            >
-                                .
-                            </div>
+                            ⭐
                         </div>
+                    )}
+                </div>
 
-                        {/* Talent Name */}
+                {/* Right side - Content */}
+                <div
+                    style={{
+                        display: 'flex',
+                        flexDirection: 'column',
+                        flex: 1,
+                        maxWidth: 700,
+                    }}
+                >
+                    {/* Brand */}
+                    <div
+                        style={{
+                            display: 'flex',
+                            alignItems: 'center',
+                            marginBottom: 30,
+                        }}
+                    >
                         <div
                             style={{
-                                fontSize: 64,
-                                fontWeight: 800,
+                                fontSize: 36,
+                                fontWeight: 700,
                                 color: textColor,
-                                marginBottom: 20,
-                                lineHeight: 1.1,
+                                letterSpacing: '-1px',
                             }}
                         >
-                            {talentName}
+                            NEGO
                         </div>
-
-                        {/* Bio/Description */}
                         <div
                             style={{
-                                fontSize: 28,
-                                color: textSecondary,
-                                lineHeight: 1.5,
-                                maxHeight: 120,
-                                overflow: 'hidden',
+                                fontSize: 36,
+                                fontWeight: 700,
+                                color: primaryColor,
+                                marginLeft: 4,
                             }}
                         >
-                            {bio.length > 100 ? `${bio.substring(0, 100)}...` : bio}
+                            .
                         </div>
+                    </div>
+
+                    {/* Talent Name */}
+                    <div
+                        style={{
+                            fontSize: 64,
+                            fontWeight: 800,
+                            color: textColor,
+                            marginBottom: 20,
+                            lineHeight: 1.1,
+                        }}
+                    >
+                        {talentName}
+                    </div>
+
+                    {/* Bio/Description */}
+                    <div
+                        style={{
+                            fontSize: 28,
+                            color: textSecondary,
+                            lineHeight: 1.5,
+                            maxHeight: 120,
+                            overflow: 'hidden',
+                        }}
+                    >
+                        {bio.length > 100 ? `${bio.substring(0, 100)}...` : bio}
+                    </div>
 
-                        {/* Badge */}
+                    {/* Badge */}
+                    <div
+                        style={{
+                            marginTop: 30,
+                            display: 'flex',
+                            alignItems: 'center',
+                            padding: '12px 24px',
+                            backgroundColor: `${primaryColor}20`,
+                            border: `2px solid ${primaryColor}`,
+                            borderRadius: 8,
+                            width: 'fit-content',
+                        }}
+                    >
                         <div
                             style={{
-                                marginTop: 30,
-                                display: 'flex',
-                                alignItems: 'center',
-                                padding: '12px 24px',
-                                backgroundColor: `${primaryColor}20`,
-                                border: `2px solid ${primaryColor}`,
-                                borderRadius: 8,
-                                width: 'fit-content',
+                                fontSize: 20,
+                                color: primaryColor,
+                                fontWeight: 600,
                             }}
                         >
-                            <div
-                                style={{
-                                    fontSize: 20,
-                                    color: primaryColor,
-                                    fontWeight: 600,
-                                }}
-                            >
-                                Verified Talent
-                            </div>
+                            Verified Talent
                         </div>
                     </div>
-
-                    {/* Bottom accent line */}
-                    <div
-                        style={{
-                            position: 'absolute',
-                            bottom: 0,
-                            left: 0,
-                            right: 0,
-                            height: 8,
-                            background: `linear-gradient(90deg, transparent 0%, ${primaryColor} 50%, transparent 100%)`,
-                        }}
-                    />
                 </div>
-            ),
-            {
-                width: 1200,
-                height: 630,
+
+                {/* Bottom accent line */}
+                <div
+                    style={{
+                        position: 'absolute',
+                        bottom: 0,
+                        left: 0,
+                        right: 0,
+                        height: 8,
+                        background: `linear-gradient(90deg, transparent 0%, ${primaryColor} 50%, transparent 100%)`,
+                    }}
+                />
+            </div>
+        ),
+        {
+            width: 1200,
+            height: 630,
+        }
+    )
+
+    return image.arrayBuffer()
+}
+
+export async function GET(request: NextRequest) {
+    try {
+        const { searchParams } = new URL(request.url)
+        const username = searchParams.get('username')
+        const talentId = searchParams.get('id')
+        const version = searchParams.get('v')
+
+        if (!username && !talentId) {
+            return new Response('Missing username or id parameter', { status: 400 })
+        }
+
+        // Versioned URL: the content is fully determined by (id, v)
+        if (talentId && version) {
+            const etag = `"${talentId}-${version}"`
+            if (matchesETag(request, etag)) {
+                return new Response(null, { status: 304, headers: cardHeaders(etag, IMMUTABLE_CACHE_CONTROL) })
             }
-        )
+
+            const rendered = renderedCards.get<ArrayBuffer>(`${talentId}:${version}`)
+            if (rendered) {
+                return new Response(rendered, { headers: cardHeaders(etag, IMMUTABLE_CACHE_CONTROL) })
+            }
+        }
+
+        // Fetch talent data using API client (service role, works in edge runtime)
+        const supabase = createApiClient()
+        const query = supabase
+            .from('profiles')
+            .select(CARD_SELECT)
+            .eq('role', 'talent')
+        const { data: talent } = talentId
+            ? await query.eq('id', talentId).maybeSingle()
+            : await query.eq('username', username!).maybeSingle()
+
+        if (!talent) {
+            return new Response('Talent not found', { status: 404 })
+        }
+
+        const hash = talentCardHash(talent)
+        const etag = `"${talent.id}-${hash}"`
+        // A stale ?v= gets the current card, but must not be pinned as immutable
+        const cacheControl = version === hash ? IMMUTABLE_CACHE_CONTROL : REVALIDATING_CACHE_CONTROL
+
+        if (matchesETag(request, etag)) {
+            return new Response(null, { status: 304, headers: cardHeaders(etag, cacheControl) })
+        }
+
+        // Concurrent unfurls of the same card share one render
+        const image = await renderedCards.getOrLoad(`${talent.id}:${hash}`, () => renderTalentCard(talent))
+
+        return new Response(image, { headers: cardHeaders(etag, cacheControl) })
     } catch (error) {
         console.error('Talent OG image generation error:', error)
         // Return a simple fallback image
@@ -292,6 +350,8 @@ export async function GET(request: NextRequest) {
             {
                 width: 1200,
                 height: 630,
+                // Keep a transient failure from being cached like a real card
+                headers: { 'Cache-Control': 'public, max-age=60' },
             }
         )
     }
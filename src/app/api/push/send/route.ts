@@ -1,8 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { sendPushNotification } from '@/lib/push/send-push'
+import { deliverPushBatch } from '@/lib/push/delivery'
 import { createApiClient } from '@/lib/supabase/api'
 import { createClient } from '@/lib/supabase/server'
-import type { PushSubscription } from '@/lib/push/send-push'
 
 /**
  * POST /api/push/send
@@ -79,50 +78,28 @@ export async function POST(request: NextRequest) {
         }
 
         // Send push notification to all subscriptions
-        const results = await Promise.allSettled(
-            subscriptions.map(async (sub) => {
-                const subscription: PushSubscription = {
+        const report = await deliverPushBatch(
+            subscriptions.map((sub) => ({
+                subscription: {
                     endpoint: sub.endpoint,
                     keys: {
                         p256dh: sub.p256dh_key,
                         auth: sub.auth_key,
                     },
-                }
-
-                await sendPushNotification(subscription, {
-                    title,
-                    body,
-                    icon,
-                    badge,
-                    tag,
-                    data,
-                    url,
-                })
-            })
+                },
+                payload: { title, body, icon, badge, tag, data, url },
+            }))
         )
 
-        // Remove expired/invalid subscriptions
-        const expiredSubscriptions: string[] = []
-        results.forEach((result, index) => {
-            if (result.status === 'rejected') {
-                const error = result.reason
-                if (
-                    error instanceof Error &&
-                    (error.message.includes('expired') || error.message.includes('Invalid'))
-                ) {
-                    expiredSubscriptions.push(subscriptions[index]!.endpoint)
-                }
-            }
-        })
-
-        if (expiredSubscriptions.length > 0) {
+        // Remove subscriptions the push service reports as gone (404/410)
+        if (report.expiredEndpoints.length > 0) {
             await supabase
                 .from('push_subscriptions')
                 .delete()
-                .in('endpoint', expiredSubscriptions)
+                .in('endpoint', report.expiredEndpoints)
         }
 
-        const successCount = results.filter((r) => r.status === 'fulfilled').length
+        const successCount = report.sent
 
         return NextResponse.json({
             success: true,
@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server'
 import { createClient } from '@/lib/supabase/server'
+import { invalidateTalentProfile } from '@/lib/talent-profile'
 import { syncTalentAutoVerification } from '@/lib/talent-verification'
 
 export async function POST() {
@@ -35,6 +36,11 @@ export async function POST() {
         }
 
         const result = await syncTalentAutoVerification(user.id)
+
+        // Called by the dashboard after every profile, menu or media edit, so this
+        // is also where the public profile page cache is dropped
+        invalidateTalentProfile(user.id)
+
         return NextResponse.json(result)
     } catch (error) {
         console.error('[TalentVerificationSync] Error syncing talent verification:', error)
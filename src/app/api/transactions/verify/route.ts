@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { createClient } from '@/lib/supabase/server'
 import { processSuccessfulTransaction } from '@/services/paymentResponse'
+import { scheduleWebhookDrain } from '@/services/paymentWebhookQueue'
 
 const PAYSTACK_SECRET = process.env.PAYSTACK_SECRET_KEY!
 
@@ -80,6 +81,9 @@ export async function POST(request: NextRequest) {
 
         const result = await processSuccessfulTransaction(verifiedReference, amountInNaira, 'paystack')
 
+        // Settle any queued webhook retries that have come due, after the response
+        scheduleWebhookDrain()
+
         if (result.status === 'failed') {
             return NextResponse.json({
                 error: result.error,
@@ -0,0 +1,41 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+import { drainPaymentWebhooks } from '@/services/paymentWebhookQueue'
+
+// Drain endpoint for the payment webhook queue. Webhooks drain the queue right
+// after they respond; pg_cron calls this through pg_net once a retry's backoff
+// has passed (202610170018), and Vercel Cron calls it daily as a safety net for
+// anything left behind by an instance that died mid-drain.
+
+export const maxDuration = 60
+
+export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/webhooks/drain', request, (trace) => drainQueue(request, trace))
+}
+
+async function drainQueue(request: NextRequest, trace: RequestTrace) {
+    try {
+        const authHeader = request.headers.get('authorization')
+        const cronSecret = process.env.CRON_SECRET
+
+        if (cronSecret && authHeader !== `Bearer ${cronSecret}`) {
+            return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+        }
+
+        const result = await drainPaymentWebhooks(trace)
+
+        return NextResponse.json({
+            success: true,
+            ...result,
+            timestamp: new Date().toISOString(),
+        })
+    } catch (error) {
+        console.error('[Payment Webhooks] Drain error:', error)
+        return NextResponse.json({ error: 'Drain failed' }, { status: 500 })
+    }
+}
+
+// Vercel Cron issues GET requests
+export async function GET(request: NextRequest) {
+    return POST(request)
+}
@@ -1,6 +1,7 @@
 import crypto from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
-import { processSuccessfulTransaction } from '@/services/paymentResponse'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+import { enqueuePaymentWebhook, scheduleWebhookDrain } from '@/services/paymentWebhookQueue'
 
 const NOWPAYMENTS_IPN_SECRET = process.env.NOWPAYMENTS_IPN_SECRET!
 
@@ -32,9 +33,13 @@ function timingSafeEqualHex(a: string, b: string): boolean {
 }
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/webhooks/nowpayments', request, (trace) => handleNowPaymentsWebhook(request, trace))
+}
+
+async function handleNowPaymentsWebhook(request: NextRequest, trace: RequestTrace) {
     try {
         const signature = request.headers.get('x-nowpayments-sig')
-        const bodyText = await request.text()
+        const bodyText = await trace.span('parse', () => request.text())
 
         if (!signature) {
             console.error('[NOWPayments Webhook] Missing signature')
@@ -56,13 +61,16 @@ export async function POST(request: NextRequest) {
         }
 
         // Verify signature over the deeply key-sorted JSON, per NOWPayments IPN spec.
-        const canonicalBody = JSON.stringify(sortKeysDeep(event))
-        const expectedSignature = crypto
-            .createHmac('sha512', NOWPAYMENTS_IPN_SECRET)
-            .update(canonicalBody)
-            .digest('hex')
-
-        if (!timingSafeEqualHex(signature, expectedSignature)) {
+        const verified = await trace.span('verify', async () => {
+            const canonicalBody = JSON.stringify(sortKeysDeep(event))
+            const expectedSignature = crypto
+                .createHmac('sha512', NOWPAYMENTS_IPN_SECRET)
+                .update(canonicalBody)
+                .digest('hex')
+            return timingSafeEqualHex(signature, expectedSignature)
+        })
+
+        if (!verified) {
             console.error('[NOWPayments Webhook] Invalid signature')
             return NextResponse.json({ error: 'Invalid signature' }, { status: 403 })
         }
@@ -80,7 +88,7 @@ export async function POST(request: NextRequest) {
             return NextResponse.json({ status: 'ignored', message: 'Status not finished' })
         }
 
-        // processSuccessfulTransaction expects amount in Naira.
+        // Settlement expects amount in Naira.
         // price_amount should be what we requested (e.g. 5000 NGN converted to USD? or purely NGN if supported)
         // Assuming we asked for 'price_amount' in key currency.
         const amount = parseFloat(String(price_amount ?? '0'))
@@ -90,13 +98,20 @@ export async function POST(request: NextRequest) {
             return NextResponse.json({ error: 'Missing order_id' }, { status: 400 })
         }
 
-        const result = await processSuccessfulTransaction(reference, amount, 'nowpayments')
+        // Settlement runs after the response; a 500 here makes NOWPayments retry the IPN
+        const queued = await trace.span('db.enqueue', () => enqueuePaymentWebhook({
+            provider: 'nowpayments',
+            reference,
+            amount,
+            payload: event,
+        }))
 
-        if (result.status === 'failed') {
-            return NextResponse.json({ error: result.error }, { status: 500 })
+        if (queued.error) {
+            return NextResponse.json({ error: 'Failed to queue event' }, { status: 500 })
         }
 
-        return NextResponse.json({ status: 'success' })
+        scheduleWebhookDrain()
+        return NextResponse.json({ status: queued.duplicate ? 'duplicate' : 'queued' })
 
     } catch (error) {
         console.error('[NOWPayments Webhook] Error:', error)
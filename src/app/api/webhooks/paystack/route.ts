@@ -1,6 +1,7 @@
 import crypto from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
-import { processSuccessfulTransaction } from '@/services/paymentResponse'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+import { enqueuePaymentWebhook, scheduleWebhookDrain } from '@/services/paymentWebhookQueue'
 
 const PAYSTACK_SECRET = process.env.PAYSTACK_SECRET_KEY!
 
@@ -19,9 +20,13 @@ function verifyPaystackSignature(signature: string, body: string): boolean {
 }
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/webhooks/paystack', request, (trace) => handlePaystackWebhook(request, trace))
+}
+
+async function handlePaystackWebhook(request: NextRequest, trace: RequestTrace) {
     try {
         // Get raw body for signature verification
-        const bodyText = await request.text()
+        const bodyText = await trace.span('parse', () => request.text())
         const signature = request.headers.get('x-paystack-signature')
 
         if (!signature) {
@@ -30,7 +35,7 @@ export async function POST(request: NextRequest) {
         }
 
         // Verify signature
-        if (!verifyPaystackSignature(signature, bodyText)) {
+        if (!(await trace.span('verify', async () => verifyPaystackSignature(signature, bodyText)))) {
             console.error('[Paystack Webhook] Invalid signature')
             return NextResponse.json({ error: 'Invalid signature' }, { status: 403 })
         }
@@ -53,13 +58,20 @@ export async function POST(request: NextRequest) {
         const { reference, amount } = event.data
         const amountInNaira = amount / 100 // Convert from kobo to naira
 
-        const result = await processSuccessfulTransaction(reference, amountInNaira, 'paystack')
+        // Settlement runs after the response; a 500 here makes Paystack retry the delivery
+        const queued = await trace.span('db.enqueue', () => enqueuePaymentWebhook({
+            provider: 'paystack',
+            reference,
+            amount: amountInNaira,
+            payload: event,
+        }))
 
-        if (result.status === 'failed') {
-            return NextResponse.json({ error: result.error }, { status: 500 })
+        if (queued.error) {
+            return NextResponse.json({ error: 'Failed to queue event' }, { status: 500 })
         }
 
-        return NextResponse.json({ status: 'success' })
+        scheduleWebhookDrain()
+        return NextResponse.json({ status: queued.duplicate ? 'duplicate' : 'queued' })
 
     } catch (error) {
         console.error('[Paystack Webhook] Error:', error)
@@ -1,6 +1,7 @@
 import crypto from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
 import { createApiClient } from '@/lib/supabase/api'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
 
 /**
  * Resend delivery webhook — handles bounces/complaints so a permanently
@@ -32,8 +33,12 @@ interface ResendWebhookEvent {
 }
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/webhooks/resend', request, (trace) => handleResendWebhook(request, trace))
+}
+
+async function handleResendWebhook(request: NextRequest, trace: RequestTrace) {
     try {
-        const bodyText = await request.text()
+        const bodyText = await trace.span('parse', () => request.text())
 
         const secret = process.env.RESEND_WEBHOOK_SECRET
         const svixId = request.headers.get('svix-id')
@@ -45,7 +50,7 @@ export async function POST(request: NextRequest) {
             return NextResponse.json({ status: 'ignored' })
         }
 
-        if (!verifySvixSignature(secret, svixId, svixTimestamp, bodyText, svixSignature)) {
+        if (!(await trace.span('verify', async () => verifySvixSignature(secret, svixId, svixTimestamp, bodyText, svixSignature)))) {
             console.error('[Resend Webhook] Invalid signature')
             return NextResponse.json({ error: 'Invalid signature' }, { status: 403 })
         }
@@ -56,17 +61,17 @@ export async function POST(request: NextRequest) {
             const recipients = event.data.to || []
             if (recipients.length > 0) {
                 const supabase = createApiClient()
-                const { data: profiles } = await supabase
+                const { data: profiles } = await trace.span('db.profiles', () => supabase
                     .from('profiles')
                     .select('id')
-                    .in('email', recipients)
+                    .in('email', recipients))
 
                 const userIds = (profiles || []).map((p) => p.id as string)
                 if (userIds.length > 0) {
-                    await supabase
+                    await trace.span('db.disable_email', () => supabase
                         .from('notification_preferences')
                         .update({ email_enabled: false })
-                        .in('user_id', userIds)
+                        .in('user_id', userIds))
 
                     console.warn(`[Resend Webhook] Disabled email notifications for ${userIds.length} user(s) after ${event.type}`, recipients)
                 }
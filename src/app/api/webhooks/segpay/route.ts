@@ -1,6 +1,7 @@
 import crypto from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
-import { processSuccessfulTransaction } from '@/services/paymentResponse'
+import { traceRequest, type RequestTrace } from '@/lib/tracing'
+import { enqueuePaymentWebhook, scheduleWebhookDrain } from '@/services/paymentWebhookQueue'
 
 const SEGPAY_SECRET = process.env.SEGPAY_WEBHOOK_SECRET
 
@@ -17,11 +18,15 @@ function verifySegpaySignature(body: string, signature: string | null): boolean
 }
 
 export async function POST(request: NextRequest) {
+    return traceRequest('POST /api/webhooks/segpay', request, (trace) => handleSegpayWebhook(request, trace))
+}
+
+async function handleSegpayWebhook(request: NextRequest, trace: RequestTrace) {
     try {
-        const bodyText = await request.text()
+        const bodyText = await trace.span('parse', () => request.text())
 
         const signature = request.headers.get('x-segpay-signature') || request.headers.get('x-signature')
-        if (!verifySegpaySignature(bodyText, signature)) {
+        if (!(await trace.span('verify', async () => verifySegpaySignature(bodyText, signature)))) {
             console.error('[Segpay Webhook] Invalid or missing signature')
             return NextResponse.json({ error: 'Invalid signature' }, { status: 403 })
         }
@@ -46,12 +51,19 @@ export async function POST(request: NextRequest) {
 
         const amount = parseFloat(data.amount || '0')
 
-        const result = await processSuccessfulTransaction(reference, amount, 'segpay')
+        // Settlement runs after the response; a 500 here makes Segpay retry the postback
+        const queued = await trace.span('db.enqueue', () => enqueuePaymentWebhook({
+            provider: 'segpay',
+            reference,
+            amount,
+            payload: data,
+        }))
 
-        if (result.status === 'failed') {
-            return NextResponse.json({ error: result.error }, { status: 400 })
+        if (queued.error) {
+            return NextResponse.json({ error: 'Failed to queue event' }, { status: 500 })
         }
 
+        scheduleWebhookDrain()
         return new NextResponse('OK')
     } catch (error) {
         console.error('[Segpay Webhook] Error:', error)
@@ -25,12 +25,14 @@ interface BrowseClientProps {
     userRole?: 'client' | 'talent' | 'admin'
     totalCount: number
     currentPage: number
+    // Keyset cursor for the next page; search results page by number instead
+    nextCursor: string | null
 }
 
 // All locations including "All Locations" option
 const locations = ['All Locations', ...NIGERIAN_LOCATIONS]
 
-export function BrowseClient({ talents: initialTalents, serviceTypes, userId, userRole, totalCount, currentPage }: BrowseClientProps) {
+export function BrowseClient({ talents: initialTalents, serviceTypes, userId, userRole, totalCount, currentPage, nextCursor }: BrowseClientProps) {
     const router = useRouter()
     const searchParams = useSearchParams()
 
@@ -74,6 +76,7 @@ export function BrowseClient({ talents: initialTalents, serviceTypes, userId, us
         
         // Reset to page 1 on filter change
         params.set('page', '1')
+        params.delete('cursor')
 
         Object.entries(updates).forEach(([key, value]) => {
             if (value === null || value === undefined || value === 'all' || value === 'All Locations') {
@@ -98,13 +101,20 @@ export function BrowseClient({ talents: initialTalents, serviceTypes, userId, us
         return () => clearTimeout(timer)
     }, [searchQuery])
 
+    // Plain browsing pages by cursor; search results (q) page by number
+    const isSearch = Boolean(searchParams.get('q'))
+    const hasMore = isSearch ? talents.length < totalCount : nextCursor !== null
+
     // Infinite scroll observer
     useEffect(() => {
         const observer = new IntersectionObserver((entries) => {
-            if (entries[0]?.isIntersecting && talents.length < totalCount && !isPendingTrans) {
+            if (entries[0]?.isIntersecting && hasMore && !isPendingTrans) {
                 const params = new URLSearchParams(searchParams.toString())
                 const nextPage = currentPage + 1
                 params.set('page', nextPage.toString())
+                if (!isSearch && nextCursor) {
+                    params.set('cursor', nextCursor)
+                }
                 
                 startTransition(() => {
                     router.push(`/dashboard/browse?${params.toString()}`, { scroll: false })
@@ -117,7 +127,7 @@ export function BrowseClient({ talents: initialTalents, serviceTypes, userId, us
         }
 
         return () => observer.disconnect()
-    }, [talents.length, totalCount, isPendingTrans, currentPage, searchParams, router])
+    }, [hasMore, isSearch, nextCursor, isPendingTrans, currentPage, searchParams, router])
 
     const formatPrice = (price: number) => {
         return `${new Intl.NumberFormat('en-NG', {
@@ -344,13 +354,13 @@ export function BrowseClient({ talents: initialTalents, serviceTypes, userId, us
                             </div>
 
                             {/* Infinite Scroll Loader */}
-                            {talents.length < totalCount && (
+                            {hasMore && (
                                 <div ref={loaderRef} className="py-12 flex justify-center">
                                     <LoadingSpinner size="sm" />
                                 </div>
                             )}
 
-                            {talents.length >= totalCount && talents.length > 0 && (
+                            {!hasMore && talents.length > 0 && (
                                 <div className="py-12 text-center">
                                     <p className="text-white/20 text-sm">You&apos;ve reached the end of the list</p>
                                 </div>
@@ -3,15 +3,19 @@ import { redirect } from 'next/navigation'
 import { generateOpenGraphMetadata } from '@/lib/og-metadata'
 import { createApiClient } from '@/lib/supabase/api'
 import { getServerProfile } from '@/lib/supabase/server'
+import { searchTalents, talentCardSelect, TalentSearchResult } from '@/lib/talent-search'
+import { decodeCursor, keysetFilter, KeysetOrder, takePage } from '@/lib/utils/keyset'
 import { ServiceType, TalentWithMenu } from '@/types/database'
 import { BrowseClient } from './BrowseClient'
 
 const APP_URL = process.env.NEXT_PUBLIC_APP_URL || 'https://negoempire.live'
 const BROWSE_PAGE_SIZE = 20
 
-interface CachedBrowseResult {
-    talents: TalentWithMenu[]
-    totalCount: number
+// Sort options and their keyset order; 'random' and unknown values fall back to recent
+const BROWSE_ORDERS: Record<string, KeysetOrder> = {
+    recent: { column: 'created_at', ascending: false },
+    price_low: { column: 'starting_price', ascending: true, nullsLast: true },
+    price_high: { column: 'starting_price', ascending: false, nullsLast: true },
 }
 
 const getCachedBrowseResults = unstable_cache(
@@ -23,46 +27,22 @@ const getCachedBrowseResults = unstable_cache(
         serviceId: string | null,
         sortBy: string,
         page: number,
-        limit: number
-    ): Promise<CachedBrowseResult> => {
+        limit: number,
+        cursor: string | null
+    ): Promise<TalentSearchResult> => {
         const supabase = createApiClient()
-        const offset = (page - 1) * limit
+
+        // Text queries go through the indexed search RPC; plain filtering stays a
+        // direct query on idx_profiles_browse_filters
+        if (q) {
+            return searchTalents(supabase, { q, location, gender, status, serviceId, sortBy, page, limit })
+        }
 
         let query = supabase
             .from('profiles')
-            .select(`
-                id,
-                display_name,
-                avatar_url,
-                location,
-                bio,
-                status,
-                is_verified,
-                starting_price,
-                created_at,
-                username,
-                role,
-                full_name,
-                updated_at,
-                gender,
-                talent_menus:talent_menus${serviceId ? '!inner' : ''} (
-                    id,
-                    talent_id,
-                    service_type_id,
-                    price,
-                    is_active,
-                    service_type:service_types (
-                        id,
-                        name,
-                        icon
-                    )
-                )
-            `, { count: 'exact' })
+            .select(talentCardSelect(serviceId), { count: 'estimated' })
             .eq('role', 'talent')
 
-        if (q) {
-            query = query.or(`display_name.ilike.%${q}%,username.ilike.%${q}%,location.ilike.%${q}%,bio.ilike.%${q}%`)
-        }
         if (location) {
             query = query.eq('location', location)
         }
@@ -77,25 +57,38 @@ const getCachedBrowseResults = unstable_cache(
             query = query.eq('talent_menus.is_active', true)
         }
 
-        if (sortBy === 'recent') {
-            query = query.order('created_at', { ascending: false })
-        } else if (sortBy === 'price_low') {
-            query = query.order('starting_price', { ascending: true, nullsFirst: false })
-        } else if (sortBy === 'price_high') {
-            query = query.order('starting_price', { ascending: false, nullsFirst: false })
+        // Keyset pagination on (sort column, id): the next page starts after the last
+        // row of the previous one, so deep pages cost the same as the first
+        const order = BROWSE_ORDERS[sortBy] ?? BROWSE_ORDERS.recent!
+        const after = decodeCursor(cursor)
+
+        // One row past the page tells takePage whether there is a next page
+        if (after) {
+            query = query.or(keysetFilter(order, after)).limit(limit + 1)
         } else {
-            query = query.order('created_at', { ascending: false })
+            // First page, or a page link without a cursor (old bookmarks)
+            const offset = (page - 1) * limit
+            query = query.range(offset, offset + limit)
         }
 
-        const { data, count, error } = await query.range(offset, offset + limit - 1)
+        const { data, count, error } = await query
+            .order(order.column, { ascending: order.ascending, nullsFirst: false })
+            .order('id', { ascending: order.ascending })
 
         if (error) {
             throw error
         }
 
+        const { rows, nextCursor } = takePage(
+            (data ?? []) as unknown as TalentWithMenu[],
+            limit,
+            order.column as keyof TalentWithMenu
+        )
+
         return {
-            talents: (data ?? []) as unknown as TalentWithMenu[],
+            talents: rows,
             totalCount: count ?? 0,
+            nextCursor,
         }
     },
     ['browse-results'],
@@ -152,9 +145,10 @@ export default async function BrowsePage({
     const sortBy = params.sort || 'random'
     const parsedPage = Number.parseInt(params.page || '1', 10)
     const page = Number.isFinite(parsedPage) && parsedPage > 0 ? parsedPage : 1
+    const cursor = params.cursor || null
 
-    const [{ talents, totalCount }, serviceTypes] = await Promise.all([
-        getCachedBrowseResults(q, location, gender, status, serviceId, sortBy, page, BROWSE_PAGE_SIZE),
+    const [{ talents, totalCount, nextCursor }, serviceTypes] = await Promise.all([
+        getCachedBrowseResults(q, location, gender, status, serviceId, sortBy, page, BROWSE_PAGE_SIZE, cursor),
         getCachedServiceTypes(),
     ])
 
@@ -166,6 +160,7 @@ export default async function BrowsePage({
             userRole={profile?.role || 'client'}
             totalCount={totalCount}
             currentPage={page}
+            nextCursor={nextCursor}
         />
     )
 }
@@ -17,6 +17,47 @@ import { createClient } from '@/lib/supabase/client'
 import { getTalentUrl } from '@/lib/talent-url'
 import type { Conversation, Message, Profile } from '@/types/database'
 
+// Messages per history window from /api/messages
+const MESSAGE_PAGE_SIZE = 50
+
+// Messages kept for the open conversation, trimmed from the side away from what is
+// being read: new arrivals drop the oldest (reloaded with "Load earlier messages"),
+// paging back drops the newest (reloaded with "Jump to latest").
+const MAX_MESSAGES_IN_MEMORY = 500
+
+// Delta-sync windows to fetch before giving up and reloading the latest window
+const MAX_SYNC_WINDOWS = 4
+
+interface MessageWindow {
+    messages: Message[]
+    hasMore: boolean
+}
+
+function compareMessages(a: Message, b: Message) {
+    return new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
+}
+
+// Merge newer messages in by id, keeping chronological order and the memory cap
+function appendToHistory(prev: Message[], incoming: Message[]): Message[] {
+    const byId = new Map(prev.map(m => [m.id, m]))
+    for (const message of incoming) {
+        byId.set(message.id, { ...byId.get(message.id), ...message })
+    }
+    const merged = Array.from(byId.values()).sort(compareMessages)
+    return merged.length > MAX_MESSAGES_IN_MEMORY
+        ? merged.slice(merged.length - MAX_MESSAGES_IN_MEMORY)
+        : merged
+}
+
+// Put an older window in front, dropping the newest past the memory cap
+function prependToHistory(prev: Message[], older: Message[]): Message[] {
+    const existingIds = new Set(prev.map(m => m.id))
+    const merged = [...older.filter(m => !existingIds.has(m.id)), ...prev]
+    return merged.length > MAX_MESSAGES_IN_MEMORY
+        ? merged.slice(0, MAX_MESSAGES_IN_MEMORY)
+        : merged
+}
+
 interface MessagesClientProps {
     userId: string
     conversations: (Conversation & { other_user?: Profile | null })[]
@@ -31,11 +72,16 @@ export function MessagesClient({ userId, conversations: initialConversations, us
     const inputRef = useRef<HTMLInputElement>(null)
     const typingTimeoutRef = useRef<NodeJS.Timeout | null>(null)
 
-    // Channel refs for real-time subscriptions
+    // Channel refs for real-time subscriptions. Message changes and typing
+    // broadcasts for the open conversation share one channel.
     const messageChannelRef = useRef<ReturnType<typeof supabase.channel> | null>(null)
-    const typingChannelRef = useRef<ReturnType<typeof supabase.channel> | null>(null)
     const conversationsChannelRef = useRef<ReturnType<typeof supabase.channel> | null>(null)
 
+    // Sender profiles by id, so realtime and history rows are hydrated without a join
+    const senderCacheRef = useRef(new Map<string, Profile>())
+    // Latest messages for callbacks that must not re-subscribe when they change
+    const messagesRef = useRef<Message[]>([])
+
     const [conversations, setConversations] = useState(initialConversations)
     const [selectedConversation, setSelectedConversation] = useState<(Conversation & { other_user?: Profile | null }) | null>(null)
     const [messages, setMessages] = useState<Message[]>([])
@@ -45,6 +91,18 @@ export function MessagesClient({ userId, conversations: initialConversations, us
     const [searchQuery, setSearchQuery] = useState('')
     const [otherUserTyping, setOtherUserTyping] = useState(false)
     const [error, setError] = useState<string | null>(null)
+    const [hasOlderMessages, setHasOlderMessages] = useState(false)
+    const [loadingOlder, setLoadingOlder] = useState(false)
+    // Set once paging back dropped the newest messages; live messages are not
+    // appended to a window that no longer reaches the latest
+    const [hasNewerMessages, setHasNewerMessages] = useState(false)
+    const hasNewerRef = useRef(false)
+    // Set while prepending older history so the view does not jump to the bottom
+    const skipScrollRef = useRef(false)
+
+    useEffect(() => {
+        messagesRef.current = messages
+    }, [messages])
 
     // Real-time wallet synchronization for gift feature
     const { wallet } = useWallet({ userId, autoRefresh: true })
@@ -57,51 +115,164 @@ export function MessagesClient({ userId, conversations: initialConversations, us
         }
     }, [])
 
-    // Fetch messages for selected conversation
+    // Fetch one window of history; null when the conversation or cursor is gone
+    const fetchWindow = useCallback(async (
+        conversationId: string,
+        cursor: { before?: string; after?: string } = {}
+    ): Promise<MessageWindow | null> => {
+        const params = new URLSearchParams({ conversationId, limit: String(MESSAGE_PAGE_SIZE) })
+        if (cursor.before) params.set('before', cursor.before)
+        if (cursor.after) params.set('after', cursor.after)
+
+        const response = await fetch(`/api/messages?${params.toString()}`)
+        if (response.status === 404 || response.status === 410) {
+            return null
+        }
+
+        const result = await response.json()
+        if (!response.ok) {
+            throw new Error(result.error || 'Failed to load messages')
+        }
+
+        return result as MessageWindow
+    }, [])
+
+    // Attach sender profiles, fetching only ids not seen before in this session
+    const hydrateSenders = useCallback(async (rows: Message[]): Promise<Message[]> => {
+        const cache = senderCacheRef.current
+        const missing = Array.from(new Set(rows.map(m => m.sender_id))).filter(id => !cache.has(id))
+
+        if (missing.length > 0) {
+            const { data, error: profilesError } = await supabase
+                .from('profiles')
+                .select('id, display_name, avatar_url, is_verified')
+                .in('id', missing)
+
+            if (profilesError) {
+                console.error('Error loading sender profiles:', profilesError)
+            }
+            for (const profile of data || []) {
+                cache.set(profile.id, profile as Profile)
+            }
+        }
+
+        return rows.map(m => ({ ...m, sender: cache.get(m.sender_id) }))
+    }, [supabase])
+
+    const setDetachedFromLatest = useCallback((detached: boolean) => {
+        hasNewerRef.current = detached
+        setHasNewerMessages(detached)
+    }, [])
+
+    const appendMessages = useCallback((incoming: Message[]) => {
+        // Detached: the messages in between are not loaded; "Jump to latest" picks these up
+        if (incoming.length > 0 && !hasNewerRef.current) {
+            setMessages(prev => appendToHistory(prev, incoming))
+        }
+    }, [])
+
+    const markConversationRead = useCallback(async (conversationId: string) => {
+        const { error: readError } = await supabase
+            .from('messages')
+            .update({ is_read: true })
+            .eq('conversation_id', conversationId)
+            .neq('sender_id', userId)
+            .eq('is_read', false)
+
+        if (readError) {
+            console.error('Error marking messages as read:', readError)
+            // Non-critical error, don't show to user
+        }
+    }, [supabase, userId])
+
+    // Fetch the latest window for the selected conversation
     const fetchMessages = useCallback(async (conversationId: string) => {
         setLoading(true)
         setError(null)
         try {
-            const { data, error: messagesError } = await supabase
-                .from('messages')
-                .select(`
-          *,
-          sender:profiles!messages_sender_id_fkey(id, display_name, avatar_url, is_verified)
-        `)
-                .eq('conversation_id', conversationId)
-                .order('created_at', { ascending: true })
-
-            if (messagesError) throw messagesError
-
-            if (data) {
-                // Sort messages by created_at to ensure proper order
-                const sortedMessages = [...data].sort((a, b) =>
-                    new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
-                )
-                setMessages(sortedMessages)
-
-                // Mark messages as read
-                const { error: readError } = await supabase
-                    .from('messages')
-                    .update({ is_read: true })
-                    .eq('conversation_id', conversationId)
-                    .neq('sender_id', userId)
-
-                if (readError) {
-                    console.error('Error marking messages as read:', readError)
-                    // Non-critical error, don't show to user
-                }
-            }
+            const latest = await fetchWindow(conversationId)
+            if (!latest) throw new Error('Conversation not found')
+
+            setHasOlderMessages(latest.hasMore)
+            setMessages(await hydrateSenders(latest.messages))
+            setDetachedFromLatest(false)
+            await markConversationRead(conversationId)
         } catch (err) {
             console.error('Error fetching messages:', err)
             setError('Failed to load messages. Please try again.')
         } finally {
             setLoading(false)
         }
-    }, [supabase, userId])
+    }, [fetchWindow, hydrateSenders, markConversationRead, setDetachedFromLatest])
+
+    // Delta sync: fetch everything after the newest message held, e.g. once the
+    // realtime channel (re)connects or the tab comes back to the foreground
+    const syncNewMessages = useCallback(async (conversationId: string) => {
+        const newest = [...messagesRef.current].reverse().find(m => !m.id.startsWith('temp-'))
+        if (!newest || newest.conversation_id !== conversationId || hasNewerRef.current) return
+
+        try {
+            let after = newest.id
+            for (let i = 0; i < MAX_SYNC_WINDOWS; i++) {
+                const delta = await fetchWindow(conversationId, { after })
+                if (!delta) break
+
+                appendMessages(await hydrateSenders(delta.messages))
+                const last = delta.messages[delta.messages.length - 1]
+                if (!delta.hasMore || !last) {
+                    if (delta.messages.some(m => m.sender_id !== userId)) {
+                        await markConversationRead(conversationId)
+                    }
+                    return
+                }
+                after = last.id
+            }
+        } catch (err) {
+            console.error('Error syncing new messages:', err)
+            return
+        }
+
+        // Too far behind (or the anchor is gone): start again from the latest window
+        await fetchMessages(conversationId)
+    }, [fetchWindow, hydrateSenders, appendMessages, markConversationRead, fetchMessages, userId])
+
+    // Load the window of history before the oldest message shown
+    const loadOlderMessages = useCallback(async () => {
+        const oldest = messages[0]
+        if (!selectedConversation || !oldest || loadingOlder) return
+
+        setLoadingOlder(true)
+        try {
+            const older = await fetchWindow(selectedConversation.id, { before: oldest.id })
+            if (!older) return
+
+            setHasOlderMessages(older.hasMore)
+            const hydrated = await hydrateSenders(older.messages)
+            skipScrollRef.current = true
+            if (messagesRef.current.length + hydrated.length > MAX_MESSAGES_IN_MEMORY) {
+                setDetachedFromLatest(true)
+            }
+            setMessages(prev => prependToHistory(prev, hydrated))
+        } catch (err) {
+            console.error('Error fetching older messages:', err)
+            setError('Failed to load earlier messages. Please try again.')
+        } finally {
+            setLoadingOlder(false)
+        }
+    }, [selectedConversation, messages, loadingOlder, fetchWindow, hydrateSenders, setDetachedFromLatest])
+
+    // Reload the latest window after paging back dropped it
+    const jumpToLatest = useCallback(() => {
+        if (selectedConversation) {
+            void fetchMessages(selectedConversation.id)
+        }
+    }, [selectedConversation, fetchMessages])
 
     // Select a conversation
     const handleSelectConversation = useCallback((conv: Conversation & { other_user?: Profile | null }) => {
+        if (conv.other_user) {
+            senderCacheRef.current.set(conv.other_user.id, conv.other_user)
+        }
         setSelectedConversation(conv)
         fetchMessages(conv.id)
         inputRef.current?.focus()
@@ -164,6 +335,11 @@ export function MessagesClient({ userId, conversations: initialConversations, us
         const messageContent = newMessage.trim()
         setNewMessage('')
 
+        // A reply belongs after the latest messages, not after the page being read
+        if (hasNewerRef.current) {
+            await fetchMessages(selectedConversation.id)
+        }
+
         // Optimistically add message to UI
         const tempMessage: Message = {
             id: `temp-${Date.now()}`,
@@ -174,13 +350,7 @@ export function MessagesClient({ userId, conversations: initialConversations, us
             created_at: new Date().toISOString(),
             sender: undefined
         }
-        setMessages(prev => {
-            const updated = [...prev, tempMessage]
-            // Sort to maintain order
-            return updated.sort((a, b) =>
-                new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
-            )
-        })
+        appendMessages([tempMessage])
         scrollToBottom()
 
         try {
@@ -201,13 +371,10 @@ export function MessagesClient({ userId, conversations: initialConversations, us
 
             if (result.message) {
                 // Replace temp message with the server-returned message
-                setMessages(prev => {
-                    const filtered = prev.filter(m => m.id !== tempMessage.id)
-                    const updated = [...filtered, result.message]
-                    return updated.sort((a, b) =>
-                        new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
-                    )
-                })
+                setMessages(prev => appendToHistory(
+                    prev.filter(m => m.id !== tempMessage.id),
+                    [result.message]
+                ))
             }
         } catch (err) {
             console.error('Error sending message:', err)
@@ -222,10 +389,10 @@ export function MessagesClient({ userId, conversations: initialConversations, us
 
     // Handle typing indicator
     const handleTyping = useCallback(() => {
-        if (!selectedConversation || !typingChannelRef.current) return
+        if (!selectedConversation || !messageChannelRef.current) return
 
         // Broadcast typing status
-        typingChannelRef.current.send({
+        messageChannelRef.current.send({
             type: 'broadcast',
             event: 'typing',
             payload: { userId, isTyping: true }
@@ -238,8 +405,8 @@ export function MessagesClient({ userId, conversations: initialConversations, us
 
         // Set timeout to stop typing indicator
         typingTimeoutRef.current = setTimeout(() => {
-            if (typingChannelRef.current) {
-                typingChannelRef.current.send({
+            if (messageChannelRef.current) {
+                messageChannelRef.current.send({
                     type: 'broadcast',
                     event: 'typing',
                     payload: { userId, isTyping: false }
@@ -257,34 +424,24 @@ export function MessagesClient({ userId, conversations: initialConversations, us
         }
     }, [])
 
-    // Subscribe to messages for selected conversation
+    // Subscribe to messages and typing for the selected conversation
     useEffect(() => {
-        if (!selectedConversation) {
-            // Cleanup channels when no conversation is selected
-            if (messageChannelRef.current) {
-                supabase.removeChannel(messageChannelRef.current)
-                messageChannelRef.current = null
-            }
-            if (typingChannelRef.current) {
-                supabase.removeChannel(typingChannelRef.current)
-                typingChannelRef.current = null
-            }
-            return
-        }
-
-        // Cleanup existing channels
         if (messageChannelRef.current) {
             supabase.removeChannel(messageChannelRef.current)
+            messageChannelRef.current = null
         }
-        if (typingChannelRef.current) {
-            supabase.removeChannel(typingChannelRef.current)
+
+        if (!selectedConversation) {
+            return
         }
 
-        // Message channel - subscribes to INSERT and UPDATE events
+        const conversationId = selectedConversation.id
+
+        // One channel per open conversation: INSERT/UPDATE on messages plus typing broadcasts
         const messageChannel = supabase
-            .channel(`messages:${selectedConversation.id}`, {
+            .channel(`messages:${conversationId}`, {
                 config: {
-                    broadcast: { self: true }
+                    broadcast: { self: false }
                 }
             })
             .on(
@@ -293,52 +450,24 @@ export function MessagesClient({ userId, conversations: initialConversations, us
                     event: 'INSERT',
                     schema: 'public',
                     table: 'messages',
-                    filter: `conversation_id=eq.${selectedConversation.id}`,
+                    filter: `conversation_id=eq.${conversationId}`,
                 },
                 async (payload) => {
-                    console.log('[Real-time] Message INSERT received:', payload.new.id, 'from:', payload.new.sender_id)
+                    // The payload carries the full row; only the sender needs hydrating
+                    const row = payload.new as Message
 
                     try {
-                        // Fetch the full message with sender info
-                        const { data, error: fetchError } = await supabase
-                            .from('messages')
-                            .select(`
-                                *,
-                                sender:profiles!messages_sender_id_fkey(id, display_name, avatar_url, is_verified)
-                            `)
-                            .eq('id', payload.new.id)
-                            .single()
-
-                        if (fetchError) {
-                            console.error('[Real-time] Error fetching new message:', fetchError)
-                            return
-                        }
+                        appendMessages(await hydrateSenders([row]))
 
-                        if (data) {
-                            setMessages(prev => {
-                                // Check for duplicates
-                                if (prev.find(m => m.id === data.id)) {
-                                    console.log('[Real-time] Duplicate message detected, skipping:', data.id)
-                                    return prev
-                                }
+                        // Mark as read if message is from other user
+                        if (row.sender_id !== userId) {
+                            const { error: readError } = await supabase
+                                .from('messages')
+                                .update({ is_read: true })
+                                .eq('id', row.id)
 
-                                // Add new message and sort by created_at
-                                const updated = [...prev, data]
-                                return updated.sort((a, b) =>
-                                    new Date(a.created_at).getTime() - new Date(b.created_at).getTime()
-                                )
-                            })
-
-                            // Mark as read if message is from other user
-                            if (data.sender_id !== userId) {
-                                const { error: readError } = await supabase
-                                    .from('messages')
-                                    .update({ is_read: true })
-                                    .eq('id', data.id)
-
-                                if (readError) {
-                                    console.error('[Real-time] Error marking message as read:', readError)
-                                }
+                            if (readError) {
+                                console.error('[Real-time] Error marking message as read:', readError)
                             }
                         }
                     } catch (err) {
@@ -352,53 +481,46 @@ export function MessagesClient({ userId, conversations: initialConversations, us
                     event: 'UPDATE',
                     schema: 'public',
                     table: 'messages',
-                    filter: `conversation_id=eq.${selectedConversation.id}`,
+                    filter: `conversation_id=eq.${conversationId}`,
                 },
                 (payload) => {
-                    console.log('[Real-time] Message UPDATE received:', payload.new.id)
                     // Update message in UI (e.g., read status)
                     setMessages(prev => prev.map(m =>
                         m.id === payload.new.id ? { ...m, is_read: payload.new.is_read } : m
                     ))
                 }
             )
-            .subscribe((status) => {
-                console.log('[Real-time] Message channel subscription status:', status)
-            })
-
-        messageChannelRef.current = messageChannel
-
-        // Typing indicator channel
-        const typingChannel = supabase
-            .channel(`typing:${selectedConversation.id}`, {
-                config: {
-                    broadcast: { self: false }
-                }
-            })
             .on('broadcast', { event: 'typing' }, (payload) => {
                 if (payload.payload.userId !== userId) {
                     setOtherUserTyping(payload.payload.isTyping)
                 }
             })
             .subscribe((status) => {
-                console.log('[Real-time] Typing channel subscription status:', status)
+                // Catch up on anything sent while (re)connecting
+                if (status === 'SUBSCRIBED') {
+                    void syncNewMessages(conversationId)
+                }
             })
 
-        typingChannelRef.current = typingChannel
+        messageChannelRef.current = messageChannel
+
+        // Realtime events are not replayed after the tab sleeps; sync on return
+        const handleVisibilityChange = () => {
+            if (document.visibilityState === 'visible') {
+                void syncNewMessages(conversationId)
+            }
+        }
+        document.addEventListener('visibilitychange', handleVisibilityChange)
 
         return () => {
-            console.log('[Real-time] Cleaning up channels for conversation:', selectedConversation.id)
+            document.removeEventListener('visibilitychange', handleVisibilityChange)
             if (messageChannelRef.current) {
                 supabase.removeChannel(messageChannelRef.current)
                 messageChannelRef.current = null
             }
-            if (typingChannelRef.current) {
-                supabase.removeChannel(typingChannelRef.current)
-                typingChannelRef.current = null
-            }
             setOtherUserTyping(false)
         }
-    }, [selectedConversation, userId, supabase])
+    }, [selectedConversation, userId, supabase, appendMessages, hydrateSenders, syncNewMessages])
 
     // Subscribe to conversations for real-time updates
     useEffect(() => {
@@ -407,107 +529,115 @@ export function MessagesClient({ userId, conversations: initialConversations, us
             supabase.removeChannel(conversationsChannelRef.current)
         }
 
-        // Conversations channel - subscribes to INSERT and UPDATE events
-        // We subscribe to all conversations and filter in the handler
-        const conversationsChannel = supabase
+        // Conversations channel - subscribes to INSERT and UPDATE events on this
+        // user's conversations only; a filter takes one column, so one listener
+        // pair per participant slot
+        let conversationsChannel = supabase
             .channel('conversations:user', {
                 config: {
                     broadcast: { self: true }
                 }
             })
-            .on(
-                'postgres_changes',
-                {
-                    event: 'INSERT',
-                    schema: 'public',
-                    table: 'conversations',
-                },
-                async (payload) => {
-                    // Filter to only process conversations where user is a participant
-                    const isParticipant = payload.new.participant_1 === userId || payload.new.participant_2 === userId
-                    if (!isParticipant) return
-
-                    console.log('[Real-time] New conversation created:', payload.new.id)
 
-                    try {
-                        // Fetch the other user's profile
-                        const otherUserId = payload.new.participant_1 === userId
-                            ? payload.new.participant_2
-                            : payload.new.participant_1
+        for (const column of ['participant_1', 'participant_2']) {
+            conversationsChannel = conversationsChannel
+                .on(
+                    'postgres_changes',
+                    {
+                        event: 'INSERT',
+                        schema: 'public',
+                        table: 'conversations',
+                        filter: `${column}=eq.${userId}`,
+                    },
+                    async (payload) => {
+                        // Filter to only process conversations where user is a participant
+                        const isParticipant = payload.new.participant_1 === userId || payload.new.participant_2 === userId
+                        if (!isParticipant) return
+
+                        console.log('[Real-time] New conversation created:', payload.new.id)
+
+                        try {
+                            // Fetch the other user's profile
+                            const otherUserId = payload.new.participant_1 === userId
+                                ? payload.new.participant_2
+                                : payload.new.participant_1
+
+                            const { data: profile, error: profileError } = await supabase
+                                .from('profiles')
+                                .select('id, display_name, avatar_url, role, is_verified')
+                                .eq('id', otherUserId)
+                                .single()
+
+                            if (profileError) {
+                                console.error('[Real-time] Error fetching profile for new conversation:', profileError)
+                                return
+                            }
 
-                        const { data: profile, error: profileError } = await supabase
-                            .from('profiles')
-                            .select('id, display_name, avatar_url, role, is_verified')
-                            .eq('id', otherUserId)
-                            .single()
+                            // Ensure payload.new has all required Conversation properties
+                            const conversationData = payload.new as Conversation
+                            if (!conversationData.id || !conversationData.participant_1 || !conversationData.participant_2) {
+                                console.error('[Real-time] Invalid conversation data:', conversationData)
+                                return
+                            }
 
-                        if (profileError) {
-                            console.error('[Real-time] Error fetching profile for new conversation:', profileError)
-                            return
-                        }
+                            const newConversation = {
+                                ...conversationData,
+                                other_user: profile || null
+                            } as Conversation & { other_user?: Profile | null }
 
-                        // Ensure payload.new has all required Conversation properties
-                        const conversationData = payload.new as Conversation
-                        if (!conversationData.id || !conversationData.participant_1 || !conversationData.participant_2) {
-                            console.error('[Real-time] Invalid conversation data:', conversationData)
-                            return
+                            setConversations(prev => {
+                                // Check for duplicates
+                                if (prev.find(c => c.id === newConversation.id)) {
+                                    return prev
+                                }
+                                // Add new conversation and sort by last_message_at
+                                const updated = [newConversation, ...prev]
+                                return updated.sort((a, b) => {
+                                    const aTime = a.last_message_at || a.created_at
+                                    const bTime = b.last_message_at || b.created_at
+                                    return new Date(bTime).getTime() - new Date(aTime).getTime()
+                                })
+                            })
+                        } catch (err) {
+                            console.error('[Real-time] Error processing new conversation:', err)
                         }
-
-                        const newConversation = {
-                            ...conversationData,
-                            other_user: profile || null
-                        } as Conversation & { other_user?: Profile | null }
-
+                    }
+                )
+                .on(
+                    'postgres_changes',
+                    {
+                        event: 'UPDATE',
+                        schema: 'public',
+                        table: 'conversations',
+                        filter: `${column}=eq.${userId}`,
+                    },
+                    (payload) => {
+                        // Filter to only process conversations where user is a participant
+                        const isParticipant = payload.new.participant_1 === userId || payload.new.participant_2 === userId
+                        if (!isParticipant) return
+
+                        console.log('[Real-time] Conversation UPDATE received:', payload.new.id, 'last_message_at:', payload.new.last_message_at)
+
+                        // Update conversation in list (e.g., last_message_at)
                         setConversations(prev => {
-                            // Check for duplicates
-                            if (prev.find(c => c.id === newConversation.id)) {
-                                return prev
-                            }
-                            // Add new conversation and sort by last_message_at
-                            const updated = [newConversation, ...prev]
-                            return updated.sort((a, b) => {
-                                const aTime = a.last_message_at || a.created_at
-                                const bTime = b.last_message_at || b.created_at
-                                return new Date(bTime).getTime() - new Date(aTime).getTime()
-                            })
+                            const updated = prev.map(conv =>
+                                conv.id === payload.new.id
+                                    ? { ...conv, ...payload.new }
+                                    : conv
+                            )
+                            // Re-sort by last_message_at descending
+                            return updated.sort((a, b) =>
+                                new Date(b.last_message_at || b.created_at).getTime() -
+                                new Date(a.last_message_at || a.created_at).getTime()
+                            )
                         })
-                    } catch (err) {
-                        console.error('[Real-time] Error processing new conversation:', err)
                     }
-                }
-            )
-            .on(
-                'postgres_changes',
-                {
-                    event: 'UPDATE',
-                    schema: 'public',
-                    table: 'conversations',
-                },
-                (payload) => {
-                    // Filter to only process conversations where user is a participant
-                    const isParticipant = payload.new.participant_1 === userId || payload.new.participant_2 === userId
-                    if (!isParticipant) return
-
-                    console.log('[Real-time] Conversation UPDATE received:', payload.new.id, 'last_message_at:', payload.new.last_message_at)
-
-                    // Update conversation in list (e.g., last_message_at)
-                    setConversations(prev => {
-                        const updated = prev.map(conv =>
-                            conv.id === payload.new.id
-                                ? { ...conv, ...payload.new }
-                                : conv
-                        )
-                        // Re-sort by last_message_at descending
-                        return updated.sort((a, b) =>
-                            new Date(b.last_message_at || b.created_at).getTime() -
-                            new Date(a.last_message_at || a.created_at).getTime()
-                        )
-                    })
-                }
-            )
-            .subscribe((status) => {
-                console.log('[Real-time] Conversations channel subscription status:', status)
-            })
+                )
+        }
+
+        conversationsChannel.subscribe((status) => {
+            console.log('[Real-time] Conversations channel subscription status:', status)
+        })
 
         conversationsChannelRef.current = conversationsChannel
 
@@ -522,6 +652,10 @@ export function MessagesClient({ userId, conversations: initialConversations, us
 
     // Scroll to bottom when messages change
     useEffect(() => {
+        if (skipScrollRef.current) {
+            skipScrollRef.current = false
+            return
+        }
         if (messages.length > 0) {
             // Use setTimeout to ensure DOM is updated
             const timeoutId = setTimeout(() => {
@@ -793,7 +927,21 @@ export function MessagesClient({ userId, conversations: initialConversations, us
                                                 </p>
                                             </div>
                                         ) : (
-                                            messages.map((message) => {
+                                            <>
+                                            {/* Older history exists, or was dropped to stay under the memory cap */}
+                                            {(hasOlderMessages || messages.length >= MAX_MESSAGES_IN_MEMORY) && (
+                                                <div className="flex justify-center">
+                                                    <button
+                                                        type="button"
+                                                        onClick={loadOlderMessages}
+                                                        disabled={loadingOlder}
+                                                        className="text-white/50 hover:text-white text-xs px-3 py-1.5 rounded-full bg-white/5 hover:bg-white/10 transition-colors disabled:opacity-50"
+                                                    >
+                                                        {loadingOlder ? 'Loading...' : 'Load earlier messages'}
+                                                    </button>
+                                                </div>
+                                            )}
+                                            {messages.map((message) => {
                                                 const isOwn = message.sender_id === userId
                                                 return (
                                                     <div
@@ -826,7 +974,21 @@ export function MessagesClient({ userId, conversations: initialConversations, us
                                                         </div>
                                                     </div>
                                                 )
-                                            })
+                                            })}
+                                            {/* Paging back dropped the newest messages */}
+                                            {hasNewerMessages && (
+                                                <div className="flex justify-center">
+                                                    <button
+                                                        type="button"
+                                                        onClick={jumpToLatest}
+                                                        disabled={loading}
+                                                        className="text-white/50 hover:text-white text-xs px-3 py-1.5 rounded-full bg-white/5 hover:bg-white/10 transition-colors disabled:opacity-50"
+                                                    >
+                                                        {loading ? 'Loading...' : 'Jump to latest'}
+                                                    </button>
+                                                </div>
+                                            )}
+                                            </>
                                         )}
                                         <div ref={messagesEndRef} />
                                     </div>
@@ -481,6 +481,7 @@ export function TalentDashboardClient({
 
             if (error) throw error
             setIsOnline(!isOnline)
+            await syncTalentVerification()
             router.refresh()
         } catch (error) {
             console.error('Error updating status:', error)
@@ -9,27 +9,36 @@ interface TalentWithStats extends Profile {
   free_media: number;
 }
 
+interface StatsRow {
+  total_media: number;
+  premium_media: number;
+  free_media: number;
+  profile: Profile;
+}
+
 export default async function HiddenTalentsPage() {
   const supabase = await createClient()
 
-  // Fetch all talents with media from the new stats view
+  // Read the trigger-maintained stats table; this ordering matches
+  // idx_talent_media_stats_ranking, so no aggregate or sort runs per request
   const { data, error, count } = await supabase
-    .from('talents_with_media_stats')
-    .select('*', { count: 'exact' })
+    .from('talent_media_stats')
+    .select('total_media, premium_media, free_media, profile:profiles!inner(*)', { count: 'exact' })
     .order('total_media', { ascending: false })
-    .order('created_at', { ascending: false })
+    .order('talent_created_at', { ascending: false })
     .limit(10000)
 
   if (error) {
     console.error('Error fetching talents:', error)
     return (
       <div className="flex justify-center items-center h-64 text-red-500">
-        Failed to load talents. Please make sure the SQL view is created in Supabase.
+        Failed to load talents. Please make sure the talent_media_stats table is created in Supabase.
       </div>
     )
   }
 
-  const talents = data as TalentWithStats[] | null;
+  const rows = data as unknown as StatsRow[] | null;
+  const talents: TalentWithStats[] | null = rows?.map(({ profile, ...stats }) => ({ ...profile, ...stats })) ?? null;
   const totalItems = count || 0;
 
   if (!talents || talents.length === 0) {
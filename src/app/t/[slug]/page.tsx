@@ -1,211 +1,71 @@
-import { createClient as createAdminClient } from '@supabase/supabase-js'
 import { Metadata } from 'next'
-import { unstable_cache } from 'next/cache'
+import { headers } from 'next/headers'
 import { notFound } from 'next/navigation'
 import { TalentProfileClient } from '@/app/talent/[id]/TalentProfileClient'
+import { getClientIP } from '@/lib/admin/audit-log'
 import { generateTalentOpenGraphMetadata } from '@/lib/og-metadata'
-import { generateSlug } from '@/lib/talent-url'
-import { createApiClient } from '@/lib/supabase/api'
 import { createClient, getServerProfile } from '@/lib/supabase/server'
-import type { Profile, Review, ServiceType, TalentMenu, Wallet } from '@/types/database'
-
-type TalentProfileRow = Profile & {
-    talent_menus?: Array<TalentMenu & { service_type?: ServiceType | null }>
-}
-
-type ReviewWithClient = Review & {
-    client?: Profile
-}
-
-// Create admin client lazily with service role key for bypassing RLS
-function getAdminClient() {
-    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
-    const serviceRoleKey = process.env.SUPABASE_SERVICE_ROLE_KEY
-
-    if (!supabaseUrl || !serviceRoleKey) {
-        console.error('Missing Supabase env vars for admin client')
-        return null
-    }
-
-    return createAdminClient(supabaseUrl, serviceRoleKey, {
-        auth: { persistSession: false }
-    })
-}
-
-// Cache talent profile data for 1 hour
-// This includes basic profile and their service menus
-async function getTalentProfile(slug: string) {
-    const supabase = createApiClient()
-
-    const talentProfileQuery = `
-                *,
-                talent_menus (
-                    *,
-                    service_type:service_types(*)
-                )
-            `
-
-    // Validate if slug is a UUID to prevent Postgres type mismatch errors when querying the id column
-    const isUuid = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i.test(slug)
-    const orFilter = isUuid
-        ? `username.eq."${slug}",slug.eq."${slug}",id.eq."${slug}"`
-        : `username.eq."${slug}",slug.eq."${slug}"`
-
-    // Priority: username > persisted slug column > id
-    const { data: talent, error } = await supabase
-        .from('profiles')
-        .select(talentProfileQuery)
-        .eq('role', 'talent')
-        .or(orFilter)
-        .maybeSingle()
-
-    if (talent) {
-        return talent
-    }
-
-    if (error) {
-        console.error(`[TalentProfile] Database error for slug "${slug}":`, error)
-        return null
-    }
-
-    const { data: candidates, error: candidatesError } = await supabase
-        .from('profiles')
-        .select('id, display_name')
-        .eq('role', 'talent')
-
-    if (candidatesError || !candidates) {
-        return null
-    }
-
-    const matchedCandidate = candidates.find((candidate) => {
-        return candidate.display_name ? generateSlug(candidate.display_name) === slug : false
-    })
-
-    if (!matchedCandidate) {
-        return null
-    }
-
-    const { data: fallbackTalent, error: fallbackError } = await supabase
-        .from('profiles')
-        .select(talentProfileQuery)
-        .eq('role', 'talent')
-        .eq('id', matchedCandidate.id)
-        .maybeSingle()
-
-    if (fallbackError || !fallbackTalent) {
-        return null
-    }
-
-    return fallbackTalent
-}
-
-const getCachedTalentProfile = (slug: string) => unstable_cache(
-    async () => getTalentProfile(slug),
-    ['talent-profile', slug],
-    { revalidate: 3600, tags: ['talents'] }
-)()
+import { getTalentProfileBySlug, getViewerMedia } from '@/lib/talent-profile'
+import { recordProfileView } from '@/lib/view-tracking'
+import type { Wallet } from '@/types/database'
 
 export async function generateMetadata({ params }: { params: Promise<{ slug: string }> }): Promise<Metadata> {
     const { slug } = await params
-    const talent = await getCachedTalentProfile(slug)
+    const profile = await getTalentProfileBySlug(slug)
 
-    if (!talent) {
+    if (!profile) {
         return generateTalentOpenGraphMetadata('Talent Profile', undefined, slug)
     }
 
     return generateTalentOpenGraphMetadata(
-        talent.display_name || 'Talent Profile',
+        profile.talent.display_name || 'Talent Profile',
         undefined,
-        talent.username || null,
-        talent.id
+        profile.talent.username || null,
+        profile.talent.id,
+        profile.talent
     )
 }
 
 export default async function TalentProfileBySlugPage({ params }: { params: Promise<{ slug: string }> }) {
     const { slug } = await params
-    const supabase = await createClient()
 
-    // Get session and profile (with override)
-    const { profile: currentUserProfile, user } = await getServerProfile()
-
-    // Get cached talent profile (includes menus)
-    const talent = await getCachedTalentProfile(slug)
+    // Public data comes from the shared per-talent cache; only the session, wallet
+    // and premium media urls are per request
+    const [profile, { profile: currentUserProfile, user }] = await Promise.all([
+        getTalentProfileBySlug(slug),
+        getServerProfile(),
+    ])
 
-    if (!talent) {
+    if (!profile) {
         notFound()
     }
 
-    // Fetch remaining data in parallel
-    const [mediaResult, reviewsResult, userContextResult] = await Promise.all([
-        // 1. Fetch media (respecting RLS or using admin if authenticated)
-        user ? (async () => {
-            const supabaseAdmin = getAdminClient()
-            if (!supabaseAdmin) return supabase.from('media').select('id, talent_id, url, type, is_premium, unlock_price, created_at').eq('talent_id', talent.id).or('moderation_status.is.null,moderation_status.eq.approved,moderation_status.eq.pending').order('created_at', { ascending: false })
-            return supabaseAdmin.from('media').select('id, talent_id, url, type, is_premium, unlock_price, created_at').eq('talent_id', talent.id).or('moderation_status.is.null,moderation_status.eq.approved,moderation_status.eq.pending').order('created_at', { ascending: false })
-        })() : supabase.from('media').select('id, talent_id, url, type, is_premium, unlock_price, created_at').eq('talent_id', talent.id).or('moderation_status.is.null,moderation_status.eq.approved,moderation_status.eq.pending').order('created_at', { ascending: false }),
-
-        // 2. Fetch reviews
-        supabase.from('reviews').select(`*, client:profiles!reviews_client_id_fkey(id, display_name, avatar_url)`).eq('talent_id', talent.id).order('created_at', { ascending: false }),
+    const { talent, media, reviews, averageRating, reviewCount } = profile
 
-        // 3. Fetch current user context
+    const supabase = await createClient()
+    const [wallet, viewerMedia, requestHeaders] = await Promise.all([
         user ? (async () => {
-            const { data: wallet } = await supabase.from('wallets').select('*').eq('user_id', user.id).single()
-            return wallet
-        })() : Promise.resolve(null)
+            const { data } = await supabase.from('wallets').select('*').eq('user_id', user.id).single()
+            return data as Wallet | null
+        })() : Promise.resolve(null),
+        getViewerMedia(supabase, talent.id, media, user?.id || null),
+        headers(),
     ])
 
-    const media = mediaResult.data
-    const allReviews = reviewsResult.data as ReviewWithClient[] | null
-    const wallet = userContextResult as Wallet | null
-    let averageRating = 0
-    let reviewCount = 0
-    if (allReviews && allReviews.length > 0) {
-        reviewCount = allReviews.length
-        averageRating = allReviews.reduce((sum: number, r) => sum + r.rating, 0) / reviewCount
-    }
-
-    // Map talent_menus to expected structure
-    const mappedMenus = ((talent as TalentProfileRow).talent_menus || []).map((m) => ({
-        ...m,
-        service_type: m.service_type || null
-    }))
-
-    const talentWithMedia = {
-        ...talent,
-        media: media || [],
-        talent_menus: mappedMenus
-    }
-
-    // Track profile view and update activity status (async/background)
-    if (talent.id) {
-        const supabaseAdmin = getAdminClient()
-        if (supabaseAdmin) {
-            // Record view
-            supabaseAdmin.from('profile_views').insert({
-                talent_id: talent.id,
-                viewer_id: user?.id || null,
-                viewer_role: user ? (currentUserProfile?.role || 'client') : 'anonymous'
-            }).then(({ error }: { error: Error | null }) => {
-                if (error) console.error('[TalentProfile] Error tracking view:', error)
-            })
-
-            // Update viewer activity
-            if (user?.id) {
-                supabaseAdmin.from('profiles')
-                    .update({ last_active_at: new Date().toISOString() })
-                    .eq('id', user.id)
-                    .then(({ error }: { error: Error | null }) => {
-                        if (error) console.error('[TalentProfile] Error updating activity:', error)
-                    })
-            }
-        }
-    }
+    // Track profile view and viewer activity; buffered and written in bulk
+    recordProfileView({
+        talentId: talent.id,
+        viewerId: user?.id || null,
+        viewerRole: user ? (currentUserProfile?.role || 'client') : 'anonymous',
+        anonymousKey: user ? null : getClientIP(requestHeaders),
+    })
 
     return (
         <TalentProfileClient
             talent={{
-                ...talentWithMedia,
-                reviews: allReviews || [], // Pass all reviews for accurate distribution calculation
+                ...talent,
+                media: viewerMedia,
+                reviews, // Pass all reviews for accurate distribution calculation
                 average_rating: averageRating,
                 review_count: reviewCount
             }}
@@ -252,7 +252,10 @@ function GallerySection({ media, userId, userBalance, talentName, onUnlock, onOp
                                     className={`aspect-square rounded-xl overflow-hidden relative group ${canOpen ? 'cursor-pointer' : ''}`}
                                     onClick={() => canOpen && handleOpenLightbox(item)}
                                 >
-                                    {isVideo(item.url) ? (
+                                    {!item.url ? (
+                                        // Locked premium media is served without its url
+                                        <div className="w-full h-full bg-gradient-to-br from-amber-500/10 to-orange-500/10" />
+                                    ) : isVideo(item.url) ? (
                                         <video
                                             src={item.url}
                                             className={`w-full h-full object-cover transition-all ${showBlur ? 'blur-xl scale-110' : ''}`}
@@ -1308,14 +1311,20 @@ export function TalentProfileClient({ talent: initialTalent, currentUser, wallet
                     onLoginRequired={handleLoginRedirect}
                 />
 
-                {/* Gift Leaderboard - Enhanced */}
-                <div className="mb-8">
-                    <div className="mb-4">
-                        <h2 className="text-2xl font-bold text-white mb-1">Top Supporters</h2>
-                        <p className="text-white/50 text-sm">See who&apos;s been showing {talent.display_name || 'this talent'} the most love</p>
+                {/* Gift Leaderboard - signed-in viewers only */}
+                {userId && (
+                    <div className="mb-8">
+                        <div className="mb-4">
+                            <h2 className="text-2xl font-bold text-white mb-1">Top Supporters</h2>
+                            <p className="text-white/50 text-sm">
+                                {userId === talent.id
+                                    ? 'See who\'s been showing you the most love'
+                                    : `Your gifts to ${talent.display_name || 'this talent'}`}
+                            </p>
+                        </div>
+                        <GiftLeaderboard talentId={talent.id} />
                     </div>
-                    <GiftLeaderboard talentId={talent.id} />
-                </div>
+                )}
 
                 {/* Reviews Section - Enhanced */}
                 <div className="mb-8">
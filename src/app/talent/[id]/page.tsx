@@ -1,7 +1,9 @@
 import { Metadata } from 'next'
 import { redirect, notFound } from 'next/navigation'
+import { isValidUUID } from '@/lib/gift-validation'
 import { generateTalentOpenGraphMetadata } from '@/lib/og-metadata'
 import { createClient } from '@/lib/supabase/server'
+import { getTalentProfileById } from '@/lib/talent-profile'
 import { getTalentUrl } from '@/lib/talent-url'
 
 interface PageProps {
@@ -10,13 +12,7 @@ interface PageProps {
 
 export async function generateMetadata({ params }: PageProps): Promise<Metadata> {
     const { id } = await params
-    const supabase = await createClient()
-
-    const { data: talent } = await supabase
-        .from('profiles')
-        .select('id, display_name, username, avatar_url')
-        .eq('id', id)
-        .single()
+    const talent = isValidUUID(id) ? (await getTalentProfileById(id))?.talent : null
 
     if (!talent) {
         return generateTalentOpenGraphMetadata('Talent Profile', undefined, undefined, id)
@@ -26,7 +22,8 @@ export async function generateMetadata({ params }: PageProps): Promise<Metadata>
         talent.display_name || 'Talent Profile',
         undefined, // Don't pass image URL, let the OG route fetch it
         talent.username,
-        talent.id
+        talent.id,
+        talent
     )
 }
 
@@ -42,18 +39,15 @@ export default async function TalentProfilePage({ params }: PageProps) {
         redirect('/login')
     }
 
-    // Fetch talent profile to get username/display_name for slug
-    const { data: talent, error } = await supabase
-        .from('profiles')
-        .select('id, username, display_name')
-        .eq('id', id)
-        .eq('role', 'talent')
-        .single()
+    // Same cached loader as /t/[slug], so the redirect target is usually warm
+    const profile = isValidUUID(id) ? await getTalentProfileById(id) : null
 
-    if (error || !talent) {
+    if (!profile) {
         notFound()
     }
 
+    const { talent } = profile
+
     // Redirect to the new slug-based URL
     const newUrl = getTalentUrl(talent)
 
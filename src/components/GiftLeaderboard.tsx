@@ -4,21 +4,9 @@ import { Trophy, Crown, Medal, Coin, SpinnerGap } from '@phosphor-icons/react'
 import Image from 'next/image'
 import Link from 'next/link'
 import { useState, useEffect } from 'react'
-import { createClient } from '@/lib/supabase/client'
+import type { TopGifter } from '@/lib/gift-leaderboard'
 import { getTalentUrl } from '@/lib/talent-url'
 
-interface TopGifter {
-    sender_id: string
-    total_amount: number
-    gift_count: number
-    sender: {
-        id: string
-        display_name: string | null
-        avatar_url: string | null
-        username: string | null
-    } | null
-}
-
 interface GiftLeaderboardProps {
     talentId: string
 }
@@ -39,72 +27,21 @@ export function GiftLeaderboard({ talentId }: GiftLeaderboardProps) {
         async function fetchLeaderboard() {
             setLoading(true)
             setError(null)
-            const supabase = createClient()
 
             try {
-                // Calculate date filter
-                let dateFilter = null
-                if (timeRange === 'week') {
-                    const weekAgo = new Date()
-                    weekAgo.setDate(weekAgo.getDate() - 7)
-                    dateFilter = weekAgo.toISOString()
-                } else if (timeRange === 'month') {
-                    const monthAgo = new Date()
-                    monthAgo.setMonth(monthAgo.getMonth() - 1)
-                    dateFilter = monthAgo.toISOString()
-                }
-
-                // Fetch gifts grouped by sender
-                let query = supabase
-                    .from('gifts')
-                    .select(`
-                        sender_id,
-                        amount,
-                        created_at,
-                        sender:profiles!gifts_sender_id_fkey(id, display_name, avatar_url, username)
-                    `)
-                    .eq('recipient_id', talentId)
-
-                if (dateFilter) {
-                    query = query.gte('created_at', dateFilter)
-                }
-
-                const { data: gifts, error: fetchError } = await query
+                // Aggregated and ranked server-side; the response is at most ten rows
+                const params = new URLSearchParams({ talentId, range: timeRange })
+                const response = await fetch(`/api/gifts/leaderboard?${params.toString()}`)
+                const result = await response.json()
 
-                if (fetchError) {
-                    console.error('Leaderboard fetch error:', fetchError)
+                if (!response.ok || !result.success) {
+                    console.error('Leaderboard fetch error:', result.error)
                     setError('Failed to load leaderboard')
                     setLoading(false)
                     return
                 }
 
-                // Aggregate by sender
-                const aggregated: Record<string, TopGifter> = {}
-
-                gifts?.forEach(gift => {
-                    if (!aggregated[gift.sender_id]) {
-                        // Handle sender which could be an array or single object from Supabase
-                        const senderData = Array.isArray(gift.sender) ? gift.sender[0] : gift.sender
-                        aggregated[gift.sender_id] = {
-                            sender_id: gift.sender_id,
-                            total_amount: 0,
-                            gift_count: 0,
-                            sender: senderData as TopGifter['sender']
-                        }
-                    }
-                    const entry = aggregated[gift.sender_id]
-                    if (entry) {
-                        entry.total_amount += gift.amount
-                        entry.gift_count += 1
-                    }
-                })
-
-                // Sort by total amount and take top 10
-                const sorted = Object.values(aggregated)
-                    .sort((a, b) => b.total_amount - a.total_amount)
-                    .slice(0, 10)
-
-                setTopGifters(sorted)
+                setTopGifters(result.topGifters as TopGifter[])
             } catch (err) {
                 console.error('Leaderboard error:', err)
                 setError('Failed to load leaderboard')
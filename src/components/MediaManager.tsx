@@ -7,6 +7,7 @@ import {
 import { useState, useMemo } from 'react'
 import { Button } from '@/components/ui/button'
 import { createClient } from '@/lib/supabase/client'
+import { syncTalentVerification } from '@/lib/talent-verification-client'
 import { MediaFilterPanel } from './media/MediaFilterPanel'
 import { MediaGallery } from './media/MediaGallery'
 import { MediaUploadModal } from './media/MediaUploadModal'
@@ -88,6 +89,7 @@ export function MediaManager({ talentId, media, onRefresh }: MediaManagerProps)
                 }
             }
 
+            await syncTalentVerification()
             onRefresh()
 
         } catch (err) {
@@ -0,0 +1,234 @@
+/**
+ * Streaming admin exports
+ *
+ * Each dataset is read from the database in fixed-size chunks and written out as
+ * CSV or NDJSON while it is read, so an export holds one chunk in memory however
+ * many rows it covers. Chunks are pulled on demand: a slow download stops the
+ * reads instead of buffering ahead of it.
+ */
+
+import { createApiClient } from '@/lib/supabase/api'
+import { compositeKeysetFilter, keysetFilter, type KeysetCursor, type KeysetOrder } from '@/lib/utils/keyset'
+import { toCSVRow } from './export-utils'
+
+export type ExportFormat = 'csv' | 'ndjson'
+
+export type ExportDataset = 'verifications' | 'withdrawal_requests' | 'payouts' | 'analytics'
+
+export interface ExportDateRange {
+    // ISO timestamps, both inclusive
+    from?: string
+    to?: string
+}
+
+// Rows per database round trip
+const EXPORT_CHUNK_SIZE = 1000
+
+type ExportValue = string | number | null
+
+// Rows come from an untyped service-role client
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+type ExportRow = any
+
+interface ExportColumn {
+    key: string
+    header: string
+    value: (row: ExportRow) => ExportValue
+}
+
+interface DatasetSpec {
+    table: string
+    select: string
+    // Column the date range applies to
+    dateColumn: string
+    // Keyset order on one column and a unique tiebreaker...
+    order?: KeysetOrder
+    // ...or, for tables keyed on several columns, the non-null primary key, read ascending
+    key?: string[]
+    filter?: (query: ExportRow) => ExportRow
+    columns: ExportColumn[]
+}
+
+const iso = (value: string | null | undefined): string | null =>
+    value ? new Date(value).toISOString() : null
+
+const DATASETS: Record<ExportDataset, DatasetSpec> = {
+    verifications: {
+        table: 'verifications',
+        select: `
+            booking_id, full_name, phone, status, admin_notes, created_at,
+            booking:bookings (
+                total_price, status,
+                client:profiles!bookings_client_id_fkey (display_name),
+                talent:profiles!bookings_talent_id_fkey (display_name)
+            )
+        `,
+        dateColumn: 'created_at',
+        order: { column: 'created_at', ascending: false, tiebreaker: 'booking_id' },
+        columns: [
+            { key: 'booking_id', header: 'Booking ID', value: (v) => v.booking_id },
+            { key: 'client_name', header: 'Client Name', value: (v) => v.full_name || v.booking?.client?.display_name || null },
+            { key: 'talent_name', header: 'Talent Name', value: (v) => v.booking?.talent?.display_name ?? null },
+            { key: 'phone', header: 'Phone', value: (v) => v.phone ?? null },
+            { key: 'status', header: 'Status', value: (v) => v.status },
+            { key: 'submitted_at', header: 'Submitted Date', value: (v) => iso(v.created_at) },
+            { key: 'admin_notes', header: 'Admin Notes', value: (v) => v.admin_notes ?? null },
+            { key: 'booking_amount', header: 'Booking Amount', value: (v) => v.booking?.total_price ?? null },
+            { key: 'booking_status', header: 'Booking Status', value: (v) => v.booking?.status ?? null },
+        ],
+    },
+    withdrawal_requests: {
+        table: 'withdrawal_requests',
+        select: '*, talent:profiles(display_name)',
+        dateColumn: 'created_at',
+        order: { column: 'created_at', ascending: false },
+        columns: [
+            { key: 'id', header: 'Request ID', value: (r) => r.id },
+            { key: 'talent_name', header: 'Talent Name', value: (r) => r.talent?.display_name ?? null },
+            { key: 'amount', header: 'Amount (Coins)', value: (r) => r.amount },
+            { key: 'bank_name', header: 'Bank Name', value: (r) => r.bank_name },
+            { key: 'account_number', header: 'Account Number', value: (r) => r.account_number },
+            { key: 'account_name', header: 'Account Name', value: (r) => r.account_name },
+            { key: 'status', header: 'Status', value: (r) => r.status },
+            { key: 'requested_at', header: 'Requested Date', value: (r) => iso(r.created_at) },
+            { key: 'processed_at', header: 'Processed Date', value: (r) => iso(r.processed_at) },
+            { key: 'admin_notes', header: 'Admin Notes', value: (r) => r.admin_notes ?? null },
+        ],
+    },
+    payouts: {
+        table: 'transactions',
+        select: 'id, coins, amount, status, description, created_at, user:profiles(display_name)',
+        dateColumn: 'created_at',
+        order: { column: 'created_at', ascending: false },
+        filter: (query) => query.eq('type', 'payout'),
+        columns: [
+            { key: 'id', header: 'Transaction ID', value: (p) => p.id },
+            { key: 'user_name', header: 'User Name', value: (p) => p.user?.display_name ?? null },
+            { key: 'coins', header: 'Amount (Coins)', value: (p) => Math.abs(p.coins || p.amount || 0) },
+            { key: 'status', header: 'Status', value: (p) => p.status },
+            { key: 'created_at', header: 'Date', value: (p) => iso(p.created_at) },
+            { key: 'description', header: 'Description', value: (p) => p.description ?? null },
+        ],
+    },
+    analytics: {
+        // Deltas written since the last compaction, normally under ten minutes, are not included
+        table: 'analytics_daily_rollups',
+        select: 'day, metric, dimension, count, amount',
+        dateColumn: 'day',
+        key: ['day', 'metric', 'dimension'],
+        columns: [
+            { key: 'day', header: 'Day', value: (r) => r.day },
+            { key: 'metric', header: 'Metric', value: (r) => r.metric },
+            { key: 'dimension', header: 'Dimension', value: (r) => r.dimension || null },
+            { key: 'count', header: 'Count', value: (r) => Number(r.count) },
+            { key: 'amount', header: 'Amount', value: (r) => Number(r.amount) },
+        ],
+    },
+}
+
+export function isExportDataset(value: string): value is ExportDataset {
+    return Object.prototype.hasOwnProperty.call(DATASETS, value)
+}
+
+export function exportContentType(format: ExportFormat): string {
+    return format === 'csv' ? 'text/csv; charset=utf-8' : 'application/x-ndjson; charset=utf-8'
+}
+
+export function exportFilename(dataset: ExportDataset, format: ExportFormat): string {
+    return `${dataset}_${new Date().toISOString().split('T')[0]}.${format === 'csv' ? 'csv' : 'ndjson'}`
+}
+
+/**
+ * Stream a dataset as CSV (header row first) or NDJSON (one object per line,
+ * keyed by column key). Read errors abort the stream, which the client sees as a
+ * truncated download rather than a silently short file.
+ */
+export function streamExport(
+    dataset: ExportDataset,
+    format: ExportFormat,
+    range: ExportDateRange = {}
+): ReadableStream<Uint8Array> {
+    const spec = DATASETS[dataset]
+    const supabase = createApiClient()
+    const encoder = new TextEncoder()
+
+    // Day columns compare against the date part only
+    const bound = (value: string) => spec.dateColumn === 'day' ? value.split('T')[0]! : value
+
+    let cursor: KeysetCursor | null = null
+    let keyCursor: Array<string | number> | null = null
+    let headerSent = false
+
+    const fetchChunk = async (): Promise<ExportRow[]> => {
+        let query: ExportRow = supabase.from(spec.table).select(spec.select)
+        if (spec.filter) query = spec.filter(query)
+        if (range.from) query = query.gte(spec.dateColumn, bound(range.from))
+        if (range.to) query = query.lte(spec.dateColumn, bound(range.to))
+
+        if (spec.order) {
+            const tiebreaker = spec.order.tiebreaker ?? 'id'
+            if (cursor) query = query.or(keysetFilter(spec.order, cursor))
+            query = query
+                .order(spec.order.column, { ascending: spec.order.ascending })
+                .order(tiebreaker, { ascending: spec.order.ascending })
+                .limit(EXPORT_CHUNK_SIZE)
+        } else if (spec.key) {
+            if (keyCursor) query = query.or(compositeKeysetFilter(spec.key, keyCursor, true))
+            for (const column of spec.key) {
+                query = query.order(column, { ascending: true })
+            }
+            query = query.limit(EXPORT_CHUNK_SIZE)
+        }
+
+        const { data, error } = await query
+        if (error) {
+            throw new Error(`Export of ${dataset} failed: ${error.message}`)
+        }
+        return (data || []) as ExportRow[]
+    }
+
+    const serialize = (row: ExportRow): string => {
+        if (format === 'csv') {
+            return toCSVRow(spec.columns.map((column) => column.value(row))) + '\n'
+        }
+        const record: Record<string, ExportValue> = {}
+        for (const column of spec.columns) {
+            record[column.key] = column.value(row)
+        }
+        return JSON.stringify(record) + '\n'
+    }
+
+    return new ReadableStream<Uint8Array>({
+        async pull(controller) {
+            if (format === 'csv' && !headerSent) {
+                headerSent = true
+                controller.enqueue(encoder.encode(toCSVRow(spec.columns.map((column) => column.header)) + '\n'))
+                return
+            }
+
+            try {
+                const rows = await fetchChunk()
+
+                if (rows.length > 0) {
+                    controller.enqueue(encoder.encode(rows.map(serialize).join('')))
+                }
+
+                if (rows.length < EXPORT_CHUNK_SIZE) {
+                    controller.close()
+                    return
+                }
+
+                const last = rows[rows.length - 1]
+                if (spec.order) {
+                    const id = last[spec.order.tiebreaker ?? 'id'] as string
+                    cursor = { value: last[spec.order.column] ?? null, id }
+                } else if (spec.key) {
+                    keyCursor = spec.key.map((column) => last[column])
+                }
+            } catch (error) {
+                console.error('[Admin Export] Stream failed:', error)
+                controller.error(error)
+            }
+        },
+    }, { highWaterMark: 1 })
+}
@@ -0,0 +1,263 @@
+/**
+ * Bounded in-process cache
+ *
+ * LRU eviction under entry and approximate-memory limits, per-entry TTL with an
+ * optional stale-while-revalidate window, and single-flight loading so concurrent
+ * misses on one key share a single loader call. delete(), deletePrefix() and clear()
+ * also cancel the write-back of loads already running for those keys, so a value read
+ * before an invalidation is never cached after it. Hit/miss counters are exposed via
+ * stats() for logging or a metrics endpoint.
+ *
+ * State is per server instance; treat it as a latency optimisation, never as the
+ * source of truth.
+ */
+
+export interface CacheOptions {
+    // Maximum number of entries before least-recently-used ones are evicted
+    maxEntries?: number
+    // Approximate memory budget in bytes (see sizeOf)
+    maxBytes?: number
+    // TTL used when set()/getOrLoad() are not given one
+    defaultTtlMs?: number
+    // Estimate an entry's size in bytes; defaults to 2 bytes per JSON character
+    sizeOf?: (value: unknown) => number
+}
+
+export interface LoadOptions {
+    ttlMs?: number
+    // After the TTL, serve the old value for this long while one refresh runs
+    staleMs?: number
+}
+
+export interface CacheStats {
+    hits: number
+    staleHits: number
+    misses: number
+    loads: number
+    loadErrors: number
+    evictions: number
+    entries: number
+    bytes: number
+    hitRate: number
+}
+
+interface CacheEntry {
+    value: unknown
+    size: number
+    expiresAt: number
+    staleUntil: number
+}
+
+function defaultSizeOf(value: unknown): number {
+    try {
+        return (JSON.stringify(value)?.length ?? 0) * 2
+    } catch {
+        return 1024
+    }
+}
+
+export class BoundedCache {
+    private entries = new Map<string, CacheEntry>()
+    private inflight = new Map<string, Promise<unknown>>()
+    private bytes = 0
+    private counters = { hits: 0, staleHits: 0, misses: 0, loads: 0, loadErrors: 0, evictions: 0 }
+
+    private readonly maxEntries: number
+    private readonly maxBytes: number
+    private readonly defaultTtlMs: number
+    private readonly sizeOf: (value: unknown) => number
+
+    constructor(options: CacheOptions = {}) {
+        this.maxEntries = options.maxEntries ?? 1000
+        this.maxBytes = options.maxBytes ?? 32 * 1024 * 1024
+        this.defaultTtlMs = options.defaultTtlMs ?? 5 * 60 * 1000
+        this.sizeOf = options.sizeOf ?? defaultSizeOf
+    }
+
+    /**
+     * Get a fresh value, or null if missing or past its TTL
+     */
+    get<T>(key: string): T | null {
+        const entry = this.entries.get(key)
+        const now = Date.now()
+
+        if (!entry || now > entry.expiresAt) {
+            if (entry && now > entry.staleUntil) {
+                this.remove(key)
+            }
+            this.counters.misses++
+            return null
+        }
+
+        this.touch(key, entry)
+        this.counters.hits++
+        return entry.value as T
+    }
+
+    /**
+     * Set an entry, evicting least-recently-used entries if over a limit
+     */
+    set<T>(key: string, value: T, ttlMs: number = this.defaultTtlMs, staleMs = 0): void {
+        const size = this.sizeOf(value)
+        if (size > this.maxBytes) {
+            // Never worth caching something that would flush everything else
+            this.remove(key)
+            return
+        }
+
+        this.remove(key)
+        const now = Date.now()
+        this.entries.set(key, { value, size, expiresAt: now + ttlMs, staleUntil: now + ttlMs + staleMs })
+        this.bytes += size
+        this.evict()
+    }
+
+    /**
+     * Return the cached value for `key`, loading it with `loader` on a miss.
+     * Concurrent callers for the same key share one loader call. Within the stale
+     * window the old value is returned immediately and refreshed in the background.
+     */
+    async getOrLoad<T>(key: string, loader: () => Promise<T>, options: LoadOptions = {}): Promise<T> {
+        const ttlMs = options.ttlMs ?? this.defaultTtlMs
+        const staleMs = options.staleMs ?? 0
+        const entry = this.entries.get(key)
+        const now = Date.now()
+
+        if (entry && now <= entry.expiresAt) {
+            this.touch(key, entry)
+            this.counters.hits++
+            return entry.value as T
+        }
+
+        if (entry && now <= entry.staleUntil) {
+            this.touch(key, entry)
+            this.counters.staleHits++
+            this.load(key, loader, ttlMs, staleMs).catch(() => {
+                // Already counted; the stale value keeps being served until staleUntil
+            })
+            return entry.value as T
+        }
+
+        this.counters.misses++
+        return this.load(key, loader, ttlMs, staleMs)
+    }
+
+    delete(key: string): void {
+        this.remove(key)
+        this.inflight.delete(key)
+    }
+
+    /**
+     * Delete every entry whose key starts with `prefix`
+     */
+    deletePrefix(prefix: string): void {
+        for (const key of Array.from(this.entries.keys())) {
+            if (key.startsWith(prefix)) {
+                this.remove(key)
+            }
+        }
+        for (const key of Array.from(this.inflight.keys())) {
+            if (key.startsWith(prefix)) {
+                this.inflight.delete(key)
+            }
+        }
+    }
+
+    clear(): void {
+        this.entries.clear()
+        this.inflight.clear()
+        this.bytes = 0
+    }
+
+    /**
+     * Drop entries past their stale window
+     */
+    cleanup(): void {
+        const now = Date.now()
+        for (const [key, entry] of Array.from(this.entries.entries())) {
+            if (now > entry.staleUntil) {
+                this.remove(key)
+            }
+        }
+    }
+
+    stats(): CacheStats {
+        const lookups = this.counters.hits + this.counters.staleHits + this.counters.misses
+        return {
+            ...this.counters,
+            entries: this.entries.size,
+            bytes: this.bytes,
+            hitRate: lookups > 0 ? (this.counters.hits + this.counters.staleHits) / lookups : 0,
+        }
+    }
+
+    resetStats(): void {
+        this.counters = { hits: 0, staleHits: 0, misses: 0, loads: 0, loadErrors: 0, evictions: 0 }
+    }
+
+    private load<T>(key: string, loader: () => Promise<T>, ttlMs: number, staleMs: number): Promise<T> {
+        const pending = this.inflight.get(key)
+        if (pending) {
+            return pending as Promise<T>
+        }
+
+        this.counters.loads++
+        // A load stays current while it is the key's inflight entry; invalidating the
+        // key removes it, and the result then goes to its callers but not the cache
+        const promise: Promise<T> = loader()
+            .then((value) => {
+                if (this.inflight.get(key) === promise) {
+                    this.set(key, value, ttlMs, staleMs)
+                }
+                return value
+            })
+            .catch((error: unknown) => {
+                this.counters.loadErrors++
+                throw error
+            })
+            .finally(() => {
+                if (this.inflight.get(key) === promise) {
+                    this.inflight.delete(key)
+                }
+            })
+
+        this.inflight.set(key, promise)
+        return promise
+    }
+
+    // Map iteration order is insertion order, so re-inserting marks most recent
+    private touch(key: string, entry: CacheEntry): void {
+        this.entries.delete(key)
+        this.entries.set(key, entry)
+    }
+
+    private remove(key: string): void {
+        const entry = this.entries.get(key)
+        if (entry) {
+            this.bytes -= entry.size
+            this.entries.delete(key)
+        }
+    }
+
+    private evict(): void {
+        if (this.entries.size <= this.maxEntries && this.bytes <= this.maxBytes) {
+            return
+        }
+
+        // Expired entries go first, then least recently used
+        this.cleanup()
+        for (const key of this.entries.keys()) {
+            if (this.entries.size <= this.maxEntries && this.bytes <= this.maxBytes) {
+                break
+            }
+            this.remove(key)
+            this.counters.evictions++
+        }
+    }
+}
+
+// Shared server-side instance for page and API loaders
+export const cache = new BoundedCache({
+    maxEntries: 2000,
+    maxBytes: 64 * 1024 * 1024,
+})
@@ -862,6 +862,11 @@ const EMAIL_SKIPPED_TYPES = new Set([
     'general',
 ])
 
+// Whether a notification type sends an email at all
+export function hasEmailTemplate(type: string): boolean {
+    return !EMAIL_SKIPPED_TYPES.has(type)
+}
+
 // Select the appropriate email template for a notification type
 export function getTemplateForNotification(
     name: string,
@@ -873,7 +878,7 @@ export function getTemplateForNotification(
         url?: string
     }
 ): { subject: string; html: string } | null {
-    if (EMAIL_SKIPPED_TYPES.has(payload.type)) {
+    if (!hasEmailTemplate(payload.type)) {
         return null
     }
 
@@ -975,42 +980,103 @@ export async function sendEmail(to: string, template: { subject: string; html: s
     }
 }
 
-// Send the same template to many recipients in one Resend API call instead
-// of one request per recipient — used for role-wide broadcasts (e.g. an
-// admin digest or a notifyRole fan-out) where each recipient's rendered
-// template can still differ.
+// Resend accepts at most 100 emails per batch call
+const BATCH_CHUNK_SIZE = 100
+// Resend's default API rate limit is 2 requests per second per team
+const SEND_RATE_PER_SECOND = Number(process.env.RESEND_RATE_LIMIT_PER_SECOND) || 2
+const MAX_CHUNK_ATTEMPTS = 3
+const CHUNK_RETRY_BASE_MS = 1000
+
+// Token bucket shared by every batch on this instance, so concurrent broadcasts
+// queue behind one another instead of tripping the provider's rate limit
+let sendTokens = SEND_RATE_PER_SECOND
+let tokensRefilledAt = Date.now()
+
+async function acquireSendToken(): Promise<void> {
+    for (;;) {
+        const now = Date.now()
+        sendTokens = Math.min(SEND_RATE_PER_SECOND, sendTokens + ((now - tokensRefilledAt) / 1000) * SEND_RATE_PER_SECOND)
+        tokensRefilledAt = now
+
+        if (sendTokens >= 1) {
+            sendTokens -= 1
+            return
+        }
+
+        const waitMs = Math.ceil(((1 - sendTokens) / SEND_RATE_PER_SECOND) * 1000)
+        await new Promise((resolve) => setTimeout(resolve, waitMs))
+    }
+}
+
+// Validation and auth errors fail the same way on every attempt
+const RETRYABLE_EMAIL_ERRORS = new Set(['rate_limit_exceeded', 'internal_server_error', 'application_error'])
+
+function isRetryableEmailError(error: unknown): boolean {
+    const name = (error as { name?: unknown } | null)?.name
+    return typeof name !== 'string' || RETRYABLE_EMAIL_ERRORS.has(name)
+}
+
+// Send many emails through Resend's batch API: recipients are split into
+// provider-sized chunks, each call waits for a rate-limit token, and only chunks
+// that failed with a transient error are retried. A chunk is accepted or
+// rejected as a whole, so `delivered` (input order) says which messages went out.
+// Used for role-wide broadcasts (e.g. an admin digest or a notifyRole fan-out)
+// where each recipient's rendered template can still differ.
 export async function sendBatchEmails(
     messages: Array<{ to: string; template: { subject: string; html: string } }>
-): Promise<{ success: boolean; sent: number; failed: number; error?: unknown }> {
+): Promise<{ success: boolean; sent: number; failed: number; delivered: boolean[]; error?: unknown }> {
+    const delivered: boolean[] = new Array(messages.length).fill(false)
     if (messages.length === 0) {
-        return { success: true, sent: 0, failed: 0 }
+        return { success: true, sent: 0, failed: 0, delivered }
     }
 
     const resend = getResendClient()
     if (!resend) {
         console.log('Resend API key not configured. Skipping batch email send.')
-        return { success: false, sent: 0, failed: messages.length, error: 'Email not configured' }
+        return { success: false, sent: 0, failed: messages.length, delivered, error: 'Email not configured' }
     }
 
-    try {
-        const { data, error } = await resend.batch.send(
-            messages.map((m) => ({
-                from: SENDER_EMAIL,
-                to: [m.to],
-                subject: m.template.subject,
-                html: m.template.html,
-            }))
-        )
-
-        if (error) {
-            console.error('Failed to send batch emails:', error)
-            return { success: false, sent: 0, failed: messages.length, error }
+    let lastError: unknown
+
+    for (let start = 0; start < messages.length; start += BATCH_CHUNK_SIZE) {
+        const chunk = messages.slice(start, start + BATCH_CHUNK_SIZE)
+
+        for (let attempt = 1; attempt <= MAX_CHUNK_ATTEMPTS; attempt++) {
+            await acquireSendToken()
+
+            let error: unknown
+            try {
+                const response = await resend.batch.send(
+                    chunk.map((m) => ({
+                        from: SENDER_EMAIL,
+                        to: [m.to],
+                        subject: m.template.subject,
+                        html: m.template.html,
+                    }))
+                )
+                error = response.error
+            } catch (thrown) {
+                error = thrown
+            }
+
+            if (!error) {
+                delivered.fill(true, start, start + chunk.length)
+                break
+            }
+
+            lastError = error
+            if (attempt === MAX_CHUNK_ATTEMPTS || !isRetryableEmailError(error)) {
+                console.error(`Failed to send batch emails ${start}-${start + chunk.length - 1}:`, error)
+                break
+            }
+
+            await new Promise((resolve) => setTimeout(resolve, CHUNK_RETRY_BASE_MS * 2 ** (attempt - 1)))
         }
-
-        const sent = data?.data?.length ?? 0
-        return { success: true, sent, failed: messages.length - sent }
-    } catch (error) {
-        console.error('Failed to send batch emails:', error)
-        return { success: false, sent: 0, failed: messages.length, error }
     }
+
+    const sent = delivered.filter(Boolean).length
+    const failed = messages.length - sent
+    return failed === 0
+        ? { success: true, sent, failed, delivered }
+        : { success: false, sent, failed, delivered, error: lastError }
 }
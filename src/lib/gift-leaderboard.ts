@@ -0,0 +1,109 @@
+/**
+ * Gift Leaderboard
+ *
+ * Top gift senders per talent, read from the gift_leaderboard RPC (backed by the
+ * trigger-maintained gift_sender_* aggregates) and held in a short-TTL cache so a
+ * popular profile costs one small query per window per TTL. Only the talent's own
+ * view reads the cached board; anyone else gets just their entry.
+ */
+import type { SupabaseClient } from '@supabase/supabase-js'
+import { cache } from '@/lib/cache'
+import { createApiClient } from '@/lib/supabase/api'
+
+export type LeaderboardRange = 'week' | 'month' | 'all'
+
+export const LEADERBOARD_RANGES: readonly LeaderboardRange[] = ['week', 'month', 'all']
+
+export const LEADERBOARD_SIZE = 10
+
+// Rankings may lag a new gift by at most this long on other instances
+export const LEADERBOARD_TTL_MS = 30 * 1000
+
+export interface TopGifter {
+    sender_id: string
+    total_amount: number
+    gift_count: number
+    sender: {
+        id: string
+        display_name: string | null
+        avatar_url: string | null
+        username: string | null
+    } | null
+}
+
+interface LeaderboardRow {
+    sender_id: string
+    total_amount: number
+    gift_count: number
+    display_name: string | null
+    avatar_url: string | null
+    username: string | null
+}
+
+function cacheKey(recipientId: string, range: LeaderboardRange): string {
+    return `gift-leaderboard:${recipientId}:${range}`
+}
+
+function toTopGifter(row: LeaderboardRow): TopGifter {
+    return {
+        sender_id: row.sender_id,
+        total_amount: Number(row.total_amount),
+        gift_count: Number(row.gift_count),
+        sender: {
+            id: row.sender_id,
+            display_name: row.display_name,
+            avatar_url: row.avatar_url,
+            username: row.username,
+        },
+    }
+}
+
+export function isLeaderboardRange(value: unknown): value is LeaderboardRange {
+    return typeof value === 'string' && (LEADERBOARD_RANGES as readonly string[]).includes(value)
+}
+
+export async function getGiftLeaderboard(recipientId: string, range: LeaderboardRange): Promise<TopGifter[]> {
+    return cache.getOrLoad<TopGifter[]>(cacheKey(recipientId, range), async () => {
+        const supabase = createApiClient()
+        const { data, error } = await supabase.rpc('gift_leaderboard', {
+            p_recipient_id: recipientId,
+            p_window: range,
+            p_limit: LEADERBOARD_SIZE,
+        })
+
+        if (error) {
+            throw error
+        }
+
+        return ((data ?? []) as LeaderboardRow[]).map(toTopGifter)
+    }, { ttlMs: LEADERBOARD_TTL_MS, staleMs: LEADERBOARD_TTL_MS })
+}
+
+/**
+ * The signed-in viewer's own entry on a talent's board, read with their session
+ * client so gift_leaderboard() returns only their row. Not cached.
+ */
+export async function getOwnGiftLeaderboardEntry(
+    supabase: SupabaseClient,
+    recipientId: string,
+    range: LeaderboardRange
+): Promise<TopGifter[]> {
+    const { data, error } = await supabase.rpc('gift_leaderboard', {
+        p_recipient_id: recipientId,
+        p_window: range,
+        p_limit: LEADERBOARD_SIZE,
+    })
+
+    if (error) {
+        throw error
+    }
+
+    return ((data ?? []) as LeaderboardRow[]).map(toTopGifter)
+}
+
+/**
+ * Drop this instance's cached rankings for a recipient, e.g. right after a gift.
+ */
+export function invalidateGiftLeaderboard(recipientId: string): void {
+    cache.deletePrefix(`gift-leaderboard:${recipientId}:`)
+}
@@ -1,6 +1,8 @@
-import { getTemplateForNotification, sendBatchEmails, sendEmail } from '@/lib/email'
-import { sendPushNotification } from '@/lib/push/send-push'
+import { after } from 'next/server'
+import { getTemplateForNotification, hasEmailTemplate, sendBatchEmails, sendEmail } from '@/lib/email'
+import { deliverPushBatch } from '@/lib/push/delivery'
 import { createApiClient } from '@/lib/supabase/api'
+import { mapWithConcurrency } from '@/lib/utils/concurrency'
 import type { NotificationType, UserRole } from '@/types/database'
 
 type JsonPayload = Record<string, unknown>
@@ -44,6 +46,13 @@ interface NotificationPreferences {
     chat_enabled: boolean
 }
 
+// Upper bounds on simultaneous outbound calls per delivery pass.
+const PUSH_CONCURRENCY = 16
+const EMAIL_LOOKUP_CONCURRENCY = 8
+
+// Largest number of queued notifications delivered in one pass.
+const MAX_QUEUE_BATCH = 200
+
 const DEFAULT_PREFERENCES: NotificationPreferences = {
     in_app_enabled: true,
     push_enabled: true,
@@ -94,253 +103,305 @@ function dedupeIds(ids: string[] = []): string[] {
     return [...new Set(ids.filter(Boolean))]
 }
 
-async function resolveRoleTargets(roles: UserRole[]): Promise<string[]> {
+function emptyResult(): NotificationResult {
+    return {
+        success: true,
+        inserted: 0,
+        pushed: 0,
+        failedPushes: 0,
+        emailed: 0,
+        failedEmails: 0,
+        notifications: [],
+    }
+}
+
+async function resolveRoleTargets(roles: UserRole[]): Promise<Map<UserRole, string[]>> {
+    const byRole = new Map<UserRole, string[]>()
     if (roles.length === 0) {
-        return []
+        return byRole
     }
 
     const supabase = createApiClient()
     const { data, error } = await supabase
         .from('profiles')
-        .select('id')
+        .select('id, role')
         .in('role', roles)
 
     if (error) {
         throw error
     }
 
-    return (data || []).map((row) => row.id as string)
+    for (const row of data || []) {
+        const role = row.role as UserRole
+        byRole.set(role, [...(byRole.get(role) || []), row.id as string])
+    }
+
+    return byRole
 }
 
-async function sendPushToUsers(userIds: string[], payload: NotificationContent): Promise<{ pushed: number; failedPushes: number }> {
-    if (userIds.length === 0) {
-        return { pushed: 0, failedPushes: 0 }
+// One notification and the recipients it should reach on each channel.
+interface DeliveryPlan {
+    content: NotificationContent
+    inApp: string[]
+    push: string[]
+    email: string[]
+}
+
+async function sendPushForPlans(plans: DeliveryPlan[], results: NotificationResult[]): Promise<void> {
+    const pushUsers = dedupeIds(plans.flatMap((plan) => plan.push))
+    if (pushUsers.length === 0) {
+        return
     }
 
     const supabase = createApiClient()
     const { data: subscriptions, error: subError } = await supabase
         .from('push_subscriptions')
         .select('user_id, endpoint, p256dh_key, auth_key')
-        .in('user_id', userIds)
+        .in('user_id', pushUsers)
 
     if (subError || !subscriptions || subscriptions.length === 0) {
-        return { pushed: 0, failedPushes: 0 }
+        return
     }
 
-    let pushed = 0
-    let failedPushes = 0
-    const expiredEndpoints: string[] = []
-
-    const results = await Promise.allSettled(
-        subscriptions.map(async (sub) => {
-            await sendPushNotification(
-                {
-                    endpoint: sub.endpoint as string,
-                    keys: {
-                        p256dh: sub.p256dh_key as string,
-                        auth: sub.auth_key as string,
-                    },
-                },
-                {
-                    title: payload.title,
-                    body: payload.message,
-                    tag: `notification-${payload.type}`,
-                    data: payload.data || {},
-                    url: payload.url || '/dashboard/notifications',
-                }
-            )
-        })
+    const subscriptionsByUser = new Map<string, typeof subscriptions>()
+    for (const sub of subscriptions) {
+        const userId = sub.user_id as string
+        subscriptionsByUser.set(userId, [...(subscriptionsByUser.get(userId) || []), sub])
+    }
+
+    const jobs = plans.flatMap((plan, planIndex) =>
+        plan.push.flatMap((userId) =>
+            (subscriptionsByUser.get(userId) || []).map((sub) => ({ planIndex, sub, content: plan.content }))
+        )
     )
 
-    results.forEach((result, index) => {
-        if (result.status === 'fulfilled') {
-            pushed += 1
-            return
-        }
+    const report = await deliverPushBatch(
+        jobs.map(({ sub, content }) => ({
+            subscription: {
+                endpoint: sub.endpoint as string,
+                keys: {
+                    p256dh: sub.p256dh_key as string,
+                    auth: sub.auth_key as string,
+                },
+            },
+            payload: {
+                title: content.title,
+                body: content.message,
+                tag: `notification-${content.type}`,
+                data: content.data || {},
+                url: content.url || '/dashboard/notifications',
+            },
+        })),
+        { concurrency: PUSH_CONCURRENCY }
+    )
 
-        failedPushes += 1
-        const reason = result.reason
-        if (reason instanceof Error && (reason.message.includes('expired') || reason.message.includes('Invalid'))) {
-            expiredEndpoints.push(subscriptions[index]!.endpoint as string)
+    report.results.forEach((result, index) => {
+        const planResult = results[jobs[index]!.planIndex]!
+        if (result.ok) {
+            planResult.pushed += 1
+        } else {
+            planResult.failedPushes += 1
         }
     })
 
-    if (expiredEndpoints.length > 0) {
+    if (jobs.length >= PUSH_CONCURRENCY) {
+        console.log(
+            `[Notifications] Push batch: ${report.sent}/${jobs.length} sent in ${report.durationMs}ms ` +
+            `(${report.throughput}/s, ${report.retries} retries, ${report.expiredEndpoints.length} expired)`
+        )
+    }
+
+    if (report.expiredEndpoints.length > 0) {
         await supabase
             .from('push_subscriptions')
             .delete()
-            .in('endpoint', expiredEndpoints)
+            .in('endpoint', report.expiredEndpoints)
     }
-
-    return { pushed, failedPushes }
 }
 
-async function sendEmailToUsers(userIds: string[], payload: NotificationContent): Promise<{ emailed: number; failedEmails: number }> {
-    if (userIds.length === 0) {
-        return { emailed: 0, failedEmails: 0 }
+async function sendEmailForPlans(allPlans: DeliveryPlan[], results: NotificationResult[]): Promise<void> {
+    // Types without an email template skip the profile and auth lookups entirely
+    const plans = allPlans.map((plan) => hasEmailTemplate(plan.content.type) ? plan : { ...plan, email: [] })
+    const emailUsers = dedupeIds(plans.flatMap((plan) => plan.email))
+    if (emailUsers.length === 0) {
+        return
     }
 
     const supabase = createApiClient()
     const { data: profiles } = await supabase
         .from('profiles')
         .select('id, display_name, full_name')
-        .in('id', userIds)
+        .in('id', emailUsers)
 
     const profileById = new Map<string, { display_name?: string | null; full_name?: string | null }>(
         (profiles || []).map((row) => [row.id as string, row as { display_name?: string | null; full_name?: string | null }])
     )
 
-    const resolved = await Promise.all(
-        userIds.map(async (userId) => {
+    // Auth emails are looked up once per user per pass, however many notifications they get.
+    const lookups = await mapWithConcurrency(emailUsers, EMAIL_LOOKUP_CONCURRENCY, async (userId) => {
+        const userResponse = await supabase.auth.admin.getUserById(userId)
+        return userResponse.data.user?.email || null
+    })
+    const emailByUser = new Map<string, string>()
+    lookups.forEach((lookup, index) => {
+        if (lookup.status === 'fulfilled' && lookup.value) {
+            emailByUser.set(emailUsers[index]!, lookup.value)
+        }
+    })
+
+    const messages: Array<{ planIndex: number; email: string; template: { subject: string; html: string } }> = []
+    plans.forEach((plan, planIndex) => {
+        // A template depends only on the notification and the greeting name, so a
+        // broadcast renders it once per distinct name rather than once per recipient
+        const templatesByName = new Map<string, ReturnType<typeof getTemplateForNotification>>()
+        for (const userId of plan.email) {
+            const email = emailByUser.get(userId)
+            if (!email) {
+                continue
+            }
             const profile = profileById.get(userId)
             const name = profile?.display_name || profile?.full_name || 'there'
-            const template = getTemplateForNotification(name, {
-                type: payload.type,
-                title: payload.title,
-                message: payload.message,
-                data: payload.data,
-                url: payload.url,
-            })
-            if (!template) {
-                return null
+            let template = templatesByName.get(name)
+            if (template === undefined) {
+                template = getTemplateForNotification(name, plan.content)
+                templatesByName.set(name, template)
             }
-
-            const userResponse = await supabase.auth.admin.getUserById(userId)
-            const email = userResponse.data.user?.email
-            if (!email) {
-                return null
+            if (template) {
+                messages.push({ planIndex, email, template })
             }
+        }
+    })
 
-            return { email, template }
-        })
-    )
-
-    const messages = resolved.filter((m): m is { email: string; template: { subject: string; html: string } } => m !== null)
     if (messages.length === 0) {
-        return { emailed: 0, failedEmails: 0 }
+        return
     }
 
     // A single recipient just sends directly; multiple recipients batch into
     // one Resend API call instead of one request per user.
     if (messages.length === 1) {
-        const result = await sendEmail(messages[0]!.email, messages[0]!.template)
+        const message = messages[0]!
+        const result = await sendEmail(message.email, message.template)
         if (!result.success) {
             console.error('[Notifications] Email send failed:', result.error)
-            return { emailed: 0, failedEmails: 1 }
+            results[message.planIndex]!.failedEmails += 1
+        } else {
+            results[message.planIndex]!.emailed += 1
         }
-        return { emailed: 1, failedEmails: 0 }
+        return
     }
 
     const batchResult = await sendBatchEmails(messages.map((m) => ({ to: m.email, template: m.template })))
     if (!batchResult.success) {
         console.error('[Notifications] Batch email send failed:', batchResult.error)
     }
-    return { emailed: batchResult.sent, failedEmails: batchResult.failed }
+    messages.forEach((message, index) => {
+        if (batchResult.delivered[index]) {
+            results[message.planIndex]!.emailed += 1
+        } else {
+            results[message.planIndex]!.failedEmails += 1
+        }
+    })
 }
 
-export async function notifyTargets(params: NotifyTargetsParams): Promise<NotificationResult> {
+/**
+ * Delivers many notifications in one pass: one role lookup, one preference
+ * lookup and one `notifications` insert for the whole batch, then push and
+ * email with bounded concurrency. Results are returned in input order.
+ */
+async function deliverNotifications(batch: NotifyTargetsParams[]): Promise<NotificationResult[]> {
+    const results = batch.map(() => emptyResult())
+
     try {
-        const { userIds = [], roles = [], type, title, message, data = {}, url } = params
-        const roleUsers = await resolveRoleTargets(roles)
-        const recipients = dedupeIds([...userIds, ...roleUsers])
+        const usersByRole = await resolveRoleTargets(dedupeIds(batch.flatMap((params) => params.roles || [])) as UserRole[])
 
-        if (recipients.length === 0) {
-            return {
-                success: true,
-                inserted: 0,
-                pushed: 0,
-                failedPushes: 0,
-                emailed: 0,
-                failedEmails: 0,
-                notifications: [],
-            }
+        const targets = batch.map((params) => dedupeIds([
+            ...(params.userIds || []),
+            ...(params.roles || []).flatMap((role) => usersByRole.get(role) || []),
+        ]))
+
+        const everyone = dedupeIds(targets.flat())
+        if (everyone.length === 0) {
+            return results
         }
 
         const supabase = createApiClient()
-        const preferences = await getPreferencesByUser(recipients)
-        const chatGated = isChatNotification(type)
-
-        const isEligible = (userId: string, channel: keyof NotificationPreferences) => {
-            const prefs = resolvePreferences(preferences, userId)
-            return prefs[channel] && (!chatGated || prefs.chat_enabled)
-        }
+        const preferences = await getPreferencesByUser(everyone)
+
+        let plans: DeliveryPlan[] = batch.map((params, index) => {
+            const { type, title, message, data = {}, url } = params
+            const chatGated = isChatNotification(type)
+            const isEligible = (userId: string, channel: keyof NotificationPreferences) => {
+                const prefs = resolvePreferences(preferences, userId)
+                return prefs[channel] && (!chatGated || prefs.chat_enabled)
+            }
+            const recipients = targets[index]!
 
-        const inAppRecipients = recipients.filter((id) => isEligible(id, 'in_app_enabled'))
-        const pushRecipients = recipients.filter((id) => isEligible(id, 'push_enabled'))
-        const emailRecipients = recipients.filter((id) => isEligible(id, 'email_enabled'))
+            return {
+                content: { type, title, message, data, url },
+                inApp: recipients.filter((id) => isEligible(id, 'in_app_enabled')),
+                push: recipients.filter((id) => isEligible(id, 'push_enabled')),
+                email: recipients.filter((id) => isEligible(id, 'email_enabled')),
+            }
+        })
 
-        let insertedRows: Array<{ id: string; user_id: string }> = []
-        if (inAppRecipients.length > 0) {
-            const notificationRows = inAppRecipients.map((targetUserId) => ({
+        const notificationRows = plans.flatMap((plan) =>
+            plan.inApp.map((targetUserId) => ({
                 user_id: targetUserId,
-                type,
-                title,
-                message,
-                data: { ...data, url },
+                type: plan.content.type,
+                title: plan.content.title,
+                message: plan.content.message,
+                data: { ...plan.content.data, url: plan.content.url },
                 is_read: false,
             }))
+        )
 
+        if (notificationRows.length > 0) {
             const { data: rows, error: insertError } = await supabase
                 .from('notifications')
                 .insert(notificationRows)
                 .select('id, user_id')
 
             if (insertError) {
-                return {
-                    success: false,
-                    inserted: 0,
-                    pushed: 0,
-                    failedPushes: 0,
-                    emailed: 0,
-                    failedEmails: 0,
-                    notifications: [],
-                    error: insertError,
-                }
+                // Same contract as a single notifyTargets call: a failed in-app
+                // insert fails the notification and skips its push/email.
+                plans.forEach((plan, index) => {
+                    if (plan.inApp.length > 0) {
+                        results[index] = { ...emptyResult(), success: false, error: insertError }
+                    }
+                })
+                plans = plans.map((plan, index) => results[index]!.success ? plan : { ...plan, push: [], email: [] })
+            } else {
+                // Returned rows follow insert order, so slice them back per notification.
+                const inserted = (rows || []) as Array<{ id: string; user_id: string }>
+                let offset = 0
+                plans.forEach((plan, index) => {
+                    const slice = inserted.slice(offset, offset + plan.inApp.length)
+                    offset += plan.inApp.length
+                    results[index]!.inserted = slice.length
+                    results[index]!.notifications = slice
+                })
             }
-
-            insertedRows = (rows || []) as Array<{ id: string; user_id: string }>
         }
 
-        const { pushed, failedPushes } = await sendPushToUsers(pushRecipients, {
-            type,
-            title,
-            message,
-            data,
-            url,
-        })
-
         // Email is best-effort; failures should not fail in-app or push delivery.
-        const { emailed, failedEmails } = await sendEmailToUsers(emailRecipients, {
-            type,
-            title,
-            message,
-            data,
-            url,
-        })
-
-        return {
-            success: true,
-            inserted: insertedRows?.length || 0,
-            pushed,
-            failedPushes,
-            emailed,
-            failedEmails,
-            notifications: (insertedRows || []) as Array<{ id: string; user_id: string }>,
-        }
+        await Promise.all([
+            sendPushForPlans(plans, results),
+            sendEmailForPlans(plans, results).catch((error) => {
+                console.error('[Notifications] Email delivery failed:', error)
+            }),
+        ])
+
+        return results
     } catch (error) {
-        return {
-            success: false,
-            inserted: 0,
-            pushed: 0,
-            failedPushes: 0,
-            emailed: 0,
-            failedEmails: 0,
-            notifications: [],
-            error,
-        }
+        return batch.map(() => ({ ...emptyResult(), success: false, error }))
     }
 }
 
+export async function notifyTargets(params: NotifyTargetsParams): Promise<NotificationResult> {
+    const [result] = await deliverNotifications([params])
+    return result!
+}
+
 export async function notifyUser(params: NotifyUserParams): Promise<NotificationResult> {
     const { userId, ...content } = params
     return notifyTargets({ ...content, userIds: [userId] })
@@ -351,7 +412,79 @@ export async function notifyRole(params: NotifyRoleParams): Promise<Notification
     return notifyTargets({ ...content, roles: [role] })
 }
 
+/**
+ * Awaited bulk delivery for jobs (cron, admin broadcasts) that produce many
+ * differently-worded notifications at once.
+ */
+export async function notifyBatch(batch: NotifyTargetsParams[]): Promise<NotificationResult[]> {
+    const results: NotificationResult[] = []
+    for (let start = 0; start < batch.length; start += MAX_QUEUE_BATCH) {
+        results.push(...await deliverNotifications(batch.slice(start, start + MAX_QUEUE_BATCH)))
+    }
+    return results
+}
+
 // Backward-compatible alias for existing call sites.
 export async function createNotification(params: NotifyUserParams): Promise<NotificationResult> {
     return notifyUser(params)
 }
+
+// ---------------------------------------------------------------------------
+// Queued fan-out
+//
+// Request handlers that only need "eventually notified" semantics enqueue
+// instead of awaiting delivery. The queue is drained after the response is
+// sent (Next.js `after`), and every notification queued by concurrent requests
+// on this instance is coalesced into one deliverNotifications pass.
+// ---------------------------------------------------------------------------
+
+const notificationQueue: NotifyTargetsParams[] = []
+let activeFlush: Promise<void> | null = null
+
+/**
+ * Delivers everything currently queued. Safe to call concurrently; callers
+ * share the in-flight pass and any stragglers are picked up by a follow-up pass.
+ */
+export function flushNotificationQueue(): Promise<void> {
+    if (activeFlush) {
+        return activeFlush
+    }
+
+    activeFlush = (async () => {
+        while (notificationQueue.length > 0) {
+            const batch = notificationQueue.splice(0, MAX_QUEUE_BATCH)
+            const results = await deliverNotifications(batch)
+            results.forEach((result, index) => {
+                if (!result.success) {
+                    console.error('[Notifications] Queued delivery failed:', batch[index]!.type, result.error)
+                }
+            })
+        }
+    })().finally(() => {
+        activeFlush = null
+    })
+
+    return activeFlush
+}
+
+function scheduleFlush() {
+    try {
+        after(flushNotificationQueue)
+    } catch {
+        // Outside a request scope (scripts, background jobs) there is no
+        // response to wait for; drain on the next tick instead.
+        setTimeout(() => {
+            void flushNotificationQueue()
+        }, 0)
+    }
+}
+
+export function queueNotifyTargets(params: NotifyTargetsParams): void {
+    notificationQueue.push(params)
+    scheduleFlush()
+}
+
+export function queueNotifyUser(params: NotifyUserParams): void {
+    const { userId, ...content } = params
+    queueNotifyTargets({ ...content, userIds: [userId] })
+}
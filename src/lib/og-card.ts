@@ -0,0 +1,37 @@
+/**
+ * Talent share card versioning
+ *
+ * The fields drawn on a talent's OG card are hashed into a short version string.
+ * Page metadata puts it in the card URL (?v=...), so each distinct card has its own
+ * immutable URL: crawlers and CDNs can cache it forever, and an edit produces a new
+ * URL instead of a stale image. The card route uses the same hash for its ETag.
+ */
+
+// Bump when the card layout changes so every cached card is re-rendered
+export const TALENT_CARD_LAYOUT_VERSION = 1
+
+export interface TalentCardFields {
+    display_name: string | null
+    avatar_url: string | null
+    bio: string | null
+}
+
+// 32-bit FNV-1a; two seeds give a 64-bit hex digest, plenty for cache busting
+function fnv1a(input: string, seed: number): string {
+    let hash = seed
+    for (let i = 0; i < input.length; i++) {
+        hash ^= input.charCodeAt(i)
+        hash = Math.imul(hash, 0x01000193)
+    }
+    return (hash >>> 0).toString(16).padStart(8, '0')
+}
+
+export function talentCardHash(fields: TalentCardFields): string {
+    const source = JSON.stringify([
+        TALENT_CARD_LAYOUT_VERSION,
+        fields.display_name ?? '',
+        fields.avatar_url ?? '',
+        fields.bio ?? '',
+    ])
+    return fnv1a(source, 0x811c9dc5) + fnv1a(source, 0x01000193)
+}
@@ -1,4 +1,5 @@
 import { Metadata } from 'next'
+import { talentCardHash, type TalentCardFields } from '@/lib/og-card'
 
 const APP_URL = process.env.NEXT_PUBLIC_APP_URL || 'https://negoempire.live'
 const SITE_NAME = 'Nego'
@@ -80,18 +81,26 @@ export function generateOpenGraphMetadata(options: OpenGraphMetadataOptions): Me
 
 /**
  * Generates Open Graph metadata for talent profiles
+ *
+ * Pass the card fields when they are already loaded: the image URL then carries
+ * their hash and is served as an immutable, long-cached asset.
  */
 export function generateTalentOpenGraphMetadata(
     talentName: string,
     _talentImage?: string | null,
     username?: string | null,
-    talentId?: string | null
+    talentId?: string | null,
+    cardFields?: TalentCardFields | null
 ): Metadata {
     const talentUrl = username ? `${APP_URL}/t/${username}` : undefined
 
     // Generate dynamic talent OG image URL
     const ogParams = new URLSearchParams()
-    if (username) {
+    if (talentId && cardFields) {
+        // Keyed on the stable id so a username change does not orphan the cached card
+        ogParams.set('id', talentId)
+        ogParams.set('v', talentCardHash(cardFields))
+    } else if (username) {
         ogParams.set('username', username)
     } else if (talentId) {
         ogParams.set('id', talentId)
@@ -0,0 +1,118 @@
+import { mapWithConcurrency } from '@/lib/utils/concurrency'
+import {
+    PushSendError,
+    sendPushNotification,
+    type PushNotificationPayload,
+    type PushSubscription,
+} from './send-push'
+
+/**
+ * Push delivery engine
+ *
+ * Delivers a batch of (subscription, payload) pairs with a bounded number of
+ * requests in flight, over the per-push-service keep-alive agents in send-push.ts.
+ * 429 and 5xx responses are retried with exponential backoff (or the push
+ * service's Retry-After); 404/410 mark the subscription expired for the caller
+ * to delete. Anything else fails the delivery without a retry.
+ */
+
+export interface PushDelivery {
+    subscription: PushSubscription
+    payload: PushNotificationPayload
+}
+
+export interface PushDeliveryOptions {
+    concurrency?: number
+    maxAttempts?: number
+}
+
+export interface PushDeliveryReport {
+    // Per delivery, in input order
+    results: Array<{ ok: boolean; expired: boolean; attempts: number; statusCode: number | null }>
+    sent: number
+    failed: number
+    retries: number
+    // Endpoints that answered 404/410, deduplicated
+    expiredEndpoints: string[]
+    durationMs: number
+    // Successful deliveries per second over the whole batch
+    throughput: number
+}
+
+const DEFAULT_PUSH_CONCURRENCY = 16
+const DEFAULT_MAX_ATTEMPTS = 3
+const BASE_BACKOFF_MS = 500
+// A Retry-After longer than this fails the delivery rather than holding a lane
+const MAX_BACKOFF_MS = 10_000
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms))
+
+function backoffDelay(error: PushSendError, attempt: number): number {
+    if (error.retryAfterMs !== null) {
+        return error.retryAfterMs
+    }
+    // Full jitter keeps retries from a broadcast from landing together
+    return Math.random() * BASE_BACKOFF_MS * 2 ** (attempt - 1)
+}
+
+export async function deliverPushBatch(
+    deliveries: PushDelivery[],
+    options: PushDeliveryOptions = {}
+): Promise<PushDeliveryReport> {
+    const maxAttempts = Math.max(1, options.maxAttempts ?? DEFAULT_MAX_ATTEMPTS)
+    const startedAt = Date.now()
+    let retries = 0
+
+    // The worker never throws: each delivery resolves to its own outcome
+    const settled = await mapWithConcurrency(
+        deliveries,
+        options.concurrency ?? DEFAULT_PUSH_CONCURRENCY,
+        async ({ subscription, payload }) => {
+            for (let attempt = 1; ; attempt++) {
+                try {
+                    await sendPushNotification(subscription, payload)
+                    return { ok: true, expired: false, attempts: attempt, statusCode: null }
+                } catch (error) {
+                    const pushError = error instanceof PushSendError ? error : null
+                    const delay = pushError ? backoffDelay(pushError, attempt) : 0
+
+                    if (!pushError?.retryable || attempt >= maxAttempts || delay > MAX_BACKOFF_MS) {
+                        return {
+                            ok: false,
+                            expired: pushError?.expired ?? false,
+                            attempts: attempt,
+                            statusCode: pushError?.statusCode ?? null,
+                        }
+                    }
+
+                    retries++
+                    await sleep(delay)
+                }
+            }
+        }
+    )
+
+    const expiredEndpoints = new Set<string>()
+    const results: PushDeliveryReport['results'] = settled.map((result, index) => {
+        const outcome = result.status === 'fulfilled'
+            ? result.value
+            : { ok: false, expired: false, attempts: 1, statusCode: null }
+        if (outcome.expired) {
+            expiredEndpoints.add(deliveries[index]!.subscription.endpoint)
+        }
+        return outcome
+    })
+
+    const sent = results.filter((result) => result.ok).length
+    const durationMs = Date.now() - startedAt
+
+    return {
+        results,
+        sent,
+        failed: results.length - sent,
+        retries,
+        expiredEndpoints: [...expiredEndpoints],
+        durationMs,
+        throughput: durationMs > 0 ? Math.round((sent / durationMs) * 1000 * 10) / 10 : sent,
+    }
+}
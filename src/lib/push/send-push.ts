@@ -20,39 +20,111 @@ export interface PushSubscription {
     }
 }
 
-// Initialize web-push lazily (server-side only)
-let webpushInitialized = false
+// Push services close idle sockets after a minute or so; keep ours slightly shorter
+const AGENT_KEEP_ALIVE_MS = 30_000
+// Sockets per push service origin; delivery concurrency is bounded separately
+const AGENT_MAX_SOCKETS = 32
+const PUSH_REQUEST_TIMEOUT_MS = 10_000
 
-async function initializeWebPush() {
+/**
+ * A push service rejected the notification. `statusCode` is the HTTP status the
+ * push service returned (null for network errors and timeouts).
+ */
+export class PushSendError extends Error {
+    readonly statusCode: number | null
+    readonly retryAfterMs: number | null
+
+    constructor(message: string, statusCode: number | null, retryAfterMs: number | null = null) {
+        super(message)
+        this.name = 'PushSendError'
+        this.statusCode = statusCode
+        this.retryAfterMs = retryAfterMs
+    }
+
+    // 404/410: the subscription no longer exists and should be deleted
+    get expired(): boolean {
+        return this.statusCode === 404 || this.statusCode === 410
+    }
+
+    // Rate limited, a server error or no response at all
+    get retryable(): boolean {
+        return this.statusCode === null || this.statusCode === 429 || this.statusCode >= 500
+    }
+}
+
+type WebPushModule = (typeof import('web-push'))['default']
+type HttpsAgent = import('https').Agent
+type HttpsAgentClass = typeof import('https').Agent
+
+// Loaded once per server instance (server-side only); VAPID details are set on load
+let webPushModules: Promise<{ webpush: WebPushModule; Agent: HttpsAgentClass }> | null = null
+
+function loadWebPush() {
     if (typeof window !== 'undefined') {
         throw new Error('web-push can only be used server-side')
     }
 
-    if (webpushInitialized) {
-        return
+    if (!webPushModules) {
+        webPushModules = Promise.all([import('web-push'), import('https')]).then(([webpushImport, httpsImport]) => {
+            const webpush = webpushImport.default
+            const vapidPrivateKey = getVapidPrivateKey()
+            const vapidPublicKey = process.env.NEXT_PUBLIC_VAPID_PUBLIC_KEY
+
+            if (vapidPrivateKey && vapidPublicKey) {
+                webpush.setVapidDetails(
+                    `mailto:${process.env.VAPID_EMAIL || 'notifications@negoempire.live'}`,
+                    vapidPublicKey,
+                    vapidPrivateKey
+                )
+            }
+
+            return { webpush, Agent: httpsImport.Agent }
+        })
+        webPushModules.catch((error) => {
+            console.warn('[Push] Failed to initialize web-push:', error)
+            webPushModules = null
+        })
     }
 
-    try {
-        const webpush = await import('web-push')
-        const vapidPrivateKey = getVapidPrivateKey()
-        const vapidPublicKey = process.env.NEXT_PUBLIC_VAPID_PUBLIC_KEY
-
-        if (vapidPrivateKey && vapidPublicKey) {
-            webpush.default.setVapidDetails(
-                `mailto:${process.env.VAPID_EMAIL || 'notifications@negoempire.live'}`,
-                vapidPublicKey,
-                vapidPrivateKey
-            )
-            webpushInitialized = true
-        }
-    } catch (error) {
-        console.warn('[Push] Failed to initialize web-push:', error)
-        throw error
+    return webPushModules
+}
+
+// One keep-alive agent per push service (FCM, Mozilla, Apple, ...), so a broadcast
+// reuses a handful of TLS connections instead of opening one per subscription
+const agentsByOrigin = new Map<string, HttpsAgent>()
+
+function agentFor(Agent: HttpsAgentClass, endpoint: string): HttpsAgent {
+    const origin = new URL(endpoint).origin
+    let agent = agentsByOrigin.get(origin)
+    if (!agent) {
+        agent = new Agent({
+            keepAlive: true,
+            keepAliveMsecs: AGENT_KEEP_ALIVE_MS,
+            maxSockets: AGENT_MAX_SOCKETS,
+        })
+        agentsByOrigin.set(origin, agent)
+    }
+    return agent
+}
+
+function parseRetryAfter(headers: Record<string, string> | undefined): number | null {
+    const raw = headers?.['retry-after']
+    if (!raw) {
+        return null
     }
+
+    const seconds = Number(raw)
+    if (Number.isFinite(seconds)) {
+        return Math.max(0, seconds * 1000)
+    }
+
+    const date = Date.parse(raw)
+    return Number.isNaN(date) ? null : Math.max(0, date - Date.now())
 }
 
 /**
- * Send a push notification to a subscription
+ * Send a push notification to a subscription. Rejects with a PushSendError
+ * carrying the push service's status code.
  */
 export async function sendPushNotification(
     subscription: PushSubscription,
@@ -62,47 +134,45 @@ export async function sendPushNotification(
         throw new Error('sendPushNotification can only be used server-side')
     }
 
-    try {
-        await initializeWebPush()
-        const webpush = await import('web-push')
-
-        const notificationPayload = JSON.stringify({
-            title: payload.title,
-            body: payload.body,
-            icon: payload.icon || '/icon.svg',
-            badge: payload.badge || '/badge.svg',
-            tag: payload.tag || 'nego-notification',
-            data: {
-                ...payload.data,
-                url: payload.url || '/dashboard/notifications',
-            },
-            actions: payload.actions || [
-                { action: 'open', title: 'Open', icon: '/icon.svg' },
-                { action: 'close', title: 'Close' },
-            ],
-        })
+    const { webpush, Agent } = await loadWebPush()
 
-        const webPushSubscription: WebPushSubscription = {
-            endpoint: subscription.endpoint,
-            keys: {
-                p256dh: subscription.keys.p256dh,
-                auth: subscription.keys.auth,
-            },
-        }
+    const notificationPayload = JSON.stringify({
+        title: payload.title,
+        body: payload.body,
+        icon: payload.icon || '/icon.svg',
+        badge: payload.badge || '/badge.svg',
+        tag: payload.tag || 'nego-notification',
+        data: {
+            ...payload.data,
+            url: payload.url || '/dashboard/notifications',
+        },
+        actions: payload.actions || [
+            { action: 'open', title: 'Open', icon: '/icon.svg' },
+            { action: 'close', title: 'Close' },
+        ],
+    })
+
+    const webPushSubscription: WebPushSubscription = {
+        endpoint: subscription.endpoint,
+        keys: {
+            p256dh: subscription.keys.p256dh,
+            auth: subscription.keys.auth,
+        },
+    }
 
-        await webpush.default.sendNotification(webPushSubscription, notificationPayload)
+    try {
+        await webpush.sendNotification(webPushSubscription, notificationPayload, {
+            agent: agentFor(Agent, subscription.endpoint),
+            timeout: PUSH_REQUEST_TIMEOUT_MS,
+        })
     } catch (error) {
-        // Handle specific error cases
-        if (error instanceof Error) {
-            // Subscription is invalid or expired
-            if (error.message.includes('410') || error.message.includes('Gone')) {
-                throw new Error('Subscription expired')
-            }
-            // Subscription is invalid
-            if (error.message.includes('404') || error.message.includes('Not Found')) {
-                throw new Error('Invalid subscription')
-            }
+        if (error instanceof webpush.WebPushError) {
+            throw new PushSendError(
+                `Push service responded ${error.statusCode}: ${error.body || error.message}`,
+                error.statusCode,
+                parseRetryAfter(error.headers as Record<string, string> | undefined)
+            )
         }
-        throw error
+        throw new PushSendError(error instanceof Error ? error.message : 'Push delivery failed', null)
     }
 }
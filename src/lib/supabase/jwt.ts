@@ -0,0 +1,219 @@
+import type { SupabaseClient } from '@supabase/supabase-js'
+
+/**
+ * Local verification of Supabase access tokens.
+ *
+ * supabase.auth.getUser() asks the auth server about every request. A session's
+ * access token is a signed JWT, so most requests can instead check the signature
+ * against the project's signing keys (fetched from the JWKS endpoint and cached
+ * here) and read the user id from the claims. Uses WebCrypto only, so it runs in
+ * middleware (edge) as well as in route handlers.
+ *
+ * Tokens signed with the legacy shared secret (HS256) verify locally when
+ * SUPABASE_JWT_SECRET is set; otherwise they take the remote path.
+ */
+
+export interface AccessTokenClaims {
+  sub: string
+  exp: number
+  role?: string
+  email?: string
+  session_id?: string
+}
+
+// Signing keys are refetched this often, and at most this often on an unknown kid
+const JWKS_TTL_MS = 10 * 60 * 1000
+const JWKS_MIN_REFRESH_MS = 30 * 1000
+
+// Tokens this close to expiry go to the auth server, which also covers clock skew
+const NEAR_EXPIRY_SECONDS = 60
+
+interface Jwk extends JsonWebKey {
+  kid?: string
+  alg?: string
+}
+
+interface JwksCache {
+  keys: Map<string, CryptoKey>
+  fetchedAt: number
+}
+
+let jwksCache: JwksCache | null = null
+let jwksRequest: Promise<JwksCache | null> | null = null
+let hmacKey: Promise<CryptoKey> | null = null
+
+const ALGORITHMS: Record<string, { import: RsaHashedImportParams | EcKeyImportParams; verify: AlgorithmIdentifier | EcdsaParams }> = {
+  RS256: {
+    import: { name: 'RSASSA-PKCS1-v1_5', hash: 'SHA-256' },
+    verify: { name: 'RSASSA-PKCS1-v1_5' },
+  },
+  ES256: {
+    import: { name: 'ECDSA', namedCurve: 'P-256' },
+    verify: { name: 'ECDSA', hash: 'SHA-256' },
+  },
+}
+
+function base64UrlDecode(segment: string) {
+  const base64 = segment.replace(/-/g, '+').replace(/_/g, '/')
+  const binary = atob(base64 + '='.repeat((4 - (base64.length % 4)) % 4))
+  const bytes = new Uint8Array(binary.length)
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i)
+  }
+  return bytes
+}
+
+function decodeJson<T>(segment: string): T | null {
+  try {
+    return JSON.parse(new TextDecoder().decode(base64UrlDecode(segment))) as T
+  } catch {
+    return null
+  }
+}
+
+function issuer(): string | null {
+  const url = process.env.NEXT_PUBLIC_SUPABASE_URL
+  return url ? `${url.replace(/\/$/, '')}/auth/v1` : null
+}
+
+async function fetchJwks(): Promise<JwksCache | null> {
+  const authUrl = issuer()
+  if (!authUrl) {
+    return null
+  }
+
+  try {
+    const response = await fetch(`${authUrl}/.well-known/jwks.json`)
+    if (!response.ok) {
+      return null
+    }
+
+    const { keys = [] } = (await response.json()) as { keys?: Jwk[] }
+    const imported = new Map<string, CryptoKey>()
+    for (const jwk of keys) {
+      const algorithm = jwk.alg ? ALGORITHMS[jwk.alg] : undefined
+      if (!jwk.kid || !algorithm) {
+        continue
+      }
+      imported.set(jwk.kid, await crypto.subtle.importKey('jwk', jwk, algorithm.import, false, ['verify']))
+    }
+
+    return { keys: imported, fetchedAt: Date.now() }
+  } catch (error) {
+    console.warn('[Auth] Failed to fetch signing keys:', error)
+    return null
+  }
+}
+
+async function signingKey(kid: string): Promise<CryptoKey | null> {
+  const now = Date.now()
+  const cached = jwksCache
+  const stale = !cached || now - cached.fetchedAt > JWKS_TTL_MS
+  const unknownKid = !!cached && !cached.keys.has(kid) && now - cached.fetchedAt > JWKS_MIN_REFRESH_MS
+
+  if (stale || unknownKid) {
+    // Concurrent requests share one fetch; a failed fetch keeps the old keys
+    jwksRequest ??= fetchJwks().then((fresh) => {
+      if (fresh) {
+        jwksCache = fresh
+      }
+      return jwksCache
+    }).finally(() => {
+      jwksRequest = null
+    })
+    await jwksRequest
+  }
+
+  return jwksCache?.keys.get(kid) ?? null
+}
+
+function sharedSecretKey(): Promise<CryptoKey> | null {
+  const secret = process.env.SUPABASE_JWT_SECRET
+  if (!secret) {
+    return null
+  }
+  hmacKey ??= crypto.subtle.importKey(
+    'raw',
+    new TextEncoder().encode(secret),
+    { name: 'HMAC', hash: 'SHA-256' },
+    false,
+    ['verify']
+  )
+  return hmacKey
+}
+
+/**
+ * Verify an access token's signature, issuer and expiry without calling the
+ * auth server. Returns null when the token is invalid or cannot be checked locally.
+ */
+export async function verifyAccessToken(token: string): Promise<AccessTokenClaims | null> {
+  const [headerSegment, payloadSegment, signatureSegment] = token.split('.')
+  if (!headerSegment || !payloadSegment || !signatureSegment) {
+    return null
+  }
+
+  const header = decodeJson<{ alg?: string; kid?: string }>(headerSegment)
+  const claims = decodeJson<AccessTokenClaims & { iss?: string }>(payloadSegment)
+  if (!header?.alg || !claims?.sub || typeof claims.exp !== 'number') {
+    return null
+  }
+
+  if (claims.exp <= Date.now() / 1000 || claims.iss !== issuer()) {
+    return null
+  }
+
+  let key: CryptoKey | null = null
+  let verifyAlgorithm: AlgorithmIdentifier | EcdsaParams
+  if (header.alg === 'HS256') {
+    key = await sharedSecretKey()
+    verifyAlgorithm = { name: 'HMAC' }
+  } else {
+    const algorithm = ALGORITHMS[header.alg]
+    if (!algorithm || !header.kid) {
+      return null
+    }
+    key = await signingKey(header.kid)
+    verifyAlgorithm = algorithm.verify
+  }
+
+  if (!key) {
+    return null
+  }
+
+  try {
+    const valid = await crypto.subtle.verify(
+      verifyAlgorithm,
+      key,
+      base64UrlDecode(signatureSegment),
+      new TextEncoder().encode(`${headerSegment}.${payloadSegment}`)
+    )
+    return valid ? claims : null
+  } catch {
+    return null
+  }
+}
+
+/**
+ * The signed-in user's id. Verifies the session's access token locally and only
+ * asks the auth server when the token can't be checked here, is about to expire,
+ * or the caller passes `strict` (routes where a revoked session must be refused
+ * immediately, such as /admin).
+ */
+export async function getSessionUserId(
+  supabase: Pick<SupabaseClient, 'auth'>,
+  { strict = false }: { strict?: boolean } = {}
+): Promise<string | null> {
+  if (!strict) {
+    // Reads the session from cookies, refreshing it first if it has expired
+    const { data: { session } } = await supabase.auth.getSession()
+    if (session?.access_token) {
+      const claims = await verifyAccessToken(session.access_token)
+      if (claims && claims.exp - Date.now() / 1000 > NEAR_EXPIRY_SECONDS) {
+        return claims.sub
+      }
+    }
+  }
+
+  const { data: { user } } = await supabase.auth.getUser()
+  return user?.id ?? null
+}
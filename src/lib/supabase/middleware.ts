@@ -1,8 +1,12 @@
 import { createServerClient } from '@supabase/ssr'
 import { NextResponse, type NextRequest } from 'next/server'
+import { getSessionUserId } from './jwt'
 
 const PROTECTED_PATHS = ['/dashboard', '/portal', '/wallet', '/bookings', '/admin']
 const AUTH_PATHS = ['/login', '/register']
+// A signed-out or banned user must lose access here at once, not when their
+// access token expires, so these always check with the auth server
+const REVOCATION_SENSITIVE_PATHS = ['/admin']
 
 export function isProtectedPath(pathname: string) {
   return PROTECTED_PATHS.some(path => pathname.startsWith(path))
@@ -70,21 +74,22 @@ export async function updateSession(request: NextRequest) {
     }
   )
 
-  // Do not run code between createServerClient and
-  // supabase.auth.getUser(). A simple mistake could make it very hard to debug
-  // issues with users being randomly logged out.
+  // Do not run code between createServerClient and the session check
+  // below. A simple mistake could make it very hard to debug issues with users
+  // being randomly logged out.
 
-  const {
-    data: { user },
-  } = await supabase.auth.getUser()
+  // Verified locally against the cached signing keys where possible (see ./jwt)
+  const userId = await getSessionUserId(supabase, {
+    strict: REVOCATION_SENSITIVE_PATHS.some(path => pathname.startsWith(path)),
+  })
 
-  if (isProtectedRoute && !user) {
+  if (isProtectedRoute && !userId) {
     const url = request.nextUrl.clone()
     url.pathname = '/login'
     return NextResponse.redirect(url)
   }
 
-  if (isAuthRoute && user) {
+  if (isAuthRoute && userId) {
     const url = request.nextUrl.clone()
     url.pathname = '/dashboard'
     return NextResponse.redirect(url)
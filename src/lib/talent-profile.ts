@@ -0,0 +1,226 @@
+/**
+ * Talent profile loader
+ *
+ * Shared by /t/[slug] and the legacy /talent/[id] route. A URL segment resolves to
+ * a talent id with one resolve_talent_slug() call; the public parts of the page
+ * (profile with menus, visible media, reviews and their summary) are then loaded
+ * concurrently and cached per talent under talentProfileTag(id).
+ *
+ * Talent edits reach the server through /api/talent/verification/sync, which calls
+ * invalidateTalentProfile(). Viewer-specific data (session, wallet, premium media
+ * urls) is never cached: the loader reads with the service role, so premium rows
+ * are cached without their url and resolved per viewer by getViewerMedia().
+ */
+import type { SupabaseClient } from '@supabase/supabase-js'
+import { revalidateTag, unstable_cache } from 'next/cache'
+import { createApiClient } from '@/lib/supabase/api'
+import type { Media, Profile, Review, ServiceType, TalentMenu } from '@/types/database'
+
+const PROFILE_REVALIDATE_SECONDS = 3600
+// Reviews are written by clients, whose edits do not invalidate the talent's cache
+const REVIEWS_REVALIDATE_SECONDS = 300
+
+export const TALENT_SLUGS_TAG = 'talent-slugs'
+
+export const VISIBLE_MEDIA_FILTER = 'moderation_status.is.null,moderation_status.eq.approved,moderation_status.eq.pending'
+
+const MEDIA_SELECT = 'id, talent_id, url, type, is_premium, unlock_price, created_at'
+
+const PROFILE_SELECT = `
+    *,
+    talent_menus (
+        *,
+        service_type:service_types(*)
+    )
+`
+
+export type TalentWithMenus = Profile & {
+    talent_menus: Array<TalentMenu & { service_type: ServiceType }>
+}
+
+export type TalentMedia = Pick<Media, 'id' | 'talent_id' | 'url' | 'type' | 'is_premium' | 'unlock_price' | 'created_at'>
+
+export type ReviewWithClient = Review & {
+    client?: Profile
+}
+
+export interface TalentReviews {
+    reviews: ReviewWithClient[]
+    averageRating: number
+    reviewCount: number
+}
+
+export interface TalentProfileData extends TalentReviews {
+    talent: TalentWithMenus
+    media: TalentMedia[]
+}
+
+export function talentProfileTag(talentId: string): string {
+    return `talent-profile:${talentId}`
+}
+
+async function resolveTalentId(slug: string): Promise<string | null> {
+    const supabase = createApiClient()
+    const { data, error } = await supabase.rpc('resolve_talent_slug', { p_slug: slug })
+
+    if (error) {
+        // Thrown so a transient failure is not cached as a 404
+        throw new Error(`[TalentProfile] Failed to resolve slug "${slug}": ${error.message}`)
+    }
+
+    return (data as string | null) ?? null
+}
+
+async function loadProfileAndMedia(talentId: string): Promise<Pick<TalentProfileData, 'talent' | 'media'> | null> {
+    const supabase = createApiClient()
+
+    const [profileResult, mediaResult] = await Promise.all([
+        supabase
+            .from('profiles')
+            .select(PROFILE_SELECT)
+            .eq('id', talentId)
+            .eq('role', 'talent')
+            .maybeSingle(),
+        supabase
+            .from('media')
+            .select(MEDIA_SELECT)
+            .eq('talent_id', talentId)
+            .or(VISIBLE_MEDIA_FILTER)
+            .order('created_at', { ascending: false }),
+    ])
+
+    if (profileResult.error) {
+        throw new Error(`[TalentProfile] Failed to load talent ${talentId}: ${profileResult.error.message}`)
+    }
+
+    if (!profileResult.data) {
+        return null
+    }
+
+    if (mediaResult.error) {
+        console.error(`[TalentProfile] Failed to load media for ${talentId}:`, mediaResult.error)
+    }
+
+    // Premium urls never enter the shared cache; see getViewerMedia()
+    const media = ((mediaResult.data || []) as TalentMedia[]).map((item) =>
+        item.is_premium ? { ...item, url: '' } : item
+    )
+
+    const row = profileResult.data as unknown as TalentWithMenus
+    const talent = {
+        ...row,
+        talent_menus: (row.talent_menus || []).map((menu) => ({
+            ...menu,
+            service_type: menu.service_type || null,
+        })),
+    } as TalentWithMenus
+
+    return {
+        talent,
+        media,
+    }
+}
+
+async function loadReviews(talentId: string): Promise<TalentReviews> {
+    const supabase = createApiClient()
+    const { data, error } = await supabase
+        .from('reviews')
+        .select('*, client:profiles!reviews_client_id_fkey(id, display_name, avatar_url)')
+        .eq('talent_id', talentId)
+        .order('created_at', { ascending: false })
+
+    if (error) {
+        console.error(`[TalentProfile] Failed to load reviews for ${talentId}:`, error)
+    }
+
+    // All reviews are passed on so the client can show the rating distribution
+    const reviews = (data || []) as ReviewWithClient[]
+    const reviewCount = reviews.length
+    const averageRating = reviewCount > 0
+        ? reviews.reduce((sum, review) => sum + review.rating, 0) / reviewCount
+        : 0
+
+    return { reviews, averageRating, reviewCount }
+}
+
+export const getTalentIdForSlug = (slug: string) => unstable_cache(
+    async () => resolveTalentId(slug),
+    ['talent-slug', slug],
+    { revalidate: PROFILE_REVALIDATE_SECONDS, tags: [TALENT_SLUGS_TAG] }
+)()
+
+const getCachedProfileAndMedia = (talentId: string) => unstable_cache(
+    async () => loadProfileAndMedia(talentId),
+    ['talent-profile', talentId],
+    { revalidate: PROFILE_REVALIDATE_SECONDS, tags: ['talents', talentProfileTag(talentId)] }
+)()
+
+const getCachedReviews = (talentId: string) => unstable_cache(
+    async () => loadReviews(talentId),
+    ['talent-reviews', talentId],
+    { revalidate: REVIEWS_REVALIDATE_SECONDS, tags: ['talents', talentProfileTag(talentId)] }
+)()
+
+/**
+ * Public profile data for a talent id, or null if there is no such talent
+ */
+export async function getTalentProfileById(talentId: string): Promise<TalentProfileData | null> {
+    const [profile, reviews] = await Promise.all([
+        getCachedProfileAndMedia(talentId),
+        getCachedReviews(talentId),
+    ])
+
+    return profile ? { ...profile, ...reviews } : null
+}
+
+/**
+ * Public profile data for a /t/[slug] URL segment (username, slug, id or display name slug)
+ */
+export async function getTalentProfileBySlug(slug: string): Promise<TalentProfileData | null> {
+    const talentId = await getTalentIdForSlug(slug)
+    return talentId ? getTalentProfileById(talentId) : null
+}
+
+/**
+ * Media as one viewer may see it. Anonymous viewers get no premium rows, as the
+ * "Premium media with conditions" policy hides them. Signed-in viewers read the
+ * talent's premium rows with their own session client, so RLS returns only the
+ * ones they own or have unlocked; those get their url back and the rest stay
+ * locked with an empty url.
+ */
+export async function getViewerMedia(
+    supabase: SupabaseClient,
+    talentId: string,
+    media: TalentMedia[],
+    viewerId: string | null
+): Promise<TalentMedia[]> {
+    if (!viewerId) {
+        return media.filter((item) => !item.is_premium)
+    }
+
+    if (!media.some((item) => item.is_premium)) {
+        return media
+    }
+
+    const { data, error } = await supabase
+        .from('media')
+        .select('id, url')
+        .eq('talent_id', talentId)
+        .eq('is_premium', true)
+
+    if (error) {
+        console.error(`[TalentProfile] Failed to resolve premium media for ${talentId}:`, error)
+    }
+
+    const urls = new Map((data || []).map((row: { id: string, url: string }) => [row.id, row.url]))
+    return media.map((item) => item.is_premium ? { ...item, url: urls.get(item.id) ?? '' } : item)
+}
+
+/**
+ * Drop cached public data after a talent edits their profile, menus or media.
+ * Slug resolutions are dropped too, since a username or display name may have changed.
+ */
+export function invalidateTalentProfile(talentId: string): void {
+    revalidateTag(talentProfileTag(talentId), { expire: 0 })
+    revalidateTag(TALENT_SLUGS_TAG, { expire: 0 })
+}
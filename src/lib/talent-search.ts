@@ -0,0 +1,114 @@
+import { SupabaseClient } from '@supabase/supabase-js'
+import { TalentWithMenu } from '@/types/database'
+
+export interface TalentSearchFilters {
+    q: string
+    location: string | null
+    gender: string | null
+    status: string | null
+    serviceId: string | null
+    sortBy: string
+    page: number
+    limit: number
+}
+
+export interface TalentSearchResult {
+    talents: TalentWithMenu[]
+    totalCount: number
+    // Keyset cursor for the next page; null when paging by page number instead
+    nextCursor: string | null
+}
+
+interface SearchHit {
+    id: string
+    rank: number
+    total_count: number
+}
+
+// Columns rendered by the browse cards. With a service filter the menus embed is
+// inner-joined so only the matching service is returned, as browse always did.
+export function talentCardSelect(serviceId: string | null): string {
+    return `
+        id,
+        display_name,
+        avatar_url,
+        location,
+        bio,
+        status,
+        is_verified,
+        starting_price,
+        created_at,
+        username,
+        role,
+        full_name,
+        updated_at,
+        gender,
+        talent_menus:talent_menus${serviceId ? '!inner' : ''} (
+            id,
+            talent_id,
+            service_type_id,
+            price,
+            is_active,
+            service_type:service_types (
+                id,
+                name,
+                icon
+            )
+        )
+    `
+}
+
+/**
+ * Ranked full-text search over talents via the search_talents RPC.
+ * The RPC does matching, filtering, ordering and pagination against indexes and
+ * returns one page of ids; the cards for that page are then fetched by id and put
+ * back in ranked order.
+ */
+export async function searchTalents(
+    supabase: SupabaseClient,
+    filters: TalentSearchFilters
+): Promise<TalentSearchResult> {
+    const { data: hits, error: searchError } = await supabase.rpc('search_talents', {
+        p_query: filters.q,
+        p_location: filters.location,
+        p_gender: filters.gender,
+        p_status: filters.status,
+        p_service_id: filters.serviceId,
+        p_sort: filters.sortBy,
+        p_limit: filters.limit,
+        p_offset: (filters.page - 1) * filters.limit,
+    })
+
+    if (searchError) {
+        throw searchError
+    }
+
+    const rows = (hits ?? []) as SearchHit[]
+    if (rows.length === 0) {
+        return { talents: [], totalCount: 0, nextCursor: null }
+    }
+
+    let query = supabase
+        .from('profiles')
+        .select(talentCardSelect(filters.serviceId))
+        .in('id', rows.map((row) => row.id))
+
+    if (filters.serviceId) {
+        query = query.eq('talent_menus.service_type_id', filters.serviceId)
+        query = query.eq('talent_menus.is_active', true)
+    }
+
+    const { data, error } = await query
+
+    if (error) {
+        throw error
+    }
+
+    const byId = new Map(((data ?? []) as unknown as TalentWithMenu[]).map((talent) => [talent.id, talent]))
+
+    return {
+        talents: rows.flatMap((row) => byId.get(row.id) ?? []),
+        totalCount: Number(rows[0]!.total_count),
+        nextCursor: null,
+    }
+}
@@ -0,0 +1,146 @@
+/**
+ * Request tracing for API hot paths
+ *
+ * A route wraps its handler in traceRequest() and times each stage and database
+ * call with trace.span(). Every response then carries a Server-Timing header
+ * (one entry per stage plus `total`), which browser devtools and the Python load
+ * harness (tests/timings.py) read directly. Sampled requests also log one
+ * structured line with every span:
+ *
+ *   [Trace] {"route":"POST /api/gifts","status":200,"total_ms":182.4,"spans":[...]}
+ *
+ * Sampling:
+ * - TRACE_SAMPLE_RATE   share of requests whose spans are logged (0..1, default 0)
+ * - TRACE_SLOW_MS       requests slower than this are always logged (default 1000)
+ * - TRACE_TOKEN         requests sending `x-nego-trace: <token>` are always logged
+ * - SERVER_TIMING=off   drops the Server-Timing header (spans are still measured)
+ *
+ * Spans cost two performance.now() calls and an array push, so tracing stays on
+ * for every request; only logging is sampled.
+ */
+export interface TraceSpan {
+    name: string
+    // Milliseconds from the start of the request
+    start: number
+    duration: number
+    error?: boolean
+}
+
+const SAMPLE_RATE = Math.min(Math.max(Number(process.env.TRACE_SAMPLE_RATE) || 0, 0), 1)
+const SLOW_MS = Number(process.env.TRACE_SLOW_MS) || 1000
+const TRACE_TOKEN = process.env.TRACE_TOKEN
+const SERVER_TIMING_ENABLED = process.env.SERVER_TIMING !== 'off'
+
+export const TRACE_HEADER = 'x-nego-trace'
+
+// Server-Timing metric names are HTTP tokens
+function metricName(name: string) {
+    return name.replace(/[^A-Za-z0-9!#$%&'*+.^_`|~-]/g, '_')
+}
+
+function round(ms: number) {
+    return Math.round(ms * 10) / 10
+}
+
+export class RequestTrace {
+    readonly spans: TraceSpan[] = []
+    private readonly startedAt = performance.now()
+
+    constructor(
+        readonly route: string,
+        readonly sampled: boolean
+    ) {}
+
+    /**
+     * Time one stage. Accepts anything awaitable, including supabase-js query
+     * builders, so a database call is traced by wrapping it as-is.
+     */
+    async span<T>(name: string, work: () => PromiseLike<T>): Promise<T> {
+        const start = performance.now()
+        let failed = false
+        try {
+            return await work()
+        } catch (error) {
+            failed = true
+            throw error
+        } finally {
+            this.spans.push({
+                name,
+                start: round(start - this.startedAt),
+                duration: round(performance.now() - start),
+                ...(failed ? { error: true } : {}),
+            })
+        }
+    }
+
+    elapsed() {
+        return performance.now() - this.startedAt
+    }
+
+    /**
+     * Server-Timing value: stages in the order they ran, repeated names summed
+     */
+    serverTiming(total = this.elapsed()) {
+        const totals = new Map<string, number>()
+        for (const span of this.spans) {
+            const name = metricName(span.name)
+            totals.set(name, (totals.get(name) ?? 0) + span.duration)
+        }
+        const entries = [...totals].map(([name, duration]) => `${name};dur=${round(duration)}`)
+        entries.push(`total;dur=${round(total)}`)
+        return entries.join(', ')
+    }
+
+    /**
+     * Attach Server-Timing to the response and log the spans if this request is
+     * sampled or slow
+     */
+    finish<R extends Response>(response: R): R {
+        const total = this.elapsed()
+
+        if (SERVER_TIMING_ENABLED) {
+            try {
+                response.headers.append('Server-Timing', this.serverTiming(total))
+            } catch {
+                // Immutable headers (e.g. a proxied fetch response); the log still has the spans
+            }
+        }
+
+        this.log(response.status, total)
+        return response
+    }
+
+    /**
+     * Log the spans if this trace is sampled or slow. finish() calls it; work that
+     * runs after the response (and so has no header to carry timings) calls it directly.
+     */
+    log(status: number | null = null, total = this.elapsed()) {
+        if (this.sampled || total >= SLOW_MS) {
+            console.log('[Trace]', JSON.stringify({
+                route: this.route,
+                status,
+                total_ms: round(total),
+                sampled: this.sampled,
+                spans: this.spans,
+            }))
+        }
+    }
+}
+
+export function startTrace(route: string, request?: Request): RequestTrace {
+    const forced = !!TRACE_TOKEN && request?.headers.get(TRACE_HEADER) === TRACE_TOKEN
+    return new RequestTrace(route, forced || (SAMPLE_RATE > 0 && Math.random() < SAMPLE_RATE))
+}
+
+/**
+ * Run a route handler under a trace and stamp its response. The route name
+ * should be stable (method and path pattern, not the concrete URL).
+ */
+export async function traceRequest<R extends Response>(
+    route: string,
+    request: Request,
+    handler: (trace: RequestTrace) => Promise<R>
+): Promise<R> {
+    const trace = startTrace(route, request)
+    return trace.finish(await handler(trace))
+}
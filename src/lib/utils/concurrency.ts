@@ -0,0 +1,28 @@
+/**
+ * Runs `worker` over `items` with at most `limit` calls in flight.
+ * Results come back in input order with the same shape as Promise.allSettled,
+ * so callers can swap it in wherever an unbounded allSettled fans out too wide.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  worker: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+  const results: PromiseSettledResult<R>[] = new Array(items.length)
+  let next = 0
+
+  async function run() {
+    while (next < items.length) {
+      const index = next++
+      try {
+        results[index] = { status: 'fulfilled', value: await worker(items[index]!, index) }
+      } catch (reason) {
+        results[index] = { status: 'rejected', reason }
+      }
+    }
+  }
+
+  const lanes = Math.max(1, Math.min(limit, items.length))
+  await Promise.all(Array.from({ length: lanes }, run))
+  return results
+}
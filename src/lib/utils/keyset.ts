@@ -0,0 +1,127 @@
+/**
+ * Keyset (cursor) pagination helpers for PostgREST queries.
+ *
+ * A cursor records the sort value and id of the last row a page returned. The next
+ * page asks for rows strictly after that (value, id) pair, so with an index on
+ * (column, id) every page costs the same, unlike .range() where the database still
+ * walks past every skipped row.
+ */
+
+export interface KeysetCursor {
+  value: string | number | null
+  id: string
+}
+
+export interface KeysetOrder {
+  column: string
+  ascending: boolean
+  // Rows with a NULL sort value come after every non-null value
+  nullsLast?: boolean
+  // Unique column that breaks ties in `column`; defaults to id
+  tiebreaker?: string
+}
+
+// Cursor contents are ids, timestamps and numbers, so plain btoa/atob (available in
+// both the browser and Node) is enough; the output is made URL-safe by hand.
+export function encodeCursor(cursor: KeysetCursor): string {
+  return btoa(JSON.stringify([cursor.value, cursor.id]))
+    .replace(/\+/g, '-')
+    .replace(/\//g, '_')
+    .replace(/=+$/, '')
+}
+
+export function decodeCursor(raw: string | null | undefined): KeysetCursor | null {
+  if (!raw) {
+    return null
+  }
+
+  try {
+    const parsed: unknown = JSON.parse(atob(raw.replace(/-/g, '+').replace(/_/g, '/')))
+    if (!Array.isArray(parsed) || parsed.length !== 2) {
+      return null
+    }
+
+    const [value, id] = parsed as unknown[]
+    if (typeof id !== 'string' || !(value === null || typeof value === 'string' || typeof value === 'number')) {
+      return null
+    }
+
+    return { value, id }
+  } catch {
+    return null
+  }
+}
+
+function quote(value: string | number): string {
+  return `"${String(value).replace(/"/g, '\\"')}"`
+}
+
+/**
+ * PostgREST `or=(...)` expression selecting rows after `cursor` in the given order.
+ * The query must also be ordered by `order.column` then the tiebreaker (`id`) in
+ * the same direction.
+ */
+export function keysetFilter(order: KeysetOrder, cursor: KeysetCursor): string {
+  const past = order.ascending ? 'gt' : 'lt'
+  const idColumn = order.tiebreaker ?? 'id'
+  const id = quote(cursor.id)
+
+  if (cursor.value === null) {
+    // Already inside the trailing NULL block: only the id can move forward
+    return `and(${order.column}.is.null,${idColumn}.${past}.${id})`
+  }
+
+  const value = quote(cursor.value)
+  const clauses = [
+    `${order.column}.${past}.${value}`,
+    `and(${order.column}.eq.${value},${idColumn}.${past}.${id})`,
+  ]
+
+  if (order.nullsLast) {
+    clauses.push(`${order.column}.is.null`)
+  }
+
+  return clauses.join(',')
+}
+
+/**
+ * PostgREST `or=(...)` expression selecting rows after `values` on a composite key
+ * of non-null columns, e.g. a (day, metric, dimension) primary key. The query must
+ * be ordered by every column of the key, in order and in the same direction.
+ */
+export function compositeKeysetFilter(
+  columns: string[],
+  values: Array<string | number>,
+  ascending: boolean
+): string {
+  const past = ascending ? 'gt' : 'lt'
+
+  return columns.map((column, i) => {
+    const equal = columns.slice(0, i).map((prefix, j) => `${prefix}.eq.${quote(values[j]!)}`)
+    const after = `${column}.${past}.${quote(values[i]!)}`
+    return equal.length > 0 ? `and(${[...equal, after].join(',')})` : after
+  }).join(',')
+}
+
+/**
+ * Trims a `limit + 1` fetch to `limit` rows and builds the cursor for the next page,
+ * or null when there is no next page.
+ */
+export function takePage<T extends { id: string }>(
+  rows: T[],
+  limit: number,
+  column: keyof T
+): { rows: T[]; nextCursor: string | null } {
+  if (rows.length <= limit) {
+    return { rows, nextCursor: null }
+  }
+
+  const page = rows.slice(0, limit)
+  const last = page[page.length - 1]!
+  const value = last[column] as unknown as string | number | null | undefined
+
+  return {
+    rows: page,
+    nextCursor: encodeCursor({ value: value ?? null, id: last.id }),
+  }
+}
@@ -0,0 +1,211 @@
+/**
+ * Profile view and activity tracking
+ *
+ * Talent profile renders record a view and bump the viewer's last_active_at.
+ * Instead of two writes per render, events are buffered in-process and flushed
+ * in bulk: one profile_views insert and one touch_last_active call per flush.
+ *
+ * - Repeat views of the same talent by the same viewer within VIEW_DEDUPE_MS
+ *   are dropped before they reach the buffer.
+ * - Activity is coalesced per user and throttled to ACTIVITY_THROTTLE_MS.
+ * - A flush runs once MAX_BUFFERED_VIEWS events are pending, or after the
+ *   response once the oldest pending event is FLUSH_INTERVAL_MS old.
+ *
+ * Buffered events can be lost if an instance is torn down before a flush;
+ * view counts are analytics, not billing, so that trade is accepted.
+ */
+import { after } from 'next/server'
+import { createApiClient } from '@/lib/supabase/api'
+
+const MAX_BUFFERED_VIEWS = 200
+const FLUSH_INTERVAL_MS = 10 * 1000
+// Hard cap so a failing database cannot grow the buffer without bound
+const MAX_PENDING_VIEWS = 5000
+// Dedupe memory; the oldest viewers are forgotten first past this
+const MAX_TRACKED_VIEWERS = 50000
+
+export const VIEW_DEDUPE_MS = 30 * 60 * 1000
+export const ACTIVITY_THROTTLE_MS = 5 * 60 * 1000
+
+export interface ProfileViewEvent {
+    talentId: string
+    viewerId: string | null
+    viewerRole: string
+    // Identifies anonymous viewers for de-duplication only (e.g. client IP); never stored
+    anonymousKey?: string | null
+}
+
+interface ProfileViewRow {
+    talent_id: string
+    viewer_id: string | null
+    viewer_role: string
+    created_at: string
+}
+
+const pendingViews: ProfileViewRow[] = []
+const pendingActivity = new Map<string, number>()
+const recentViews = new Map<string, number>()
+const recentActivity = new Map<string, number>()
+
+let oldestPendingAt: number | null = null
+let activeFlush: Promise<void> | null = null
+let flushTimer: ReturnType<typeof setTimeout> | null = null
+
+function viewerKey(event: ProfileViewEvent): string | null {
+    if (event.viewerId) {
+        return `user:${event.viewerId}`
+    }
+    return event.anonymousKey ? `anon:${event.anonymousKey}` : null
+}
+
+// Forget dedupe entries whose window has passed
+function pruneWindows(now: number) {
+    for (const [key, at] of Array.from(recentViews.entries())) {
+        if (now - at >= VIEW_DEDUPE_MS) {
+            recentViews.delete(key)
+        }
+    }
+    for (const [userId, at] of Array.from(recentActivity.entries())) {
+        if (now - at >= ACTIVITY_THROTTLE_MS) {
+            recentActivity.delete(userId)
+        }
+    }
+}
+
+async function writeViews(rows: ProfileViewRow[]): Promise<void> {
+    const supabase = createApiClient()
+    const { error } = await supabase.from('profile_views').insert(rows)
+    if (error) {
+        console.error('[ViewTracking] Error inserting profile views:', error)
+        // Keep what still fits so a transient failure does not drop the batch
+        pendingViews.unshift(...rows.slice(0, Math.max(0, MAX_PENDING_VIEWS - pendingViews.length)))
+    }
+}
+
+async function writeActivity(activity: Map<string, number>): Promise<void> {
+    // One timestamp for the whole batch; per-user precision within a flush
+    // interval is not meaningful for "last active"
+    const latest = Math.max(...Array.from(activity.values()))
+    const supabase = createApiClient()
+    const { error } = await supabase.rpc('touch_last_active', {
+        p_user_ids: Array.from(activity.keys()),
+        p_at: new Date(latest).toISOString(),
+    })
+    if (error) {
+        console.error('[ViewTracking] Error updating activity:', error)
+    }
+}
+
+/**
+ * Writes everything currently buffered. Concurrent callers share the in-flight pass.
+ */
+export function flushViewTracking(): Promise<void> {
+    if (activeFlush) {
+        return activeFlush
+    }
+
+    if (flushTimer) {
+        clearTimeout(flushTimer)
+        flushTimer = null
+    }
+
+    activeFlush = (async () => {
+        while (pendingViews.length > 0 || pendingActivity.size > 0) {
+            const views = pendingViews.splice(0, MAX_BUFFERED_VIEWS)
+            const activity = new Map(pendingActivity)
+            pendingActivity.clear()
+            oldestPendingAt = pendingViews.length > 0 ? Date.now() : null
+
+            await Promise.all([
+                views.length > 0 ? writeViews(views) : Promise.resolve(),
+                activity.size > 0 ? writeActivity(activity) : Promise.resolve(),
+            ])
+
+            // A failed insert re-queues its rows; leave them for the next trigger
+            if (views.length > 0 && pendingViews.length >= views.length) {
+                break
+            }
+        }
+        pruneWindows(Date.now())
+    })().finally(() => {
+        activeFlush = null
+    })
+
+    return activeFlush
+}
+
+function scheduleFlush(now: number) {
+    const due = pendingViews.length >= MAX_BUFFERED_VIEWS
+        || (oldestPendingAt !== null && now - oldestPendingAt >= FLUSH_INTERVAL_MS)
+
+    if (due) {
+        try {
+            after(flushViewTracking)
+            return
+        } catch {
+            // Outside a request scope; fall through to the timer
+        }
+    }
+
+    // Time trigger for quiet periods, where no later request would notice the
+    // buffer is due. On serverless runtimes this only fires while warm.
+    if (!flushTimer) {
+        flushTimer = setTimeout(() => {
+            flushTimer = null
+            void flushViewTracking()
+        }, due ? 0 : FLUSH_INTERVAL_MS)
+    }
+}
+
+/**
+ * Record a profile view (and the viewer's activity) without waiting on the database.
+ * Returns false if the view was dropped as a repeat within VIEW_DEDUPE_MS.
+ */
+export function recordProfileView(event: ProfileViewEvent): boolean {
+    const now = Date.now()
+    let recorded = false
+
+    const key = viewerKey(event)
+    const dedupeKey = key ? `${event.talentId}:${key}` : null
+    const lastSeen = dedupeKey ? recentViews.get(dedupeKey) : undefined
+
+    if (lastSeen === undefined || now - lastSeen >= VIEW_DEDUPE_MS) {
+        if (dedupeKey) {
+            // Re-insert so Map order stays oldest-first for eviction
+            recentViews.delete(dedupeKey)
+            recentViews.set(dedupeKey, now)
+            if (recentViews.size > MAX_TRACKED_VIEWERS) {
+                const oldest = recentViews.keys().next().value
+                if (oldest !== undefined) {
+                    recentViews.delete(oldest)
+                }
+            }
+        }
+        if (pendingViews.length >= MAX_PENDING_VIEWS) {
+            pendingViews.shift()
+        }
+        pendingViews.push({
+            talent_id: event.talentId,
+            viewer_id: event.viewerId,
+            viewer_role: event.viewerRole,
+            created_at: new Date(now).toISOString(),
+        })
+        oldestPendingAt ??= now
+        recorded = true
+    }
+
+    if (event.viewerId) {
+        const lastTouched = recentActivity.get(event.viewerId)
+        if (lastTouched === undefined || now - lastTouched >= ACTIVITY_THROTTLE_MS) {
+            recentActivity.set(event.viewerId, now)
+            pendingActivity.set(event.viewerId, now)
+            oldestPendingAt ??= now
+        }
+    }
+
+    if (pendingViews.length > 0 || pendingActivity.size > 0) {
+        scheduleFlush(now)
+    }
+
+    return recorded
+}
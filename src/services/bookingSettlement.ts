@@ -0,0 +1,78 @@
+import { createApiClient } from '@/lib/supabase/api'
+
+// Booking settlement
+//
+// Completing a booking and releasing its escrow is one call to settle_bookings
+// (202610170011_settle_bookings.sql): the status change, the client escrow debit,
+// the talent credit and the earnings ledger row commit together or not at all.
+// Booking rows are locked for the call, so concurrent completes of the same
+// booking settle it once and the others see 'already_settled'.
+
+export type SettlementStatus =
+    | 'settled'
+    | 'already_settled'
+    | 'insufficient_escrow'
+    | 'invalid_status'
+    | 'forbidden'
+    | 'not_found'
+
+export interface BookingSettlement {
+    booking_id: string
+    status: SettlementStatus
+    booking_status: string | null
+    client_id: string | null
+    talent_id: string | null
+    amount: number | null
+}
+
+// Ids per settle_bookings call when settling in bulk
+const SETTLE_BATCH_SIZE = 200
+
+/**
+ * Settle bookings in one database round trip per batch.
+ *
+ * complete: move confirmed bookings to completed first; any other status is
+ * 'invalid_status'. Without it only already-completed bookings are settled.
+ * talentId: refuse bookings that belong to another talent.
+ */
+export async function settleBookings(
+    bookingIds: string[],
+    options: { complete?: boolean; talentId?: string | null } = {}
+): Promise<BookingSettlement[]> {
+    const supabase = createApiClient()
+    const settlements: BookingSettlement[] = []
+
+    for (let start = 0; start < bookingIds.length; start += SETTLE_BATCH_SIZE) {
+        const { data, error } = await supabase.rpc('settle_bookings', {
+            p_booking_ids: bookingIds.slice(start, start + SETTLE_BATCH_SIZE),
+            p_complete: options.complete ?? true,
+            p_talent_id: options.talentId ?? null,
+        })
+
+        if (error) {
+            throw new Error(`settle_bookings failed: ${error.message}`)
+        }
+
+        settlements.push(...((data || []) as BookingSettlement[]))
+    }
+
+    return settlements
+}
+
+/**
+ * Settle a single booking; see settleBookings
+ */
+export async function settleBooking(
+    bookingId: string,
+    options: { complete?: boolean; talentId?: string | null } = {}
+): Promise<BookingSettlement> {
+    const [settlement] = await settleBookings([bookingId], options)
+    return settlement ?? {
+        booking_id: bookingId,
+        status: 'not_found',
+        booking_status: null,
+        client_id: null,
+        talent_id: null,
+        amount: null,
+    }
+}
@@ -1,4 +1,4 @@
-import { notifyUser } from '@/lib/notifications'
+import { notifyBatch, notifyUser } from '@/lib/notifications'
 import { createApiClient } from '@/lib/supabase/api'
 
 // Shared logic to process a successful transaction
@@ -16,7 +16,11 @@ interface ProcessResult {
     newBalance?: number
 }
 
-async function sendPurchaseSuccessNotifications(
+export type PaymentProvider = 'paystack' | 'segpay' | 'nowpayments'
+
+type PurchaseNotification = Parameters<typeof notifyBatch>[0][number]
+
+export function purchaseSuccessNotifications(
     transaction: {
         user_id: string
         id: string
@@ -24,36 +28,46 @@ async function sendPurchaseSuccessNotifications(
         amount: number
         reference: string | null
     },
-    provider: 'paystack' | 'segpay' | 'nowpayments',
+    provider: PaymentProvider,
     newBalance: number
-) {
-    try {
-        await notifyUser({
-            userId: transaction.user_id,
-            type: 'purchase_success',
-            title: 'Purchase Successful! 🎉',
-            message: `Your purchase of ${transaction.coins.toLocaleString()} coins was successful via ${provider}. New balance: ${newBalance.toLocaleString()}.`,
-            data: {
-                transaction_id: transaction.id,
-                coins: transaction.coins,
-                amount: transaction.amount,
-                new_balance: newBalance,
-                reference: transaction.reference,
-                provider,
-            },
+): PurchaseNotification[] {
+    const notifications: PurchaseNotification[] = [{
+        userIds: [transaction.user_id],
+        type: 'purchase_success',
+        title: 'Purchase Successful! 🎉',
+        message: `Your purchase of ${transaction.coins.toLocaleString()} coins was successful via ${provider}. New balance: ${newBalance.toLocaleString()}.`,
+        data: {
+            transaction_id: transaction.id,
+            coins: transaction.coins,
+            amount: transaction.amount,
+            new_balance: newBalance,
+            reference: transaction.reference,
+            provider,
+        },
+        url: '/dashboard/wallet',
+    }]
+
+    if (newBalance < 100) {
+        notifications.push({
+            userIds: [transaction.user_id],
+            type: 'low_balance',
+            title: 'Low Balance Warning ⚠️',
+            message: `Your balance is low (${newBalance.toLocaleString()} coins).`,
+            data: { current_balance: newBalance, threshold: 100 },
             url: '/dashboard/wallet',
         })
+    }
 
-        if (newBalance < 100) {
-            await notifyUser({
-                userId: transaction.user_id,
-                type: 'low_balance',
-                title: 'Low Balance Warning ⚠️',
-                message: `Your balance is low (${newBalance.toLocaleString()} coins).`,
-                data: { current_balance: newBalance, threshold: 100 },
-                url: '/dashboard/wallet',
-            })
-        }
+    return notifications
+}
+
+async function sendPurchaseSuccessNotifications(
+    transaction: Parameters<typeof purchaseSuccessNotifications>[0],
+    provider: PaymentProvider,
+    newBalance: number
+) {
+    try {
+        await notifyBatch(purchaseSuccessNotifications(transaction, provider, newBalance))
     } catch (notificationError) {
         console.warn(`[${provider} Payment] Notification delivery failed after settlement:`, notificationError)
     }
@@ -62,7 +76,7 @@ async function sendPurchaseSuccessNotifications(
 export async function processSuccessfulTransaction(
     reference: string,
     amountInNaira: number,
-    provider: 'paystack' | 'segpay' | 'nowpayments'
+    provider: PaymentProvider
 ): Promise<ProcessResult> {
     const supabase = createApiClient()
 
@@ -0,0 +1,217 @@
+import { after } from 'next/server'
+import { notifyBatch } from '@/lib/notifications'
+import { createApiClient } from '@/lib/supabase/api'
+import { startTrace, type RequestTrace } from '@/lib/tracing'
+import { purchaseSuccessNotifications, type PaymentProvider } from '@/services/paymentResponse'
+
+// Queued payment webhook processing
+//
+// Provider webhooks only verify the signature and enqueue the event, keyed by
+// (provider, reference) so a provider retry is a no-op, unless the event has
+// failed for good, in which case the redelivery requeues it. Settlement happens in
+// settle_payment_webhook_events, drained after the webhook response is sent, after
+// /api/transactions/verify, and through /api/webhooks/drain, which pg_cron calls as
+// soon as a retry is due (202610170018) and Vercel Cron calls daily as a safety net.
+// Events that run out of attempts are reported to admins.
+
+// Events per settle_payment_webhook_events call
+const SETTLE_BATCH_SIZE = 50
+
+// Bound a single drain so one invocation cannot run past its function timeout
+const MAX_BATCHES_PER_DRAIN = 20
+
+export interface PaymentWebhookEvent {
+    provider: PaymentProvider
+    reference: string
+    amount: number
+    payload?: unknown
+}
+
+interface SettlementRow {
+    event_id: number
+    provider: PaymentProvider
+    reference: string
+    // failed: out of attempts, until the provider redelivers the event
+    status: 'success' | 'retry' | 'failed'
+    credited: boolean
+    error: string | null
+    new_balance: number | null
+    transaction_id: string | null
+    user_id: string | null
+    coins: number | null
+    amount: number | null
+}
+
+export interface DrainResult {
+    settled: number
+    credited: number
+    retrying: number
+    failed: number
+    batches: number
+}
+
+/**
+ * Durably record a verified webhook event. Returns duplicate: true when the
+ * provider has already delivered this reference and it is pending or processed;
+ * a redelivery of an event that failed for good puts it back in the queue.
+ */
+export async function enqueuePaymentWebhook(
+    event: PaymentWebhookEvent
+): Promise<{ duplicate: boolean; error?: string }> {
+    const supabase = createApiClient()
+    const { data, error } = await supabase.rpc('enqueue_payment_webhook_event', {
+        p_provider: event.provider,
+        p_reference: event.reference,
+        p_amount: event.amount,
+        p_payload: event.payload ?? null,
+    })
+
+    if (error) {
+        console.error(`[${event.provider} Webhook] Failed to enqueue event:`, error)
+        return { duplicate: false, error: error.message }
+    }
+
+    if (data === 'requeued') {
+        console.log(`[${event.provider} Webhook] Requeued failed event ${event.reference} on redelivery`)
+    }
+
+    return { duplicate: data === 'duplicate' }
+}
+
+async function settleBatch(): Promise<SettlementRow[]> {
+    const supabase = createApiClient()
+    const { data, error } = await supabase.rpc('settle_payment_webhook_events', {
+        p_limit: SETTLE_BATCH_SIZE,
+    })
+
+    if (error) {
+        throw new Error(`settle_payment_webhook_events failed: ${error.message}`)
+    }
+
+    return (data || []) as SettlementRow[]
+}
+
+/**
+ * Admin alert for events that ran out of settlement attempts. The payment was
+ * acknowledged to the provider, so it stays uncredited until the provider
+ * redelivers it or an admin settles it.
+ */
+function settlementFailureAlert(rows: SettlementRow[]) {
+    const references = rows.map((row) => `${row.provider}:${row.reference}`)
+    return {
+        type: 'general' as const,
+        title: 'Payment settlement failed',
+        message: rows.length === 1
+            ? `Payment ${references[0]} could not be credited after repeated attempts: ${rows[0]!.error || 'unknown error'}`
+            : `${rows.length} payments could not be credited after repeated attempts: ${references.join(', ')}`,
+        data: {
+            events: rows.map((row) => ({
+                event_id: row.event_id,
+                provider: row.provider,
+                reference: row.reference,
+                error: row.error,
+            })),
+        },
+        roles: ['admin' as const],
+    }
+}
+
+let activeDrain: Promise<DrainResult> | null = null
+
+/**
+ * Settle queued events in batches until the queue is empty (or the per-drain cap
+ * is hit). Concurrent callers on one instance share the in-flight drain; across
+ * instances the database claims events with skip locked. Batches and
+ * notification sends are recorded on the starting caller's trace.
+ */
+export function drainPaymentWebhooks(trace: RequestTrace = startTrace('payment-webhooks.drain')): Promise<DrainResult> {
+    if (activeDrain) {
+        return activeDrain
+    }
+
+    activeDrain = (async () => {
+        const result: DrainResult = { settled: 0, credited: 0, retrying: 0, failed: 0, batches: 0 }
+        const exhausted: SettlementRow[] = []
+
+        while (result.batches < MAX_BATCHES_PER_DRAIN) {
+            const rows = await trace.span('db.settle_batch', settleBatch)
+            result.batches++
+
+            const notifications = rows.flatMap((row) => {
+                if (row.status === 'retry') {
+                    result.retrying++
+                    console.warn(`[${row.provider} Webhook] Settlement failed for ${row.reference}, will retry:`, row.error)
+                    return []
+                }
+
+                if (row.status === 'failed') {
+                    result.failed++
+                    exhausted.push(row)
+                    console.error(`[${row.provider} Webhook] Settlement failed for good for ${row.reference}:`, row.error)
+                    return []
+                }
+
+                result.settled++
+                if (!row.credited || !row.user_id || !row.transaction_id) {
+                    return []
+                }
+
+                result.credited++
+                console.log(`[${row.provider} Payment] Successfully credited ${row.coins} coins to user ${row.user_id}`)
+                return purchaseSuccessNotifications({
+                    id: row.transaction_id,
+                    user_id: row.user_id,
+                    coins: Number(row.coins ?? 0),
+                    amount: Number(row.amount ?? 0),
+                    reference: row.reference,
+                }, row.provider, Number(row.new_balance ?? 0))
+            })
+
+            if (notifications.length > 0) {
+                try {
+                    await trace.span('notify.batch', () => notifyBatch(notifications))
+                } catch (notificationError) {
+                    console.warn('[Payment Webhooks] Notification delivery failed after settlement:', notificationError)
+                }
+            }
+
+            if (rows.length < SETTLE_BATCH_SIZE) {
+                break
+            }
+        }
+
+        if (exhausted.length > 0) {
+            try {
+                await trace.span('notify.admins', () => notifyBatch([settlementFailureAlert(exhausted)]))
+            } catch (notificationError) {
+                console.error('[Payment Webhooks] Failed to alert admins about failed settlements:', notificationError)
+            }
+        }
+
+        return result
+    })().finally(() => {
+        activeDrain = null
+    })
+
+    return activeDrain
+}
+
+/**
+ * Drain the queue once the current response has been sent
+ */
+export function scheduleWebhookDrain(): void {
+    // Runs after the response, so its timings go to the trace log only
+    const trace = startTrace('payment-webhooks.drain.after')
+    const drain = () => drainPaymentWebhooks(trace).then(() => trace.log(), (error: unknown) => {
+        console.error('[Payment Webhooks] Drain failed:', error)
+    })
+
+    try {
+        after(drain)
+    } catch {
+        // Outside a request scope there is no response to wait for
+        setTimeout(() => {
+            void drain()
+        }, 0)
+    }
+}
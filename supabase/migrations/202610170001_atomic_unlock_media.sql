@@ -0,0 +1,139 @@
+-- Atomic media unlock: one round trip, no overdraft under concurrency.
+--
+-- The route used to look the media row up itself, call unlock_media, and on any RPC
+-- error fall back to a client-side sequence of wallet reads/updates and ledger inserts
+-- (6-7 round trips, no transaction). The previous unlock_media also read the buyer's
+-- balance and wrote back `balance - price` without a row lock, so two concurrent
+-- unlocks from the same wallet could both pass the balance check.
+--
+-- This version keeps the secure signature from 202607040001 and:
+--   * debits with a single conditional UPDATE (balance >= price), so concurrent
+--     unlocks serialize on the wallet row and can never drive it negative
+--   * claims the user_unlocks row first, so a double-click only charges once
+--   * returns a machine-readable `code` plus unlock_price/talent_id, so the route
+--     needs no extra lookups to build its response or notifications
+-- Any failure after the debit raises, which rolls the whole call back.
+
+DO $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT oid::regprocedure AS sig
+        FROM pg_proc
+        WHERE proname = 'unlock_media'
+          AND pronamespace = 'public'::regnamespace
+    LOOP
+        EXECUTE 'DROP FUNCTION ' || r.sig::text;
+    END LOOP;
+END $$;
+
+-- Belt and braces: the ledger may never go negative, whatever the code path.
+-- NOT VALID so existing rows are not re-checked on deploy.
+ALTER TABLE wallets DROP CONSTRAINT IF EXISTS wallets_balance_non_negative;
+ALTER TABLE wallets ADD CONSTRAINT wallets_balance_non_negative CHECK (balance >= 0) NOT VALID;
+
+CREATE OR REPLACE FUNCTION unlock_media(
+    p_user_id UUID,
+    p_media_id UUID
+)
+RETURNS JSON
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_media media%ROWTYPE;
+    v_price INTEGER;
+    v_new_user_balance INTEGER;
+    v_current_balance INTEGER;
+BEGIN
+    IF auth.uid() IS NULL OR auth.uid() <> p_user_id THEN
+        RETURN json_build_object('success', false, 'code', 'forbidden', 'error', 'Forbidden');
+    END IF;
+
+    SELECT * INTO v_media FROM media WHERE id = p_media_id;
+
+    IF NOT FOUND THEN
+        RETURN json_build_object('success', false, 'code', 'not_found', 'error', 'Content not found');
+    END IF;
+
+    v_price := v_media.unlock_price;
+
+    IF NOT COALESCE(v_media.is_premium, false) OR v_price IS NULL OR v_price <= 0 THEN
+        RETURN json_build_object('success', false, 'code', 'not_premium', 'error', 'This content is not available for unlock');
+    END IF;
+
+    IF v_media.talent_id = p_user_id THEN
+        RETURN json_build_object('success', false, 'code', 'own_content', 'error', 'You can''t unlock your own content');
+    END IF;
+
+    BEGIN
+        -- Claim the unlock first. A concurrent duplicate blocks here on the unique
+        -- index and then sees the conflict, so it never reaches the debit.
+        INSERT INTO user_unlocks (user_id, media_id)
+        VALUES (p_user_id, p_media_id)
+        ON CONFLICT (user_id, media_id) DO NOTHING;
+
+        IF NOT FOUND THEN
+            RETURN json_build_object('success', false, 'code', 'already_unlocked', 'error', 'This content is already unlocked');
+        END IF;
+
+        UPDATE wallets
+        SET balance = balance - v_price,
+            updated_at = NOW()
+        WHERE user_id = p_user_id
+          AND balance >= v_price
+        RETURNING balance INTO v_new_user_balance;
+
+        IF NOT FOUND THEN
+            SELECT balance INTO v_current_balance FROM wallets WHERE user_id = p_user_id;
+            IF v_current_balance IS NULL THEN
+                RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'User wallet not found';
+            END IF;
+            RAISE EXCEPTION USING
+                ERRCODE = 'P0001',
+                MESSAGE = format('Insufficient balance. You need %s coins but only have %s coins.', v_price, v_current_balance);
+        END IF;
+
+        UPDATE wallets
+        SET balance = balance + v_price,
+            updated_at = NOW()
+        WHERE user_id = v_media.talent_id;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'Talent wallet not found';
+        END IF;
+
+        INSERT INTO transactions (user_id, amount, coins, type, status, reference_id, description)
+        VALUES
+            (p_user_id, -v_price, -v_price, 'premium_unlock', 'completed', p_media_id, 'Unlocked premium content'),
+            (v_media.talent_id, v_price, v_price, 'premium_unlock', 'completed', p_media_id, 'Content unlock payment');
+    EXCEPTION
+        WHEN SQLSTATE 'P0002' THEN
+            RETURN json_build_object('success', false, 'code', 'wallet_not_found', 'error', SQLERRM);
+        WHEN SQLSTATE 'P0001' THEN
+            RETURN json_build_object(
+                'success', false,
+                'code', 'insufficient_balance',
+                'error', SQLERRM,
+                'unlock_price', v_price,
+                'current_balance', (SELECT balance FROM wallets WHERE user_id = p_user_id)
+            );
+        WHEN OTHERS THEN
+            RETURN json_build_object('success', false, 'code', 'failed', 'error', 'Failed to process unlock. Please try again.');
+    END;
+
+    RETURN json_build_object(
+        'success', true,
+        'message', 'Content unlocked successfully',
+        'new_balance', v_new_user_balance,
+        'unlock_price', v_price,
+        'talent_id', v_media.talent_id
+    );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION unlock_media(UUID, UUID) TO authenticated;
+
+COMMENT ON FUNCTION unlock_media(UUID, UUID) IS 'Atomically unlocks premium media for the calling user: claims the unlock, debits with a conditional update, credits the talent and writes both ledger rows in one call.';
@@ -0,0 +1,113 @@
+-- Set-based booking expiry.
+--
+-- /api/bookings/expire used to load every stale booking and then, per booking, run an
+-- update, a refund-existence check, a wallet read, a wallet update and a transaction
+-- insert. This function expires one chunk of bookings for a status in a single
+-- statement: claim (skip-locked, so overlapping runs never double-process), mark
+-- expired, refund escrow per client in one wallet update, and write the refund ledger
+-- rows. Each call commits on its own, so a run that stops half-way resumes cleanly on
+-- the next call.
+--
+-- Escrow is refunded per client for the whole chunk; a client whose escrow does not
+-- cover the chunk's total is left for manual review (their bookings are still expired
+-- and they are notified). 202610170019 replaces this with a per-booking guard.
+
+create index if not exists idx_bookings_status_created_at
+    on public.bookings (status, created_at);
+
+create index if not exists idx_transactions_reference_type
+    on public.transactions (reference_id, type);
+
+create or replace function public.expire_stale_bookings(
+    p_status text,
+    p_cutoff timestamptz,
+    p_limit integer default 500
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_result jsonb;
+begin
+    with claimed as (
+        select id
+        from public.bookings
+        where status::text = p_status
+          and created_at < p_cutoff
+        order by created_at
+        limit p_limit
+        for update skip locked
+    ),
+    expired as (
+        update public.bookings b
+        set status = 'expired',
+            updated_at = now()
+        from claimed c
+        where b.id = c.id
+        returning b.id, b.client_id, b.talent_id, b.total_price
+    ),
+    prior_refunds as (
+        select distinct t.reference_id as booking_id
+        from public.transactions t
+        join expired e on e.id = t.reference_id
+        where t.type = 'refund'
+    ),
+    refundable as (
+        select e.*
+        from expired e
+        where p_status = 'payment_pending'
+          and e.total_price > 0
+          and e.client_id is not null
+          and not exists (select 1 from prior_refunds pr where pr.booking_id = e.id)
+    ),
+    per_client as (
+        select client_id, sum(total_price) as total
+        from refundable
+        group by client_id
+    ),
+    credited as (
+        update public.wallets w
+        set escrow_balance = w.escrow_balance - pc.total,
+            balance = w.balance + pc.total,
+            updated_at = now()
+        from per_client pc
+        where w.user_id = pc.client_id
+          and w.escrow_balance >= pc.total
+        returning w.user_id
+    ),
+    ledger as (
+        insert into public.transactions (user_id, amount, coins, type, status, description, reference_id)
+        select r.client_id, 0, r.total_price, 'refund', 'completed',
+               'Refund for expired booking #' || left(r.id::text, 8), r.id
+        from refundable r
+        join credited c on c.user_id = r.client_id
+        returning reference_id
+    )
+    select jsonb_build_object(
+        'expired', (select count(*) from expired),
+        'refunded', (select count(*) from ledger) + (select count(*) from prior_refunds),
+        'bookings', coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'id', e.id,
+                'client_id', e.client_id,
+                'talent_name', p.display_name,
+                'refunded', e.id in (select reference_id from ledger)
+                         or e.id in (select booking_id from prior_refunds)
+            ))
+            from expired e
+            left join public.profiles p on p.id = e.talent_id
+        ), '[]'::jsonb)
+    )
+    into v_result;
+
+    return v_result;
+end;
+$$;
+
+revoke all on function public.expire_stale_bookings(text, timestamptz, integer) from public, anon, authenticated;
+grant execute on function public.expire_stale_bookings(text, timestamptz, integer) to service_role;
+
+comment on function public.expire_stale_bookings(text, timestamptz, integer) is
+    'Expires up to p_limit bookings in p_status created before p_cutoff, refunding payment_pending escrow and writing refund ledger rows in one statement.';
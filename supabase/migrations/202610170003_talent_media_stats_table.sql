@@ -0,0 +1,158 @@
+-- Stored, trigger-maintained talent media stats.
+--
+-- talents_with_media_stats aggregated every talent against every media row on each
+-- read (GROUP BY p.id), and /hidden/talents reads it with limit 10000 and a
+-- total_media DESC, created_at DESC sort, so every page load was a full aggregate
+-- plus a sort. talent_media_stats keeps one row per talent, updated by triggers on
+-- media insert/delete/update and on profile role changes, with an index matching
+-- the page's ordering so the read is an index scan.
+
+create table if not exists public.talent_media_stats (
+    talent_id uuid primary key references public.profiles(id) on delete cascade,
+    total_media integer not null default 0,
+    premium_media integer not null default 0,
+    free_media integer not null default 0,
+    -- Copy of profiles.created_at so the page's sort can be served by one index
+    talent_created_at timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists idx_talent_media_stats_ranking
+    on public.talent_media_stats (total_media desc, talent_created_at desc);
+
+alter table public.talent_media_stats enable row level security;
+
+drop policy if exists "Talent media stats viewable by everyone" on public.talent_media_stats;
+create policy "Talent media stats viewable by everyone" on public.talent_media_stats
+    for select using (true);
+
+-- Backfill from the same aggregate the view used (talents with zero media included)
+insert into public.talent_media_stats (talent_id, total_media, premium_media, free_media, talent_created_at)
+select
+    p.id,
+    count(m.id),
+    count(m.id) filter (where m.is_premium),
+    count(m.id) filter (where not m.is_premium),
+    p.created_at
+from public.profiles p
+left join public.media m on m.talent_id = p.id
+where p.role = 'talent'
+group by p.id
+on conflict (talent_id) do update
+set total_media = excluded.total_media,
+    premium_media = excluded.premium_media,
+    free_media = excluded.free_media,
+    talent_created_at = excluded.talent_created_at,
+    updated_at = now();
+
+-- Apply a +1/-1 delta for one media row. Only talents have a stats row, so media
+-- owned by anyone else is a no-op update.
+create or replace function public.apply_talent_media_delta(
+    p_talent_id uuid,
+    p_is_premium boolean,
+    p_delta integer
+)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if p_talent_id is null then
+        return;
+    end if;
+
+    update public.talent_media_stats
+    set total_media = total_media + p_delta,
+        premium_media = premium_media + case when p_is_premium is true then p_delta else 0 end,
+        free_media = free_media + case when p_is_premium is false then p_delta else 0 end,
+        updated_at = now()
+    where talent_id = p_talent_id;
+end;
+$$;
+
+create or replace function public.sync_talent_media_stats_from_media()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') then
+        perform public.apply_talent_media_delta(old.talent_id, old.is_premium, -1);
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.apply_talent_media_delta(new.talent_id, new.is_premium, 1);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists on_media_changed_sync_stats on public.media;
+create trigger on_media_changed_sync_stats
+    after insert or delete on public.media
+    for each row
+    execute function public.sync_talent_media_stats_from_media();
+
+drop trigger if exists on_media_updated_sync_stats on public.media;
+create trigger on_media_updated_sync_stats
+    after update of talent_id, is_premium on public.media
+    for each row
+    when (old.talent_id is distinct from new.talent_id or old.is_premium is distinct from new.is_premium)
+    execute function public.sync_talent_media_stats_from_media();
+
+-- Keep the row set in step with profiles.role and the sort key in step with
+-- profiles.created_at. A profile that becomes a talent is counted once here;
+-- from then on the media triggers keep it current.
+create or replace function public.sync_talent_media_stats_from_profile()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if new.role::text = 'talent' then
+        insert into public.talent_media_stats (talent_id, total_media, premium_media, free_media, talent_created_at)
+        select
+            new.id,
+            count(m.id),
+            count(m.id) filter (where m.is_premium),
+            count(m.id) filter (where not m.is_premium),
+            new.created_at
+        from public.media m
+        where m.talent_id = new.id
+        on conflict (talent_id) do update
+        set talent_created_at = excluded.talent_created_at,
+            updated_at = now();
+    else
+        delete from public.talent_media_stats where talent_id = new.id;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists on_profile_changed_sync_media_stats on public.profiles;
+create trigger on_profile_changed_sync_media_stats
+    after insert or update of role, created_at on public.profiles
+    for each row
+    execute function public.sync_talent_media_stats_from_profile();
+
+revoke all on function public.apply_talent_media_delta(uuid, boolean, integer) from public, anon, authenticated;
+
+-- Keep the view for any other readers, now backed by the stored stats
+create or replace view public.talents_with_media_stats as
+select
+    p.*,
+    s.total_media::bigint as total_media,
+    s.premium_media::bigint as premium_media,
+    s.free_media::bigint as free_media
+from public.talent_media_stats s
+join public.profiles p on p.id = s.talent_id;
+
+alter view public.talents_with_media_stats set (security_invoker = true);
+
+comment on table public.talent_media_stats is
+    'Per-talent media counts maintained by triggers on media and profiles; ordered reads use idx_talent_media_stats_ranking.';
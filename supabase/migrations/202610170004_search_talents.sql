@@ -0,0 +1,111 @@
+-- Indexed talent search for the browse page.
+--
+-- Browse used `display_name.ilike.%q%,username.ilike.%q%,...`, and a leading-wildcard
+-- ILIKE cannot use idx_profiles_search_text, so every search scanned profiles.
+-- search_talents matches against the exact tsvector expression of
+-- idx_profiles_search_text (with prefix matching on every term), falls back to
+-- trigram similarity on display_name/username for typos, and keeps the location
+-- substring match on a trigram index. Results are ranked, filtered and paginated
+-- in one call; the caller fetches the page of profiles by id.
+
+create extension if not exists pg_trgm with schema extensions;
+
+create index if not exists idx_profiles_display_name_trgm
+    on public.profiles using gin (display_name extensions.gin_trgm_ops)
+    where role = 'talent';
+
+create index if not exists idx_profiles_username_trgm
+    on public.profiles using gin (username extensions.gin_trgm_ops)
+    where role = 'talent';
+
+create index if not exists idx_profiles_location_trgm
+    on public.profiles using gin (location extensions.gin_trgm_ops)
+    where role = 'talent';
+
+create or replace function public.search_talents(
+    p_query text,
+    p_location text default null,
+    p_gender text default null,
+    p_status text default null,
+    p_service_id uuid default null,
+    p_sort text default 'relevance',
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (id uuid, rank real, total_count bigint)
+language sql
+stable
+set search_path = public, extensions
+as $$
+    with q as (
+        select
+            nullif(trim(p_query), '') as raw,
+            (
+                select to_tsquery('english', string_agg(term || ':*', ' & '))
+                from regexp_split_to_table(lower(coalesce(p_query, '')), '[^[:alnum:]]+') as term
+                where term <> ''
+            ) as ts
+    ),
+    matches as (
+        select
+            p.id,
+            p.created_at,
+            p.starting_price,
+            (
+                coalesce(ts_rank(
+                    to_tsvector('english',
+                        coalesce(p.display_name, '') || ' ' ||
+                        coalesce(p.username, '') || ' ' ||
+                        coalesce(p.bio, '')
+                    ),
+                    q.ts
+                ), 0) * 2
+                + greatest(
+                    similarity(coalesce(p.display_name, ''), q.raw),
+                    similarity(coalesce(p.username, ''), q.raw)
+                )
+            )::real as rank
+        from public.profiles p
+        cross join q
+        where p.role = 'talent'
+          and q.raw is not null
+          and (
+              to_tsvector('english',
+                  coalesce(p.display_name, '') || ' ' ||
+                  coalesce(p.username, '') || ' ' ||
+                  coalesce(p.bio, '')
+              ) @@ q.ts
+              or p.display_name % q.raw
+              or p.username % q.raw
+              or p.location ilike '%' || q.raw || '%'
+          )
+          and (p_location is null or p.location = p_location)
+          and (p_gender is null or p.gender::text = p_gender)
+          and (p_status is null or p.status::text = p_status)
+          and (
+              p_service_id is null
+              or exists (
+                  select 1
+                  from public.talent_menus tm
+                  where tm.talent_id = p.id
+                    and tm.service_type_id = p_service_id
+                    and tm.is_active = true
+              )
+          )
+    )
+    select m.id, m.rank, count(*) over () as total_count
+    from matches m
+    order by
+        case when p_sort = 'price_low' then m.starting_price end asc nulls last,
+        case when p_sort = 'price_high' then m.starting_price end desc nulls last,
+        case when p_sort = 'recent' then m.created_at end desc,
+        m.rank desc,
+        m.created_at desc
+    limit greatest(p_limit, 0)
+    offset greatest(p_offset, 0);
+$$;
+
+grant execute on function public.search_talents(text, text, text, text, uuid, text, integer, integer) to anon, authenticated, service_role;
+
+comment on function public.search_talents(text, text, text, text, uuid, text, integer, integer) is
+    'Ranked talent search over idx_profiles_search_text with prefix matching and trigram fallback, combined with browse filters. Returns one page of ids plus the total match count.';
@@ -0,0 +1,19 @@
+-- Indexes for keyset pagination.
+--
+-- Browse and message history now page by (sort column, id) cursors instead of
+-- OFFSET, so each page is a range scan that starts where the previous one ended.
+-- These indexes cover the cursor orderings with id as the tiebreaker.
+
+-- Browse: recent first
+create index if not exists idx_profiles_talent_created_keyset
+    on public.profiles (created_at desc, id desc)
+    where role = 'talent';
+
+-- Browse: price low; NULL prices sort last (price high: 202610170021)
+create index if not exists idx_profiles_talent_price_keyset
+    on public.profiles (starting_price asc nulls last, id asc)
+    where role = 'talent';
+
+-- Message history: newest page first, older pages on demand
+create index if not exists idx_messages_conversation_keyset
+    on public.messages (conversation_id, created_at desc, id desc);
@@ -0,0 +1,463 @@
+-- Pre-aggregated analytics rollups for the admin analytics page and weekly digest.
+--
+-- /admin/analytics pulled every booking (with services_snapshot), every wallet, all
+-- verifications and all disputes into the server on each render, and
+-- /api/admin/digest summed every purchase transaction client-side. Both now read
+-- rollups that triggers keep current:
+--
+--   analytics_daily_rollups   (day, metric, dimension) -> count, amount
+--   analytics_hourly_rollups  (hour, metric, dimension) -> count, amount
+--   analytics_totals          (metric, dimension) -> count, amount
+--
+-- Daily metrics:
+--   signups            dimension = role
+--   signups_location   dimension = location
+--   bookings           dimension = status, amount = sum(total_price)
+--   booking_services   dimension = service name from services_snapshot
+--   talent_revenue     dimension = talent_id, completed bookings only
+--   revenue            completed purchase transactions, amount = sum(amount)
+-- Hourly metrics:
+--   bookings           bookings created in that hour
+-- Totals:
+--   booking_clients, repeat_booking_clients (clients with >= 1 / >= 2 bookings)
+--
+-- Buckets use the row's created_at in UTC.
+
+create table if not exists public.analytics_daily_rollups (
+    day date not null,
+    metric text not null,
+    dimension text not null default '',
+    count bigint not null default 0,
+    amount bigint not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (day, metric, dimension)
+);
+
+create index if not exists idx_analytics_daily_rollups_metric_day
+    on public.analytics_daily_rollups (metric, day);
+
+create table if not exists public.analytics_hourly_rollups (
+    hour timestamptz not null,
+    metric text not null,
+    dimension text not null default '',
+    count bigint not null default 0,
+    amount bigint not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (hour, metric, dimension)
+);
+
+create table if not exists public.analytics_totals (
+    metric text not null,
+    dimension text not null default '',
+    count bigint not null default 0,
+    amount bigint not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (metric, dimension)
+);
+
+alter table public.analytics_daily_rollups enable row level security;
+alter table public.analytics_hourly_rollups enable row level security;
+alter table public.analytics_totals enable row level security;
+
+drop policy if exists "Admins can view daily rollups" on public.analytics_daily_rollups;
+create policy "Admins can view daily rollups" on public.analytics_daily_rollups
+    for select using (
+        exists (select 1 from public.profiles where profiles.id = auth.uid() and profiles.role = 'admin')
+    );
+
+drop policy if exists "Admins can view hourly rollups" on public.analytics_hourly_rollups;
+create policy "Admins can view hourly rollups" on public.analytics_hourly_rollups
+    for select using (
+        exists (select 1 from public.profiles where profiles.id = auth.uid() and profiles.role = 'admin')
+    );
+
+drop policy if exists "Admins can view analytics totals" on public.analytics_totals;
+create policy "Admins can view analytics totals" on public.analytics_totals
+    for select using (
+        exists (select 1 from public.profiles where profiles.id = auth.uid() and profiles.role = 'admin')
+    );
+
+-- ============================================
+-- Bump helpers
+-- ============================================
+
+create or replace function public.bump_analytics_daily(
+    p_at timestamptz,
+    p_metric text,
+    p_dimension text,
+    p_count bigint,
+    p_amount bigint
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    values ((coalesce(p_at, now()) at time zone 'utc')::date, p_metric, coalesce(p_dimension, ''), p_count, p_amount)
+    on conflict (day, metric, dimension) do update
+    set count = analytics_daily_rollups.count + excluded.count,
+        amount = analytics_daily_rollups.amount + excluded.amount,
+        updated_at = now();
+$$;
+
+create or replace function public.bump_analytics_hourly(
+    p_at timestamptz,
+    p_metric text,
+    p_dimension text,
+    p_count bigint,
+    p_amount bigint
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.analytics_hourly_rollups (hour, metric, dimension, count, amount)
+    values (date_trunc('hour', coalesce(p_at, now()) at time zone 'utc') at time zone 'utc', p_metric, coalesce(p_dimension, ''), p_count, p_amount)
+    on conflict (hour, metric, dimension) do update
+    set count = analytics_hourly_rollups.count + excluded.count,
+        amount = analytics_hourly_rollups.amount + excluded.amount,
+        updated_at = now();
+$$;
+
+create or replace function public.bump_analytics_total(
+    p_metric text,
+    p_dimension text,
+    p_count bigint,
+    p_amount bigint
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.analytics_totals (metric, dimension, count, amount)
+    values (p_metric, coalesce(p_dimension, ''), p_count, p_amount)
+    on conflict (metric, dimension) do update
+    set count = analytics_totals.count + excluded.count,
+        amount = analytics_totals.amount + excluded.amount,
+        updated_at = now();
+$$;
+
+-- ============================================
+-- Profiles: signups
+-- ============================================
+
+create or replace function public.analytics_track_profile()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.bump_analytics_daily(old.created_at, 'signups', old.role::text, -1, 0);
+        if old.location is not null then
+            perform public.bump_analytics_daily(old.created_at, 'signups_location', old.location, -1, 0);
+        end if;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.bump_analytics_daily(new.created_at, 'signups', new.role::text, 1, 0);
+        if new.location is not null then
+            perform public.bump_analytics_daily(new.created_at, 'signups_location', new.location, 1, 0);
+        end if;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_profile_changes on public.profiles;
+create trigger tr_analytics_profile_changes
+    after insert or delete on public.profiles
+    for each row execute function public.analytics_track_profile();
+
+drop trigger if exists tr_analytics_profile_updates on public.profiles;
+create trigger tr_analytics_profile_updates
+    after update of role, location, created_at on public.profiles
+    for each row
+    when (old.role is distinct from new.role
+          or old.location is distinct from new.location
+          or old.created_at is distinct from new.created_at)
+    execute function public.analytics_track_profile();
+
+-- ============================================
+-- Bookings: status/value, services, talent revenue, peak hour, retention
+-- ============================================
+
+create or replace function public.analytics_apply_booking(
+    p_booking public.bookings,
+    p_sign integer,
+    p_include_created boolean
+)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_service text;
+begin
+    perform public.bump_analytics_daily(p_booking.created_at, 'bookings', p_booking.status::text, p_sign, p_sign * coalesce(p_booking.total_price, 0));
+
+    if p_booking.status::text = 'completed' and p_booking.talent_id is not null then
+        perform public.bump_analytics_daily(p_booking.created_at, 'talent_revenue', p_booking.talent_id::text, p_sign, p_sign * coalesce(p_booking.total_price, 0));
+    end if;
+
+    -- Facts fixed at creation: only counted on insert/delete
+    if p_include_created then
+        perform public.bump_analytics_hourly(p_booking.created_at, 'bookings', '', p_sign, 0);
+
+        if jsonb_typeof(p_booking.services_snapshot) = 'array' then
+            for v_service in
+                select coalesce(elem->>'service_name', elem->'service_type'->>'name', 'Unknown')
+                from jsonb_array_elements(p_booking.services_snapshot) as elem
+            loop
+                perform public.bump_analytics_daily(p_booking.created_at, 'booking_services', v_service, p_sign, 0);
+            end loop;
+        end if;
+    end if;
+end;
+$$;
+
+-- Called after a client gains (p_sign = 1) or loses (p_sign = -1) a booking
+create or replace function public.analytics_apply_booking_client(p_client_id uuid, p_sign integer)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_count bigint;
+begin
+    if p_client_id is null then
+        return;
+    end if;
+
+    select count(*) into v_count from public.bookings where client_id = p_client_id;
+
+    -- v_count is the count after the change; crossing 1 or 2 moves the totals
+    if (p_sign = 1 and v_count = 1) or (p_sign = -1 and v_count = 0) then
+        perform public.bump_analytics_total('booking_clients', '', p_sign, 0);
+    elsif (p_sign = 1 and v_count = 2) or (p_sign = -1 and v_count = 1) then
+        perform public.bump_analytics_total('repeat_booking_clients', '', p_sign, 0);
+    end if;
+end;
+$$;
+
+create or replace function public.analytics_track_booking()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'INSERT' then
+        perform public.analytics_apply_booking(new, 1, true);
+        perform public.analytics_apply_booking_client(new.client_id, 1);
+    elsif tg_op = 'DELETE' then
+        perform public.analytics_apply_booking(old, -1, true);
+        perform public.analytics_apply_booking_client(old.client_id, -1);
+    else
+        perform public.analytics_apply_booking(old, -1, false);
+        perform public.analytics_apply_booking(new, 1, false);
+        if old.client_id is distinct from new.client_id then
+            perform public.analytics_apply_booking_client(old.client_id, -1);
+            perform public.analytics_apply_booking_client(new.client_id, 1);
+        end if;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_booking_changes on public.bookings;
+create trigger tr_analytics_booking_changes
+    after insert or delete on public.bookings
+    for each row execute function public.analytics_track_booking();
+
+drop trigger if exists tr_analytics_booking_updates on public.bookings;
+create trigger tr_analytics_booking_updates
+    after update of status, total_price, talent_id, client_id on public.bookings
+    for each row
+    when (old.status is distinct from new.status
+          or old.total_price is distinct from new.total_price
+          or old.talent_id is distinct from new.talent_id
+          or old.client_id is distinct from new.client_id)
+    execute function public.analytics_track_booking();
+
+-- ============================================
+-- Transactions: completed purchase revenue
+-- ============================================
+
+create or replace function public.analytics_track_transaction()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.type = 'purchase' and old.status = 'completed' then
+        perform public.bump_analytics_daily(old.created_at, 'revenue', '', -1, -coalesce(old.amount, 0));
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') and new.type = 'purchase' and new.status = 'completed' then
+        perform public.bump_analytics_daily(new.created_at, 'revenue', '', 1, coalesce(new.amount, 0));
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_transaction_changes on public.transactions;
+create trigger tr_analytics_transaction_changes
+    after insert or delete on public.transactions
+    for each row execute function public.analytics_track_transaction();
+
+drop trigger if exists tr_analytics_transaction_updates on public.transactions;
+create trigger tr_analytics_transaction_updates
+    after update of type, status, amount, created_at on public.transactions
+    for each row
+    when (old.type is distinct from new.type
+          or old.status is distinct from new.status
+          or old.amount is distinct from new.amount
+          or old.created_at is distinct from new.created_at)
+    execute function public.analytics_track_transaction();
+
+-- ============================================
+-- Backfill
+-- ============================================
+
+truncate public.analytics_daily_rollups, public.analytics_hourly_rollups, public.analytics_totals;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date, 'signups', role::text, count(*), 0
+from public.profiles
+group by 1, 3;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date, 'signups_location', location, count(*), 0
+from public.profiles
+where location is not null
+group by 1, 3;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date, 'bookings', status::text, count(*), coalesce(sum(total_price), 0)
+from public.bookings
+group by 1, 3;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date, 'talent_revenue', talent_id::text, count(*), coalesce(sum(total_price), 0)
+from public.bookings
+where status::text = 'completed' and talent_id is not null
+group by 1, 3;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (b.created_at at time zone 'utc')::date,
+       'booking_services',
+       coalesce(elem->>'service_name', elem->'service_type'->>'name', 'Unknown'),
+       count(*),
+       0
+from public.bookings b
+cross join lateral jsonb_array_elements(
+    case when jsonb_typeof(b.services_snapshot) = 'array' then b.services_snapshot else '[]'::jsonb end
+) as elem
+group by 1, 3;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date, 'revenue', '', count(*), coalesce(sum(amount), 0)
+from public.transactions
+where type = 'purchase' and status = 'completed'
+group by 1;
+
+insert into public.analytics_hourly_rollups (hour, metric, dimension, count, amount)
+select date_trunc('hour', created_at at time zone 'utc') at time zone 'utc', 'bookings', '', count(*), 0
+from public.bookings
+group by 1;
+
+insert into public.analytics_totals (metric, dimension, count, amount)
+select 'booking_clients', '', count(*), 0
+from (select client_id from public.bookings where client_id is not null group by client_id) c;
+
+insert into public.analytics_totals (metric, dimension, count, amount)
+select 'repeat_booking_clients', '', count(*), 0
+from (
+    select client_id from public.bookings
+    where client_id is not null
+    group by client_id
+    having count(*) > 1
+) c;
+
+-- ============================================
+-- Readers
+-- ============================================
+
+-- Lifetime (or since p_since) totals per metric/dimension, summed in the database
+create or replace function public.analytics_rollup_totals(
+    p_metrics text[],
+    p_since date default null
+)
+returns table (metric text, dimension text, count bigint, amount bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select r.metric, r.dimension, sum(r.count)::bigint, sum(r.amount)::bigint
+    from public.analytics_daily_rollups r
+    where r.metric = any(p_metrics)
+      and (p_since is null or r.day >= p_since)
+    group by r.metric, r.dimension;
+$$;
+
+-- Figures that come from small tables or the hourly/total rollups
+create or replace function public.admin_analytics_snapshot()
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select jsonb_build_object(
+        'escrow_total', (select coalesce(sum(escrow_balance), 0) from public.wallets),
+        'avg_verification_hours', (
+            select coalesce(avg(extract(epoch from (updated_at - created_at)) / 3600), 0)
+            from public.verifications
+            where status::text = 'approved' and updated_at is not null
+        ),
+        'disputes_by_type', coalesce((
+            select jsonb_object_agg(dispute_type, n)
+            from (
+                select coalesce(dispute_type, 'other') as dispute_type, count(*) as n
+                from public.disputes
+                group by 1
+            ) d
+        ), '{}'::jsonb),
+        'peak_hour', coalesce((
+            select extract(hour from hour at time zone 'utc')::integer
+            from public.analytics_hourly_rollups
+            where metric = 'bookings'
+            group by 1
+            order by sum(count) desc
+            limit 1
+        ), 0),
+        'booking_clients', coalesce((select count from public.analytics_totals where metric = 'booking_clients' and dimension = ''), 0),
+        'repeat_booking_clients', coalesce((select count from public.analytics_totals where metric = 'repeat_booking_clients' and dimension = ''), 0)
+    );
+$$;
+
+revoke all on function public.bump_analytics_daily(timestamptz, text, text, bigint, bigint) from public, anon, authenticated;
+revoke all on function public.bump_analytics_hourly(timestamptz, text, text, bigint, bigint) from public, anon, authenticated;
+revoke all on function public.bump_analytics_total(text, text, bigint, bigint) from public, anon, authenticated;
+revoke all on function public.analytics_apply_booking(public.bookings, integer, boolean) from public, anon, authenticated;
+revoke all on function public.analytics_apply_booking_client(uuid, integer) from public, anon, authenticated;
+revoke all on function public.analytics_rollup_totals(text[], date) from public, anon, authenticated;
+revoke all on function public.admin_analytics_snapshot() from public, anon, authenticated;
+grant execute on function public.analytics_rollup_totals(text[], date) to service_role;
+grant execute on function public.admin_analytics_snapshot() to service_role;
+
+comment on table public.analytics_daily_rollups is 'Trigger-maintained daily analytics counters; see 202610170006_analytics_rollups.sql for the metric list.';
+comment on table public.analytics_hourly_rollups is 'Trigger-maintained hourly analytics counters (bookings created per hour).';
+comment on table public.analytics_totals is 'Trigger-maintained lifetime analytics counters that cannot be summed from daily rows.';
@@ -0,0 +1,134 @@
+-- Server-side gift leaderboard.
+--
+-- GiftLeaderboard used to select every gift for a talent (joined to each sender's
+-- profile) into the browser and group by sender there. Gift totals are now kept per
+-- recipient and sender by a trigger on gifts, so every gift recorded by handle_gift
+-- updates them in the same transaction:
+--
+--   gift_sender_totals  all-time total per (recipient, sender)
+--   gift_sender_daily   per-day total per (recipient, sender), for the week/month views
+--
+-- gift_leaderboard(recipient, window, limit) returns the top senders with their
+-- profile fields, reading at most one row per sender per day in the window.
+
+create table if not exists public.gift_sender_totals (
+    recipient_id uuid not null references public.profiles(id) on delete cascade,
+    sender_id uuid not null references public.profiles(id) on delete cascade,
+    total_amount bigint not null default 0,
+    gift_count integer not null default 0,
+    last_gift_at timestamptz,
+    primary key (recipient_id, sender_id)
+);
+
+create index if not exists idx_gift_sender_totals_ranking
+    on public.gift_sender_totals (recipient_id, total_amount desc);
+
+create table if not exists public.gift_sender_daily (
+    recipient_id uuid not null references public.profiles(id) on delete cascade,
+    day date not null,
+    sender_id uuid not null references public.profiles(id) on delete cascade,
+    total_amount bigint not null default 0,
+    gift_count integer not null default 0,
+    primary key (recipient_id, day, sender_id)
+);
+
+alter table public.gift_sender_totals enable row level security;
+alter table public.gift_sender_daily enable row level security;
+-- No policies: read through gift_leaderboard() or the service role only
+
+create or replace function public.track_gift_leaderboard()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_sign integer := case when tg_op = 'DELETE' then -1 else 1 end;
+    v_gift public.gifts := case when tg_op = 'DELETE' then old else new end;
+begin
+    insert into public.gift_sender_totals (recipient_id, sender_id, total_amount, gift_count, last_gift_at)
+    values (v_gift.recipient_id, v_gift.sender_id, v_sign * v_gift.amount, v_sign, v_gift.created_at)
+    on conflict (recipient_id, sender_id) do update
+    set total_amount = gift_sender_totals.total_amount + excluded.total_amount,
+        gift_count = gift_sender_totals.gift_count + excluded.gift_count,
+        last_gift_at = greatest(gift_sender_totals.last_gift_at, excluded.last_gift_at);
+
+    insert into public.gift_sender_daily (recipient_id, day, sender_id, total_amount, gift_count)
+    values (
+        v_gift.recipient_id,
+        (coalesce(v_gift.created_at, now()) at time zone 'utc')::date,
+        v_gift.sender_id,
+        v_sign * v_gift.amount,
+        v_sign
+    )
+    on conflict (recipient_id, day, sender_id) do update
+    set total_amount = gift_sender_daily.total_amount + excluded.total_amount,
+        gift_count = gift_sender_daily.gift_count + excluded.gift_count;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_gift_leaderboard on public.gifts;
+create trigger tr_gift_leaderboard
+    after insert or delete on public.gifts
+    for each row execute function public.track_gift_leaderboard();
+
+-- Backfill
+truncate public.gift_sender_totals, public.gift_sender_daily;
+
+insert into public.gift_sender_totals (recipient_id, sender_id, total_amount, gift_count, last_gift_at)
+select recipient_id, sender_id, sum(amount), count(*), max(created_at)
+from public.gifts
+group by recipient_id, sender_id;
+
+insert into public.gift_sender_daily (recipient_id, day, sender_id, total_amount, gift_count)
+select recipient_id, (coalesce(created_at, now()) at time zone 'utc')::date, sender_id, sum(amount), count(*)
+from public.gifts
+group by 1, 2, 3;
+
+create or replace function public.gift_leaderboard(
+    p_recipient_id uuid,
+    p_window text default 'all',
+    p_limit integer default 10
+)
+returns table (
+    sender_id uuid,
+    total_amount bigint,
+    gift_count bigint,
+    display_name text,
+    avatar_url text,
+    username text
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with ranked as (
+        select t.sender_id, t.total_amount, t.gift_count::bigint as gift_count
+        from public.gift_sender_totals t
+        where p_window not in ('week', 'month')
+          and t.recipient_id = p_recipient_id
+          and t.gift_count > 0
+        union all
+        select d.sender_id, sum(d.total_amount)::bigint, sum(d.gift_count)::bigint
+        from public.gift_sender_daily d
+        where p_window in ('week', 'month')
+          and d.recipient_id = p_recipient_id
+          and d.day >= (now() at time zone 'utc')::date
+                       - case when p_window = 'week' then interval '7 days' else interval '1 month' end
+        group by d.sender_id
+        having sum(d.gift_count) > 0
+    )
+    select r.sender_id, r.total_amount, r.gift_count, p.display_name, p.avatar_url, p.username
+    from ranked r
+    left join public.profiles p on p.id = r.sender_id
+    order by r.total_amount desc, r.sender_id
+    limit least(greatest(p_limit, 1), 50);
+$$;
+
+grant execute on function public.gift_leaderboard(uuid, text, integer) to anon, authenticated, service_role;
+
+comment on function public.gift_leaderboard(uuid, text, integer) is
+    'Top gift senders for a recipient over week, month or all time, from the trigger-maintained gift_sender_* aggregates.';
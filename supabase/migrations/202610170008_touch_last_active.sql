@@ -0,0 +1,34 @@
+-- Batched last-active updates.
+--
+-- Talent profile renders used to update profiles.last_active_at for the viewer on
+-- every request. The app now buffers activity per instance (src/lib/view-tracking.ts)
+-- and flushes it with one call per batch. Rows that are already at least as recent
+-- are skipped, so repeated flushes do not rewrite hot profile rows.
+
+create or replace function public.touch_last_active(
+    p_user_ids uuid[],
+    p_at timestamptz default now()
+)
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_updated integer;
+begin
+    update public.profiles
+    set last_active_at = p_at
+    where id = any(p_user_ids)
+      and (last_active_at is null or last_active_at < p_at);
+
+    get diagnostics v_updated = row_count;
+    return v_updated;
+end;
+$$;
+
+revoke all on function public.touch_last_active(uuid[], timestamptz) from public, anon, authenticated;
+grant execute on function public.touch_last_active(uuid[], timestamptz) to service_role;
+
+comment on function public.touch_last_active(uuid[], timestamptz) is
+    'Set last_active_at for a batch of users, skipping rows that are already newer.';
@@ -0,0 +1,63 @@
+-- Resolve a talent profile URL segment in one indexed query.
+--
+-- /t/[slug] used to try username/slug/id with one query and, on a miss, load every
+-- talent's display_name to compare generated slugs in Node before a third query.
+-- resolve_talent_slug() applies the same priority (username > slug > id > display
+-- name slug) in the database. talent_display_slug() mirrors generateSlug() in
+-- src/lib/talent-url.ts and backs an expression index so the last step is a lookup.
+
+create or replace function public.talent_display_slug(p_display_name text)
+returns text
+language sql
+immutable
+parallel safe
+as $$
+    select btrim(regexp_replace(lower(p_display_name), '[^a-z0-9]+', '-', 'g'), '-');
+$$;
+
+create index if not exists idx_profiles_talent_username
+    on public.profiles (username)
+    where role = 'talent';
+
+create index if not exists idx_profiles_talent_slug
+    on public.profiles (slug)
+    where role = 'talent';
+
+create index if not exists idx_profiles_talent_display_slug
+    on public.profiles (public.talent_display_slug(display_name))
+    where role = 'talent';
+
+create or replace function public.resolve_talent_slug(p_slug text)
+returns uuid
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select p.id
+    from public.profiles p
+    where p.role = 'talent'
+      and (
+          p.username = p_slug
+          or p.slug = p_slug
+          -- case keeps the cast from running on non-uuid input
+          or p.id = case
+              when p_slug ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' then p_slug::uuid
+          end
+          or public.talent_display_slug(p.display_name) = p_slug
+      )
+    order by
+        case
+            when p.username = p_slug then 0
+            when p.slug = p_slug then 1
+            when public.talent_display_slug(p.display_name) = p_slug then 3
+            else 2
+        end,
+        p.created_at
+    limit 1;
+$$;
+
+grant execute on function public.resolve_talent_slug(text) to anon, authenticated, service_role;
+
+comment on function public.resolve_talent_slug(text) is
+    'Talent id for a /t/[slug] URL segment: username, then slug, then id, then display name slug.';
@@ -0,0 +1,120 @@
+-- Queued payment webhook processing.
+--
+-- The Paystack, NOWPayments and Segpay webhooks used to settle the payment inside
+-- the provider's request, so a retry during a slow database moment re-ran the whole
+-- path. They now verify the signature, record the event here keyed by
+-- (provider, reference) and acknowledge. A provider retry hits the unique key and
+-- is a no-op.
+--
+-- settle_payment_webhook_events() drains a batch: it claims pending events with
+-- skip locked (so concurrent workers never share an event), settles each through
+-- process_successful_transaction(), and records the outcome. The pending -> completed
+-- transition on transactions stays the ledger guard, so an event that is replayed,
+-- or races /api/transactions/verify, credits the wallet at most once.
+
+create index if not exists idx_transactions_reference
+    on public.transactions (reference);
+
+create table if not exists public.payment_webhook_events (
+    id bigserial primary key,
+    provider text not null check (provider in ('paystack', 'nowpayments', 'segpay')),
+    reference text not null,
+    amount numeric not null,
+    payload jsonb,
+    status text not null default 'pending' check (status in ('pending', 'processed', 'failed')),
+    attempts integer not null default 0,
+    next_attempt_at timestamptz not null default now(),
+    last_error text,
+    received_at timestamptz not null default now(),
+    processed_at timestamptz,
+    unique (provider, reference)
+);
+
+create index if not exists idx_payment_webhook_events_pending
+    on public.payment_webhook_events (next_attempt_at, id)
+    where status = 'pending';
+
+alter table public.payment_webhook_events enable row level security;
+-- No policies: written and drained with the service role only
+
+create or replace function public.settle_payment_webhook_events(
+    p_limit integer default 50,
+    p_max_attempts integer default 5
+)
+returns table (
+    event_id bigint,
+    provider text,
+    reference text,
+    status text,
+    credited boolean,
+    error text,
+    new_balance numeric,
+    transaction_id uuid,
+    user_id uuid,
+    coins numeric,
+    amount numeric
+)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_event public.payment_webhook_events%rowtype;
+    v_result jsonb;
+    v_transaction public.transactions%rowtype;
+    v_failed boolean;
+begin
+    for v_event in
+        select e.*
+        from public.payment_webhook_events e
+        where e.status = 'pending'
+          and e.next_attempt_at <= now()
+        order by e.next_attempt_at, e.id
+        for update skip locked
+        limit least(greatest(p_limit, 1), 500)
+    loop
+        -- process_successful_transaction() traps its own errors and reports them
+        v_result := public.process_successful_transaction(v_event.reference, v_event.amount, v_event.provider);
+        v_failed := coalesce(v_result->>'status', 'failed') <> 'success';
+
+        update public.payment_webhook_events e
+        set attempts = e.attempts + 1,
+            status = case
+                when not v_failed then 'processed'
+                when e.attempts + 1 >= p_max_attempts then 'failed'
+                else 'pending'
+            end,
+            -- Linear backoff between retries
+            next_attempt_at = now() + (e.attempts + 1) * interval '1 minute',
+            last_error = case when v_failed then v_result->>'error' end,
+            processed_at = case when not v_failed then now() end
+        where e.id = v_event.id;
+
+        select t.*
+        into v_transaction
+        from public.transactions t
+        where t.reference = v_event.reference
+        limit 1;
+
+        event_id := v_event.id;
+        provider := v_event.provider;
+        reference := v_event.reference;
+        status := case when v_failed then 'failed' else 'success' end;
+        -- Only the call that moved the transaction to completed reports a credit
+        credited := not v_failed and v_result->>'message' = 'Transaction processed';
+        error := v_result->>'error';
+        new_balance := (v_result->>'new_balance')::numeric;
+        transaction_id := v_transaction.id;
+        user_id := v_transaction.user_id;
+        coins := v_transaction.coins;
+        amount := v_transaction.amount;
+        return next;
+    end loop;
+end;
+$$;
+
+revoke all on function public.settle_payment_webhook_events(integer, integer) from public, anon, authenticated;
+grant execute on function public.settle_payment_webhook_events(integer, integer) to service_role;
+
+comment on function public.settle_payment_webhook_events(integer, integer) is
+    'Settle up to p_limit queued payment webhook events exactly once each; returns one row per event attempted.';
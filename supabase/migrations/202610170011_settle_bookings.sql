@@ -0,0 +1,135 @@
+-- Single-transaction booking settlement.
+--
+-- /api/bookings/[id]/complete used to mark the booking completed and then, as separate
+-- requests, read the client's wallet, decrement escrow, read or create the talent's
+-- wallet, credit it and write the earnings row, logging (but not undoing) any step
+-- that failed. /api/bookings/[id]/release-escrow repeated the same chain with
+-- hand-written rollbacks. settle_bookings() does all of it in one call and one
+-- transaction per booking set:
+--
+--   1. lock each booking row (in id order, so concurrent batches never deadlock)
+--   2. optionally move it confirmed -> completed
+--   3. skip it if its earnings row already exists (replays and concurrent completes
+--      find the lock released and the ledger written)
+--   4. move total_price out of the client's escrow, credit the talent's net amount
+--      (net_amount, or total_price for bookings from before platform fees) and write
+--      the earnings ledger row
+--
+-- A booking whose client escrow does not cover it is still completed but left
+-- unsettled (status 'insufficient_escrow') for an admin to release, rather than
+-- crediting the talent with coins that were never held.
+
+create or replace function public.settle_bookings(
+    p_booking_ids uuid[],
+    p_complete boolean default true,
+    p_talent_id uuid default null
+)
+returns table (
+    booking_id uuid,
+    status text,
+    booking_status text,
+    client_id uuid,
+    talent_id uuid,
+    amount integer
+)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_booking record;
+    v_amount integer;
+begin
+    for v_booking in
+        select b.id, b.client_id, b.talent_id, b.total_price, b.net_amount, b.status::text as status
+        from public.bookings b
+        where b.id = any(p_booking_ids)
+        order by b.id
+        for update
+    loop
+        booking_id := v_booking.id;
+        client_id := v_booking.client_id;
+        talent_id := v_booking.talent_id;
+        booking_status := v_booking.status;
+        v_amount := coalesce(nullif(v_booking.net_amount, 0), v_booking.total_price);
+        amount := v_amount;
+
+        if p_talent_id is not null and v_booking.talent_id is distinct from p_talent_id then
+            status := 'forbidden';
+            return next;
+            continue;
+        end if;
+
+        if p_complete and v_booking.status = 'confirmed' then
+            update public.bookings b
+            set status = 'completed',
+                updated_at = now()
+            where b.id = v_booking.id;
+            booking_status := 'completed';
+        elsif v_booking.status <> 'completed' then
+            status := 'invalid_status';
+            return next;
+            continue;
+        end if;
+
+        if exists (
+            select 1
+            from public.transactions t
+            where t.reference_id = v_booking.id
+              and t.type = 'booking'
+              and t.user_id = v_booking.talent_id
+        ) then
+            status := 'already_settled';
+            return next;
+            continue;
+        end if;
+
+        update public.wallets w
+        set escrow_balance = w.escrow_balance - v_booking.total_price,
+            updated_at = now()
+        where w.user_id = v_booking.client_id
+          and coalesce(w.escrow_balance, 0) >= v_booking.total_price;
+
+        if not found then
+            status := 'insufficient_escrow';
+            return next;
+            continue;
+        end if;
+
+        insert into public.wallets (user_id, balance, escrow_balance)
+        values (v_booking.talent_id, v_amount, 0)
+        on conflict (user_id) do update
+        set balance = coalesce(wallets.balance, 0) + excluded.balance,
+            updated_at = now();
+
+        insert into public.transactions (user_id, amount, coins, type, status, description, reference_id)
+        values (
+            v_booking.talent_id, v_amount, v_amount, 'booking', 'completed',
+            'Earnings from completed booking #' || left(v_booking.id::text, 8), v_booking.id
+        );
+
+        status := 'settled';
+        return next;
+    end loop;
+
+    -- Ids with no booking row
+    for booking_id in
+        select requested.id
+        from unnest(p_booking_ids) as requested(id)
+        where not exists (select 1 from public.bookings b where b.id = requested.id)
+    loop
+        status := 'not_found';
+        booking_status := null;
+        client_id := null;
+        talent_id := null;
+        amount := null;
+        return next;
+    end loop;
+end;
+$$;
+
+revoke all on function public.settle_bookings(uuid[], boolean, uuid) from public, anon, authenticated;
+grant execute on function public.settle_bookings(uuid[], boolean, uuid) to service_role;
+
+comment on function public.settle_bookings(uuid[], boolean, uuid) is
+    'Completes (optionally) and settles bookings atomically: escrow release, talent credit and earnings ledger row, once per booking. p_talent_id restricts to that talent''s bookings.';
@@ -0,0 +1,117 @@
+-- Recompute the trigger-maintained aggregate tables from their source rows.
+--
+-- talent_media_stats, gift_sender_totals/gift_sender_daily and the analytics rollups
+-- are kept current row by row by triggers. Bulk loads (tests/datagen.py) copy millions
+-- of rows with session_replication_role = replica, which skips those triggers, so the
+-- aggregates are rebuilt once afterwards with the same queries as the backfills in
+-- 202610170003, 202610170006 and 202610170007. Also usable to repair drift.
+--
+-- Takes table locks for the duration; run it outside peak traffic.
+
+create or replace function public.rebuild_derived_tables()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    truncate public.talent_media_stats;
+
+    insert into public.talent_media_stats (talent_id, total_media, premium_media, free_media, talent_created_at)
+    select
+        p.id,
+        count(m.id),
+        count(m.id) filter (where m.is_premium),
+        count(m.id) filter (where not m.is_premium),
+        p.created_at
+    from public.profiles p
+    left join public.media m on m.talent_id = p.id
+    where p.role = 'talent'
+    group by p.id;
+
+    truncate public.gift_sender_totals, public.gift_sender_daily;
+
+    insert into public.gift_sender_totals (recipient_id, sender_id, total_amount, gift_count, last_gift_at)
+    select recipient_id, sender_id, sum(amount), count(*), max(created_at)
+    from public.gifts
+    group by recipient_id, sender_id;
+
+    insert into public.gift_sender_daily (recipient_id, day, sender_id, total_amount, gift_count)
+    select recipient_id, (coalesce(created_at, now()) at time zone 'utc')::date, sender_id, sum(amount), count(*)
+    from public.gifts
+    group by 1, 2, 3;
+
+    truncate public.analytics_daily_rollups, public.analytics_hourly_rollups, public.analytics_totals;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups', role::text, count(*), 0
+    from public.profiles
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups_location', location, count(*), 0
+    from public.profiles
+    where location is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'bookings', status::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'talent_revenue', talent_id::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    where status::text = 'completed' and talent_id is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (b.created_at at time zone 'utc')::date,
+           'booking_services',
+           coalesce(elem->>'service_name', elem->'service_type'->>'name', 'Unknown'),
+           count(*),
+           0
+    from public.bookings b
+    cross join lateral jsonb_array_elements(
+        case when jsonb_typeof(b.services_snapshot) = 'array' then b.services_snapshot else '[]'::jsonb end
+    ) as elem
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'revenue', '', count(*), coalesce(sum(amount), 0)
+    from public.transactions
+    where type = 'purchase' and status = 'completed'
+    group by 1;
+
+    insert into public.analytics_hourly_rollups (hour, metric, dimension, count, amount)
+    select date_trunc('hour', created_at at time zone 'utc') at time zone 'utc', 'bookings', '', count(*), 0
+    from public.bookings
+    group by 1;
+
+    insert into public.analytics_totals (metric, dimension, count, amount)
+    select 'booking_clients', '', count(*), 0
+    from (select client_id from public.bookings where client_id is not null group by client_id) c;
+
+    insert into public.analytics_totals (metric, dimension, count, amount)
+    select 'repeat_booking_clients', '', count(*), 0
+    from (
+        select client_id from public.bookings
+        where client_id is not null
+        group by client_id
+        having count(*) > 1
+    ) c;
+
+    return jsonb_build_object(
+        'talent_media_stats', (select count(*) from public.talent_media_stats),
+        'gift_sender_totals', (select count(*) from public.gift_sender_totals),
+        'gift_sender_daily', (select count(*) from public.gift_sender_daily),
+        'analytics_daily_rollups', (select count(*) from public.analytics_daily_rollups)
+    );
+end;
+$$;
+
+revoke all on function public.rebuild_derived_tables() from public, anon, authenticated;
+grant execute on function public.rebuild_derived_tables() to service_role;
+
+comment on function public.rebuild_derived_tables() is
+    'Recomputes talent_media_stats, gift_sender_totals/daily and the analytics rollups from source rows, e.g. after a bulk load that bypassed triggers.';
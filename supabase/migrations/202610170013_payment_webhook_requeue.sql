@@ -0,0 +1,140 @@
+-- Requeue failed payment webhook events on redelivery.
+--
+-- Webhooks acknowledge as soon as the event is queued, so the provider's own
+-- retries no longer cover a settlement failure. An event that ran out of attempts
+-- (a transient error, or a webhook that arrived before its transactions row) was
+-- left 'failed', and a later redelivery of the same reference was dropped as a
+-- duplicate by the unique (provider, reference) key.
+--
+-- enqueue_payment_webhook_event() replaces the plain upsert: a new reference is
+-- queued, a redelivery of a 'failed' event resets it to 'pending' with a fresh
+-- attempt budget, and a redelivery of a pending or processed event stays a no-op.
+--
+-- settle_payment_webhook_events() now reports 'retry' for an attempt that will be
+-- retried and 'failed' only when the event has run out of attempts, so the drain
+-- can alert on terminal failures.
+
+create or replace function public.enqueue_payment_webhook_event(
+    p_provider text,
+    p_reference text,
+    p_amount numeric,
+    p_payload jsonb default null
+)
+returns text
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_inserted boolean;
+begin
+    insert into public.payment_webhook_events as e (provider, reference, amount, payload)
+    values (p_provider, p_reference, p_amount, p_payload)
+    on conflict (provider, reference) do update
+    set status = 'pending',
+        attempts = 0,
+        next_attempt_at = now(),
+        amount = excluded.amount,
+        payload = excluded.payload,
+        received_at = now()
+    where e.status = 'failed'
+    returning (xmax = 0) into v_inserted;
+
+    if not found then
+        return 'duplicate';
+    end if;
+
+    return case when v_inserted then 'queued' else 'requeued' end;
+end;
+$$;
+
+revoke all on function public.enqueue_payment_webhook_event(text, text, numeric, jsonb) from public, anon, authenticated;
+grant execute on function public.enqueue_payment_webhook_event(text, text, numeric, jsonb) to service_role;
+
+comment on function public.enqueue_payment_webhook_event(text, text, numeric, jsonb) is
+    'Queue a verified payment webhook event; requeues a failed event on redelivery. Returns queued, requeued or duplicate.';
+
+create or replace function public.settle_payment_webhook_events(
+    p_limit integer default 50,
+    p_max_attempts integer default 5
+)
+returns table (
+    event_id bigint,
+    provider text,
+    reference text,
+    status text,
+    credited boolean,
+    error text,
+    new_balance numeric,
+    transaction_id uuid,
+    user_id uuid,
+    coins numeric,
+    amount numeric
+)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_event public.payment_webhook_events%rowtype;
+    v_result jsonb;
+    v_transaction public.transactions%rowtype;
+    v_failed boolean;
+    v_exhausted boolean;
+begin
+    for v_event in
+        select e.*
+        from public.payment_webhook_events e
+        where e.status = 'pending'
+          and e.next_attempt_at <= now()
+        order by e.next_attempt_at, e.id
+        for update skip locked
+        limit least(greatest(p_limit, 1), 500)
+    loop
+        -- process_successful_transaction() traps its own errors and reports them
+        v_result := public.process_successful_transaction(v_event.reference, v_event.amount, v_event.provider);
+        v_failed := coalesce(v_result->>'status', 'failed') <> 'success';
+        v_exhausted := v_failed and v_event.attempts + 1 >= p_max_attempts;
+
+        update public.payment_webhook_events e
+        set attempts = e.attempts + 1,
+            status = case
+                when not v_failed then 'processed'
+                when v_exhausted then 'failed'
+                else 'pending'
+            end,
+            -- Linear backoff between retries; pg_cron requests a drain once one is due (202610170018)
+            next_attempt_at = now() + (e.attempts + 1) * interval '1 minute',
+            last_error = case when v_failed then v_result->>'error' end,
+            processed_at = case when not v_failed then now() end
+        where e.id = v_event.id;
+
+        select t.*
+        into v_transaction
+        from public.transactions t
+        where t.reference = v_event.reference
+        limit 1;
+
+        event_id := v_event.id;
+        provider := v_event.provider;
+        reference := v_event.reference;
+        status := case
+            when not v_failed then 'success'
+            when v_exhausted then 'failed'
+            else 'retry'
+        end;
+        -- Only the call that moved the transaction to completed reports a credit
+        credited := not v_failed and v_result->>'message' = 'Transaction processed';
+        error := v_result->>'error';
+        new_balance := (v_result->>'new_balance')::numeric;
+        transaction_id := v_transaction.id;
+        user_id := v_transaction.user_id;
+        coins := v_transaction.coins;
+        amount := v_transaction.amount;
+        return next;
+    end loop;
+end;
+$$;
+
+comment on function public.settle_payment_webhook_events(integer, integer) is
+    'Settle up to p_limit queued payment webhook events exactly once each; returns one row per event attempted (success, retry or failed once out of attempts).';
@@ -0,0 +1,59 @@
+-- Server-side aggregation for the admin analytics window.
+--
+-- /admin/analytics read the raw analytics_daily_rollups rows for its 30-day window.
+-- talent_revenue and signups_location have one row per talent or location per day,
+-- so at scale the read passed PostgREST's max-rows cap and came back silently
+-- truncated, skewing revenue, the weekly stats, the charts and the leaders.
+--
+-- analytics_window() returns a bounded result instead:
+--   daily series     metric in (signups, bookings, revenue), one row per day
+--                    (per status for bookings), dimension '' otherwise
+--   window leaders   metric in (signups_location, talent_revenue), day null, the
+--                    top p_top dimensions by count (locations) or amount (talents)
+
+create or replace function public.analytics_window(
+    p_since date,
+    p_top integer default 5
+)
+returns table (metric text, day date, dimension text, count bigint, amount bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select r.metric,
+           r.day,
+           case when r.metric = 'bookings' then r.dimension else '' end,
+           sum(r.count)::bigint,
+           sum(r.amount)::bigint
+    from public.analytics_daily_rollups r
+    where r.metric in ('signups', 'bookings', 'revenue')
+      and r.day >= p_since
+    group by 1, 2, 3
+
+    union all
+
+    select l.metric, null::date, l.dimension, l.count, l.amount
+    from (
+        select r.metric,
+               r.dimension,
+               sum(r.count)::bigint as count,
+               sum(r.amount)::bigint as amount,
+               row_number() over (
+                   partition by r.metric
+                   order by case when r.metric = 'talent_revenue' then sum(r.amount) else sum(r.count) end desc,
+                            r.dimension
+               ) as rank
+        from public.analytics_daily_rollups r
+        where r.metric in ('signups_location', 'talent_revenue')
+          and r.day >= p_since
+        group by r.metric, r.dimension
+    ) l
+    where l.rank <= least(greatest(p_top, 1), 100);
+$$;
+
+revoke all on function public.analytics_window(date, integer) from public, anon, authenticated;
+grant execute on function public.analytics_window(date, integer) to service_role;
+
+comment on function public.analytics_window(date, integer) is
+    'Daily signups/bookings/revenue series since p_since plus the top p_top locations and talents over the same window.';
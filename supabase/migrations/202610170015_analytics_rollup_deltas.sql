@@ -0,0 +1,392 @@
+-- Contention-free analytics rollup writes.
+--
+-- The 202610170006 triggers upserted the rollup rows in place, so every booking and
+-- purchase transaction updated the same few rows (today's 'revenue', this hour's
+-- 'bookings', the client totals) and concurrent writers queued on one row lock.
+-- analytics_apply_booking_client() also counted the client's bookings inside the
+-- trigger, so two first bookings by one client could both see a count of 1 and
+-- miscount booking_clients / repeat_booking_clients.
+--
+-- Now:
+--   - bump_analytics_daily/hourly append to analytics_daily_deltas /
+--     analytics_hourly_deltas, which are insert-only and have no unique key, so
+--     writers never wait on each other. The trigger functions are unchanged.
+--   - compact_analytics_rollups() folds the deltas into the rollup tables; the
+--     /api/admin/analytics/compact cron runs it every ten minutes.
+--   - The readers (analytics_rollup_totals, analytics_window, the snapshot's peak
+--     hour) sum rollups and pending deltas together, so figures are current between
+--     compactions.
+--   - Client counts are derived from bookings in admin_analytics_snapshot() instead
+--     of a trigger; analytics_totals and its helpers are dropped.
+
+create table if not exists public.analytics_daily_deltas (
+    id bigserial primary key,
+    day date not null,
+    metric text not null,
+    dimension text not null default '',
+    count bigint not null default 0,
+    amount bigint not null default 0
+);
+
+create table if not exists public.analytics_hourly_deltas (
+    id bigserial primary key,
+    hour timestamptz not null,
+    metric text not null,
+    dimension text not null default '',
+    count bigint not null default 0,
+    amount bigint not null default 0
+);
+
+alter table public.analytics_daily_deltas enable row level security;
+alter table public.analytics_hourly_deltas enable row level security;
+-- No policies: written by triggers and read through the security definer readers
+
+-- ============================================
+-- Writers
+-- ============================================
+
+create or replace function public.bump_analytics_daily(
+    p_at timestamptz,
+    p_metric text,
+    p_dimension text,
+    p_count bigint,
+    p_amount bigint
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.analytics_daily_deltas (day, metric, dimension, count, amount)
+    values ((coalesce(p_at, now()) at time zone 'utc')::date, p_metric, coalesce(p_dimension, ''), p_count, p_amount);
+$$;
+
+create or replace function public.bump_analytics_hourly(
+    p_at timestamptz,
+    p_metric text,
+    p_dimension text,
+    p_count bigint,
+    p_amount bigint
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    insert into public.analytics_hourly_deltas (hour, metric, dimension, count, amount)
+    values (date_trunc('hour', coalesce(p_at, now()) at time zone 'utc') at time zone 'utc', p_metric, coalesce(p_dimension, ''), p_count, p_amount);
+$$;
+
+create or replace function public.analytics_track_booking()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'INSERT' then
+        perform public.analytics_apply_booking(new, 1, true);
+    elsif tg_op = 'DELETE' then
+        perform public.analytics_apply_booking(old, -1, true);
+    else
+        perform public.analytics_apply_booking(old, -1, false);
+        perform public.analytics_apply_booking(new, 1, false);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_booking_updates on public.bookings;
+create trigger tr_analytics_booking_updates
+    after update of status, total_price, talent_id on public.bookings
+    for each row
+    when (old.status is distinct from new.status
+          or old.total_price is distinct from new.total_price
+          or old.talent_id is distinct from new.talent_id)
+    execute function public.analytics_track_booking();
+
+drop function if exists public.analytics_apply_booking_client(uuid, integer);
+drop function if exists public.bump_analytics_total(text, text, bigint, bigint);
+drop table if exists public.analytics_totals;
+
+-- ============================================
+-- Compaction
+-- ============================================
+
+create or replace function public.compact_analytics_rollups()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_daily bigint;
+    v_hourly bigint;
+begin
+    -- One compaction at a time; an overlapping call returns straight away
+    if not pg_try_advisory_xact_lock(hashtext('compact_analytics_rollups')) then
+        return jsonb_build_object('skipped', true);
+    end if;
+
+    with moved as (
+        delete from public.analytics_daily_deltas
+        returning day, metric, dimension, count, amount
+    ), merged as (
+        insert into public.analytics_daily_rollups as r (day, metric, dimension, count, amount)
+        select day, metric, dimension, sum(count), sum(amount)
+        from moved
+        group by 1, 2, 3
+        on conflict (day, metric, dimension) do update
+        set count = r.count + excluded.count,
+            amount = r.amount + excluded.amount,
+            updated_at = now()
+        returning 1
+    )
+    select count(*) into v_daily from merged;
+
+    with moved as (
+        delete from public.analytics_hourly_deltas
+        returning hour, metric, dimension, count, amount
+    ), merged as (
+        insert into public.analytics_hourly_rollups as r (hour, metric, dimension, count, amount)
+        select hour, metric, dimension, sum(count), sum(amount)
+        from moved
+        group by 1, 2, 3
+        on conflict (hour, metric, dimension) do update
+        set count = r.count + excluded.count,
+            amount = r.amount + excluded.amount,
+            updated_at = now()
+        returning 1
+    )
+    select count(*) into v_hourly from merged;
+
+    return jsonb_build_object('daily', v_daily, 'hourly', v_hourly);
+end;
+$$;
+
+-- ============================================
+-- Readers
+-- ============================================
+
+-- Compacted rollups plus the deltas written since the last compaction
+create or replace function public.analytics_daily_rows(p_metrics text[], p_since date default null)
+returns table (day date, metric text, dimension text, count bigint, amount bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select r.day, r.metric, r.dimension, r.count, r.amount
+    from public.analytics_daily_rollups r
+    where r.metric = any(p_metrics)
+      and (p_since is null or r.day >= p_since)
+    union all
+    select d.day, d.metric, d.dimension, d.count, d.amount
+    from public.analytics_daily_deltas d
+    where d.metric = any(p_metrics)
+      and (p_since is null or d.day >= p_since);
+$$;
+
+create or replace function public.analytics_rollup_totals(
+    p_metrics text[],
+    p_since date default null
+)
+returns table (metric text, dimension text, count bigint, amount bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select r.metric, r.dimension, sum(r.count)::bigint, sum(r.amount)::bigint
+    from public.analytics_daily_rows(p_metrics, p_since) r
+    group by r.metric, r.dimension;
+$$;
+
+create or replace function public.analytics_window(
+    p_since date,
+    p_top integer default 5
+)
+returns table (metric text, day date, dimension text, count bigint, amount bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select r.metric,
+           r.day,
+           case when r.metric = 'bookings' then r.dimension else '' end,
+           sum(r.count)::bigint,
+           sum(r.amount)::bigint
+    from public.analytics_daily_rows(array['signups', 'bookings', 'revenue'], p_since) r
+    group by 1, 2, 3
+
+    union all
+
+    select l.metric, null::date, l.dimension, l.count, l.amount
+    from (
+        select r.metric,
+               r.dimension,
+               sum(r.count)::bigint as count,
+               sum(r.amount)::bigint as amount,
+               row_number() over (
+                   partition by r.metric
+                   order by case when r.metric = 'talent_revenue' then sum(r.amount) else sum(r.count) end desc,
+                            r.dimension
+               ) as rank
+        from public.analytics_daily_rows(array['signups_location', 'talent_revenue'], p_since) r
+        group by r.metric, r.dimension
+    ) l
+    where l.rank <= least(greatest(p_top, 1), 100);
+$$;
+
+create or replace function public.admin_analytics_snapshot()
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select jsonb_build_object(
+        'escrow_total', (select coalesce(sum(escrow_balance), 0) from public.wallets),
+        'avg_verification_hours', (
+            select coalesce(avg(extract(epoch from (updated_at - created_at)) / 3600), 0)
+            from public.verifications
+            where status::text = 'approved' and updated_at is not null
+        ),
+        'disputes_by_type', coalesce((
+            select jsonb_object_agg(dispute_type, n)
+            from (
+                select coalesce(dispute_type, 'other') as dispute_type, count(*) as n
+                from public.disputes
+                group by 1
+            ) d
+        ), '{}'::jsonb),
+        'peak_hour', coalesce((
+            select extract(hour from h.hour at time zone 'utc')::integer
+            from (
+                select hour, count from public.analytics_hourly_rollups where metric = 'bookings'
+                union all
+                select hour, count from public.analytics_hourly_deltas where metric = 'bookings'
+            ) h
+            group by 1
+            order by sum(h.count) desc
+            limit 1
+        ), 0),
+        -- One pass over idx_bookings_client; the page caches the snapshot for a minute
+        'booking_clients', clients.total,
+        'repeat_booking_clients', clients.repeat
+    )
+    from (
+        select count(*) as total, count(*) filter (where c.bookings > 1) as repeat
+        from (
+            select client_id, count(*) as bookings
+            from public.bookings
+            where client_id is not null
+            group by client_id
+        ) c
+    ) clients;
+$$;
+
+-- rebuild_derived_tables() (202610170012) without analytics_totals, clearing the deltas too
+create or replace function public.rebuild_derived_tables()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    truncate public.talent_media_stats;
+
+    insert into public.talent_media_stats (talent_id, total_media, premium_media, free_media, talent_created_at)
+    select
+        p.id,
+        count(m.id),
+        count(m.id) filter (where m.is_premium),
+        count(m.id) filter (where not m.is_premium),
+        p.created_at
+    from public.profiles p
+    left join public.media m on m.talent_id = p.id
+    where p.role = 'talent'
+    group by p.id;
+
+    truncate public.gift_sender_totals, public.gift_sender_daily;
+
+    insert into public.gift_sender_totals (recipient_id, sender_id, total_amount, gift_count, last_gift_at)
+    select recipient_id, sender_id, sum(amount), count(*), max(created_at)
+    from public.gifts
+    group by recipient_id, sender_id;
+
+    insert into public.gift_sender_daily (recipient_id, day, sender_id, total_amount, gift_count)
+    select recipient_id, (coalesce(created_at, now()) at time zone 'utc')::date, sender_id, sum(amount), count(*)
+    from public.gifts
+    group by 1, 2, 3;
+
+    truncate public.analytics_daily_rollups, public.analytics_hourly_rollups,
+        public.analytics_daily_deltas, public.analytics_hourly_deltas;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups', role::text, count(*), 0
+    from public.profiles
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups_location', location, count(*), 0
+    from public.profiles
+    where location is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'bookings', status::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'talent_revenue', talent_id::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    where status::text = 'completed' and talent_id is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (b.created_at at time zone 'utc')::date,
+           'booking_services',
+           coalesce(elem->>'service_name', elem->'service_type'->>'name', 'Unknown'),
+           count(*),
+           0
+    from public.bookings b
+    cross join lateral jsonb_array_elements(
+        case when jsonb_typeof(b.services_snapshot) = 'array' then b.services_snapshot else '[]'::jsonb end
+    ) as elem
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'revenue', '', count(*), coalesce(sum(amount), 0)
+    from public.transactions
+    where type = 'purchase' and status = 'completed'
+    group by 1;
+
+    insert into public.analytics_hourly_rollups (hour, metric, dimension, count, amount)
+    select date_trunc('hour', created_at at time zone 'utc') at time zone 'utc', 'bookings', '', count(*), 0
+    from public.bookings
+    group by 1;
+
+    return jsonb_build_object(
+        'talent_media_stats', (select count(*) from public.talent_media_stats),
+        'gift_sender_totals', (select count(*) from public.gift_sender_totals),
+        'gift_sender_daily', (select count(*) from public.gift_sender_daily),
+        'analytics_daily_rollups', (select count(*) from public.analytics_daily_rollups)
+    );
+end;
+$$;
+
+
+revoke all on function public.compact_analytics_rollups() from public, anon, authenticated;
+revoke all on function public.analytics_daily_rows(text[], date) from public, anon, authenticated;
+revoke all on function public.analytics_window(date, integer) from public, anon, authenticated;
+grant execute on function public.compact_analytics_rollups() to service_role;
+grant execute on function public.analytics_window(date, integer) to service_role;
+
+comment on table public.analytics_daily_deltas is 'Insert-only daily analytics deltas from the rollup triggers; folded into analytics_daily_rollups by compact_analytics_rollups().';
+comment on table public.analytics_hourly_deltas is 'Insert-only hourly analytics deltas from the rollup triggers; folded into analytics_hourly_rollups by compact_analytics_rollups().';
+comment on function public.compact_analytics_rollups() is
+    'Fold pending analytics deltas into the daily and hourly rollups; returns the number of rollup rows touched.';
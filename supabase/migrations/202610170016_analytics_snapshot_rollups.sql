@@ -0,0 +1,398 @@
+-- Incremental figures for the rest of the admin analytics snapshot.
+--
+-- admin_analytics_snapshot() still derived the booking client counts by grouping
+-- every booking per client, and the verification time and dispute breakdown by
+-- scanning verifications and disputes, so the page's cost grew with lifetime rows.
+-- Those figures now come from the daily rollups like the rest:
+--
+--   booking_clients          clients on the day of their first booking
+--   repeat_booking_clients   clients on the day of their second booking
+--   verification_seconds     approved verifications by created_at day,
+--                            amount = sum(updated_at - created_at) in seconds
+--   disputes                 dimension = dispute_type
+--
+-- booking_client_counts keeps each client's booking count. The booking trigger
+-- upserts it and reads the new count back in the same statement, so two first
+-- bookings by one client serialize on that client's row (and only that row) and
+-- count once. The snapshot now reads only rollup rows and the wallets sum.
+
+create table if not exists public.booking_client_counts (
+    client_id uuid primary key,
+    bookings bigint not null default 0
+);
+
+alter table public.booking_client_counts enable row level security;
+-- No policies: maintained by the booking trigger only
+
+-- ============================================
+-- Bookings: client counts
+-- ============================================
+
+-- Called after a client gains (p_sign = 1) or loses (p_sign = -1) a booking
+create or replace function public.analytics_apply_booking_client(
+    p_client_id uuid,
+    p_at timestamptz,
+    p_sign integer
+)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_count bigint;
+begin
+    if p_client_id is null then
+        return;
+    end if;
+
+    insert into public.booking_client_counts as c (client_id, bookings)
+    values (p_client_id, p_sign)
+    on conflict (client_id) do update
+    set bookings = c.bookings + excluded.bookings
+    returning c.bookings into v_count;
+
+    -- v_count is the count after the change; crossing 1 or 2 moves the totals
+    if (p_sign = 1 and v_count = 1) or (p_sign = -1 and v_count = 0) then
+        perform public.bump_analytics_daily(p_at, 'booking_clients', '', p_sign, 0);
+    elsif (p_sign = 1 and v_count = 2) or (p_sign = -1 and v_count = 1) then
+        perform public.bump_analytics_daily(p_at, 'repeat_booking_clients', '', p_sign, 0);
+    end if;
+end;
+$$;
+
+create or replace function public.analytics_track_booking()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'INSERT' then
+        perform public.analytics_apply_booking(new, 1, true);
+        perform public.analytics_apply_booking_client(new.client_id, new.created_at, 1);
+    elsif tg_op = 'DELETE' then
+        perform public.analytics_apply_booking(old, -1, true);
+        perform public.analytics_apply_booking_client(old.client_id, old.created_at, -1);
+    else
+        perform public.analytics_apply_booking(old, -1, false);
+        perform public.analytics_apply_booking(new, 1, false);
+        if old.client_id is distinct from new.client_id then
+            perform public.analytics_apply_booking_client(old.client_id, old.created_at, -1);
+            perform public.analytics_apply_booking_client(new.client_id, new.created_at, 1);
+        end if;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_booking_updates on public.bookings;
+create trigger tr_analytics_booking_updates
+    after update of status, total_price, talent_id, client_id on public.bookings
+    for each row
+    when (old.status is distinct from new.status
+          or old.total_price is distinct from new.total_price
+          or old.talent_id is distinct from new.talent_id
+          or old.client_id is distinct from new.client_id)
+    execute function public.analytics_track_booking();
+
+-- ============================================
+-- Verifications: time to approval
+-- ============================================
+
+create or replace function public.analytics_track_verification()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.status::text = 'approved' and old.updated_at is not null then
+        perform public.bump_analytics_daily(old.created_at, 'verification_seconds', '', -1,
+            -extract(epoch from (old.updated_at - old.created_at))::bigint);
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') and new.status::text = 'approved' and new.updated_at is not null then
+        perform public.bump_analytics_daily(new.created_at, 'verification_seconds', '', 1,
+            extract(epoch from (new.updated_at - new.created_at))::bigint);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_verification_changes on public.verifications;
+create trigger tr_analytics_verification_changes
+    after insert or delete on public.verifications
+    for each row execute function public.analytics_track_verification();
+
+drop trigger if exists tr_analytics_verification_updates on public.verifications;
+create trigger tr_analytics_verification_updates
+    after update of status, created_at, updated_at on public.verifications
+    for each row
+    when (old.status is distinct from new.status
+          or old.created_at is distinct from new.created_at
+          or old.updated_at is distinct from new.updated_at)
+    execute function public.analytics_track_verification();
+
+-- ============================================
+-- Disputes: by type
+-- ============================================
+
+create or replace function public.analytics_track_dispute()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.bump_analytics_daily(old.created_at, 'disputes', coalesce(old.dispute_type, 'other'), -1, 0);
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.bump_analytics_daily(new.created_at, 'disputes', coalesce(new.dispute_type, 'other'), 1, 0);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists tr_analytics_dispute_changes on public.disputes;
+create trigger tr_analytics_dispute_changes
+    after insert or delete on public.disputes
+    for each row execute function public.analytics_track_dispute();
+
+drop trigger if exists tr_analytics_dispute_updates on public.disputes;
+create trigger tr_analytics_dispute_updates
+    after update of dispute_type, created_at on public.disputes
+    for each row
+    when (old.dispute_type is distinct from new.dispute_type
+          or old.created_at is distinct from new.created_at)
+    execute function public.analytics_track_dispute();
+
+-- ============================================
+-- Backfill
+-- ============================================
+
+truncate public.booking_client_counts;
+
+delete from public.analytics_daily_rollups
+where metric in ('booking_clients', 'repeat_booking_clients', 'verification_seconds', 'disputes');
+delete from public.analytics_daily_deltas
+where metric in ('booking_clients', 'repeat_booking_clients', 'verification_seconds', 'disputes');
+
+insert into public.booking_client_counts (client_id, bookings)
+select client_id, count(*)
+from public.bookings
+where client_id is not null
+group by client_id;
+
+-- A client counts on the day of their first booking, and as repeat on the day of their second
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date,
+       case when n = 1 then 'booking_clients' else 'repeat_booking_clients' end,
+       '',
+       count(*),
+       0
+from (
+    select created_at, row_number() over (partition by client_id order by created_at, id) as n
+    from public.bookings
+    where client_id is not null
+) b
+where n <= 2
+group by 1, 2;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (created_at at time zone 'utc')::date,
+       'verification_seconds',
+       '',
+       count(*),
+       coalesce(sum(extract(epoch from (updated_at - created_at))::bigint), 0)
+from public.verifications
+where status::text = 'approved' and updated_at is not null
+group by 1;
+
+insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+select (coalesce(created_at, now()) at time zone 'utc')::date, 'disputes', coalesce(dispute_type, 'other'), count(*), 0
+from public.disputes
+group by 1, 3;
+
+-- ============================================
+-- Reader
+-- ============================================
+
+create or replace function public.admin_analytics_snapshot()
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with totals as (
+        select r.metric, r.dimension, sum(r.count) as count, sum(r.amount) as amount
+        from public.analytics_daily_rows(
+            array['booking_clients', 'repeat_booking_clients', 'verification_seconds', 'disputes']
+        ) r
+        group by r.metric, r.dimension
+    )
+    select jsonb_build_object(
+        'escrow_total', (select coalesce(sum(escrow_balance), 0) from public.wallets),
+        'avg_verification_hours', coalesce((
+            select amount::numeric / nullif(count, 0) / 3600
+            from totals
+            where metric = 'verification_seconds'
+        ), 0),
+        'disputes_by_type', coalesce((
+            select jsonb_object_agg(dimension, count)
+            from totals
+            where metric = 'disputes' and count > 0
+        ), '{}'::jsonb),
+        'peak_hour', coalesce((
+            select extract(hour from h.hour at time zone 'utc')::integer
+            from (
+                select hour, count from public.analytics_hourly_rollups where metric = 'bookings'
+                union all
+                select hour, count from public.analytics_hourly_deltas where metric = 'bookings'
+            ) h
+            group by 1
+            order by sum(h.count) desc
+            limit 1
+        ), 0),
+        'booking_clients', coalesce((select count from totals where metric = 'booking_clients'), 0),
+        'repeat_booking_clients', coalesce((select count from totals where metric = 'repeat_booking_clients'), 0)
+    );
+$$;
+
+-- rebuild_derived_tables() (202610170015) with the client counts, verification
+-- and dispute rollups
+create or replace function public.rebuild_derived_tables()
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    truncate public.talent_media_stats;
+
+    insert into public.talent_media_stats (talent_id, total_media, premium_media, free_media, talent_created_at)
+    select
+        p.id,
+        count(m.id),
+        count(m.id) filter (where m.is_premium),
+        count(m.id) filter (where not m.is_premium),
+        p.created_at
+    from public.profiles p
+    left join public.media m on m.talent_id = p.id
+    where p.role = 'talent'
+    group by p.id;
+
+    truncate public.gift_sender_totals, public.gift_sender_daily;
+
+    insert into public.gift_sender_totals (recipient_id, sender_id, total_amount, gift_count, last_gift_at)
+    select recipient_id, sender_id, sum(amount), count(*), max(created_at)
+    from public.gifts
+    group by recipient_id, sender_id;
+
+    insert into public.gift_sender_daily (recipient_id, day, sender_id, total_amount, gift_count)
+    select recipient_id, (coalesce(created_at, now()) at time zone 'utc')::date, sender_id, sum(amount), count(*)
+    from public.gifts
+    group by 1, 2, 3;
+
+    truncate public.analytics_daily_rollups, public.analytics_hourly_rollups,
+        public.analytics_daily_deltas, public.analytics_hourly_deltas, public.booking_client_counts;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups', role::text, count(*), 0
+    from public.profiles
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'signups_location', location, count(*), 0
+    from public.profiles
+    where location is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'bookings', status::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'talent_revenue', talent_id::text, count(*), coalesce(sum(total_price), 0)
+    from public.bookings
+    where status::text = 'completed' and talent_id is not null
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (b.created_at at time zone 'utc')::date,
+           'booking_services',
+           coalesce(elem->>'service_name', elem->'service_type'->>'name', 'Unknown'),
+           count(*),
+           0
+    from public.bookings b
+    cross join lateral jsonb_array_elements(
+        case when jsonb_typeof(b.services_snapshot) = 'array' then b.services_snapshot else '[]'::jsonb end
+    ) as elem
+    group by 1, 3;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date, 'revenue', '', count(*), coalesce(sum(amount), 0)
+    from public.transactions
+    where type = 'purchase' and status = 'completed'
+    group by 1;
+
+    insert into public.analytics_hourly_rollups (hour, metric, dimension, count, amount)
+    select date_trunc('hour', created_at at time zone 'utc') at time zone 'utc', 'bookings', '', count(*), 0
+    from public.bookings
+    group by 1;
+
+    insert into public.booking_client_counts (client_id, bookings)
+    select client_id, count(*)
+    from public.bookings
+    where client_id is not null
+    group by client_id;
+
+    -- A client counts on the day of their first booking, and as repeat on the day of their second
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date,
+           case when n = 1 then 'booking_clients' else 'repeat_booking_clients' end,
+           '',
+           count(*),
+           0
+    from (
+        select created_at, row_number() over (partition by client_id order by created_at, id) as n
+        from public.bookings
+        where client_id is not null
+    ) b
+    where n <= 2
+    group by 1, 2;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (created_at at time zone 'utc')::date,
+           'verification_seconds',
+           '',
+           count(*),
+           coalesce(sum(extract(epoch from (updated_at - created_at))::bigint), 0)
+    from public.verifications
+    where status::text = 'approved' and updated_at is not null
+    group by 1;
+
+    insert into public.analytics_daily_rollups (day, metric, dimension, count, amount)
+    select (coalesce(created_at, now()) at time zone 'utc')::date, 'disputes', coalesce(dispute_type, 'other'), count(*), 0
+    from public.disputes
+    group by 1, 3;
+
+    return jsonb_build_object(
+        'talent_media_stats', (select count(*) from public.talent_media_stats),
+        'gift_sender_totals', (select count(*) from public.gift_sender_totals),
+        'gift_sender_daily', (select count(*) from public.gift_sender_daily),
+        'analytics_daily_rollups', (select count(*) from public.analytics_daily_rollups)
+    );
+end;
+$$;
+
+revoke all on function public.analytics_apply_booking_client(uuid, timestamptz, integer) from public, anon, authenticated;
+
+comment on table public.booking_client_counts is 'Bookings per client, maintained by the analytics booking trigger for the booking_clients / repeat_booking_clients rollups.';
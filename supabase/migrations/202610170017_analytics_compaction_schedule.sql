@@ -0,0 +1,21 @@
+-- Schedule analytics delta compaction in the database.
+--
+-- compact_analytics_rollups() (202610170015) was run by a ten-minute Vercel cron,
+-- but the project's plan only runs daily crons, and until compaction runs every
+-- reader sums the pending deltas, so read cost would grow with all-time writes.
+-- pg_cron now runs it every ten minutes inside the database. Where pg_cron is not
+-- available (plain local Postgres), the admin analytics page and the weekly digest
+-- (src/app/admin/analytics/page.tsx, src/app/api/admin/digest/route.ts) also
+-- compact before they read.
+
+do $$
+begin
+    if exists (select 1 from pg_available_extensions where name = 'pg_cron') then
+        create extension if not exists pg_cron;
+        -- Scheduling by name replaces an existing job of the same name
+        perform cron.schedule('compact-analytics-rollups', '*/10 * * * *', 'select public.compact_analytics_rollups()');
+    else
+        raise notice 'pg_cron is not available; analytics deltas are compacted by their readers only';
+    end if;
+end;
+$$;
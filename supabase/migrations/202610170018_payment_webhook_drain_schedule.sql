@@ -0,0 +1,75 @@
+-- Drain due payment webhook retries from the database.
+--
+-- Retries and requeued events wait in payment_webhook_events until next_attempt_at,
+-- and the webhook has already acknowledged the provider, so something has to come
+-- back for them. A two-minute Vercel cron cannot run on the project's plan (daily
+-- crons only), so pg_cron checks every minute and, only when an event is due,
+-- calls /api/webhooks/drain through pg_net. The drain stays in the app, so credits
+-- still send their purchase notifications.
+--
+-- Setup, once per project (Vault):
+--   select vault.create_secret('https://negoempire.live', 'nego_app_url');
+--   select vault.create_secret('<CRON_SECRET>', 'nego_cron_secret');
+--
+-- The daily Vercel cron, every webhook and every /api/transactions/verify call
+-- also drain, so events still settle (more slowly) where pg_cron is unavailable.
+
+create or replace function public.request_payment_webhook_drain()
+returns boolean
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_url text;
+    v_secret text;
+begin
+    -- Cheap check on idx_payment_webhook_events_pending; most minutes nothing is due
+    if not exists (
+        select 1
+        from public.payment_webhook_events e
+        where e.status = 'pending'
+          and e.next_attempt_at <= now()
+    ) then
+        return false;
+    end if;
+
+    select decrypted_secret into v_url from vault.decrypted_secrets where name = 'nego_app_url';
+    select decrypted_secret into v_secret from vault.decrypted_secrets where name = 'nego_cron_secret';
+
+    if v_url is null then
+        raise warning 'request_payment_webhook_drain: Vault secret nego_app_url is not set';
+        return false;
+    end if;
+
+    perform net.http_post(
+        url := rtrim(v_url, '/') || '/api/webhooks/drain',
+        headers := jsonb_build_object(
+            'Content-Type', 'application/json',
+            'Authorization', 'Bearer ' || coalesce(v_secret, '')
+        ),
+        body := '{}'::jsonb
+    );
+
+    return true;
+end;
+$$;
+
+revoke all on function public.request_payment_webhook_drain() from public, anon, authenticated;
+
+comment on function public.request_payment_webhook_drain() is
+    'Call /api/webhooks/drain through pg_net when a queued payment webhook event is due; run every minute by pg_cron.';
+
+do $$
+begin
+    if exists (select 1 from pg_available_extensions where name = 'pg_cron')
+       and exists (select 1 from pg_available_extensions where name = 'pg_net') then
+        create extension if not exists pg_cron;
+        create extension if not exists pg_net;
+        -- Scheduling by name replaces an existing job of the same name
+        perform cron.schedule('drain-payment-webhooks', '* * * * *', 'select public.request_payment_webhook_drain()');
+    else
+        raise notice 'pg_cron or pg_net is not available; payment webhook retries wait for the next webhook, verify call or daily cron';
+    end if;
+end;
+$$;
@@ -0,0 +1,120 @@
+-- Per-booking escrow guard for booking expiry.
+--
+-- expire_stale_bookings() (202610170002) refunded escrow per client for the whole
+-- chunk and skipped the client entirely when their escrow did not cover the chunk's
+-- total, so one booking that escrow could not cover also blocked the refunds of every
+-- other booking the client had in that chunk. It also compared status::text, which
+-- cannot use idx_bookings_status_created_at.
+--
+-- The redefinition compares against the enum directly and applies the guard per
+-- booking: a client's refundable bookings are taken oldest first while their running
+-- total stays within the client's escrow_balance, the same order the old per-booking
+-- loop refunded them in. Bookings past that point are still expired and are left for
+-- manual review. The wallet update re-checks the covered total, so a wallet that
+-- changed concurrently is skipped rather than driven negative.
+
+create or replace function public.expire_stale_bookings(
+    p_status text,
+    p_cutoff timestamptz,
+    p_limit integer default 500
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_result jsonb;
+begin
+    with claimed as (
+        select id
+        from public.bookings
+        where status = p_status::booking_status
+          and created_at < p_cutoff
+        order by created_at
+        limit p_limit
+        for update skip locked
+    ),
+    expired as (
+        update public.bookings b
+        set status = 'expired',
+            updated_at = now()
+        from claimed c
+        where b.id = c.id
+        returning b.id, b.client_id, b.talent_id, b.total_price, b.created_at
+    ),
+    prior_refunds as (
+        select distinct t.reference_id as booking_id
+        from public.transactions t
+        join expired e on e.id = t.reference_id
+        where t.type = 'refund'
+    ),
+    refundable as (
+        select e.*
+        from expired e
+        where p_status = 'payment_pending'
+          and e.total_price > 0
+          and e.client_id is not null
+          and not exists (select 1 from prior_refunds pr where pr.booking_id = e.id)
+    ),
+    running as (
+        select r.*,
+               sum(r.total_price) over (
+                   partition by r.client_id
+                   order by r.created_at, r.id
+               ) as running_total,
+               w.escrow_balance
+        from refundable r
+        join public.wallets w on w.user_id = r.client_id
+    ),
+    covered as (
+        select id, client_id, total_price
+        from running
+        where running_total <= escrow_balance
+    ),
+    per_client as (
+        select client_id, sum(total_price) as total
+        from covered
+        group by client_id
+    ),
+    credited as (
+        update public.wallets w
+        set escrow_balance = w.escrow_balance - pc.total,
+            balance = w.balance + pc.total,
+            updated_at = now()
+        from per_client pc
+        where w.user_id = pc.client_id
+          and w.escrow_balance >= pc.total
+        returning w.user_id
+    ),
+    ledger as (
+        insert into public.transactions (user_id, amount, coins, type, status, description, reference_id)
+        select r.client_id, 0, r.total_price, 'refund', 'completed',
+               'Refund for expired booking #' || left(r.id::text, 8), r.id
+        from covered r
+        join credited c on c.user_id = r.client_id
+        returning reference_id
+    )
+    select jsonb_build_object(
+        'expired', (select count(*) from expired),
+        'refunded', (select count(*) from ledger) + (select count(*) from prior_refunds),
+        'bookings', coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'id', e.id,
+                'client_id', e.client_id,
+                'talent_name', p.display_name,
+                'refunded', e.id in (select reference_id from ledger)
+                         or e.id in (select booking_id from prior_refunds)
+            ))
+            from expired e
+            left join public.profiles p on p.id = e.talent_id
+        ), '[]'::jsonb)
+    )
+    into v_result;
+
+    return v_result;
+end;
+$$;
+
+comment on function public.expire_stale_bookings(text, timestamptz, integer) is
+    'Expires up to p_limit bookings in p_status created before p_cutoff, refunding each payment_pending booking its escrow covers (oldest first) and writing refund ledger rows in one statement.';
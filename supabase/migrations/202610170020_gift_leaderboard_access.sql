@@ -0,0 +1,64 @@
+-- Gift leaderboard window and access.
+--
+-- gift_leaderboard() (202610170007) compared d.day against today minus 7 days or one
+-- month, which covers today plus the seven (or ~30) days before it: one day more than
+-- the 7D / 30D tabs say. The week window now starts 6 days back and the month window
+-- 29 days back.
+--
+-- It was also security definer and executable by anon, so any caller could read any
+-- talent's senders and totals, while RLS on gifts only lets the sender or the
+-- recipient read a gift. Execution is now limited to signed-in users and the service
+-- role, and a signed-in caller who is not the recipient only gets their own row. The
+-- service role (auth.uid() is null) still reads the full board; the API route applies
+-- the same rule to its cached copy.
+
+create or replace function public.gift_leaderboard(
+    p_recipient_id uuid,
+    p_window text default 'all',
+    p_limit integer default 10
+)
+returns table (
+    sender_id uuid,
+    total_amount bigint,
+    gift_count bigint,
+    display_name text,
+    avatar_url text,
+    username text
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with ranked as (
+        select t.sender_id, t.total_amount, t.gift_count::bigint as gift_count
+        from public.gift_sender_totals t
+        where p_window not in ('week', 'month')
+          and t.recipient_id = p_recipient_id
+          and t.gift_count > 0
+        union all
+        select d.sender_id, sum(d.total_amount)::bigint, sum(d.gift_count)::bigint
+        from public.gift_sender_daily d
+        where p_window in ('week', 'month')
+          and d.recipient_id = p_recipient_id
+          -- Today and the 6 (week) or 29 (month) days before it
+          and d.day >= (now() at time zone 'utc')::date
+                       - case when p_window = 'week' then 6 else 29 end
+        group by d.sender_id
+        having sum(d.gift_count) > 0
+    )
+    select r.sender_id, r.total_amount, r.gift_count, p.display_name, p.avatar_url, p.username
+    from ranked r
+    left join public.profiles p on p.id = r.sender_id
+    where auth.uid() is null
+       or auth.uid() = p_recipient_id
+       or r.sender_id = auth.uid()
+    order by r.total_amount desc, r.sender_id
+    limit least(greatest(p_limit, 1), 50);
+$$;
+
+revoke all on function public.gift_leaderboard(uuid, text, integer) from public, anon;
+grant execute on function public.gift_leaderboard(uuid, text, integer) to authenticated, service_role;
+
+comment on function public.gift_leaderboard(uuid, text, integer) is
+    'Top gift senders for a recipient over week, month or all time. The recipient and the service role see every sender; any other signed-in caller sees only their own row.';
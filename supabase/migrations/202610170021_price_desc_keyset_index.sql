@@ -0,0 +1,9 @@
+-- Browse: price high.
+--
+-- Browse orders price_high by starting_price desc nulls last, id desc. A backward
+-- scan of idx_profiles_talent_price_keyset (202610170005) yields desc nulls first,
+-- so high-to-low pages fell back to a sort; they get their own index.
+
+create index if not exists idx_profiles_talent_price_desc_keyset
+    on public.profiles (starting_price desc nulls last, id desc)
+    where role = 'talent';
@@ -0,0 +1,127 @@
+-- Completion accepts confirmed bookings only.
+--
+-- settle_bookings() (202610170011) with p_complete = true moved a confirmed booking to
+-- completed, but also fell through to settling a booking that was already completed.
+-- /api/bookings/[id]/complete could therefore settle a completed but unsettled booking
+-- (one left 'insufficient_escrow'), where it used to answer 400. Settling those stays
+-- with /api/bookings/[id]/release-escrow, which calls with p_complete = false; with
+-- p_complete = true any status other than confirmed is now 'invalid_status'.
+
+create or replace function public.settle_bookings(
+    p_booking_ids uuid[],
+    p_complete boolean default true,
+    p_talent_id uuid default null
+)
+returns table (
+    booking_id uuid,
+    status text,
+    booking_status text,
+    client_id uuid,
+    talent_id uuid,
+    amount integer
+)
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_booking record;
+    v_amount integer;
+begin
+    for v_booking in
+        select b.id, b.client_id, b.talent_id, b.total_price, b.net_amount, b.status::text as status
+        from public.bookings b
+        where b.id = any(p_booking_ids)
+        order by b.id
+        for update
+    loop
+        booking_id := v_booking.id;
+        client_id := v_booking.client_id;
+        talent_id := v_booking.talent_id;
+        booking_status := v_booking.status;
+        v_amount := coalesce(nullif(v_booking.net_amount, 0), v_booking.total_price);
+        amount := v_amount;
+
+        if p_talent_id is not null and v_booking.talent_id is distinct from p_talent_id then
+            status := 'forbidden';
+            return next;
+            continue;
+        end if;
+
+        if p_complete then
+            -- Completing: only a confirmed booking may be completed and settled
+            if v_booking.status <> 'confirmed' then
+                status := 'invalid_status';
+                return next;
+                continue;
+            end if;
+
+            update public.bookings b
+            set status = 'completed',
+                updated_at = now()
+            where b.id = v_booking.id;
+            booking_status := 'completed';
+        elsif v_booking.status <> 'completed' then
+            status := 'invalid_status';
+            return next;
+            continue;
+        end if;
+
+        if exists (
+            select 1
+            from public.transactions t
+            where t.reference_id = v_booking.id
+              and t.type = 'booking'
+              and t.user_id = v_booking.talent_id
+        ) then
+            status := 'already_settled';
+            return next;
+            continue;
+        end if;
+
+        update public.wallets w
+        set escrow_balance = w.escrow_balance - v_booking.total_price,
+            updated_at = now()
+        where w.user_id = v_booking.client_id
+          and coalesce(w.escrow_balance, 0) >= v_booking.total_price;
+
+        if not found then
+            status := 'insufficient_escrow';
+            return next;
+            continue;
+        end if;
+
+        insert into public.wallets (user_id, balance, escrow_balance)
+        values (v_booking.talent_id, v_amount, 0)
+        on conflict (user_id) do update
+        set balance = coalesce(wallets.balance, 0) + excluded.balance,
+            updated_at = now();
+
+        insert into public.transactions (user_id, amount, coins, type, status, description, reference_id)
+        values (
+            v_booking.talent_id, v_amount, v_amount, 'booking', 'completed',
+            'Earnings from completed booking #' || left(v_booking.id::text, 8), v_booking.id
+        );
+
+        status := 'settled';
+        return next;
+    end loop;
+
+    -- Ids with no booking row
+    for booking_id in
+        select requested.id
+        from unnest(p_booking_ids) as requested(id)
+        where not exists (select 1 from public.bookings b where b.id = requested.id)
+    loop
+        status := 'not_found';
+        booking_status := null;
+        client_id := null;
+        talent_id := null;
+        amount := null;
+        return next;
+    end loop;
+end;
+$$;
+
+comment on function public.settle_bookings(uuid[], boolean, uuid) is
+    'Settles bookings atomically: escrow release, talent credit and earnings ledger row, once per booking. p_complete moves confirmed bookings to completed first and rejects any other status; otherwise only completed bookings are settled. p_talent_id restricts to that talent''s bookings.';
@@ -0,0 +1,174 @@
+"""
+Latency regression benchmark for the Nego API
+Times the shared scenarios in tests/scenarios.py with repeated warm runs over a
+keep-alive connection, drops outliers outside the Tukey fences and compares the
+median per scenario against a stored baseline in tests/test_reports.
+
+Usage:
+    python -m tests.benchmark --update-baseline      # record a new baseline
+    python -m tests.benchmark                        # compare, exit 1 on regression
+    python -m tests.benchmark --max-regression 0.25 --scenario /api/gifts
+
+Requires aiohttp.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from tests import scenarios as scenario_defs
+from tests.loadgen import ERROR, execute, make_session, percentile
+from tests.seeding import worker_namespace, worker_seed
+
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), "test_reports")
+BASELINE_PATH = os.path.join(REPORTS_DIR, "benchmark_baseline.json")
+LATEST_PATH = os.path.join(REPORTS_DIR, "benchmark_latest.json")
+
+# The endpoints the Python suites cover; other scenarios are load-test only.
+BENCHMARK_PATHS = ("/api/talents", "/api/content", "/api/auth/", "/api/gifts", "/api/media/unlock")
+
+
+def drop_outliers(samples, k=1.5):
+    """Remove samples outside [Q1 - k*IQR, Q3 + k*IQR]; returns (kept, dropped_count)"""
+    if len(samples) < 4:
+        return list(samples), 0
+    ordered = sorted(samples)
+    q1 = percentile(ordered, 25)
+    q3 = percentile(ordered, 75)
+    low, high = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    kept = [s for s in ordered if low <= s <= high]
+    return kept, len(ordered) - len(kept)
+
+
+def measure(samples):
+    """Summary of one scenario's timings in milliseconds, after outlier removal"""
+    kept, dropped = drop_outliers(samples)
+    return {
+        "median_ms": round(statistics.median(kept) * 1000, 3),
+        "p95_ms": round(percentile(kept, 95) * 1000, 3),
+        "stdev_ms": round(statistics.pstdev(kept) * 1000, 3),
+        "samples": len(kept),
+        "dropped": dropped,
+    }
+
+
+async def benchmark(scenarios, base_url, runs, warmup, headers=None):
+    """Run each scenario `warmup` + `runs` times sequentially on one warm connection"""
+    results = {}
+    async with make_session(1, 30) as session:
+        for scenario in scenarios:
+            for _ in range(warmup):
+                await execute(session, base_url, scenario, headers)
+            samples = []
+            errors = 0
+            for _ in range(runs):
+                latency, outcome, _ = await execute(session, base_url, scenario, headers)
+                if outcome == ERROR:
+                    errors += 1
+                    continue
+                samples.append(latency)
+            if not samples:
+                results[scenario.name] = {"endpoint": scenario.endpoint, "errors": errors}
+                continue
+            results[scenario.name] = {"endpoint": scenario.endpoint, **measure(samples), "errors": errors}
+    return results
+
+
+def compare(results, baseline, max_regression, min_delta_ms):
+    """Return a list of (name, baseline_ms, current_ms, ratio) for regressed scenarios"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or "median_ms" not in current or not previous.get("median_ms"):
+            continue
+        delta = current["median_ms"] - previous["median_ms"]
+        ratio = current["median_ms"] / previous["median_ms"]
+        if ratio > 1 + max_regression and delta > min_delta_ms:
+            regressions.append((name, previous["median_ms"], current["median_ms"], round(ratio, 2)))
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def write_report(path, base_url, runs, results):
+    with open(path, "w") as fh:
+        json.dump({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "runs": runs,
+            "scenarios": results,
+        }, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def select_benchmark_scenarios(seed, patterns=None):
+    return [
+        s for s in scenario_defs.select(seed, patterns)
+        if s.path.startswith(BENCHMARK_PATHS)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=scenario_defs.BASE_URL)
+    parser.add_argument("--runs", type=int, default=30, help="timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed runs per scenario")
+    parser.add_argument("--scenario", action="append",
+                        help="only run scenarios whose name or path contains this (repeatable)")
+    parser.add_argument("--max-regression", type=float,
+                        default=float(os.environ.get("NEGO_BENCH_MAX_REGRESSION", "0.5")),
+                        help="allowed median slowdown as a fraction, 0.5 = 50%% slower")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="ignore regressions smaller than this many milliseconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip("/")
+    with worker_seed(worker_namespace()) as seed:
+        selected = select_benchmark_scenarios(seed, args.scenario)
+        if not selected:
+            parser.error("no scenarios matched")
+
+        started = time.perf_counter()
+        results = asyncio.run(benchmark(selected, base_url, args.runs, args.warmup))
+    print(f"benchmarked {len(results)} scenarios in {time.perf_counter() - started:.1f}s")
+
+    baseline = load_baseline(args.baseline)
+    previous = (baseline or {}).get("scenarios", {})
+    print(f"{'scenario':<30}{'endpoint':<32}{'median':>9}{'base':>9}{'p95':>9}{'drop':>6}")
+    for name, stats in results.items():
+        base_median = previous.get(name, {}).get("median_ms", "-")
+        print(
+            f"{name:<30}{stats['endpoint']:<32}{stats.get('median_ms', 'ERR'):>9}"
+            f"{base_median:>9}{stats.get('p95_ms', '-'):>9}{stats.get('dropped', 0):>6}"
+        )
+
+    write_report(LATEST_PATH, base_url, args.runs, results)
+
+    if args.update_baseline:
+        write_report(args.baseline, base_url, args.runs, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    regressions = compare(results, previous, args.max_regression, args.min_delta_ms)
+    for name, base_ms, current_ms, ratio in regressions:
+        print(f"REGRESSION {name}: median {base_ms}ms -> {current_ms}ms ({ratio}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
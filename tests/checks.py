@@ -0,0 +1,143 @@
+"""
+Shared response checks
+Each ``check_*(status, data)`` raises AssertionError on a bad response. The API
+suites call them on their responses and tests/scenarios.py attaches them to the
+load and benchmark scenarios, so both assert the same thing.
+"""
+
+
+# --- /api/gifts (tests/test_gift_api.py, tests/test_nego_edge_apis.py) ---
+
+def check_gift_missing_sender(status, data):
+    assert status == 400
+    assert data["success"] == False
+    assert "Sender ID is required" in data["error"]
+    assert data.get("field") == "senderId"
+
+
+def check_gift_invalid_sender(status, data):
+    assert status == 400
+    assert data["success"] == False
+    assert "Invalid sender ID format" in data["error"]
+    assert "pattern" not in data["error"].lower()
+    assert data.get("field") == "senderId"
+
+
+def check_gift_below_minimum(status, data):
+    assert status == 400
+    assert data["success"] == False
+    assert "Minimum gift amount is 100" in data["error"]
+    assert data.get("field") == "amount"
+
+
+def check_gift_self(status, data):
+    assert status == 400
+    assert data["success"] == False
+    assert "yourself" in data["error"].lower()
+    assert data.get("field") == "recipientId"
+
+
+def check_gift_valid_with_message(status, data):
+    assert data["success"] == False
+    assert "wallet" in data["error"].lower() or "balance" in data["error"].lower()
+    assert "pattern" not in data["error"].lower()
+
+
+def check_gift_nonexistent_sender(status, data):
+    assert status == 404
+    assert "wallet not found" in data["error"].lower()
+
+
+def check_invalid_json(status, data):
+    assert status == 400
+    assert data["success"] == False
+    assert "Invalid request format" in data["error"]
+
+
+def check_leaderboard_requires_session(status, data):
+    assert status == 401
+    assert data["success"] == False
+
+
+# --- /api/media/unlock (tests/test_nego_edge_apis.py) ---
+
+def check_unlock_missing_fields(status, data):
+    assert status == 400
+    assert "Missing required fields" in data["error"]
+
+
+def check_unlock_invalid_uuid(status, data):
+    assert status == 400
+    assert "Invalid ID format" in data["error"]
+
+
+def check_unlock_nonexistent_user(status, data):
+    assert status in [400, 404]
+    assert "wallet not found" in data["error"].lower()
+
+
+def check_no_server_error(status, data):
+    assert status not in [500, 520]
+
+
+# --- /api/cloudinary/signature (tests/test_nego_edge_apis.py) ---
+
+def check_signature(expected_folder="uploads", expected_type="image"):
+    def check(status, data):
+        assert status == 200
+        assert len(data["signature"]) == 40
+        assert all(c in "0123456789abcdef" for c in data["signature"])
+        assert data["folder"] == expected_folder
+        assert data["resource_type"] == expected_type
+    return check
+
+
+def check_signature_invalid_type(status, data):
+    assert status == 400
+    assert "Invalid resource type" in data["error"]
+
+
+# --- /api/talents, /api/content, /api/auth/* (tests/test_nego_api.py) ---
+
+def check_talents_list(status, data):
+    assert status == 200
+    assert "talents" in data
+    assert "total" in data
+    assert isinstance(data["talents"], list)
+
+
+def check_single_talent(status, data):
+    assert status == 200
+    assert data["id"] == "talent-1"
+
+
+def check_not_found(status, data):
+    assert status == 404
+
+
+def check_content_list(status, data):
+    assert status == 200
+    assert isinstance(data, list)
+    for content in data:
+        assert content["is_locked"] == True
+
+
+def check_register_duplicate(status, data):
+    assert status == 400
+    assert "already registered" in data["detail"].lower()
+
+
+def check_login_valid(email):
+    def check(status, data):
+        assert status == 200
+        assert "access_token" in data
+        assert data["user"]["email"] == email
+    return check
+
+
+def check_unauthorized(status, data):
+    assert status == 401
+
+
+def check_me_without_token(status, data):
+    assert status in [401, 403]
@@ -0,0 +1,84 @@
+"""
+Shared fixtures for the API suites
+Lets the suites run in parallel: ``pytest -n auto`` (pytest-xdist) on one machine,
+``--shard K/N`` to split them across machines, or both.
+
+    base_url   server under test (NEGO_BASE_URL, default http://localhost:3000)
+    http       one pooled requests.Session per worker, reused by every test
+    namespace  "<xdist worker>-<run id>", unique per worker and per run
+    seed       this worker's users, wallets and talents (see tests/seeding.py),
+               created once per worker and deleted when it finishes
+"""
+import os
+import uuid
+import zlib
+
+import pytest
+
+from tests.seeding import pooled_session, worker_namespace, worker_seed
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--shard", default=os.environ.get("NEGO_TEST_SHARD"),
+        help="run only shard K of N (1-based), e.g. --shard 2/4; splits by test id",
+    )
+
+
+def pytest_configure(config):
+    # The controller picks the run id so every xdist worker shares it
+    if not hasattr(config, "workerinput"):
+        config.nego_run_id = os.environ.get("NEGO_TEST_RUN_ID") or uuid.uuid4().hex[:6]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """xdist hook: hand the controller's run id to each worker"""
+    node.workerinput["nego_run_id"] = node.config.nego_run_id
+
+
+def pytest_collection_modifyitems(config, items):
+    shard = config.getoption("--shard")
+    if not shard:
+        return
+    index, _, total = shard.partition("/")
+    try:
+        index, total = int(index), int(total)
+    except ValueError:
+        raise pytest.UsageError(f"--shard must be K/N with 1 <= K <= N, got {shard}") from None
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard must be K/N with 1 <= K <= N, got {shard}")
+
+    # A stable hash of the test id, so every machine agrees on the split
+    selected, deselected = [], []
+    for item in items:
+        owner = zlib.crc32(item.nodeid.encode()) % total + 1
+        (selected if owner == index else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope="session")
+def namespace(request):
+    config = request.config
+    run_id = config.workerinput["nego_run_id"] if hasattr(config, "workerinput") else config.nego_run_id
+    return worker_namespace(run_id)
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    return os.environ.get("NEGO_BASE_URL", os.environ.get("REACT_APP_BACKEND_URL", "http://localhost:3000")).rstrip("/")
+
+
+@pytest.fixture(scope="session")
+def http():
+    session = pooled_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def seed(namespace, http):
+    with worker_seed(namespace, session=http) as created:
+        yield created
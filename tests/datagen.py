@@ -0,0 +1,586 @@
+"""
+Synthetic large-scale dataset for scaling benchmarks
+Generates a production-sized marketplace (by default 100k talents, 400k clients and
+millions of media, gifts, bookings, transactions, messages and profile views) and
+bulk-loads it with COPY, so the browse, leaderboard, analytics and expiry paths can
+be measured at scale. Load it into a dedicated benchmark database: the API suites
+expect only the demo seed (supabase_seed_talents.sql).
+
+Popularity is skewed with Zipf weights: a few hot talents receive most views,
+gifts, bookings and messages (--talent-skew), and a few whale clients send most
+gifts and buy most coins (--whale-skew). Talents are spread over the locations in
+src/lib/nigerian-locations.ts, weighted towards the big cities. Output is
+deterministic for a given --seed and --end.
+
+Rows are copied with session_replication_role = replica, which skips triggers and
+foreign key checks (generated profiles have no auth.users row), and
+rebuild_derived_tables() then recomputes the trigger-maintained aggregates once.
+Generated profiles have usernames starting with "gen_"; --reset removes them and
+everything they own before loading.
+
+Usage:
+    python -m tests.datagen --dsn "$DATABASE_URL"                      # full scale
+    python -m tests.datagen --dsn "$DATABASE_URL" --scale 0.01 --reset  # ~1% for a laptop
+    python -m tests.datagen --out /tmp/nego-data                        # COPY files + load.sql
+    cd /tmp/nego-data && psql "$DATABASE_URL" -f load.sql
+
+Loading with --dsn requires psycopg (v3); --out needs only psql.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+LOCATIONS_TS = os.path.join(os.path.dirname(__file__), "..", "src", "lib", "nigerian-locations.ts")
+
+GENERATED_PREFIX = "gen_"
+GENERATED_LIKE = GENERATED_PREFIX.replace("_", "\\_") + "%"
+
+# Share of talents per location; the remaining share is spread evenly over the rest
+DEFAULT_LOCATION_WEIGHTS = {"Lagos": 0.30, "FCT (Abuja)": 0.15, "Rivers": 0.08, "Oyo": 0.05, "Enugu": 0.04}
+
+DEFAULT_BOOKING_STATUSES = {
+    "completed": 0.55,
+    "cancelled": 0.15,
+    "confirmed": 0.10,
+    "verification_pending": 0.12,
+    "payment_pending": 0.08,
+}
+
+SERVICES = [
+    ("Dinner Date", 120_000),
+    ("Event Companion", 200_000),
+    ("Travel Companion", 500_000),
+    ("Private Meeting", 300_000),
+    ("Photo Session", 140_000),
+]
+
+# (coins, naira, relative frequency); prices as in coin_packages_migration.sql
+COIN_PACKAGES = [(1_000, 10_000, 40), (5_000, 50_000, 30), (10_000, 100_000, 15), (25_000, 250_000, 10), (50_000, 500_000, 5)]
+
+GIFT_AMOUNTS = [(100, 35), (200, 20), (500, 20), (1_000, 12), (2_000, 6), (5_000, 4), (10_000, 2), (50_000, 1)]
+
+COMMISSION_RATE = 0.2
+
+FIRST_NAMES = [
+    "Adaeze", "Chidinma", "Folake", "Grace", "Halima", "Ify", "Amaka", "Bisola", "Chioma", "Damilola",
+    "Efe", "Funmi", "Hauwa", "Ijeoma", "Kemi", "Lola", "Ngozi", "Nneka", "Ozioma", "Temi",
+    "Tolu", "Uche", "Yetunde", "Zainab", "Aisha", "Bola", "Tobi", "Emeka", "Tunde", "Seun",
+]
+
+BIO_PHRASES = [
+    "Sophisticated companion for high-profile occasions.",
+    "Elegant presence for corporate events and exclusive gatherings.",
+    "Passionate about art, music and culture.",
+    "Well-traveled and multilingual.",
+    "Fluent in English and French.",
+    "Discreet, warm and great company.",
+    "Former model with international experience.",
+]
+
+MESSAGE_PHRASES = [
+    "Hi! Are you available this weekend?",
+    "Thanks, see you then.",
+    "What time works for you?",
+    "I've sent the booking request.",
+    "Looking forward to it!",
+    "Can we move it to 8pm?",
+    "Sure, that works.",
+]
+
+GIFT_MESSAGES = [None, None, None, "You're amazing!", "For you", "Thank you for tonight", "Keep shining"]
+
+MEDIA_URLS = [
+    "https://images.unsplash.com/photo-1531746020798-e6953c6e8e04?w=600&q=80",
+    "https://images.unsplash.com/photo-1494790108377-be9c29b29330?w=600&q=80",
+    "https://images.unsplash.com/photo-1524504388940-b1c1722653e1?w=600&q=80",
+    "https://images.unsplash.com/photo-1517841905240-472988babdf9?w=600&q=80",
+    "https://images.unsplash.com/photo-1488426862026-3ee34a7d66df?w=600&q=80",
+    "https://images.unsplash.com/photo-1529626455594-4ff0802cfb7e?w=600&q=80",
+]
+
+USER_AGENTS = [
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "Mozilla/5.0 (Linux; Android 14; SM-A546E) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+]
+
+# Picks drawn per rng.choices call
+PICK_BLOCK = 4096
+
+# Bytes buffered before each write to a COPY stream
+COPY_CHUNK_BYTES = 1 << 20
+
+COLUMNS = {
+    "profiles": ("id", "role", "username", "slug", "display_name", "full_name", "avatar_url", "location", "bio",
+                 "gender", "is_verified", "status", "starting_price", "created_at", "updated_at", "last_active_at"),
+    "wallets": ("user_id", "balance", "escrow_balance", "created_at", "updated_at"),
+    "media": ("id", "talent_id", "url", "type", "is_premium", "unlock_price", "moderation_status", "created_at"),
+    "bookings": ("id", "client_id", "talent_id", "total_price", "services_snapshot", "status", "scheduled_at", "notes",
+                 "platform_fee", "net_amount", "commission_rate", "created_at", "updated_at"),
+    "gifts": ("id", "sender_id", "recipient_id", "amount", "message", "created_at"),
+    "transactions": ("id", "user_id", "amount", "coins", "type", "status", "reference_id", "description", "created_at"),
+    "conversations": ("id", "participant_1", "participant_2", "booking_id", "last_message_at", "created_at"),
+    "messages": ("id", "conversation_id", "sender_id", "content", "is_read", "created_at"),
+    "profile_views": ("id", "talent_id", "viewer_id", "viewer_ip", "user_agent", "created_at"),
+}
+
+# Run after the copy, with triggers back on: menus are derived from the loaded
+# service_types (their ids only exist in the target database), then the aggregates.
+POST_LOAD_SQL = f"""
+insert into public.talent_menus (talent_id, service_type_id, price, is_active)
+select p.id, st.id, greatest(p.starting_price, 50000) * (1 + abs(hashtext(p.id::text || st.id::text)) % 4), true
+from public.profiles p
+cross join public.service_types st
+where p.username like '{GENERATED_LIKE}' and p.role = 'talent'
+  and st.is_active
+  and abs(hashtext(st.id::text || p.id::text)) % 100 < 60
+on conflict (talent_id, service_type_id) do nothing;
+
+select public.rebuild_derived_tables();
+
+analyze public.profiles, public.wallets, public.talent_menus, public.media, public.bookings, public.gifts,
+    public.transactions, public.conversations, public.messages, public.profile_views;
+"""
+
+# Run before the copy in replica mode, where foreign key cascades do not fire, so
+# every table is cleared explicitly. Generated rows only reference generated profiles.
+RESET_SQL = f"""
+create temporary table generated_profiles on commit drop as
+    select id from public.profiles where username like '{GENERATED_LIKE}';
+delete from public.messages where sender_id in (select id from generated_profiles);
+delete from public.conversations where participant_1 in (select id from generated_profiles);
+delete from public.profile_views where talent_id in (select id from generated_profiles);
+delete from public.gifts where sender_id in (select id from generated_profiles);
+delete from public.transactions where user_id in (select id from generated_profiles);
+delete from public.bookings where client_id in (select id from generated_profiles);
+delete from public.media where talent_id in (select id from generated_profiles);
+delete from public.talent_menus where talent_id in (select id from generated_profiles);
+delete from public.wallets where user_id in (select id from generated_profiles);
+delete from public.profiles where id in (select id from generated_profiles);
+"""
+
+
+def load_locations(path=LOCATIONS_TS):
+    """The location names from NIGERIAN_LOCATIONS in nigerian-locations.ts"""
+    with open(path, encoding="utf-8") as handle:
+        source = handle.read()
+    block = re.search(r"NIGERIAN_LOCATIONS\s*=\s*\[(.*?)\]", source, re.S)
+    if not block:
+        raise ValueError(f"NIGERIAN_LOCATIONS not found in {path}")
+    return re.findall(r"'([^']+)'", block.group(1))
+
+
+def zipf_cum_weights(n, skew):
+    """Cumulative weights 1/rank**skew for ranks 1..n; skew 0 is uniform"""
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def location_cum_weights(locations, weights):
+    """Cumulative weights giving each named location its share and the rest an even split"""
+    named = {name: share for name, share in weights.items() if name in locations}
+    rest = max(0.0, 1 - sum(named.values())) / max(1, len(locations) - len(named))
+    return list(accumulate(named.get(name, rest) for name in locations))
+
+
+def copy_value(value):
+    """One field in PostgreSQL COPY text format"""
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(",", ":"))
+    return str(value).translate(_COPY_ESCAPES)
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_line(values):
+    return "\t".join(map(copy_value, values)) + "\n"
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _picks(rng, n, cum_weights):
+    """Endless indexes into range(n), drawn with the given cumulative weights"""
+    population = range(n)
+    while True:
+        yield from rng.choices(population, cum_weights=cum_weights, k=PICK_BLOCK)
+
+
+def _midnight_utc():
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class DatasetConfig:
+    talents: int = 100_000
+    clients: int = 400_000
+    media: int = 1_500_000
+    bookings: int = 500_000
+    gifts: int = 3_000_000
+    purchases: int = 1_000_000
+    conversations: int = 300_000
+    messages: int = 4_000_000
+    profile_views: int = 5_000_000
+    days: int = 365
+    # Zipf exponents: how concentrated activity is on the top talents / clients
+    talent_skew: float = 0.9
+    whale_skew: float = 1.0
+    conversation_skew: float = 0.8
+    # > 1 puts more activity in recent days, as a growing marketplace would have
+    growth: float = 1.5
+    guest_view_share: float = 0.4
+    premium_share: float = 0.35
+    location_weights: dict = field(default_factory=lambda: dict(DEFAULT_LOCATION_WEIGHTS))
+    booking_statuses: dict = field(default_factory=lambda: dict(DEFAULT_BOOKING_STATUSES))
+    seed: int = 42
+    end: datetime = field(default_factory=_midnight_utc)
+
+    COUNTS = ("talents", "clients", "media", "bookings", "gifts", "purchases", "conversations", "messages",
+              "profile_views")
+
+    def scaled(self, factor):
+        """The same shape with every row count multiplied by factor"""
+        return replace(self, **{name: max(1, round(getattr(self, name) * factor)) for name in self.COUNTS})
+
+
+class Dataset:
+    """Deterministic rows for every generated table, produced lazily per table"""
+
+    def __init__(self, config, locations=None):
+        self.config = config
+        self.locations = locations or load_locations()
+        self.end = config.end.timestamp()
+        self.start = (config.end - timedelta(days=config.days)).timestamp()
+
+        rng = self._rng("people")
+        self.talent_ids = [_uuid(rng) for _ in range(config.talents)]
+        self.client_ids = [_uuid(rng) for _ in range(config.clients)]
+        # Index 0 is the hottest talent / biggest whale
+        self.talent_created = [self._moment(rng) for _ in range(config.talents)]
+        self.client_created = [self._moment(rng) for _ in range(config.clients)]
+        self.talent_weights = zipf_cum_weights(config.talents, config.talent_skew)
+        self.client_weights = zipf_cum_weights(config.clients, config.whale_skew)
+        self._conversation_cache = None
+
+    def _rng(self, table):
+        # String seeds are hashed with SHA-512, so streams are stable across runs
+        return random.Random(f"{self.config.seed}:{table}")
+
+    def _moment(self, rng, after=None):
+        """A timestamp in the window (after `after` if given), biased towards the end"""
+        start = max(self.start, after or self.start)
+        return start + (self.end - start) * rng.random() ** (1 / self.config.growth)
+
+    def tables(self):
+        """(table, columns, rows) for every table, in load order"""
+        for table, columns in COLUMNS.items():
+            yield table, columns, getattr(self, f"_{table}")()
+
+    def _profiles(self):
+        config = self.config
+        rng = self._rng("profiles")
+        location_weights = location_cum_weights(self.locations, config.location_weights)
+        for n, (user_id, created) in enumerate(zip(self.talent_ids, self.talent_created)):
+            name = rng.choice(FIRST_NAMES)
+            username = f"{GENERATED_PREFIX}t{n:06d}"
+            yield (
+                user_id, "talent", username, username, name, f"{name} {n}", rng.choice(MEDIA_URLS),
+                rng.choices(self.locations, cum_weights=location_weights)[0],
+                " ".join(rng.sample(BIO_PHRASES, 2)),
+                rng.choices(("female", "male", "other"), weights=(80, 17, 3))[0],
+                rng.random() < 0.7,
+                rng.choices(("online", "offline", "booked"), weights=(30, 60, 10))[0],
+                rng.randrange(50_000, 500_000, 10_000),
+                _iso(created), _iso(created), _iso(self._moment(rng, created)),
+            )
+        for n, (user_id, created) in enumerate(zip(self.client_ids, self.client_created)):
+            username = f"{GENERATED_PREFIX}c{n:06d}"
+            yield (
+                user_id, "client", username, username, f"Client {n}", None, None,
+                rng.choice(self.locations), None, None, False, "offline", None,
+                _iso(created), _iso(created), _iso(self._moment(rng, created)),
+            )
+
+    def _wallets(self):
+        rng = self._rng("wallets")
+        escrow = {}
+        for booking in self._booking_plan():
+            if booking["status"] in ("verification_pending", "confirmed"):
+                escrow[booking["client"]] = escrow.get(booking["client"], 0) + booking["total_price"]
+
+        for n, user_id in enumerate(self.talent_ids):
+            created = _iso(self.talent_created[n])
+            yield user_id, int(rng.lognormvariate(9, 1.5)), 0, created, created
+        for n, user_id in enumerate(self.client_ids):
+            created = _iso(self.client_created[n])
+            # Whales (low n) hold far more coins than the long tail
+            balance = int(rng.lognormvariate(8, 1.2) * max(1.0, 50 / (n + 1) ** 0.5))
+            yield user_id, balance, escrow.get(n, 0), created, created
+
+    def _media(self):
+        config = self.config
+        rng = self._rng("media")
+        talents = _picks(rng, config.talents, self.talent_weights)
+        for _ in range(config.media):
+            talent = next(talents)
+            premium = rng.random() < config.premium_share
+            yield (
+                _uuid(rng), self.talent_ids[talent], rng.choice(MEDIA_URLS),
+                "video" if rng.random() < 0.1 else "image",
+                premium, rng.choice((100, 200, 500, 1_000)) if premium else 0, "approved",
+                _iso(self._moment(rng, self.talent_created[talent])),
+            )
+
+    def _booking_plan(self):
+        """Booking facts shared by bookings, wallets (escrow) and transactions (earnings)"""
+        config = self.config
+        rng = self._rng("bookings")
+        talents = _picks(rng, config.talents, self.talent_weights)
+        clients = _picks(rng, config.clients, self.client_weights)
+        statuses = list(config.booking_statuses)
+        status_weights = list(accumulate(config.booking_statuses.values()))
+        for _ in range(config.bookings):
+            talent, client = next(talents), next(clients)
+            services = rng.sample(SERVICES, rng.choice((1, 1, 1, 2, 3)))
+            created = self._moment(rng, max(self.talent_created[talent], self.client_created[client]))
+            status = rng.choices(statuses, cum_weights=status_weights)[0]
+            scheduled = created + rng.uniform(1, 14) * 86_400
+            yield {
+                "id": _uuid(rng),
+                "talent": talent,
+                "client": client,
+                "status": status,
+                "services": [{"service_id": None, "service_name": name, "price": price} for name, price in services],
+                "total_price": sum(price for _, price in services),
+                "created": created,
+                # Completed bookings took place before the end of the window
+                "scheduled": min(scheduled, self.end) if status == "completed" else scheduled,
+            }
+
+    def _bookings(self):
+        for booking in self._booking_plan():
+            total, status = booking["total_price"], booking["status"]
+            priced = status in ("confirmed", "completed")
+            fee = round(total * COMMISSION_RATE) if priced else None
+            yield (
+                booking["id"], self.client_ids[booking["client"]], self.talent_ids[booking["talent"]], total,
+                booking["services"], status, _iso(booking["scheduled"]), None,
+                fee, total - fee if priced else None, COMMISSION_RATE if priced else None,
+                _iso(booking["created"]), _iso(booking["created"]),
+            )
+
+    def _gift_plan(self):
+        config = self.config
+        rng = self._rng("gifts")
+        talents = _picks(rng, config.talents, self.talent_weights)
+        senders = _picks(rng, config.clients, self.client_weights)
+        amounts, amount_weights = zip(*GIFT_AMOUNTS)
+        amount_weights = list(accumulate(amount_weights))
+        for _ in range(config.gifts):
+            talent, sender = next(talents), next(senders)
+            yield (
+                _uuid(rng), sender, talent, rng.choices(amounts, cum_weights=amount_weights)[0],
+                rng.choice(GIFT_MESSAGES),
+                self._moment(rng, max(self.talent_created[talent], self.client_created[sender])),
+            )
+
+    def _gifts(self):
+        for gift_id, sender, talent, amount, message, created in self._gift_plan():
+            yield gift_id, self.client_ids[sender], self.talent_ids[talent], amount, message, _iso(created)
+
+    def _transactions(self):
+        """Coin purchases, both ledger rows of every gift, and earnings for completed bookings"""
+        config = self.config
+        rng = self._rng("transactions")
+        clients = _picks(rng, config.clients, self.client_weights)
+        packages = [(coins, naira) for coins, naira, _ in COIN_PACKAGES]
+        package_weights = list(accumulate(weight for _, _, weight in COIN_PACKAGES))
+        for _ in range(config.purchases):
+            client = next(clients)
+            coins, naira = rng.choices(packages, cum_weights=package_weights)[0]
+            yield (
+                _uuid(rng), self.client_ids[client], naira, coins, "purchase",
+                "completed" if rng.random() < 0.95 else "failed", None, f"Purchased {coins} coins",
+                _iso(self._moment(rng, self.client_created[client])),
+            )
+
+        for gift_id, sender, talent, amount, _, created in self._gift_plan():
+            at = _iso(created)
+            yield _uuid(rng), self.client_ids[sender], -amount, -amount, "gift", "completed", gift_id, "Gift sent", at
+            yield _uuid(rng), self.talent_ids[talent], amount, amount, "gift", "completed", gift_id, "Gift received", at
+
+        for booking in self._booking_plan():
+            if booking["status"] != "completed":
+                continue
+            net = booking["total_price"] - round(booking["total_price"] * COMMISSION_RATE)
+            yield (
+                _uuid(rng), self.talent_ids[booking["talent"]], net, net, "booking", "completed", booking["id"],
+                f"Earnings from completed booking #{booking['id'][:8]}", _iso(booking["scheduled"]),
+            )
+
+    def _conversation_plan(self):
+        """(id, client, talent, created, last_message_at); one per client/talent pair"""
+        if self._conversation_cache is None:
+            config = self.config
+            rng = self._rng("conversations")
+            talents = _picks(rng, config.talents, self.talent_weights)
+            clients = _picks(rng, config.clients, self.client_weights)
+            seen, plan = set(), []
+            for _ in range(config.conversations * 10):
+                if len(plan) == config.conversations:
+                    break
+                pair = (next(clients), next(talents))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                created = self._moment(rng, max(self.client_created[pair[0]], self.talent_created[pair[1]]))
+                plan.append((_uuid(rng), pair[0], pair[1], created, self._moment(rng, created)))
+            self._conversation_cache = plan
+        return self._conversation_cache
+
+    def _conversations(self):
+        for conversation_id, client, talent, created, last in self._conversation_plan():
+            yield conversation_id, self.client_ids[client], self.talent_ids[talent], None, _iso(last), _iso(created)
+
+    def _messages(self):
+        config = self.config
+        rng = self._rng("messages")
+        plan = self._conversation_plan()
+        conversations = _picks(rng, len(plan), zipf_cum_weights(len(plan), config.conversation_skew))
+        for _ in range(config.messages):
+            conversation_id, client, talent, created, last = plan[next(conversations)]
+            sender = self.client_ids[client] if rng.random() < 0.55 else self.talent_ids[talent]
+            yield (
+                _uuid(rng), conversation_id, sender, rng.choice(MESSAGE_PHRASES),
+                rng.random() < 0.85, _iso(rng.uniform(created, last)),
+            )
+
+    def _profile_views(self):
+        config = self.config
+        rng = self._rng("profile_views")
+        talents = _picks(rng, config.talents, self.talent_weights)
+        for _ in range(config.profile_views):
+            talent = next(talents)
+            guest = rng.random() < config.guest_view_share
+            yield (
+                _uuid(rng), self.talent_ids[talent],
+                None if guest else self.client_ids[rng.randrange(config.clients)],
+                f"102.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}" if guest else None,
+                rng.choice(USER_AGENTS), _iso(self._moment(rng, self.talent_created[talent])),
+            )
+
+
+def _copy_chunks(rows):
+    """COPY text for the rows, in chunks of about COPY_CHUNK_BYTES; yields (chunk, row_count)"""
+    lines, size, count = [], 0, 0
+    for row in rows:
+        line = copy_line(row)
+        lines.append(line)
+        size += len(line)
+        count += 1
+        if size >= COPY_CHUNK_BYTES:
+            yield "".join(lines), count
+            lines, size, count = [], 0, 0
+    if lines:
+        yield "".join(lines), count
+
+
+def load_postgres(dataset, dsn, reset=False, log=print):
+    """Stream every table into Postgres with COPY; returns {table: rows}"""
+    import psycopg
+
+    counts = {}
+    with psycopg.connect(dsn) as conn:
+        with conn.cursor() as cur:
+            cur.execute("set session_replication_role = replica")
+            if reset:
+                cur.execute(RESET_SQL)
+                conn.commit()
+            for table, columns, rows in dataset.tables():
+                started = time.perf_counter()
+                counts[table] = 0
+                with cur.copy(f"copy public.{table} ({', '.join(columns)}) from stdin") as copy:
+                    for chunk, count in _copy_chunks(rows):
+                        copy.write(chunk)
+                        counts[table] += count
+                conn.commit()
+                elapsed = time.perf_counter() - started
+                log(f"{table:<14} {counts[table]:>10} rows  {elapsed:7.1f}s  {counts[table] / max(elapsed, 1e-9):>9.0f} rows/s")
+            cur.execute("set session_replication_role = origin")
+            cur.execute(POST_LOAD_SQL)
+            conn.commit()
+    return counts
+
+
+def write_files(dataset, out_dir, reset=False, log=print):
+    """Write <table>.tsv COPY files and a load.sql psql script; returns {table: rows}"""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    script = ["\\set ON_ERROR_STOP on", "set session_replication_role = replica;"]
+    if reset:
+        script += ["begin;", RESET_SQL.strip(), "commit;"]
+    for table, columns, rows in dataset.tables():
+        counts[table] = 0
+        with open(os.path.join(out_dir, f"{table}.tsv"), "w", encoding="utf-8", newline="") as handle:
+            for chunk, count in _copy_chunks(rows):
+                handle.write(chunk)
+                counts[table] += count
+        script.append(f"\\copy public.{table} ({', '.join(columns)}) from '{table}.tsv'")
+        log(f"{table:<14} {counts[table]:>10} rows")
+    script += ["set session_replication_role = origin;", POST_LOAD_SQL.strip()]
+    with open(os.path.join(out_dir, "load.sql"), "w", encoding="utf-8") as handle:
+        handle.write("\n".join(script) + "\n")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--dsn", help="Postgres connection string to COPY into")
+    target.add_argument("--out", help="directory for <table>.tsv files and load.sql")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every row count, e.g. 0.01")
+    parser.add_argument("--reset", action="store_true", help="delete previously generated rows first")
+    parser.add_argument("--end", help="last day of activity (YYYY-MM-DD, UTC); default today")
+    # Every row count, skew and share in DatasetConfig is also a flag, e.g. --talent-skew 1.3
+    tunables = [spec for spec in fields(DatasetConfig) if type(spec.default) in (int, float)]
+    for spec in tunables:
+        parser.add_argument(f"--{spec.name.replace('_', '-')}", type=type(spec.default), default=spec.default)
+    args = parser.parse_args(argv)
+
+    config = DatasetConfig(**{spec.name: getattr(args, spec.name) for spec in tunables})
+    if args.end:
+        config = replace(config, end=datetime.strptime(args.end, "%Y-%m-%d").replace(tzinfo=timezone.utc))
+    if args.scale != 1.0:
+        config = config.scaled(args.scale)
+
+    started = time.perf_counter()
+    dataset = Dataset(config)
+    if args.dsn:
+        counts = load_postgres(dataset, args.dsn, reset=args.reset)
+    else:
+        counts = write_files(dataset, args.out, reset=args.reset)
+    print(f"{sum(counts.values())} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
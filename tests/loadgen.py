@@ -0,0 +1,218 @@
+"""
+Concurrent load generator for the Nego API
+Drives the shared scenarios in tests/scenarios.py with asyncio over pooled
+keep-alive connections and reports throughput plus p50/p95/p99 latency per
+endpoint. Passing several concurrency levels steps the load up so the knee of
+the latency curve shows up in one run. Server-Timing headers are aggregated
+into a per-stage breakdown for each endpoint (see tests/timings.py).
+
+Usage:
+    python -m tests.loadgen --concurrency 50,200,1000 --requests 5000
+    python -m tests.loadgen --scenario /api/gifts --header "Cookie: sb-...=..."
+
+Requires aiohttp.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+
+from tests import scenarios as scenario_defs
+from tests.seeding import worker_namespace, worker_seed
+from tests.timings import StageTimings, percentile, print_summary
+
+OK = "ok"
+CHECK_FAILED = "check_failed"
+ERROR = "error"
+
+
+def summarize(latencies):
+    """Latency summary in milliseconds"""
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round((ordered[-1] if ordered else 0) * 1000, 2),
+    }
+
+
+async def execute(session, base_url, scenario, extra_headers=None, stages=None):
+    """Send one scenario request; returns (latency_seconds, outcome, detail)
+
+    Pass a StageTimings as `stages` to record the response's Server-Timing header.
+    """
+    kwargs = scenario.request_kwargs()
+    if extra_headers:
+        kwargs["headers"].update(extra_headers)
+    started = time.perf_counter()
+    try:
+        async with session.request(scenario.method, f"{base_url}{scenario.path}", **kwargs) as response:
+            raw = await response.read()
+            latency = time.perf_counter() - started
+            status = response.status
+            if stages is not None:
+                stages.add_header(scenario.endpoint, response.headers.get("Server-Timing"))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        return time.perf_counter() - started, ERROR, f"{type(exc).__name__}: {exc}"
+
+    try:
+        data = json.loads(raw) if raw else None
+        scenario.check(status, data)
+    except (AssertionError, ValueError, KeyError, TypeError) as exc:
+        return latency, CHECK_FAILED, f"HTTP {status}: {str(exc) or type(exc).__name__}"
+    return latency, OK, None
+
+
+def make_session(concurrency, timeout):
+    """Client session whose connector keeps up to `concurrency` sockets alive"""
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=concurrency,
+        keepalive_timeout=60,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+async def run_level(scenarios, concurrency, total_requests, base_url, headers=None, timeout=30, warmup=0):
+    """Run `total_requests` calls spread round-robin over scenarios with `concurrency` workers"""
+    samples = defaultdict(list)
+    stages = StageTimings()
+    outcomes = defaultdict(lambda: defaultdict(int))
+    first_failure = {}
+    next_index = 0
+
+    async with make_session(concurrency, timeout) as session:
+        # Warm the pool so connection setup is not counted as latency
+        if warmup:
+            await asyncio.gather(*(
+                execute(session, base_url, s, headers)
+                for s in scenarios
+                for _ in range(warmup)
+            ))
+
+        async def worker():
+            nonlocal next_index
+            while next_index < total_requests:
+                scenario = scenarios[next_index % len(scenarios)]
+                next_index += 1
+                latency, outcome, detail = await execute(session, base_url, scenario, headers, stages)
+                samples[scenario.endpoint].append(latency)
+                outcomes[scenario.endpoint][outcome] += 1
+                if detail and scenario.endpoint not in first_failure:
+                    first_failure[scenario.endpoint] = f"{scenario.name}: {detail}"
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, latencies in sorted(samples.items()):
+        endpoints[endpoint] = {
+            "requests": len(latencies),
+            "ok": outcomes[endpoint][OK],
+            "check_failed": outcomes[endpoint][CHECK_FAILED],
+            "errors": outcomes[endpoint][ERROR],
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            **summarize(latencies),
+            "first_failure": first_failure.get(endpoint),
+        }
+
+    all_latencies = [latency for values in samples.values() for latency in values]
+    return {
+        "concurrency": concurrency,
+        "requests": len(all_latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        **summarize(all_latencies),
+        "endpoints": endpoints,
+        "stages": stages.summary(),
+    }
+
+
+def find_knee(levels, min_gain=0.10):
+    """Concurrency level after which throughput stops growing by at least `min_gain`"""
+    for previous, current in zip(levels, levels[1:]):
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+            return previous["concurrency"]
+    return None
+
+
+def print_level(level):
+    print(
+        f"\n== concurrency {level['concurrency']}: {level['requests']} requests in "
+        f"{level['elapsed_s']}s ({level['throughput_rps']} req/s) "
+        f"p50={level['p50_ms']}ms p95={level['p95_ms']}ms p99={level['p99_ms']}ms"
+    )
+    print(f"{'endpoint':<36}{'reqs':>7}{'ok':>7}{'chk':>6}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for endpoint, stats in level["endpoints"].items():
+        print(
+            f"{endpoint:<36}{stats['requests']:>7}{stats['ok']:>7}{stats['check_failed']:>6}"
+            f"{stats['errors']:>6}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+            f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+        )
+        if stats["first_failure"]:
+            print(f"    first failure: {stats['first_failure']}")
+    if level["stages"]:
+        print("\nstage breakdown (Server-Timing):")
+        print_summary(level["stages"])
+
+
+def parse_headers(values):
+    headers = {}
+    for value in values or []:
+        name, _, content = value.partition(":")
+        headers[name.strip()] = content.strip()
+    return headers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=scenario_defs.BASE_URL)
+    parser.add_argument("--concurrency", default="100",
+                        help="comma-separated concurrency levels, e.g. 50,200,1000")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--scenario", action="append",
+                        help="only run scenarios whose name or path contains this (repeatable)")
+    parser.add_argument("--header", action="append", help="extra header, e.g. 'Cookie: ...' (repeatable)")
+    parser.add_argument("--warmup", type=int, default=1, help="warm-up calls per scenario before each level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", dest="json_path", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    levels = []
+    with worker_seed(worker_namespace()) as seed:
+        selected = scenario_defs.select(seed, args.scenario)
+        if not selected:
+            parser.error("no scenarios matched")
+
+        for concurrency in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            level = asyncio.run(run_level(
+                selected, concurrency, args.requests, args.base_url.rstrip("/"),
+                headers=parse_headers(args.header), timeout=args.timeout, warmup=args.warmup,
+            ))
+            print_level(level)
+            levels.append(level)
+
+    knee = find_knee(levels)
+    if len(levels) > 1:
+        print(f"\nthroughput knee: {knee if knee is not None else 'not reached'}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump({"base_url": args.base_url, "levels": levels, "knee": knee}, fh, indent=2)
+
+    errors = sum(stats["errors"] for level in levels for stats in level["endpoints"].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
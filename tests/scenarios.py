@@ -0,0 +1,170 @@
+"""
+Shared API scenarios
+Request payloads from the API test suites so the load and benchmark modes
+exercise exactly what the functional tests assert.
+
+Each scenario is a single HTTP call plus a ``check(status, data)`` function from
+tests/checks.py, the same one the test it was taken from calls.
+Users and talents come from a worker seed (tests/seeding.py), the same data the
+``seed`` fixture gives the suites:
+
+    with worker_seed(worker_namespace()) as seed:
+        selected = select(seed, ["/api/gifts"])
+"""
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from tests import checks
+from tests.seeding import SEED_PASSWORD
+
+BASE_URL = os.environ.get("NEGO_BASE_URL", "http://localhost:3000").rstrip("/")
+
+
+@dataclass
+class Scenario:
+    """One request shape against one endpoint"""
+    name: str
+    method: str
+    path: str
+    check: Callable[[int, object], None]
+    json: object = None
+    params: Optional[dict] = None
+    data: Optional[str] = None
+    headers: dict = field(default_factory=dict)
+
+    @property
+    def endpoint(self):
+        return f"{self.method} {self.path}"
+
+    def request_kwargs(self):
+        """Build per-call kwargs; callable payloads are evaluated per request"""
+        kwargs = {"headers": dict(self.headers)}
+        payload = self.json() if callable(self.json) else self.json
+        if payload is not None:
+            kwargs["json"] = payload
+        if self.params:
+            kwargs["params"] = self.params
+        if self.data is not None:
+            kwargs["data"] = self.data
+        return kwargs
+
+
+def _random_ids(*keys):
+    return lambda: {key: str(uuid.uuid4()) for key in keys}
+
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def build(seed):
+    """Every scenario, with ids and credentials taken from a WorkerSeed"""
+    client = seed.clients[0]
+    sender_id = client.id
+    recipient_id = seed.talents[0].id
+    return [
+        Scenario("talents_list", "GET", "/api/talents", checks.check_talents_list),
+        Scenario("talent_single", "GET", "/api/talents/talent-1", checks.check_single_talent),
+        Scenario("talent_nonexistent", "GET", "/api/talents/nonexistent-talent", checks.check_not_found),
+        Scenario("content_list", "GET", "/api/content", checks.check_content_list),
+        Scenario(
+            "auth_register_duplicate", "POST", "/api/auth/register", checks.check_register_duplicate,
+            json={"email": client.email, "name": "Duplicate User", "password": "password123"},
+        ),
+        Scenario(
+            "auth_login_valid", "POST", "/api/auth/login", checks.check_login_valid(client.email),
+            json={"email": client.email, "password": SEED_PASSWORD},
+        ),
+        Scenario(
+            "auth_login_invalid", "POST", "/api/auth/login", checks.check_unauthorized,
+            json={"email": client.email, "password": "wrongpassword"},
+        ),
+        Scenario("auth_me_without_token", "GET", "/api/auth/me", checks.check_me_without_token),
+        Scenario(
+            "auth_me_invalid_token", "GET", "/api/auth/me", checks.check_unauthorized,
+            headers={"Authorization": "Bearer invalid_token"},
+        ),
+        Scenario(
+            "gift_missing_sender", "POST", "/api/gifts", checks.check_gift_missing_sender,
+            json={"recipientId": recipient_id, "amount": 100},
+        ),
+        Scenario(
+            "gift_invalid_sender_uuid", "POST", "/api/gifts", checks.check_gift_invalid_sender,
+            json={"senderId": "invalid-uuid", "recipientId": recipient_id, "amount": 100},
+        ),
+        Scenario(
+            "gift_amount_below_minimum", "POST", "/api/gifts", checks.check_gift_below_minimum,
+            json={"senderId": sender_id, "recipientId": recipient_id, "amount": 50},
+        ),
+        Scenario(
+            "gift_self_gifting", "POST", "/api/gifts", checks.check_gift_self,
+            json={"senderId": sender_id, "recipientId": sender_id, "amount": 100},
+        ),
+        Scenario(
+            "gift_valid_with_message", "POST", "/api/gifts", checks.check_gift_valid_with_message,
+            json={
+                "senderId": sender_id,
+                "recipientId": recipient_id,
+                "amount": 100,
+                "message": "Thank you for your great work!",
+            },
+        ),
+        Scenario(
+            "gift_nonexistent_sender", "POST", "/api/gifts", checks.check_gift_nonexistent_sender,
+            json=lambda: {**_random_ids("senderId", "recipientId")(), "amount": 100},
+            headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "gift_invalid_json", "POST", "/api/gifts", checks.check_invalid_json,
+            data="not-valid-json", headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "gift_leaderboard_requires_session", "GET", "/api/gifts/leaderboard",
+            checks.check_leaderboard_requires_session,
+            params={"talentId": recipient_id, "range": "week"},
+        ),
+        Scenario(
+            "unlock_missing_fields", "POST", "/api/media/unlock", checks.check_unlock_missing_fields,
+            json={}, headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "unlock_invalid_uuid", "POST", "/api/media/unlock", checks.check_unlock_invalid_uuid,
+            json={"userId": "invalid", "mediaId": "invalid", "talentId": "invalid", "unlockPrice": 100},
+            headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "unlock_nonexistent_user", "POST", "/api/media/unlock", checks.check_unlock_nonexistent_user,
+            json=lambda: {**_random_ids("userId", "mediaId", "talentId")(), "unlockPrice": 100},
+            headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "unlock_no_server_error", "POST", "/api/media/unlock", checks.check_no_server_error,
+            json={"userId": "test", "mediaId": "test", "talentId": "test", "unlockPrice": 100},
+            headers=JSON_HEADERS,
+        ),
+        Scenario(
+            "signature_default", "GET", "/api/cloudinary/signature", checks.check_signature(),
+        ),
+        Scenario(
+            "signature_video", "GET", "/api/cloudinary/signature", checks.check_signature("uploads", "video"),
+            params={"resource_type": "video"},
+        ),
+        Scenario(
+            "signature_media_folder", "GET", "/api/cloudinary/signature", checks.check_signature("media"),
+            params={"folder": "media"},
+        ),
+        Scenario(
+            "signature_invalid_resource_type", "GET", "/api/cloudinary/signature",
+            checks.check_signature_invalid_type,
+            params={"resource_type": "audio"},
+        ),
+    ]
+
+
+def select(seed, patterns=None):
+    """Return scenarios whose name or path contains any of the given substrings"""
+    scenarios = build(seed)
+    if not patterns:
+        return scenarios
+    return [s for s in scenarios if any(p in s.name or p in s.path for p in patterns)]
@@ -0,0 +1,237 @@
+"""
+Per-worker test data
+Creates an isolated set of users, wallets and talents for one test worker and
+removes it afterwards, so suites can run sharded across processes (pytest -n)
+and rerun without colliding on emails or shared balances.
+
+Every row a worker creates is tagged with its namespace: emails look like
+``<role><n>.<namespace>@nego.test`` and display names start with the namespace.
+Auth users are created concurrently through the GoTrue admin API (it has no bulk
+endpoint); wallets are then set in one PostgREST upsert. Talents are made bookable
+the way the seed scripts do it: an online, verified profile with a starting price
+and a menu built from the active service_types. Teardown deletes the auth users,
+which cascades to their profiles, wallets and menus.
+
+Usage:
+    seed = WorkerSeed(supabase_url, service_role_key, namespace="gw0-1a2b3c")
+    seed.create(clients=2, talents=2, balance=1000)
+    ...
+    seed.teardown()
+
+The ``seed`` fixture and the load and benchmark tools share one shape through
+``worker_seed()``:
+
+    with worker_seed(worker_namespace()) as seed:
+        ...
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SEED_PASSWORD = "SeedPass123!"
+
+# Simultaneous admin API calls while creating or deleting a worker's users
+SEED_CONCURRENCY = 8
+
+# What every worker gets from worker_seed()
+SEED_CLIENTS = 2
+SEED_TALENTS = 2
+SEED_BALANCE = 1000
+
+# Services on each seeded talent's menu, priced from TALENT_BASE_PRICE up in steps
+TALENT_MENU_SIZE = 3
+TALENT_BASE_PRICE = 3000
+TALENT_PRICE_STEP = 1000
+
+
+def pooled_session(pool_size=16):
+    """requests.Session that keeps up to ``pool_size`` connections per host alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def worker_namespace(run_id=None):
+    """Namespace for this process: the xdist worker id (or "main") plus a run id"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return f"{worker}-{run_id or uuid.uuid4().hex[:6]}"
+
+
+@dataclass
+class SeedUser:
+    id: str
+    email: str
+    role: str
+    password: str = SEED_PASSWORD
+    # Talents only: [{"service_type_id": ..., "price": ...}], cheapest first
+    menu: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class WorkerSeed:
+    """One worker's users; ``persisted`` is False when no Supabase is configured"""
+    supabase_url: Optional[str]
+    service_role_key: Optional[str]
+    namespace: str
+    session: requests.Session = field(default_factory=pooled_session)
+    clients: List[SeedUser] = field(default_factory=list)
+    talents: List[SeedUser] = field(default_factory=list)
+    persisted: bool = False
+
+    @classmethod
+    def from_env(cls, namespace, session=None):
+        """Seed against NEXT_PUBLIC_SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY when set"""
+        return cls(
+            os.environ.get("NEXT_PUBLIC_SUPABASE_URL"),
+            os.environ.get("SUPABASE_SERVICE_ROLE_KEY"),
+            namespace,
+            session=session or pooled_session(),
+        )
+
+    @property
+    def users(self):
+        return self.clients + self.talents
+
+    def _headers(self):
+        return {"apikey": self.service_role_key, "Authorization": f"Bearer {self.service_role_key}"}
+
+    def _plan(self, role, count):
+        # uuid5 keeps ids stable within a namespace and distinct across namespaces
+        return [
+            SeedUser(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"nego-test/{self.namespace}/{role}/{n}")),
+                email=f"{role}{n}.{self.namespace}@nego.test",
+                role=role,
+            )
+            for n in range(count)
+        ]
+
+    def _create_user(self, user):
+        response = self.session.post(
+            f"{self.supabase_url}/auth/v1/admin/users",
+            headers=self._headers(),
+            json={
+                "id": user.id,
+                "email": user.email,
+                "password": user.password,
+                "email_confirm": True,
+                "user_metadata": {"role": user.role, "display_name": f"{self.namespace} {user.role}"},
+            },
+            timeout=30,
+        )
+        response.raise_for_status()
+
+    def _delete_user(self, user):
+        response = self.session.delete(
+            f"{self.supabase_url}/auth/v1/admin/users/{user.id}", headers=self._headers(), timeout=30,
+        )
+        return response.status_code in (200, 204, 404)
+
+    def create(self, clients=2, talents=2, balance=0):
+        """Create the users, then set every wallet's balance in one request"""
+        self.clients = self._plan("client", clients)
+        self.talents = self._plan("talent", talents)
+        if not (self.supabase_url and self.service_role_key):
+            return self
+
+        # Set first so a partial failure still tears down the users that were created;
+        # deleting one that never was is a 404, which _delete_user counts as removed
+        self.persisted = True
+        try:
+            with ThreadPoolExecutor(max_workers=SEED_CONCURRENCY) as pool:
+                list(pool.map(self._create_user, self.users))
+
+            response = self.session.post(
+                f"{self.supabase_url}/rest/v1/wallets?on_conflict=user_id",
+                headers={**self._headers(), "Prefer": "resolution=merge-duplicates,return=minimal"},
+                json=[{"user_id": user.id, "balance": balance, "escrow_balance": 0} for user in self.users],
+                timeout=30,
+            )
+            response.raise_for_status()
+
+            if self.talents:
+                self._seed_talents()
+        except Exception:
+            # The fixture never reaches its teardown when create() raises
+            self.teardown()
+            raise
+        return self
+
+    def _seed_talents(self):
+        """Give every talent a bookable profile and menu in two upserts"""
+        response = self.session.get(
+            f"{self.supabase_url}/rest/v1/service_types",
+            headers=self._headers(),
+            params={"select": "id", "is_active": "eq.true", "order": "name", "limit": TALENT_MENU_SIZE},
+            timeout=30,
+        )
+        response.raise_for_status()
+        service_type_ids = [row["id"] for row in response.json()]
+        if not service_type_ids:
+            raise RuntimeError("no active service_types to build talent menus from; load the seed SQL first")
+
+        for talent in self.talents:
+            talent.menu = [
+                {"service_type_id": service_type_id, "price": TALENT_BASE_PRICE + n * TALENT_PRICE_STEP}
+                for n, service_type_id in enumerate(service_type_ids)
+            ]
+
+        response = self.session.post(
+            f"{self.supabase_url}/rest/v1/profiles?on_conflict=id",
+            headers={**self._headers(), "Prefer": "resolution=merge-duplicates,return=minimal"},
+            json=[
+                {
+                    "id": talent.id,
+                    "role": "talent",
+                    "display_name": f"{self.namespace} talent {n}",
+                    "location": "Lagos, Nigeria",
+                    "is_verified": True,
+                    "status": "online",
+                    "starting_price": talent.menu[0]["price"],
+                }
+                for n, talent in enumerate(self.talents)
+            ],
+            timeout=30,
+        )
+        response.raise_for_status()
+
+        response = self.session.post(
+            f"{self.supabase_url}/rest/v1/talent_menus?on_conflict=talent_id,service_type_id",
+            headers={**self._headers(), "Prefer": "resolution=merge-duplicates,return=minimal"},
+            json=[
+                {"talent_id": talent.id, **item, "is_active": True}
+                for talent in self.talents
+                for item in talent.menu
+            ],
+            timeout=30,
+        )
+        response.raise_for_status()
+
+    def teardown(self):
+        """Delete this worker's users; returns the number that could not be removed"""
+        if not self.persisted:
+            return 0
+        with ThreadPoolExecutor(max_workers=SEED_CONCURRENCY) as pool:
+            removed = list(pool.map(self._delete_user, self.users))
+        self.persisted = False
+        return removed.count(False)
+
+
+@contextmanager
+def worker_seed(namespace, session=None):
+    """Create this worker's standard seed from the environment and remove it on exit"""
+    seed = WorkerSeed.from_env(namespace, session=session).create(
+        clients=SEED_CLIENTS, talents=SEED_TALENTS, balance=SEED_BALANCE,
+    )
+    try:
+        yield seed
+    finally:
+        seed.teardown()
@@ -0,0 +1,870 @@
+"""
+Local Supabase stand-in
+An in-process, in-memory implementation of the slice of PostgREST, RPC and
+GoTrue that the API routes use, so the Next.js server and the Python suites can
+run without a live Supabase project.
+
+Covered surface:
+    GET/POST/PATCH/DELETE /rest/v1/<table>   eq, neq, gt, gte, lt, lte, like, ilike,
+                                             is, in, or=(...), select, order, limit,
+                                             offset, Prefer return/count/resolution
+    POST /rest/v1/rpc/<function>             handle_gift, unlock_media
+    GET  /auth/v1/user                       bearer-token lookup
+    POST /auth/v1/token?grant_type=password  password sign-in for seeded users
+    POST/DELETE /auth/v1/admin/users[/<id>]  service-role user management
+
+Data is seeded from supabase/database/supabase_seed_talents.sql. Each RPC runs
+under one lock, which gives it the same all-or-nothing behaviour as the
+plpgsql functions.
+
+Usage:
+    python -m tests.supabase_stub --port 54321   # prints the env for `npm run dev`
+
+    with SupabaseStub() as stub:                  # or in-process from a test
+        requests.get(f"{stub.url}/rest/v1/profiles", headers=stub.service_headers())
+"""
+import argparse
+import base64
+import copy
+import fnmatch
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+SEED_SQL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "supabase", "database", "supabase_seed_talents.sql",
+)
+
+JWT_SECRET = "nego-local-stub-secret"
+
+TEST_CLIENT_ID = "c0000000-0000-0000-0000-000000000001"
+TEST_CLIENT_EMAIL = "testclient@nego.test"
+TEST_CLIENT_PASSWORD = "TestPass123!"
+
+# Conflict targets for upserts and unique checks; everything else is keyed on id.
+PRIMARY_KEYS = {
+    "wallets": ("user_id",),
+    "notification_preferences": ("user_id",),
+    "user_unlocks": ("user_id", "media_id"),
+    "talent_menus": ("talent_id", "service_type_id"),
+}
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------------------------
+
+def _b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64url_decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def make_jwt(claims, secret=JWT_SECRET):
+    """HS256 token with the claims Supabase puts in its access tokens"""
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64url(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64url(signature)}"
+
+
+def decode_jwt(token, secret=JWT_SECRET):
+    """Claims of a token signed by this stub, or None"""
+    try:
+        header, payload, signature = token.split(".")
+    except (AttributeError, ValueError):
+        return None
+    expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(_b64url(expected), signature):
+        return None
+    claims = json.loads(_b64url_decode(payload))
+    if claims.get("exp") and claims["exp"] < time.time():
+        return None
+    return claims
+
+
+# ---------------------------------------------------------------------------
+# Seed parsing
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\s*('(?:[^']|'')*'|-?\d+(?:\.\d+)?|\w+)\s*(?:,|$)")
+
+
+def _parse_value(token, variables):
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    lowered = token.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "null":
+        return None
+    if re.fullmatch(r"-?\d+", token):
+        return int(token)
+    if re.fullmatch(r"-?\d+\.\d+", token):
+        return float(token)
+    return variables.get(token)
+
+
+def _split_tuples(values_sql):
+    """Yield the inside of each top-level (...) group, ignoring parens in strings"""
+    depth, start, in_string = 0, None, False
+    for i, char in enumerate(values_sql):
+        if char == "'":
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char == "(":
+            depth += 1
+            if depth == 1:
+                start = i + 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                yield values_sql[start:i]
+
+
+def parse_seed_sql(sql):
+    """Rows per table from the seed script's DECLAREs, SELECT INTOs and INSERTs"""
+    tables = {}
+    variables = dict(re.findall(r"(\w+)\s+UUID\s*:=\s*'([0-9a-f-]{36})'", sql))
+
+    # SELECT id INTO dinner_id FROM service_types WHERE name = 'Dinner Date';
+    for var, table, name in re.findall(
+        r"SELECT\s+id\s+INTO\s+(\w+)\s+FROM\s+(\w+)\s+WHERE\s+name\s*=\s*'([^']*)'", sql, re.I
+    ):
+        row_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{table}:{name}"))
+        variables[var] = row_id
+        tables.setdefault(table, []).append({"id": row_id, "name": name, "is_active": True})
+
+    for table, columns, values in re.findall(
+        r"INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES(.*?);", sql, re.I | re.S
+    ):
+        names = [c.strip() for c in columns.split(",")]
+        for group in _split_tuples(values):
+            cells = [_parse_value(t, variables) for t in _TOKEN.findall(group.strip())]
+            tables.setdefault(table, []).append(dict(zip(names, cells)))
+    return tables
+
+
+# ---------------------------------------------------------------------------
+# In-memory database
+# ---------------------------------------------------------------------------
+
+class StubError(Exception):
+    """PostgREST-shaped error"""
+
+    def __init__(self, message, status=400, code="PGRST000"):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _coerce(raw, sample):
+    """Turn a query-string value into the type of the column it is compared to"""
+    if raw == "null":
+        return None
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return float(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _split_top_level(text):
+    parts, depth, current = [], 0, ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _match(row, column, expression):
+    """Evaluate one PostgREST filter like `eq.5`, `not.is.null` or `in.(a,b)`"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    value = row.get(column)
+
+    if op == "is":
+        result = value is None if raw == "null" else value is (raw == "true")
+    elif op == "in":
+        options = [o.strip().strip('"') for o in raw.strip("()").split(",") if o.strip()]
+        result = value is not None and any(value == _coerce(o, value) for o in options)
+    elif op in ("like", "ilike"):
+        pattern = raw.replace("*", "%").replace("%", "*")
+        if value is None:
+            result = False
+        elif op == "ilike":
+            result = fnmatch.fnmatchcase(str(value).lower(), pattern.lower())
+        else:
+            result = fnmatch.fnmatchcase(str(value), pattern)
+    elif value is None:
+        result = False
+    else:
+        other = _coerce(raw, value)
+        result = {
+            "eq": value == other,
+            "neq": value != other,
+            "gt": value > other,
+            "gte": value >= other,
+            "lt": value < other,
+            "lte": value <= other,
+        }.get(op)
+        if result is None:
+            raise StubError(f"unsupported operator: {op}")
+    return not result if negate else result
+
+
+def _match_or(row, expression):
+    """`(a.eq.1,and(b.gt.2,c.is.null))` style groups"""
+    for clause in _split_top_level(expression.strip()[1:-1]):
+        if clause.startswith("and("):
+            if all(_match_condition(row, c) for c in _split_top_level(clause[4:-1])):
+                return True
+        elif _match_condition(row, clause):
+            return True
+    return False
+
+
+def _match_condition(row, clause):
+    column, _, expression = clause.partition(".")
+    return _match(row, column, expression)
+
+
+def _project(row, select):
+    """Apply a select list; embedded resources (`profiles(...)`) are left out"""
+    if not select or select.strip() == "*":
+        return dict(row)
+    projected = {}
+    for item in _split_top_level(select):
+        item = item.strip()
+        if "(" in item or not item:
+            continue
+        if item == "*":
+            projected.update(row)
+            continue
+        alias, _, column = item.rpartition(":")
+        column = column.split("::")[0]
+        projected[alias or column] = row.get(column)
+    return projected
+
+
+class Database:
+    """Tables of plain dict rows guarded by one re-entrant lock"""
+
+    def __init__(self, seed=None):
+        self.lock = threading.RLock()
+        self.tables = {}
+        self.users = {}
+        if seed:
+            for table, rows in seed.items():
+                for row in rows:
+                    self.insert(table, dict(row))
+
+    def rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    def key(self, table, row):
+        return tuple(row.get(c) for c in PRIMARY_KEYS.get(table, ("id",)))
+
+    def find(self, table, **where):
+        for row in self.rows(table):
+            if all(row.get(k) == v for k, v in where.items()):
+                return row
+        return None
+
+    def insert(self, table, row, upsert=False, ignore_duplicates=False):
+        with self.lock:
+            if PRIMARY_KEYS.get(table) != ("user_id",):
+                row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", now_iso())
+            existing = next((r for r in self.rows(table) if self.key(table, r) == self.key(table, row)), None)
+            if existing is not None:
+                if ignore_duplicates:
+                    return None
+                if not upsert:
+                    raise StubError(
+                        f'duplicate key value violates unique constraint "{table}_pkey"',
+                        status=409, code="23505",
+                    )
+                existing.update(row)
+                return existing
+            self.rows(table).append(row)
+            return row
+
+    def query(self, table, filters, or_groups=()):
+        matched = []
+        for row in self.rows(table):
+            if all(_match(row, column, expr) for column, expr in filters):
+                if all(_match_or(row, group) for group in or_groups):
+                    matched.append(row)
+        return matched
+
+    def add_user(self, email, password, user_id=None, role="client", balance=0, display_name=None):
+        """Create an auth user with a profile and wallet; returns the user id"""
+        user_id = user_id or str(uuid.uuid4())
+        with self.lock:
+            self.users[user_id] = {"id": user_id, "email": email, "password": password, "role": role}
+            self.insert("profiles", {
+                "id": user_id, "role": role, "email": email,
+                "display_name": display_name or email.split("@")[0],
+            }, upsert=True)
+            self.insert("wallets", {"user_id": user_id, "balance": balance, "escrow_balance": 0}, upsert=True)
+        return user_id
+
+    def remove_user(self, user_id):
+        """Delete an auth user and, like the on-delete cascades, their rows"""
+        with self.lock:
+            if self.users.pop(user_id, None) is None:
+                return False
+            for table, rows in self.tables.items():
+                column = {"profiles": "id", "talent_menus": "talent_id"}.get(table, "user_id")
+                rows[:] = [row for row in rows if row.get(column) != user_id]
+        return True
+
+
+# ---------------------------------------------------------------------------
+# RPC functions (mirrors of the plpgsql in supabase/)
+# ---------------------------------------------------------------------------
+
+def rpc_handle_gift(db, params, caller_id):
+    sender_id = params.get("p_sender_id")
+    recipient_id = params.get("p_recipient_id")
+    amount = params.get("p_amount")
+    message = params.get("p_message")
+
+    if not sender_id:
+        return {"success": False, "error": "Sender ID is required"}
+    if not recipient_id:
+        return {"success": False, "error": "Recipient ID is required"}
+    if amount is None or amount < 100:
+        return {"success": False, "error": "Minimum gift amount is 100 coins"}
+    if amount > 1000000:
+        return {"success": False, "error": "Maximum gift amount is 1,000,000 coins"}
+    if sender_id == recipient_id:
+        return {"success": False, "error": "You cannot send a gift to yourself"}
+
+    sender = db.find("profiles", id=sender_id) or {}
+    recipient = db.find("profiles", id=recipient_id) or {}
+    sender_name = sender.get("display_name") or "Someone"
+    recipient_name = recipient.get("display_name") or "Talent"
+
+    sender_wallet = db.find("wallets", user_id=sender_id)
+    if sender_wallet is None:
+        return {"success": False, "error": "Your wallet was not found"}
+    if sender_wallet["balance"] < amount:
+        return {"success": False, "error": f"Insufficient balance. You have {sender_wallet['balance']} coins."}
+
+    recipient_wallet = db.find("wallets", user_id=recipient_id)
+    if recipient_wallet is None:
+        recipient_wallet = db.insert("wallets", {"user_id": recipient_id, "balance": 0, "escrow_balance": 0})
+
+    sender_wallet["balance"] -= amount
+    recipient_wallet["balance"] += amount
+    gift = db.insert("gifts", {
+        "sender_id": sender_id, "recipient_id": recipient_id, "amount": amount, "message": message,
+    })
+    db.insert("transactions", {
+        "user_id": sender_id, "amount": -amount, "coins": -amount, "type": "gift",
+        "status": "completed", "description": f"Gift to {recipient_name}", "reference_id": gift["id"],
+    })
+    db.insert("transactions", {
+        "user_id": recipient_id, "amount": amount, "coins": amount, "type": "gift",
+        "status": "completed", "description": f"Gift from {sender_name}", "reference_id": gift["id"],
+    })
+    return {
+        "success": True,
+        "message": "Gift sent successfully",
+        "new_balance": sender_wallet["balance"],
+        "gift_id": gift["id"],
+    }
+
+
+def rpc_unlock_media(db, params, caller_id):
+    user_id = params.get("p_user_id")
+    media_id = params.get("p_media_id")
+
+    def failure(code, error, **extra):
+        return {"success": False, "code": code, "error": error, **extra}
+
+    if caller_id is None or caller_id != user_id:
+        return failure("forbidden", "Forbidden")
+
+    media = db.find("media", id=media_id)
+    if media is None:
+        return failure("not_found", "Content not found")
+    price = media.get("unlock_price") or 0
+    if not media.get("is_premium") or price <= 0:
+        return failure("not_premium", "This content is not available for unlock")
+    talent_id = media["talent_id"]
+    if talent_id == user_id:
+        return failure("own_content", "You can't unlock your own content")
+    if db.find("user_unlocks", user_id=user_id, media_id=media_id):
+        return failure("already_unlocked", "This content is already unlocked")
+
+    user_wallet = db.find("wallets", user_id=user_id)
+    if user_wallet is None:
+        return failure("wallet_not_found", "User wallet not found")
+    if user_wallet["balance"] < price:
+        return failure(
+            "insufficient_balance",
+            f"Insufficient balance. You need {price} coins but only have {user_wallet['balance']} coins.",
+            unlock_price=price, current_balance=user_wallet["balance"],
+        )
+    talent_wallet = db.find("wallets", user_id=talent_id)
+    if talent_wallet is None:
+        return failure("wallet_not_found", "Talent wallet not found")
+
+    user_wallet["balance"] -= price
+    talent_wallet["balance"] += price
+    db.insert("user_unlocks", {"user_id": user_id, "media_id": media_id, "unlocked_at": now_iso()})
+    db.insert("transactions", {
+        "user_id": user_id, "amount": -price, "coins": -price, "type": "premium_unlock",
+        "status": "completed", "reference_id": media_id, "description": "Unlocked premium content",
+    })
+    db.insert("transactions", {
+        "user_id": talent_id, "amount": price, "coins": price, "type": "premium_unlock",
+        "status": "completed", "reference_id": media_id, "description": "Content unlock payment",
+    })
+    return {
+        "success": True,
+        "message": "Content unlocked successfully",
+        "new_balance": user_wallet["balance"],
+        "unlock_price": price,
+        "talent_id": talent_id,
+    }
+
+
+def rpc_gift_leaderboard(db, params, caller_id):
+    recipient_id = params.get("p_recipient_id")
+    window = params.get("p_window") or "all"
+    limit = min(max(int(params.get("p_limit") or 10), 1), 50)
+
+    since = None
+    if window in ("week", "month"):
+        # Today and the 6 (week) or 29 (month) days before it, in UTC days
+        days = 7 if window == "week" else 30
+        since = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+    totals = {}
+    for gift in db.query("gifts", [("recipient_id", f"eq.{recipient_id}")]):
+        if since and gift["created_at"][:10] < since:
+            continue
+        entry = totals.setdefault(gift["sender_id"], {"total_amount": 0, "gift_count": 0})
+        entry["total_amount"] += gift["amount"]
+        entry["gift_count"] += 1
+
+    # Anyone but the recipient (or the service role) sees only their own row
+    if caller_id is not None and caller_id != recipient_id:
+        totals = {sender_id: entry for sender_id, entry in totals.items() if sender_id == caller_id}
+
+    ranked = sorted(totals.items(), key=lambda item: (-item[1]["total_amount"], item[0]))[:limit]
+    rows = []
+    for sender_id, entry in ranked:
+        profile = db.find("profiles", id=sender_id) or {}
+        rows.append({
+            "sender_id": sender_id,
+            **entry,
+            "display_name": profile.get("display_name"),
+            "avatar_url": profile.get("avatar_url"),
+            "username": profile.get("username"),
+        })
+    return rows
+
+
+RPC_FUNCTIONS = {
+    "gift_leaderboard": rpc_gift_leaderboard,
+    "handle_gift": rpc_handle_gift,
+    "unlock_media": rpc_unlock_media,
+}
+
+
+# ---------------------------------------------------------------------------
+# HTTP layer
+# ---------------------------------------------------------------------------
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NegoSupabaseStub/1.0"
+
+    @property
+    def stub(self):
+        return self.server.stub
+
+    def log_message(self, format, *args):
+        if self.stub.verbose:
+            super().log_message(format, *args)
+
+    # -- helpers -----------------------------------------------------------
+
+    def _send(self, status, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _error(self, exc):
+        self._send(exc.status, {"code": exc.code, "message": str(exc), "details": None, "hint": None})
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _caller(self):
+        """(role, user_id) for the bearer token; the anon/service keys carry no user"""
+        auth = self.headers.get("Authorization", "")
+        claims = decode_jwt(auth[7:]) if auth.startswith("Bearer ") else None
+        if not claims:
+            return None, None
+        return claims.get("role"), claims.get("sub")
+
+    def _prefer(self):
+        prefer = {}
+        for part in self.headers.get("Prefer", "").split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                prefer.setdefault(name, []).append(value)
+        return prefer
+
+    def _parse_query(self):
+        query = urlsplit(self.path).query
+        params, filters, or_groups = {}, [], []
+        for name, value in parse_qsl(query, keep_blank_values=True):
+            if name in RESERVED_PARAMS:
+                params[name] = value
+            elif name == "or":
+                or_groups.append(value)
+            else:
+                filters.append((name, value))
+        return params, filters, or_groups
+
+    # -- routing -----------------------------------------------------------
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        path = urlsplit(self.path).path
+        self.stub.request_count += 1
+        try:
+            if path.startswith("/rest/v1/rpc/"):
+                return self._rpc(path.rsplit("/", 1)[1])
+            if path.startswith("/rest/v1/"):
+                return self._table(method, path[len("/rest/v1/"):])
+            if path == "/auth/v1/user":
+                return self._auth_user()
+            if path == "/auth/v1/token":
+                return self._auth_token()
+            if path == "/auth/v1/logout":
+                return self._send(204)
+            if path.startswith("/auth/v1/admin/users"):
+                return self._auth_admin_users(method, path[len("/auth/v1/admin/users"):].strip("/"))
+            self._send(404, {"message": f"no route for {method} {path}"})
+        except StubError as exc:
+            self._error(exc)
+        except (ValueError, TypeError) as exc:
+            self._error(StubError(str(exc)))
+
+    def _rpc(self, name):
+        handler = RPC_FUNCTIONS.get(name)
+        if handler is None:
+            raise StubError(f"Could not find the function public.{name}", status=404, code="PGRST202")
+        _, caller_id = self._caller()
+        params = self._body() or {}
+        with self.stub.db.lock:
+            result = handler(self.stub.db, params, caller_id)
+        self._send(200, copy.deepcopy(result))
+
+    def _table(self, method, table):
+        db = self.stub.db
+        params, filters, or_groups = self._parse_query()
+        prefer = self._prefer()
+        wants_object = "vnd.pgrst.object" in self.headers.get("Accept", "")
+        returning = "representation" in prefer.get("return", [])
+
+        with db.lock:
+            if method in ("GET", "HEAD"):
+                rows = db.query(table, filters, or_groups)
+            elif method == "POST":
+                body = self._body()
+                records = body if isinstance(body, list) else [body]
+                resolution = prefer.get("resolution", [""])[0]
+                rows = []
+                for record in records:
+                    row = db.insert(
+                        table, dict(record),
+                        upsert=resolution == "merge-duplicates",
+                        ignore_duplicates=resolution == "ignore-duplicates",
+                    )
+                    if row is not None:
+                        rows.append(row)
+            elif method == "PATCH":
+                changes = self._body() or {}
+                rows = db.query(table, filters, or_groups)
+                for row in rows:
+                    row.update(changes)
+            else:
+                rows = db.query(table, filters, or_groups)
+                doomed = {id(r) for r in rows}
+                db.tables[table] = [r for r in db.rows(table) if id(r) not in doomed]
+
+            total = len(rows)
+            if method in ("GET", "HEAD"):
+                rows = self._order_and_page(rows, params)
+            result = [_project(r, params.get("select")) for r in rows]
+            result = copy.deepcopy(result)
+
+        headers = {}
+        counts = prefer.get("count")
+        if counts:
+            offset = int(params.get("offset", 0))
+            end = offset + len(result) - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if result else f"*/{total}"
+
+        if method == "HEAD":
+            return self._send(200, None, headers)
+        if method != "GET" and not returning:
+            return self._send(201 if method == "POST" else 204, None, headers)
+        if wants_object:
+            if len(result) != 1:
+                raise StubError(
+                    "JSON object requested, multiple (or no) rows returned",
+                    status=406, code="PGRST116",
+                )
+            return self._send(200, result[0], headers)
+        self._send(201 if method == "POST" else 200, result, headers)
+
+    @staticmethod
+    def _order_and_page(rows, params):
+        order = params.get("order")
+        if order:
+            for clause in reversed(order.split(",")):
+                column, *modifiers = clause.split(".")
+                descending = "desc" in modifiers
+                nulls_first = "nullsfirst" in modifiers or ("nullslast" not in modifiers and descending)
+                present = [r for r in rows if r.get(column) is not None]
+                missing = [r for r in rows if r.get(column) is None]
+                present.sort(key=lambda r: r[column], reverse=descending)
+                rows = missing + present if nulls_first else present + missing
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        return rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+
+    # -- auth --------------------------------------------------------------
+
+    def _auth_user(self):
+        _, user_id = self._caller()
+        user = self.stub.db.users.get(user_id) if user_id else None
+        if user is None:
+            return self._send(401, {"code": 401, "error_code": "bad_jwt", "msg": "invalid JWT"})
+        self._send(200, self.stub.public_user(user))
+
+    def _auth_token(self):
+        body = self._body() or {}
+        grant = dict(parse_qsl(urlsplit(self.path).query)).get("grant_type")
+        user = None
+        if grant == "password":
+            user = next(
+                (u for u in self.stub.db.users.values()
+                 if u["email"] == body.get("email") and u["password"] == body.get("password")),
+                None,
+            )
+        elif grant == "refresh_token":
+            user = self.stub.db.users.get(self.stub.refresh_tokens.get(body.get("refresh_token")))
+        if user is None:
+            return self._send(400, {"error": "invalid_grant", "error_description": "Invalid login credentials"})
+        self._send(200, self.stub.session_for(user["id"]))
+
+
+    def _auth_admin_users(self, method, user_id):
+        role, _ = self._caller()
+        if role != "service_role":
+            return self._send(403, {"code": 403, "error_code": "not_admin", "msg": "User not allowed"})
+        db = self.stub.db
+        if method == "POST" and not user_id:
+            body = self._body() or {}
+            metadata = body.get("user_metadata") or {}
+            if any(u["email"] == body.get("email") for u in db.users.values()):
+                return self._send(422, {"code": 422, "error_code": "email_exists",
+                                        "msg": "A user with this email address has already been registered"})
+            created = db.add_user(
+                body.get("email"), body.get("password"), user_id=body.get("id"),
+                role=metadata.get("role", "client"), display_name=metadata.get("display_name"),
+            )
+            return self._send(200, self.stub.public_user(db.users[created]))
+        if method == "DELETE" and user_id:
+            if not db.remove_user(user_id):
+                return self._send(404, {"code": 404, "error_code": "user_not_found", "msg": "User not found"})
+            return self._send(200, {})
+        self._send(405, {"code": 405, "msg": f"{method} not supported"})
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default backlog of 5 resets connections as soon as a load test ramps up.
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class SupabaseStub:
+    """Threaded stand-in server; usable as a context manager"""
+
+    def __init__(self, host="127.0.0.1", port=0, seed_path=SEED_SQL, verbose=False):
+        seed = None
+        if seed_path and os.path.exists(seed_path):
+            with open(seed_path) as fh:
+                seed = parse_seed_sql(fh.read())
+        self.db = Database(seed)
+        self.db.add_user(TEST_CLIENT_EMAIL, TEST_CLIENT_PASSWORD, user_id=TEST_CLIENT_ID, display_name="Test Client")
+        self.refresh_tokens = {}
+        self.request_count = 0
+        self.verbose = verbose
+        self.anon_key = make_jwt({"role": "anon", "iss": "supabase-stub"})
+        self.service_role_key = make_jwt({"role": "service_role", "iss": "supabase-stub"})
+        self._server = StubServer((host, port), StubRequestHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment for pointing the Next.js server at this stub"""
+        return {
+            "NEXT_PUBLIC_SUPABASE_URL": self.url,
+            "NEXT_PUBLIC_SUPABASE_ANON_KEY": self.anon_key,
+            "SUPABASE_SERVICE_ROLE_KEY": self.service_role_key,
+            "SUPABASE_JWT_SECRET": JWT_SECRET,
+        }
+
+    def service_headers(self):
+        return {"apikey": self.service_role_key, "Authorization": f"Bearer {self.service_role_key}"}
+
+    def user_headers(self, user_id):
+        token = self.session_for(user_id)["access_token"]
+        return {"apikey": self.anon_key, "Authorization": f"Bearer {token}"}
+
+    def public_user(self, user):
+        return {
+            "id": user["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": user["email"],
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {"role": user["role"]},
+            "created_at": "2026-01-01T00:00:00+00:00",
+        }
+
+    def session_for(self, user_id, ttl=3600):
+        user = self.db.users[user_id]
+        expires_at = int(time.time()) + ttl
+        refresh_token = uuid.uuid4().hex
+        self.refresh_tokens[refresh_token] = user_id
+        return {
+            "access_token": make_jwt({
+                "sub": user_id, "role": "authenticated", "aud": "authenticated",
+                "email": user["email"], "exp": expires_at,
+            }),
+            "token_type": "bearer",
+            "expires_in": ttl,
+            "expires_at": expires_at,
+            "refresh_token": refresh_token,
+            "user": self.public_user(user),
+        }
+
+    def session_cookie(self, user_id):
+        """(name, value) of the @supabase/ssr auth cookie for a signed-in user"""
+        project_ref = urlsplit(self.url).hostname.split(".")[0]
+        encoded = base64.urlsafe_b64encode(json.dumps(self.session_for(user_id)).encode()).decode().rstrip("=")
+        return f"sb-{project_ref}-auth-token", f"base64-{encoded}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--seed", default=SEED_SQL)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    stub = SupabaseStub(args.host, args.port, args.seed, args.verbose)
+    for name, value in stub.env().items():
+        print(f"{name}={value}")
+    print(f"# test client: {TEST_CLIENT_EMAIL} / {TEST_CLIENT_PASSWORD}", flush=True)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Synthetic Dataset Generator Tests
+Runs tests/datagen.py at a tiny scale, without a database.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+
+from tests import datagen
+
+END = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def small_config(**overrides):
+    return datagen.DatasetConfig(end=END, **overrides).scaled(0.002)
+
+
+def table_rows(dataset):
+    return {table: list(rows) for table, _, rows in dataset.tables()}
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return table_rows(datagen.Dataset(small_config()))
+
+
+def test_locations_come_from_the_app_list():
+    locations = datagen.load_locations()
+    assert len(locations) == 37
+    assert "Lagos" in locations and "FCT (Abuja)" in locations
+
+
+def test_same_seed_same_rows(rows):
+    again = table_rows(datagen.Dataset(small_config()))
+    assert again == rows
+    other = table_rows(datagen.Dataset(small_config(seed=7)))
+    assert other["profiles"] != rows["profiles"]
+
+
+def test_rows_match_columns(rows):
+    for table, columns in datagen.COLUMNS.items():
+        assert rows[table], table
+        assert all(len(row) == len(columns) for row in rows[table]), table
+
+
+def test_references_point_at_generated_rows(rows):
+    profiles = {row[0]: row[1] for row in rows["profiles"]}
+    assert all(profiles[row[1]] == "talent" for row in rows["media"])
+    assert all(profiles[row[1]] == "client" and profiles[row[2]] == "talent" for row in rows["bookings"])
+    assert all(profiles[row[1]] == "client" and profiles[row[2]] == "talent" for row in rows["gifts"])
+
+    conversations = {row[0]: (row[1], row[2]) for row in rows["conversations"]}
+    assert len(set(conversations.values())) == len(conversations)
+    assert all(row[2] in conversations[row[1]] for row in rows["messages"])
+    assert all(row[2].startswith(datagen.GENERATED_PREFIX) for row in rows["profiles"])
+
+
+def test_ledger_and_escrow_follow_gifts_and_bookings(rows):
+    gift_rows = [row for row in rows["transactions"] if row[4] == "gift"]
+    assert len(gift_rows) == 2 * len(rows["gifts"])
+    assert sum(row[2] for row in gift_rows) == 0
+
+    completed = [row for row in rows["bookings"] if row[5] == "completed"]
+    earnings = [row for row in rows["transactions"] if row[4] == "booking"]
+    assert sorted(row[6] for row in earnings) == sorted(row[0] for row in completed)
+
+    held = Counter()
+    for row in rows["bookings"]:
+        if row[5] in ("verification_pending", "confirmed"):
+            held[row[1]] += row[3]
+    assert {row[0]: row[2] for row in rows["wallets"] if row[2]} == dict(held)
+
+
+def test_activity_is_skewed_towards_hot_talents_and_whales(rows):
+    talents = Counter(row[2] for row in rows["gifts"])
+    senders = Counter(row[1] for row in rows["gifts"])
+    top_talents = sum(count for _, count in talents.most_common(max(1, len(talents) // 100)))
+    top_senders = sum(count for _, count in senders.most_common(max(1, len(senders) // 100)))
+    assert top_talents > 0.05 * len(rows["gifts"])
+    assert top_senders > 0.05 * len(rows["gifts"])
+
+    flat = table_rows(datagen.Dataset(small_config(talent_skew=0.0, whale_skew=0.0)))
+    flat_talents = Counter(row[2] for row in flat["gifts"])
+    assert max(flat_talents.values()) < max(talents.values())
+
+
+def test_copy_format_escapes_special_characters():
+    line = datagen.copy_line(["a\tb\nc\\d", None, True, False, 5, [{"k": "v"}]])
+    assert line == 'a\\tb\\nc\\\\d\t\\N\tt\tf\t5\t[{"k":"v"}]\n'
+
+
+def test_write_files_produces_a_psql_script(tmp_path):
+    counts = datagen.write_files(datagen.Dataset(small_config()), str(tmp_path), reset=True, log=lambda _: None)
+    script = (tmp_path / "load.sql").read_text()
+    for table, count in counts.items():
+        assert f"\\copy public.{table} (" in script
+        with open(tmp_path / f"{table}.tsv", encoding="utf-8") as handle:
+            assert sum(1 for _ in handle) == count
+    assert script.index("delete from public.profiles") < script.index("\\copy public.profiles")
+    assert script.index("session_replication_role = origin") < script.index("rebuild_derived_tables()")
@@ -5,31 +5,37 @@ Validates UUID format, amount limits, self-gifting prevention, and error message
 """
 
 import pytest
-import requests
 
-# Use localhost since this is a Next.js app with API routes
-BASE_URL = "http://localhost:3000"
+from tests import checks
+
+
+@pytest.fixture
+def sender_id(seed):
+    """A client seeded for this worker; validation tests only need a real-looking id"""
+    return seed.clients[0].id
+
+
+@pytest.fixture
+def recipient_id(seed):
+    return seed.talents[0].id
+
 
 class TestGiftAPIValidation:
     """Tests for Gift API validation - ensures user-friendly error messages"""
     
-    def test_missing_sender_id(self):
+    def test_missing_sender_id(self, http, base_url, recipient_id):
         """Test that missing senderId returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
-            json={"recipientId": "00000000-0000-0000-0000-000000000002", "amount": 100}
+        response = http.post(
+            f"{base_url}/api/gifts",
+            json={"recipientId": recipient_id, "amount": 100}
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert data["success"] == False
-        assert "Sender ID is required" in data["error"]
-        assert data.get("field") == "senderId"
+        checks.check_gift_missing_sender(response.status_code, response.json())
     
-    def test_missing_recipient_id(self):
+    def test_missing_recipient_id(self, http, base_url, sender_id):
         """Test that missing recipientId returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
-            json={"senderId": "00000000-0000-0000-0000-000000000001", "amount": 100}
+        response = http.post(
+            f"{base_url}/api/gifts",
+            json={"senderId": sender_id, "amount": 100}
         )
         assert response.status_code == 400
         data = response.json()
@@ -37,13 +43,13 @@ class TestGiftAPIValidation:
         assert "Recipient ID is required" in data["error"]
         assert data.get("field") == "recipientId"
     
-    def test_missing_amount(self):
+    def test_missing_amount(self, http, base_url, sender_id, recipient_id):
         """Test that missing amount returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002"
+                "senderId": sender_id,
+                "recipientId": recipient_id
             }
         )
         assert response.status_code == 400
@@ -52,29 +58,25 @@ class TestGiftAPIValidation:
         assert "amount is required" in data["error"].lower()
         assert data.get("field") == "amount"
     
-    def test_invalid_sender_uuid_format(self):
+    def test_invalid_sender_uuid_format(self, http, base_url, recipient_id):
         """Test that invalid senderId UUID returns clear error (not pattern error)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": "invalid-uuid",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "recipientId": recipient_id,
                 "amount": 100
             }
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert data["success"] == False
-        assert "Invalid sender ID format" in data["error"]
-        assert "pattern" not in data["error"].lower()  # No cryptic pattern errors
-        assert data.get("field") == "senderId"
+        # No cryptic pattern errors
+        checks.check_gift_invalid_sender(response.status_code, response.json())
     
-    def test_invalid_recipient_uuid_format(self):
+    def test_invalid_recipient_uuid_format(self, http, base_url, sender_id):
         """Test that invalid recipientId UUID returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
+                "senderId": sender_id,
                 "recipientId": "not-a-uuid",
                 "amount": 100
             }
@@ -86,29 +88,25 @@ class TestGiftAPIValidation:
         assert "pattern" not in data["error"].lower()
         assert data.get("field") == "recipientId"
     
-    def test_amount_below_minimum(self):
+    def test_amount_below_minimum(self, http, base_url, sender_id, recipient_id):
         """Test that amount below 100 returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 50
             }
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert data["success"] == False
-        assert "Minimum gift amount is 100" in data["error"]
-        assert data.get("field") == "amount"
+        checks.check_gift_below_minimum(response.status_code, response.json())
     
-    def test_amount_above_maximum(self):
+    def test_amount_above_maximum(self, http, base_url, sender_id, recipient_id):
         """Test that amount above 1000000 returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 1000001
             }
         )
@@ -118,77 +116,65 @@ class TestGiftAPIValidation:
         assert "Maximum gift amount is 1000000" in data["error"]
         assert data.get("field") == "amount"
     
-    def test_self_gifting_prevention(self):
+    def test_self_gifting_prevention(self, http, base_url, sender_id):
         """Test that sending gift to yourself is prevented"""
-        same_id = "00000000-0000-0000-0000-000000000001"
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        same_id = sender_id
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": same_id,
                 "recipientId": same_id,
                 "amount": 100
             }
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert data["success"] == False
-        assert "yourself" in data["error"].lower()
-        assert data.get("field") == "recipientId"
+        checks.check_gift_self(response.status_code, response.json())
     
-    def test_valid_request_with_message(self):
+    def test_valid_request_with_message(self, http, base_url, sender_id, recipient_id):
         """Test valid request with optional message (will fail due to no wallet, but validates format)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 100,
                 "message": "Thank you for your great work!"
             }
         )
-        # Should pass validation but fail on wallet lookup
-        data = response.json()
-        assert data["success"] == False
-        # Error should be about wallet, not validation
-        assert "wallet" in data["error"].lower() or "balance" in data["error"].lower()
-        # No pattern errors
-        assert "pattern" not in data["error"].lower()
+        # Should pass validation but fail on wallet lookup, with no pattern errors
+        checks.check_gift_valid_with_message(response.status_code, response.json())
     
-    def test_invalid_json_body(self):
+    def test_invalid_json_body(self, http, base_url):
         """Test that invalid JSON returns clear error"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             data="not-valid-json",
             headers={"Content-Type": "application/json"}
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert data["success"] == False
-        assert "Invalid request format" in data["error"]
+        checks.check_invalid_json(response.status_code, response.json())
 
 
 class TestGiftAPIHTTPMethods:
     """Tests for HTTP method handling"""
     
-    def test_get_method_not_allowed(self):
+    def test_get_method_not_allowed(self, http, base_url):
         """Test that GET returns 405"""
-        response = requests.get(f"{BASE_URL}/api/gifts")
+        response = http.get(f"{base_url}/api/gifts")
         assert response.status_code == 405
         data = response.json()
         assert data["success"] == False
         assert "Method not allowed" in data["error"]
     
-    def test_put_method_not_allowed(self):
+    def test_put_method_not_allowed(self, http, base_url):
         """Test that PUT returns 405"""
-        response = requests.put(f"{BASE_URL}/api/gifts", json={})
+        response = http.put(f"{base_url}/api/gifts", json={})
         assert response.status_code == 405
         data = response.json()
         assert data["success"] == False
         assert "Method not allowed" in data["error"]
     
-    def test_delete_method_not_allowed(self):
+    def test_delete_method_not_allowed(self, http, base_url):
         """Test that DELETE returns 405"""
-        response = requests.delete(f"{BASE_URL}/api/gifts")
+        response = http.delete(f"{base_url}/api/gifts")
         assert response.status_code == 405
         data = response.json()
         assert data["success"] == False
@@ -198,13 +184,13 @@ class TestGiftAPIHTTPMethods:
 class TestGiftAPIEdgeCases:
     """Tests for edge cases and boundary conditions"""
     
-    def test_amount_at_minimum_boundary(self):
+    def test_amount_at_minimum_boundary(self, http, base_url, sender_id, recipient_id):
         """Test amount exactly at minimum (100)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 100
             }
         )
@@ -212,13 +198,13 @@ class TestGiftAPIEdgeCases:
         # Should pass validation (fail on wallet lookup)
         assert "Minimum" not in data.get("error", "")
     
-    def test_amount_at_maximum_boundary(self):
+    def test_amount_at_maximum_boundary(self, http, base_url, sender_id, recipient_id):
         """Test amount exactly at maximum (1000000)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 1000000
             }
         )
@@ -226,13 +212,13 @@ class TestGiftAPIEdgeCases:
         # Should pass validation (fail on wallet lookup)
         assert "Maximum" not in data.get("error", "")
     
-    def test_amount_just_below_minimum(self):
+    def test_amount_just_below_minimum(self, http, base_url, sender_id, recipient_id):
         """Test amount at 99 (just below minimum)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 99
             }
         )
@@ -240,13 +226,13 @@ class TestGiftAPIEdgeCases:
         data = response.json()
         assert "Minimum" in data["error"]
     
-    def test_amount_just_above_maximum(self):
+    def test_amount_just_above_maximum(self, http, base_url, sender_id, recipient_id):
         """Test amount at 1000001 (just above maximum)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 1000001
             }
         )
@@ -254,12 +240,12 @@ class TestGiftAPIEdgeCases:
         data = response.json()
         assert "Maximum" in data["error"]
     
-    def test_uuid_with_uppercase(self):
+    def test_uuid_with_uppercase(self, http, base_url, sender_id):
         """Test that uppercase UUIDs are accepted"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
+                "senderId": sender_id,
                 "recipientId": "AAAAAAAA-BBBB-CCCC-DDDD-EEEEEEEEEEEE",
                 "amount": 100
             }
@@ -268,13 +254,13 @@ class TestGiftAPIEdgeCases:
         # Should pass UUID validation (fail on wallet lookup)
         assert "Invalid recipient ID format" not in data.get("error", "")
     
-    def test_empty_message_allowed(self):
+    def test_empty_message_allowed(self, http, base_url, sender_id, recipient_id):
         """Test that empty message is allowed"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 100,
                 "message": ""
             }
@@ -283,13 +269,13 @@ class TestGiftAPIEdgeCases:
         # Should pass validation (fail on wallet lookup)
         assert "message" not in data.get("error", "").lower()
     
-    def test_null_message_allowed(self):
+    def test_null_message_allowed(self, http, base_url, sender_id, recipient_id):
         """Test that null message is allowed"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
-                "senderId": "00000000-0000-0000-0000-000000000001",
-                "recipientId": "00000000-0000-0000-0000-000000000002",
+                "senderId": sender_id,
+                "recipientId": recipient_id,
                 "amount": 100,
                 "message": None
             }
@@ -298,17 +284,17 @@ class TestGiftAPIEdgeCases:
         # Should pass validation (fail on wallet lookup)
         assert "message" not in data.get("error", "").lower()
     
-    def test_no_pattern_error_in_any_response(self):
+    def test_no_pattern_error_in_any_response(self, http, base_url, sender_id, recipient_id):
         """Verify no 'pattern' error appears in any validation response"""
         test_cases = [
-            {"senderId": "bad", "recipientId": "00000000-0000-0000-0000-000000000002", "amount": 100},
-            {"senderId": "00000000-0000-0000-0000-000000000001", "recipientId": "bad", "amount": 100},
+            {"senderId": "bad", "recipientId": recipient_id, "amount": 100},
+            {"senderId": sender_id, "recipientId": "bad", "amount": 100},
             {"senderId": "123", "recipientId": "456", "amount": 100},
             {"senderId": "", "recipientId": "", "amount": 100},
         ]
         
         for test_data in test_cases:
-            response = requests.post(f"{BASE_URL}/api/gifts", json=test_data)
+            response = http.post(f"{base_url}/api/gifts", json=test_data)
             data = response.json()
             error_msg = data.get("error", "").lower()
             assert "pattern" not in error_msg, f"Pattern error found in: {data}"
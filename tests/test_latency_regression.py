@@ -0,0 +1,28 @@
+"""
+Latency Regression Tests
+Fails when a scenario's median latency regresses past the stored baseline.
+Skipped until a baseline is recorded with: python -m tests.benchmark --update-baseline
+"""
+import asyncio
+import os
+
+import pytest
+
+from tests import benchmark
+from tests.scenarios import BASE_URL
+
+BASELINE = benchmark.load_baseline()
+MAX_REGRESSION = float(os.environ.get("NEGO_BENCH_MAX_REGRESSION", "0.5"))
+
+pytestmark = pytest.mark.skipif(BASELINE is None, reason="no benchmark baseline recorded")
+
+
+@pytest.mark.parametrize("name", sorted((BASELINE or {}).get("scenarios", {})))
+def test_median_within_baseline(name, seed):
+    """Median latency must stay within MAX_REGRESSION of the baseline"""
+    scenario = next((s for s in benchmark.select_benchmark_scenarios(seed) if s.name == name), None)
+    if scenario is None:
+        pytest.skip(f"{name} is no longer a benchmark scenario")
+    results = asyncio.run(benchmark.benchmark([scenario], BASE_URL, runs=15, warmup=3))
+    regressions = benchmark.compare(results, BASELINE["scenarios"], MAX_REGRESSION, min_delta_ms=2.0)
+    assert not regressions, f"median regressed: {regressions}"
@@ -3,18 +3,25 @@ Nego Talent Marketplace API Tests
 Tests for: Health, Talents, Content, and Auth endpoints
 """
 import pytest
-import requests
-import os
-import time
 
-BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+from tests import checks
+from tests.seeding import SEED_PASSWORD
+
+
+@pytest.fixture
+def seed_client(seed):
+    """A client seeded for this worker (tests/seeding.py); skips without Supabase"""
+    if not seed.persisted:
+        pytest.skip("needs NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY to seed a user")
+    return seed.clients[0]
+
 
 class TestHealthEndpoint:
     """Health check endpoint tests"""
     
-    def test_health_returns_healthy(self):
+    def test_health_returns_healthy(self, http, base_url):
         """GET /api/health should return healthy status"""
-        response = requests.get(f"{BASE_URL}/api/health")
+        response = http.get(f"{base_url}/api/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
@@ -23,26 +30,22 @@ class TestHealthEndpoint:
 class TestTalentsEndpoint:
     """Talents CRUD endpoint tests"""
     
-    def test_get_talents_returns_list(self):
+    def test_get_talents_returns_list(self, http, base_url):
         """GET /api/talents should return list of talents"""
-        response = requests.get(f"{BASE_URL}/api/talents")
-        assert response.status_code == 200
-        data = response.json()
-        assert "talents" in data
-        assert "total" in data
-        assert isinstance(data["talents"], list)
+        response = http.get(f"{base_url}/api/talents")
+        checks.check_talents_list(response.status_code, response.json())
     
-    def test_get_talents_returns_8_seeded_talents(self):
+    def test_get_talents_returns_8_seeded_talents(self, http, base_url):
         """GET /api/talents should return 8 seeded talents"""
-        response = requests.get(f"{BASE_URL}/api/talents")
+        response = http.get(f"{base_url}/api/talents")
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 8
         assert len(data["talents"]) == 8
     
-    def test_talents_have_location_data(self):
+    def test_talents_have_location_data(self, http, base_url):
         """Each talent should have location data"""
-        response = requests.get(f"{BASE_URL}/api/talents")
+        response = http.get(f"{base_url}/api/talents")
         assert response.status_code == 200
         data = response.json()
         for talent in data["talents"]:
@@ -50,9 +53,9 @@ class TestTalentsEndpoint:
             assert talent["location"] is not None
             assert len(talent["location"]) > 0
     
-    def test_talents_have_required_fields(self):
+    def test_talents_have_required_fields(self, http, base_url):
         """Each talent should have all required fields"""
-        response = requests.get(f"{BASE_URL}/api/talents")
+        response = http.get(f"{base_url}/api/talents")
         assert response.status_code == 200
         data = response.json()
         required_fields = ["id", "name", "location", "image", "starting_price", "age"]
@@ -60,48 +63,44 @@ class TestTalentsEndpoint:
             for field in required_fields:
                 assert field in talent, f"Missing field: {field}"
     
-    def test_get_single_talent(self):
+    def test_get_single_talent(self, http, base_url):
         """GET /api/talents/{id} should return single talent"""
-        response = requests.get(f"{BASE_URL}/api/talents/talent-1")
-        assert response.status_code == 200
+        response = http.get(f"{base_url}/api/talents/talent-1")
         data = response.json()
-        assert data["id"] == "talent-1"
+        checks.check_single_talent(response.status_code, data)
         assert data["name"] == "Adaeze Nwosu"
         assert data["location"] == "Lagos"
     
-    def test_get_nonexistent_talent_returns_404(self):
+    def test_get_nonexistent_talent_returns_404(self, http, base_url):
         """GET /api/talents/{id} with invalid id should return 404"""
-        response = requests.get(f"{BASE_URL}/api/talents/nonexistent-talent")
-        assert response.status_code == 404
+        response = http.get(f"{base_url}/api/talents/nonexistent-talent")
+        checks.check_not_found(response.status_code, None)
 
 class TestContentEndpoint:
     """Private content endpoint tests"""
     
-    def test_get_content_returns_list(self):
+    def test_get_content_returns_list(self, http, base_url):
         """GET /api/content should return list of private content"""
-        response = requests.get(f"{BASE_URL}/api/content")
+        response = http.get(f"{base_url}/api/content")
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
     
-    def test_get_content_returns_3_items(self):
+    def test_get_content_returns_3_items(self, http, base_url):
         """GET /api/content should return 3 seeded content items"""
-        response = requests.get(f"{BASE_URL}/api/content")
+        response = http.get(f"{base_url}/api/content")
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 3
     
-    def test_content_items_are_locked(self):
+    def test_content_items_are_locked(self, http, base_url):
         """All content items should be locked by default"""
-        response = requests.get(f"{BASE_URL}/api/content")
-        assert response.status_code == 200
-        data = response.json()
-        for content in data:
-            assert content["is_locked"] == True
+        response = http.get(f"{base_url}/api/content")
+        checks.check_content_list(response.status_code, response.json())
     
-    def test_content_has_required_fields(self):
+    def test_content_has_required_fields(self, http, base_url):
         """Each content item should have required fields"""
-        response = requests.get(f"{BASE_URL}/api/content")
+        response = http.get(f"{base_url}/api/content")
         assert response.status_code == 200
         data = response.json()
         required_fields = ["id", "title", "image_url", "unlock_price", "is_locked"]
@@ -112,11 +111,11 @@ class TestContentEndpoint:
 class TestAuthEndpoints:
     """Authentication endpoint tests"""
     
-    def test_register_new_user(self):
+    def test_register_new_user(self, http, base_url, namespace):
         """POST /api/auth/register should create new user and return token"""
-        unique_email = f"TEST_user_{int(time.time())}@negoempire.live"
-        response = requests.post(
-            f"{BASE_URL}/api/auth/register",
+        unique_email = f"TEST_user_{namespace}@negoempire.live"
+        response = http.post(
+            f"{base_url}/api/auth/register",
             json={
                 "email": unique_email,
                 "name": "Test User",
@@ -130,50 +129,44 @@ class TestAuthEndpoints:
         assert data["user"]["email"] == unique_email
         assert data["user"]["name"] == "Test User"
     
-    def test_register_duplicate_email_fails(self):
+    def test_register_duplicate_email_fails(self, http, base_url, seed_client):
         """POST /api/auth/register with existing email should fail"""
-        response = requests.post(
-            f"{BASE_URL}/api/auth/register",
+        response = http.post(
+            f"{base_url}/api/auth/register",
             json={
-                "email": "test@negoempire.live",
+                "email": seed_client.email,
                 "name": "Duplicate User",
                 "password": "password123"
             }
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert "already registered" in data["detail"].lower()
+        checks.check_register_duplicate(response.status_code, response.json())
     
-    def test_login_valid_credentials(self):
+    def test_login_valid_credentials(self, http, base_url, seed_client):
         """POST /api/auth/login with valid credentials should return token"""
-        response = requests.post(
-            f"{BASE_URL}/api/auth/login",
+        response = http.post(
+            f"{base_url}/api/auth/login",
             json={
-                "email": "test@negoempire.live",
-                "password": "password123"
+                "email": seed_client.email,
+                "password": SEED_PASSWORD
             }
         )
-        assert response.status_code == 200
-        data = response.json()
-        assert "access_token" in data
-        assert "user" in data
-        assert data["user"]["email"] == "test@negoempire.live"
+        checks.check_login_valid(seed_client.email)(response.status_code, response.json())
     
-    def test_login_invalid_credentials(self):
+    def test_login_invalid_credentials(self, http, base_url, seed_client):
         """POST /api/auth/login with invalid credentials should fail"""
-        response = requests.post(
-            f"{BASE_URL}/api/auth/login",
+        response = http.post(
+            f"{base_url}/api/auth/login",
             json={
-                "email": "test@negoempire.live",
+                "email": seed_client.email,
                 "password": "wrongpassword"
             }
         )
-        assert response.status_code == 401
+        checks.check_unauthorized(response.status_code, None)
     
-    def test_login_nonexistent_user(self):
+    def test_login_nonexistent_user(self, http, base_url):
         """POST /api/auth/login with nonexistent user should fail"""
-        response = requests.post(
-            f"{BASE_URL}/api/auth/login",
+        response = http.post(
+            f"{base_url}/api/auth/login",
             json={
                 "email": "nonexistent@negoempire.live",
                 "password": "password123"
@@ -181,48 +174,48 @@ class TestAuthEndpoints:
         )
         assert response.status_code == 401
     
-    def test_get_me_with_valid_token(self):
+    def test_get_me_with_valid_token(self, http, base_url, seed_client):
         """GET /api/auth/me with valid token should return user"""
         # First login to get token
-        login_response = requests.post(
-            f"{BASE_URL}/api/auth/login",
+        login_response = http.post(
+            f"{base_url}/api/auth/login",
             json={
-                "email": "test@negoempire.live",
-                "password": "password123"
+                "email": seed_client.email,
+                "password": SEED_PASSWORD
             }
         )
         token = login_response.json()["access_token"]
         
         # Then get user info
-        response = requests.get(
-            f"{BASE_URL}/api/auth/me",
+        response = http.get(
+            f"{base_url}/api/auth/me",
             headers={"Authorization": f"Bearer {token}"}
         )
         assert response.status_code == 200
         data = response.json()
-        assert data["email"] == "test@negoempire.live"
+        assert data["email"] == seed_client.email
         assert "id" in data
         assert "name" in data
     
-    def test_get_me_without_token_fails(self):
+    def test_get_me_without_token_fails(self, http, base_url):
         """GET /api/auth/me without token should fail"""
-        response = requests.get(f"{BASE_URL}/api/auth/me")
-        assert response.status_code in [401, 403]
+        response = http.get(f"{base_url}/api/auth/me")
+        checks.check_me_without_token(response.status_code, None)
     
-    def test_get_me_with_invalid_token_fails(self):
+    def test_get_me_with_invalid_token_fails(self, http, base_url):
         """GET /api/auth/me with invalid token should fail"""
-        response = requests.get(
-            f"{BASE_URL}/api/auth/me",
+        response = http.get(
+            f"{base_url}/api/auth/me",
             headers={"Authorization": "Bearer invalid_token"}
         )
-        assert response.status_code == 401
+        checks.check_unauthorized(response.status_code, None)
 
 class TestAPIRoot:
     """API root endpoint tests"""
     
-    def test_api_root_returns_welcome(self):
+    def test_api_root_returns_welcome(self, http, base_url):
         """GET /api/ should return welcome message"""
-        response = requests.get(f"{BASE_URL}/api/")
+        response = http.get(f"{base_url}/api/")
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
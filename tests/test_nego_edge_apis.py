@@ -3,22 +3,22 @@ Nego Talent Marketplace Edge API Tests
 Tests for: Cloudinary Signature, Gifts, Media Unlock APIs (Edge Runtime)
 """
 import pytest
-import requests
-import os
 import uuid
 
-# Use localhost for testing since this is a Next.js app
-BASE_URL = "http://localhost:3000"
+from tests import checks
+
 
 class TestCloudinarySignatureAPI:
     """Cloudinary signature endpoint tests - Edge Runtime"""
     
-    def test_signature_returns_valid_response(self):
+    def test_signature_returns_valid_response(self, http, base_url):
         """GET /api/cloudinary/signature should return valid signature data"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature")
-        assert response.status_code == 200
+        response = http.get(f"{base_url}/api/cloudinary/signature")
         data = response.json()
         
+        # Valid SHA1 hex signature (40 chars) with the default folder and type
+        checks.check_signature()(response.status_code, data)
+        
         # Verify all required fields are present
         assert "signature" in data
         assert "timestamp" in data
@@ -26,67 +26,52 @@ class TestCloudinarySignatureAPI:
         assert "api_key" in data
         assert "folder" in data
         assert "resource_type" in data
-        
-        # Verify signature is a valid hex string (SHA1 = 40 chars)
-        assert len(data["signature"]) == 40
-        assert all(c in '0123456789abcdef' for c in data["signature"])
-        
-        # Verify defaults
-        assert data["folder"] == "uploads"
-        assert data["resource_type"] == "image"
     
-    def test_signature_with_video_resource_type(self):
+    def test_signature_with_video_resource_type(self, http, base_url):
         """GET /api/cloudinary/signature?resource_type=video should work"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature?resource_type=video")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["resource_type"] == "video"
+        response = http.get(f"{base_url}/api/cloudinary/signature?resource_type=video")
+        checks.check_signature("uploads", "video")(response.status_code, response.json())
     
-    def test_signature_with_custom_folder(self):
+    def test_signature_with_custom_folder(self, http, base_url):
         """GET /api/cloudinary/signature?folder=media should work"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature?folder=media")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["folder"] == "media"
+        response = http.get(f"{base_url}/api/cloudinary/signature?folder=media")
+        checks.check_signature("media")(response.status_code, response.json())
     
-    def test_signature_with_nested_folder(self):
+    def test_signature_with_nested_folder(self, http, base_url):
         """GET /api/cloudinary/signature?folder=users/avatars should work"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature?folder=users/avatars")
+        response = http.get(f"{base_url}/api/cloudinary/signature?folder=users/avatars")
         assert response.status_code == 200
         data = response.json()
         assert data["folder"] == "users/avatars"
     
-    def test_signature_invalid_resource_type_returns_400(self):
+    def test_signature_invalid_resource_type_returns_400(self, http, base_url):
         """GET /api/cloudinary/signature?resource_type=audio should return 400"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature?resource_type=audio")
-        assert response.status_code == 400
-        data = response.json()
-        assert "error" in data
-        assert "Invalid resource type" in data["error"]
+        response = http.get(f"{base_url}/api/cloudinary/signature?resource_type=audio")
+        checks.check_signature_invalid_type(response.status_code, response.json())
     
-    def test_signature_invalid_folder_returns_400(self):
+    def test_signature_invalid_folder_returns_400(self, http, base_url):
         """GET /api/cloudinary/signature?folder=invalid_folder should return 400"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature?folder=invalid_folder")
+        response = http.get(f"{base_url}/api/cloudinary/signature?folder=invalid_folder")
         assert response.status_code == 400
         data = response.json()
         assert "error" in data
         assert "Invalid folder" in data["error"]
     
-    def test_signature_allowed_folders(self):
+    def test_signature_allowed_folders(self, http, base_url):
         """Test all allowed folders work"""
         allowed_folders = ['users', 'talents', 'media', 'avatars', 'profiles', 'uploads']
         for folder in allowed_folders:
-            response = requests.get(f"{BASE_URL}/api/cloudinary/signature?folder={folder}")
+            response = http.get(f"{base_url}/api/cloudinary/signature?folder={folder}")
             assert response.status_code == 200, f"Folder {folder} should be allowed"
 
 
 class TestGiftsAPI:
     """Gifts endpoint tests - Edge Runtime with UUID validation"""
     
-    def test_gifts_missing_fields_returns_400(self):
+    def test_gifts_missing_fields_returns_400(self, http, base_url):
         """POST /api/gifts with missing fields should return 400"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={},
             headers={"Content-Type": "application/json"}
         )
@@ -95,10 +80,10 @@ class TestGiftsAPI:
         assert "error" in data
         assert "Missing required fields" in data["error"]
     
-    def test_gifts_invalid_uuid_returns_400(self):
+    def test_gifts_invalid_uuid_returns_400(self, http, base_url):
         """POST /api/gifts with invalid UUID should return 400"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": "invalid-uuid",
                 "recipientId": "also-invalid",
@@ -111,12 +96,12 @@ class TestGiftsAPI:
         assert "error" in data
         assert "Invalid user ID format" in data["error"]
     
-    def test_gifts_amount_below_minimum_returns_400(self):
+    def test_gifts_amount_below_minimum_returns_400(self, http, base_url):
         """POST /api/gifts with amount < 100 should return 400"""
         sender_id = str(uuid.uuid4())
         recipient_id = str(uuid.uuid4())
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": sender_id,
                 "recipientId": recipient_id,
@@ -129,11 +114,11 @@ class TestGiftsAPI:
         assert "error" in data
         assert "Minimum gift amount" in data["error"]
     
-    def test_gifts_self_gifting_returns_400(self):
+    def test_gifts_self_gifting_returns_400(self, http, base_url):
         """POST /api/gifts to self should return 400"""
         user_id = str(uuid.uuid4())
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": user_id,
                 "recipientId": user_id,
@@ -146,12 +131,12 @@ class TestGiftsAPI:
         assert "error" in data
         assert "Cannot gift to yourself" in data["error"]
     
-    def test_gifts_nonexistent_sender_returns_404(self):
+    def test_gifts_nonexistent_sender_returns_404(self, http, base_url):
         """POST /api/gifts with non-existent sender should return 404"""
         sender_id = str(uuid.uuid4())
         recipient_id = str(uuid.uuid4())
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={
                 "senderId": sender_id,
                 "recipientId": recipient_id,
@@ -159,31 +144,25 @@ class TestGiftsAPI:
             },
             headers={"Content-Type": "application/json"}
         )
-        assert response.status_code == 404
-        data = response.json()
-        assert "error" in data
-        assert "wallet not found" in data["error"].lower()
+        checks.check_gift_nonexistent_sender(response.status_code, response.json())
 
 
 class TestMediaUnlockAPI:
     """Media unlock endpoint tests - Edge Runtime"""
     
-    def test_unlock_missing_fields_returns_400(self):
+    def test_unlock_missing_fields_returns_400(self, http, base_url):
         """POST /api/media/unlock with missing fields should return 400"""
-        response = requests.post(
-            f"{BASE_URL}/api/media/unlock",
+        response = http.post(
+            f"{base_url}/api/media/unlock",
             json={},
             headers={"Content-Type": "application/json"}
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert "error" in data
-        assert "Missing required fields" in data["error"]
+        checks.check_unlock_missing_fields(response.status_code, response.json())
     
-    def test_unlock_invalid_uuid_returns_400(self):
+    def test_unlock_invalid_uuid_returns_400(self, http, base_url):
         """POST /api/media/unlock with invalid UUID should return 400"""
-        response = requests.post(
-            f"{BASE_URL}/api/media/unlock",
+        response = http.post(
+            f"{base_url}/api/media/unlock",
             json={
                 "userId": "invalid",
                 "mediaId": "invalid",
@@ -192,18 +171,15 @@ class TestMediaUnlockAPI:
             },
             headers={"Content-Type": "application/json"}
         )
-        assert response.status_code == 400
-        data = response.json()
-        assert "error" in data
-        assert "Invalid ID format" in data["error"]
+        checks.check_unlock_invalid_uuid(response.status_code, response.json())
     
-    def test_unlock_nonexistent_user_returns_error(self):
+    def test_unlock_nonexistent_user_returns_error(self, http, base_url):
         """POST /api/media/unlock with non-existent user should return error"""
         user_id = str(uuid.uuid4())
         media_id = str(uuid.uuid4())
         talent_id = str(uuid.uuid4())
-        response = requests.post(
-            f"{BASE_URL}/api/media/unlock",
+        response = http.post(
+            f"{base_url}/api/media/unlock",
             json={
                 "userId": user_id,
                 "mediaId": media_id,
@@ -213,19 +189,16 @@ class TestMediaUnlockAPI:
             headers={"Content-Type": "application/json"}
         )
         # API returns 400 when RPC returns success:false, or 404 for direct wallet lookup
-        assert response.status_code in [400, 404]
-        data = response.json()
-        assert "error" in data
-        assert "wallet not found" in data["error"].lower()
+        checks.check_unlock_nonexistent_user(response.status_code, response.json())
     
-    def test_unlock_valid_uuid_format_accepted(self):
+    def test_unlock_valid_uuid_format_accepted(self, http, base_url):
         """POST /api/media/unlock with valid UUID format should pass validation"""
         # This test verifies UUID validation passes (will fail on wallet lookup)
         user_id = str(uuid.uuid4())
         media_id = str(uuid.uuid4())
         talent_id = str(uuid.uuid4())
-        response = requests.post(
-            f"{BASE_URL}/api/media/unlock",
+        response = http.post(
+            f"{base_url}/api/media/unlock",
             json={
                 "userId": user_id,
                 "mediaId": media_id,
@@ -241,30 +214,30 @@ class TestMediaUnlockAPI:
 class TestAPIEdgeRuntime:
     """Tests to verify Edge Runtime compatibility"""
     
-    def test_cloudinary_signature_no_server_error(self):
+    def test_cloudinary_signature_no_server_error(self, http, base_url):
         """Cloudinary signature should not return 500/520 (Edge runtime working)"""
-        response = requests.get(f"{BASE_URL}/api/cloudinary/signature")
+        response = http.get(f"{base_url}/api/cloudinary/signature")
         assert response.status_code not in [500, 520], "Edge runtime should work without Node.js crypto"
     
-    def test_gifts_api_no_server_error(self):
+    def test_gifts_api_no_server_error(self, http, base_url):
         """Gifts API should not return 500/520 (Edge runtime working)"""
-        response = requests.post(
-            f"{BASE_URL}/api/gifts",
+        response = http.post(
+            f"{base_url}/api/gifts",
             json={"senderId": "test", "recipientId": "test", "amount": 100},
             headers={"Content-Type": "application/json"}
         )
         # Should return 400 for validation error, not 500/520
         assert response.status_code not in [500, 520], "Edge runtime should work"
     
-    def test_media_unlock_api_no_server_error(self):
+    def test_media_unlock_api_no_server_error(self, http, base_url):
         """Media unlock API should not return 500/520 (Edge runtime working)"""
-        response = requests.post(
-            f"{BASE_URL}/api/media/unlock",
+        response = http.post(
+            f"{base_url}/api/media/unlock",
             json={"userId": "test", "mediaId": "test", "talentId": "test", "unlockPrice": 100},
             headers={"Content-Type": "application/json"}
         )
         # Should return 400 for validation error, not 500/520
-        assert response.status_code not in [500, 520], "Edge runtime should work"
+        checks.check_no_server_error(response.status_code, None)
 
 
 if __name__ == "__main__":
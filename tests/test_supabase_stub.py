@@ -0,0 +1,264 @@
+"""
+Supabase Stand-in Tests
+Checks the local stand-in speaks enough PostgREST/RPC/GoTrue for the API
+routes, and that its RPCs keep wallet balances consistent under contention.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from tests.seeding import WorkerSeed
+from tests.supabase_stub import TEST_CLIENT_EMAIL, TEST_CLIENT_ID, TEST_CLIENT_PASSWORD, SupabaseStub
+
+TALENT_ID = "a1111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def stub():
+    with SupabaseStub() as running:
+        yield running
+
+
+def rest(stub, path, **kwargs):
+    headers = {**stub.service_headers(), **kwargs.pop("headers", {})}
+    return requests.request(kwargs.pop("method", "GET"), f"{stub.url}/rest/v1/{path}", headers=headers, **kwargs)
+
+
+class TestSeedData:
+    """Rows parsed from supabase_seed_talents.sql"""
+
+    def test_seeded_talents(self, stub):
+        response = rest(stub, "profiles?select=id,display_name&role=eq.talent&order=display_name.asc")
+        assert response.status_code == 200
+        names = [row["display_name"] for row in response.json()]
+        assert names == ["Adaeze", "Chidinma", "Folake", "Grace", "Halima", "Ify"]
+
+    def test_seeded_premium_media(self, stub):
+        response = rest(stub, "media?select=talent_id,unlock_price&is_premium=eq.true")
+        assert len(response.json()) == 4
+        assert all(row["unlock_price"] > 0 for row in response.json())
+
+    def test_talent_menus_resolve_service_types(self, stub):
+        menus = rest(stub, f"talent_menus?talent_id=eq.{TALENT_ID}").json()
+        service_ids = {row["id"] for row in rest(stub, "service_types").json()}
+        assert len(menus) == 4
+        assert all(menu["service_type_id"] in service_ids for menu in menus)
+
+
+class TestPostgrest:
+    """Filter, single-object and write semantics used by supabase-js"""
+
+    def test_single_object_accept_header(self, stub):
+        response = rest(
+            stub, f"wallets?select=balance&user_id=eq.{TALENT_ID}",
+            headers={"Accept": "application/vnd.pgrst.object+json"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"balance": 0}
+
+    def test_single_object_missing_row_is_406(self, stub):
+        response = rest(
+            stub, "wallets?user_id=eq.00000000-0000-0000-0000-000000000009",
+            headers={"Accept": "application/vnd.pgrst.object+json"},
+        )
+        assert response.status_code == 406
+        assert response.json()["code"] == "PGRST116"
+
+    def test_in_or_and_paging(self, stub):
+        response = rest(
+            stub, "profiles?select=display_name&location=in.(Lagos,Kano)"
+                  "&or=(status.eq.online,status.eq.booked)&order=starting_price.desc&limit=2",
+            headers={"Prefer": "count=exact"},
+        )
+        assert [row["display_name"] for row in response.json()] == ["Halima", "Adaeze"]
+        assert response.headers["Content-Range"] == "0-1/3"
+
+    def test_insert_update_delete(self, stub):
+        created = rest(
+            stub, "notifications?select=id,user_id", method="POST",
+            json=[{"user_id": TEST_CLIENT_ID, "title": "Hi"}],
+            headers={"Prefer": "return=representation"},
+        )
+        assert created.status_code == 201
+        notification_id = created.json()[0]["id"]
+
+        rest(stub, f"notifications?id=eq.{notification_id}", method="PATCH", json={"is_read": True})
+        assert rest(stub, f"notifications?id=eq.{notification_id}").json()[0]["is_read"] is True
+
+        rest(stub, f"notifications?id=eq.{notification_id}", method="DELETE")
+        assert rest(stub, "notifications").json() == []
+
+    def test_duplicate_primary_key_conflicts(self, stub):
+        response = rest(stub, "wallets", method="POST", json={"user_id": TALENT_ID, "balance": 5})
+        assert response.status_code == 409
+        assert response.json()["code"] == "23505"
+
+
+class TestAuth:
+    """GoTrue endpoints"""
+
+    def test_password_grant_and_get_user(self, stub):
+        response = requests.post(
+            f"{stub.url}/auth/v1/token?grant_type=password",
+            json={"email": TEST_CLIENT_EMAIL, "password": TEST_CLIENT_PASSWORD},
+        )
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+        user = requests.get(f"{stub.url}/auth/v1/user", headers={"Authorization": f"Bearer {token}"})
+        assert user.json()["id"] == TEST_CLIENT_ID
+
+    def test_invalid_token_rejected(self, stub):
+        response = requests.get(f"{stub.url}/auth/v1/user", headers={"Authorization": "Bearer invalid_token"})
+        assert response.status_code == 401
+
+    def test_admin_users_require_service_role(self, stub):
+        response = requests.post(
+            f"{stub.url}/auth/v1/admin/users", headers=stub.user_headers(TEST_CLIENT_ID),
+            json={"email": "x@nego.test", "password": "pw"},
+        )
+        assert response.status_code == 403
+
+
+class TestWorkerSeed:
+    """Namespaced per-worker data from tests/seeding.py"""
+
+    def test_workers_get_disjoint_users_and_wallets(self, stub):
+        first = WorkerSeed(stub.url, stub.service_role_key, "gw0-run1").create(clients=2, talents=1, balance=500)
+        second = WorkerSeed(stub.url, stub.service_role_key, "gw1-run1").create(clients=2, talents=1, balance=500)
+
+        assert not {u.id for u in first.users} & {u.id for u in second.users}
+        assert all(".gw0-run1@" in u.email for u in first.users)
+        assert stub.db.find("profiles", id=first.talents[0].id)["role"] == "talent"
+        assert all(stub.db.find("wallets", user_id=u.id)["balance"] == 500 for u in first.users + second.users)
+
+    def test_talents_get_a_bookable_profile_and_menu(self, stub):
+        seed = WorkerSeed(stub.url, stub.service_role_key, "gw0-run5").create(clients=0, talents=2)
+        for talent in seed.talents:
+            profile = stub.db.find("profiles", id=talent.id)
+            menus = stub.db.query("talent_menus", [("talent_id", f"eq.{talent.id}")])
+            assert profile["status"] == "online"
+            assert profile["starting_price"] == talent.menu[0]["price"]
+            assert sorted((m["service_type_id"], m["price"]) for m in menus) == sorted(
+                (item["service_type_id"], item["price"]) for item in talent.menu
+            )
+            assert all(stub.db.find("service_types", id=m["service_type_id"]) for m in menus)
+
+        seed.teardown()
+        assert not any(stub.db.query("talent_menus", [("talent_id", f"eq.{t.id}")]) for t in seed.talents)
+
+    def test_teardown_removes_only_its_own_rows(self, stub):
+        seed = WorkerSeed(stub.url, stub.service_role_key, "gw0-run2").create(clients=1, talents=1)
+        assert seed.teardown() == 0
+        assert all(stub.db.find("profiles", id=u.id) is None for u in seed.users)
+        assert all(stub.db.find("wallets", user_id=u.id) is None for u in seed.users)
+        assert stub.db.find("profiles", id=TEST_CLIENT_ID) is not None
+
+    def test_rerun_in_same_namespace_conflicts(self, stub):
+        WorkerSeed(stub.url, stub.service_role_key, "gw0-run3").create(clients=1, talents=0)
+        with pytest.raises(requests.HTTPError):
+            WorkerSeed(stub.url, stub.service_role_key, "gw0-run3").create(clients=1, talents=0)
+
+    def test_partial_create_removes_the_users_it_made(self, stub):
+        WorkerSeed(stub.url, stub.service_role_key, "gw0-run4").create(clients=1, talents=0)
+        seed = WorkerSeed(stub.url, stub.service_role_key, "gw0-run4")
+        with pytest.raises(requests.HTTPError):
+            seed.create(clients=3, talents=0)
+        assert all(stub.db.find("profiles", id=u.id) is None for u in seed.users)
+        assert not seed.persisted
+
+
+class TestRpc:
+    """handle_gift, gift_leaderboard and unlock_media"""
+
+    def call(self, stub, name, params, headers=None):
+        return requests.post(
+            f"{stub.url}/rest/v1/rpc/{name}", json=params, headers=headers or stub.service_headers()
+        ).json()
+
+    def test_gift_moves_balance_and_records_ledger(self, stub):
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = 1000
+        result = self.call(stub, "handle_gift", {
+            "p_sender_id": TEST_CLIENT_ID, "p_recipient_id": TALENT_ID, "p_amount": 300, "p_message": None,
+        })
+        assert result["success"] is True
+        assert result["new_balance"] == 700
+        assert stub.db.find("wallets", user_id=TALENT_ID)["balance"] == 300
+        assert len(stub.db.rows("transactions")) == 2
+
+    def test_gift_leaderboard_ranks_senders(self, stub):
+        big = stub.db.add_user("big@nego.test", "pw", balance=5000, display_name="Big Spender")
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = 1000
+        for sender, amount in [(TEST_CLIENT_ID, 300), (big, 1000), (TEST_CLIENT_ID, 200), (big, 500)]:
+            self.call(stub, "handle_gift", {"p_sender_id": sender, "p_recipient_id": TALENT_ID, "p_amount": amount})
+
+        board = self.call(stub, "gift_leaderboard", {"p_recipient_id": TALENT_ID, "p_window": "week", "p_limit": 10})
+        assert [(row["sender_id"], row["total_amount"], row["gift_count"]) for row in board] == [
+            (big, 1500, 2), (TEST_CLIENT_ID, 500, 2),
+        ]
+        assert board[0]["display_name"] == "Big Spender"
+
+    def test_gift_leaderboard_shows_other_callers_only_their_row(self, stub):
+        big = stub.db.add_user("big@nego.test", "pw", balance=5000)
+        outsider = stub.db.add_user("outsider@nego.test", "pw")
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = 1000
+        for sender, amount in [(TEST_CLIENT_ID, 300), (big, 1000)]:
+            self.call(stub, "handle_gift", {"p_sender_id": sender, "p_recipient_id": TALENT_ID, "p_amount": amount})
+
+        params = {"p_recipient_id": TALENT_ID, "p_window": "all"}
+        as_client = self.call(stub, "gift_leaderboard", params, headers=stub.user_headers(TEST_CLIENT_ID))
+        as_outsider = self.call(stub, "gift_leaderboard", params, headers=stub.user_headers(outsider))
+        assert [row["sender_id"] for row in as_client] == [TEST_CLIENT_ID]
+        assert as_outsider == []
+
+    @pytest.mark.parametrize("window,days", [("week", 7), ("month", 30)])
+    def test_gift_leaderboard_window_boundary(self, stub, window, days):
+        older = stub.db.add_user("older@nego.test", "pw")
+        today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        for age, sender, amount in [(days - 1, TEST_CLIENT_ID, 300), (days, older, 900)]:
+            stub.db.insert("gifts", {
+                "sender_id": sender, "recipient_id": TALENT_ID, "amount": amount,
+                "created_at": (today - timedelta(days=age)).isoformat(),
+            })
+
+        board = self.call(stub, "gift_leaderboard", {"p_recipient_id": TALENT_ID, "p_window": window})
+        assert [(row["sender_id"], row["total_amount"]) for row in board] == [(TEST_CLIENT_ID, 300)]
+
+    def test_unlock_requires_matching_caller(self, stub):
+        media = rest(stub, "media?is_premium=eq.true&limit=1").json()[0]
+        result = self.call(stub, "unlock_media", {"p_user_id": TEST_CLIENT_ID, "p_media_id": media["id"]})
+        assert result == {"success": False, "code": "forbidden", "error": "Forbidden"}
+
+    def test_concurrent_gifts_never_overdraw(self, stub):
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = 1000
+        params = {"p_sender_id": TEST_CLIENT_ID, "p_recipient_id": TALENT_ID, "p_amount": 100}
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(lambda _: self.call(stub, "handle_gift", params), range(30)))
+        assert sum(r["success"] for r in results) == 10
+        assert stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] == 0
+
+    def test_unlock_with_user_session(self, stub):
+        media = rest(stub, f"media?is_premium=eq.true&talent_id=eq.{TALENT_ID}").json()[0]
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = media["unlock_price"]
+        params = {"p_user_id": TEST_CLIENT_ID, "p_media_id": media["id"]}
+        result = self.call(stub, "unlock_media", params, stub.user_headers(TEST_CLIENT_ID))
+        assert result["success"] is True
+        assert result["new_balance"] == 0
+        again = self.call(stub, "unlock_media", params, stub.user_headers(TEST_CLIENT_ID))
+        assert again["error"] == "This content is already unlocked"
+
+    def test_concurrent_unlocks_never_overdraw(self, stub):
+        premium = rest(stub, "media?is_premium=eq.true").json()
+        stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] = premium[0]["unlock_price"]
+        headers = stub.user_headers(TEST_CLIENT_ID)
+
+        def unlock(media):
+            params = {"p_user_id": TEST_CLIENT_ID, "p_media_id": media["id"]}
+            return self.call(stub, "unlock_media", params, headers)
+
+        with ThreadPoolExecutor(max_workers=len(premium)) as pool:
+            results = list(pool.map(unlock, premium))
+        assert sum(r["success"] for r in results) >= 1
+        assert all(r["success"] or r["code"] == "insufficient_balance" for r in results)
+        assert stub.db.find("wallets", user_id=TEST_CLIENT_ID)["balance"] >= 0
@@ -0,0 +1,88 @@
+"""
+Stage Timing Aggregation Tests
+Parses Server-Timing headers and [Trace] log lines and checks the per-stage
+breakdown, including end to end through the load generator against a local server.
+"""
+import asyncio
+import json
+
+from aiohttp import web
+
+from tests import loadgen, timings
+from tests.scenarios import Scenario
+
+GIFT_TIMING = "auth;dur=4.5, parse;dur=0.2, db.handle_gift;dur=30, db.recipient_profile;dur=5.3, total;dur=41"
+
+
+def test_parse_server_timing():
+    stages = timings.parse_server_timing(GIFT_TIMING)
+    assert stages == {
+        "auth": 4.5, "parse": 0.2, "db.handle_gift": 30.0, "db.recipient_profile": 5.3, "total": 41.0,
+    }
+
+
+def test_parse_server_timing_sums_repeats_and_skips_entries_without_duration():
+    stages = timings.parse_server_timing('db.settle_batch;dur=10, miss;desc="cache", db.settle_batch;dur=5.5')
+    assert stages == {"db.settle_batch": 15.5}
+    assert timings.parse_server_timing(None) == {}
+
+
+def test_parse_trace_line():
+    line = "2026-10-17T10:00:00Z [Trace] " + json.dumps({
+        "route": "POST /api/gifts", "status": 200, "total_ms": 41, "sampled": True,
+        "spans": [{"name": "auth", "start": 0.1, "duration": 4.5},
+                  {"name": "db.handle_gift", "start": 5, "duration": 30}],
+    })
+    assert timings.parse_trace_line(line) == ("POST /api/gifts", {"auth": 4.5, "db.handle_gift": 30.0, "total": 41.0})
+    assert timings.parse_trace_line("[Gift API] RPC error") is None
+    assert timings.parse_trace_line("[Trace] {not json") is None
+
+
+def test_summary_orders_stages_and_computes_share():
+    collected = timings.StageTimings()
+    for _ in range(3):
+        collected.add_header("POST /api/gifts", GIFT_TIMING)
+    collected.add_header("POST /api/gifts", "")
+
+    report = collected.summary()["POST /api/gifts"]
+    assert report["requests"] == 3
+    assert list(report["stages"]) == ["db.handle_gift", "db.recipient_profile", "auth", "parse", "total"]
+    assert report["stages"]["db.handle_gift"]["p50_ms"] == 30.0
+    assert report["stages"]["db.handle_gift"]["share"] == round(30 / 41, 3)
+    assert report["stages"]["total"]["share"] == 1.0
+
+
+def test_add_log_filters_by_route():
+    lines = [
+        "[Trace] " + json.dumps({"route": "POST /api/gifts", "total_ms": 40, "spans": []}),
+        "[Trace] " + json.dumps({"route": "GET /api/messages", "total_ms": 12, "spans": []}),
+        "unrelated line",
+    ]
+    collected = timings.StageTimings()
+    collected.add_log(lines, route_filter="/api/gifts")
+    assert list(collected.summary()) == ["POST /api/gifts"]
+
+
+def test_loadgen_collects_server_timing():
+    async def handler(request):
+        return web.json_response({"ok": True}, headers={"Server-Timing": "auth;dur=2, db.query;dur=8, total;dur=11"})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/api/timed", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            scenario = Scenario("timed", "GET", "/api/timed", check=lambda status, data: None)
+            return await loadgen.run_level([scenario], 4, 20, f"http://127.0.0.1:{port}")
+        finally:
+            await runner.cleanup()
+
+    level = asyncio.run(run())
+    stages = level["stages"]["GET /api/timed"]
+    assert stages["requests"] == 20
+    assert stages["stages"]["db.query"]["p95_ms"] == 8.0
+    assert list(stages["stages"])[-1] == "total"
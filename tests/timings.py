@@ -0,0 +1,154 @@
+"""
+Per-stage latency breakdowns from Server-Timing headers and trace logs
+The API hot paths time each stage and database call (src/lib/tracing.ts) and
+report them in a Server-Timing header on every response, plus a
+"[Trace] {...}" log line for sampled or slow requests. StageTimings collects
+either source and summarizes p50/p95 per stage, per route, along with the share
+of the route's total time each stage accounts for.
+
+tests/loadgen.py collects the headers automatically. For server logs:
+
+Usage:
+    TRACE_SAMPLE_RATE=1 npm start 2>&1 | tee server.log  # log every request's spans
+    python -m tests.timings server.log                  # breakdown from the [Trace] lines
+    python -m tests.timings server.log --route /api/gifts --json breakdown.json
+"""
+import argparse
+import json
+import math
+import re
+import sys
+from collections import defaultdict
+
+TOTAL = "total"
+
+TRACE_MARKER = "[Trace]"
+
+_DURATION = re.compile(r"(?:^|;)\s*dur=([0-9.]+)")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def parse_server_timing(header):
+    """{stage: milliseconds} from a Server-Timing header; repeated stages are summed"""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        match = _DURATION.search(params)
+        if not name or not match:
+            continue
+        stages[name] = stages.get(name, 0.0) + float(match.group(1))
+    return stages
+
+
+def parse_trace_line(line):
+    """(route, {stage: milliseconds}) from a "[Trace] {...}" log line, or None"""
+    marker = line.find(TRACE_MARKER)
+    if marker < 0:
+        return None
+    try:
+        trace = json.loads(line[marker + len(TRACE_MARKER):])
+    except ValueError:
+        return None
+    stages = {}
+    for span in trace.get("spans", []):
+        stages[span["name"]] = stages.get(span["name"], 0.0) + float(span["duration"])
+    stages[TOTAL] = float(trace.get("total_ms", 0.0))
+    return trace.get("route", "unknown"), stages
+
+
+class StageTimings:
+    """Stage durations per route, summarized as p50/p95/mean and share of total"""
+
+    def __init__(self):
+        self.samples = defaultdict(lambda: defaultdict(list))
+        self.requests = defaultdict(int)
+
+    def add(self, route, stages):
+        if not stages:
+            return
+        self.requests[route] += 1
+        for name, duration in stages.items():
+            self.samples[route][name].append(duration)
+
+    def add_header(self, route, header):
+        self.add(route, parse_server_timing(header))
+
+    def add_log(self, lines, route_filter=None):
+        for line in lines:
+            parsed = parse_trace_line(line)
+            if parsed and (not route_filter or route_filter in parsed[0]):
+                self.add(*parsed)
+
+    def summary(self):
+        """{route: {"requests": n, "stages": {stage: stats}}}, stages by mean time, total last"""
+        report = {}
+        for route, stages in sorted(self.samples.items()):
+            totals = stages.get(TOTAL, [])
+            total_time = sum(totals)
+            summarized = {}
+            for name, durations in stages.items():
+                ordered = sorted(durations)
+                summarized[name] = {
+                    "count": len(ordered),
+                    "p50_ms": round(percentile(ordered, 50), 2),
+                    "p95_ms": round(percentile(ordered, 95), 2),
+                    "mean_ms": round(sum(ordered) / len(ordered), 2),
+                    # Time in this stage across all requests, over all requests' total time
+                    "share": round(sum(ordered) / total_time, 3) if total_time else None,
+                }
+            order = sorted((name for name in summarized if name != TOTAL),
+                           key=lambda name: -summarized[name]["mean_ms"])
+            if TOTAL in summarized:
+                order.append(TOTAL)
+            report[route] = {"requests": self.requests[route], "stages": {name: summarized[name] for name in order}}
+        return report
+
+
+def print_summary(report):
+    for route, data in report.items():
+        print(f"\n{route}  ({data['requests']} requests)")
+        print(f"    {'stage':<28}{'n':>7}{'p50':>9}{'p95':>9}{'mean':>9}{'share':>8}")
+        for name, stats in data["stages"].items():
+            share = f"{stats['share'] * 100:.0f}%" if stats["share"] is not None else "-"
+            print(
+                f"    {name:<28}{stats['count']:>7}{stats['p50_ms']:>9}"
+                f"{stats['p95_ms']:>9}{stats['mean_ms']:>9}{share:>8}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", help="server log files with [Trace] lines (default: stdin)")
+    parser.add_argument("--route", help="only routes containing this, e.g. /api/gifts")
+    parser.add_argument("--json", dest="json_path", help="write the breakdown to this file")
+    args = parser.parse_args(argv)
+
+    timings = StageTimings()
+    if args.logs:
+        for path in args.logs:
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                timings.add_log(fh, args.route)
+    else:
+        timings.add_log(sys.stdin, args.route)
+
+    report = timings.summary()
+    if not report:
+        print("no [Trace] lines found; set TRACE_SAMPLE_RATE or TRACE_TOKEN on the server")
+        return 1
+    print_summary(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())